@@ -0,0 +1,221 @@
+"""
+Upbit API 호출 통계 모듈 - 엔드포인트별 호출/오류 수, 지연 시간 분포, Remaining-Req 잔여량
+
+upbit_api 훅의 관찰자로 등록되어 pyupbit 시세/주문/잔고 조회 호출을 모두 집계합니다.
+"""
+
+from collections import deque
+import bisect
+import re
+import threading
+
+import clock
+
+
+# 지연 시간 히스토그램 버킷 상한(ms) - 마지막은 +Inf
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# 백분위 계산용으로 엔드포인트별 보관하는 최근 샘플 수
+_RECENT_SAMPLES = 1024
+
+_REMAINING_RE = re.compile(r"(group|min|sec)\s*=\s*([A-Za-z0-9_\-]+)")
+
+
+def parse_remaining_req(text):
+    """'group=market; min=599; sec=9' -> {'group': 'market', 'min': 599, 'sec': 9}"""
+    if not text:
+        return None
+    parsed = {}
+    for key, value in _REMAINING_RE.findall(str(text)):
+        if key == "group":
+            parsed["group"] = value
+        else:
+            try:
+                parsed[key] = int(value)
+            except ValueError:
+                continue
+    return parsed if "group" in parsed else None
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class _EndpointStats:
+    __slots__ = (
+        "count", "errors", "status_429", "hedged", "hedge_wins",
+        "total_ms", "max_ms", "buckets", "recent", "last_error", "last_at",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.status_429 = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=_RECENT_SAMPLES)
+        self.last_error = None
+        self.last_at = None
+
+
+class ApiStats:
+    """엔드포인트(메서드 + 경로)별 호출 통계."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}  # "GET /v1/ticker" -> _EndpointStats
+        self._remaining = {}  # group -> {"min", "sec", "at"}
+        self.started_at = clock.now()
+        self.loops = 0
+        self._window_calls = 0
+        self._window_errors = 0
+        self._window_loops = 0
+        self._window_started = clock.time()
+
+    def observe(self, call):
+        """upbit_api 관찰자 콜백."""
+        key = f"{call.get('method', '?')} {call.get('endpoint', '?')}"
+        elapsed_ms = float(call.get("elapsed_ms", 0) or 0)
+        failed = call.get("error") is not None
+        status = call.get("status")
+        remaining = parse_remaining_req(call.get("remaining_req"))
+
+        with self._lock:
+            ep = self._endpoints.get(key)
+            if ep is None:
+                ep = self._endpoints[key] = _EndpointStats()
+            ep.count += 1
+            ep.total_ms += elapsed_ms
+            ep.max_ms = max(ep.max_ms, elapsed_ms)
+            ep.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+            ep.recent.append(elapsed_ms)
+            ep.last_at = call.get("started_at")
+            if failed:
+                ep.errors += 1
+                ep.last_error = call.get("error")
+                self._window_errors += 1
+            if status == 429:
+                ep.status_429 += 1
+            if int(call.get("attempts", 1) or 1) > 1:
+                ep.hedged += 1
+                if call.get("hedge_won"):
+                    ep.hedge_wins += 1
+            self._window_calls += 1
+
+            if remaining:
+                self._remaining[remaining["group"]] = {
+                    "min": remaining.get("min"),
+                    "sec": remaining.get("sec"),
+                    "at": clock.time(),
+                }
+
+    def mark_loop(self):
+        """거래 루프 1회 (루프당 호출 수 계산용)."""
+        with self._lock:
+            self.loops += 1
+            self._window_loops += 1
+
+    def percentiles(self, key):
+        with self._lock:
+            ep = self._endpoints.get(key)
+            values = sorted(ep.recent) if ep else []
+        return {f"p{p}": _percentile(values, p) for p in (50, 95, 99)}
+
+    def get_p95_ms(self, key, min_samples=20):
+        """최근 샘플 기준 p95(ms). 샘플이 부족하면 None."""
+        with self._lock:
+            ep = self._endpoints.get(key)
+            if ep is None or len(ep.recent) < min_samples:
+                return None
+            values = sorted(ep.recent)
+        return _percentile(values, 95)
+
+    def remaining(self):
+        with self._lock:
+            return {group: dict(info) for group, info in self._remaining.items()}
+
+    def snapshot(self, reset_window=False):
+        """전체 통계 스냅샷 (JSON 직렬화 가능).
+
+        reset_window=True면 window(직전 호출 이후 구간) 카운터를 초기화합니다.
+        """
+        now = clock.time()
+        with self._lock:
+            endpoints = {}
+            total_calls = 0
+            total_errors = 0
+            for key, ep in self._endpoints.items():
+                values = sorted(ep.recent)
+                total_calls += ep.count
+                total_errors += ep.errors
+                endpoints[key] = {
+                    "count": ep.count,
+                    "errors": ep.errors,
+                    "status_429": ep.status_429,
+                    "hedged": ep.hedged,
+                    "hedge_wins": ep.hedge_wins,
+                    "avg_ms": round(ep.total_ms / ep.count, 2) if ep.count else None,
+                    "max_ms": round(ep.max_ms, 2),
+                    "p50_ms": _round(_percentile(values, 50)),
+                    "p95_ms": _round(_percentile(values, 95)),
+                    "p99_ms": _round(_percentile(values, 99)),
+                    "last_error": ep.last_error,
+                }
+
+            window_seconds = max(0.001, now - self._window_started)
+            window = {
+                "seconds": round(window_seconds, 1),
+                "calls": self._window_calls,
+                "errors": self._window_errors,
+                "loops": self._window_loops,
+                "calls_per_loop": round(self._window_calls / self._window_loops, 2) if self._window_loops else None,
+                "calls_per_sec": round(self._window_calls / window_seconds, 3),
+            }
+            remaining = {
+                group: {"min": info["min"], "sec": info["sec"], "age_sec": round(now - info["at"], 1)}
+                for group, info in self._remaining.items()
+            }
+            if reset_window:
+                self._window_calls = 0
+                self._window_errors = 0
+                self._window_loops = 0
+                self._window_started = now
+
+            return {
+                "since": self.started_at.isoformat(timespec="seconds"),
+                "total_calls": total_calls,
+                "total_errors": total_errors,
+                "loops": self.loops,
+                "window": window,
+                "remaining_req": remaining,
+                "endpoints": endpoints,
+            }
+
+    def histograms(self):
+        """엔드포인트별 누적 히스토그램 (버킷 상한, 누적 카운트, 합계, 개수)."""
+        with self._lock:
+            result = {}
+            for key, ep in self._endpoints.items():
+                cumulative = []
+                running = 0
+                for n in ep.buckets:
+                    running += n
+                    cumulative.append(running)
+                result[key] = {
+                    "buckets": cumulative,
+                    "sum_ms": ep.total_ms,
+                    "count": ep.count,
+                    "errors": ep.errors,
+                    "hedged": ep.hedged,
+                }
+            return result
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
@@ -0,0 +1,478 @@
+"""
+백테스트 모듈 - 과거 5분봉을 실거래와 같은 전략 정의(TradingEngine)로 평가
+
+지표/진입 조건은 TradingEngine.compute_signal_frame / compute_entry_frame으로 전체 봉을 한 번에 계산하고,
+체결/수수료/손절/분할 익절/시간 청산은 봉 단위로 시뮬레이션합니다.
+EMA(신호/레짐/BTC 필터)는 실거래가 조회하는 봉 수 기준으로 맞춰 계산합니다 (TradingEngine.ewm_live).
+
+사용 예:
+    python main.py backtest --data cache/backtest_5m.npz --fetch-days 365
+    python main.py backtest --data cache/backtest_5m.npz --start 2026-01-01 --trades trades.csv
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from candle_cache import load_candle_cache, save_candle_cache
+from trading_engine import TradingEngine
+
+
+BASE_INTERVAL = "minute5"
+
+
+class _NullLogger:
+    """백테스트용 로거 (엔진 로그 무시)."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def build_engine(config):
+    """API 연결 없이 전략 파라미터만 사용하는 엔진."""
+    return TradingEngine(config, _NullLogger(), None)
+
+
+def load_history(path, start=None, end=None):
+    """캔들 캐시(npz)에서 5분봉 로드 -> {ticker: DataFrame}"""
+    frames, _, _ = load_candle_cache(path)
+    history = {}
+    for (ticker, interval), df in frames.items():
+        if interval != BASE_INTERVAL or df is None or len(df) == 0:
+            continue
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end)]
+        history[ticker] = df
+    return history
+
+
+def fetch_history(engine, tickers, days, path=None):
+    """pyupbit로 최근 N일 5분봉 조회 (저장 경로가 있으면 npz로 저장)."""
+    count = int(days) * 24 * 12
+    history = {}
+    for ticker in tickers:
+        df = engine._fetch_ohlcv_full(ticker, BASE_INTERVAL, count)
+        if df is not None and len(df) > 0:
+            history[ticker] = df
+    if path:
+        save_candle_cache(path, {(t, BASE_INTERVAL): df for t, df in history.items()})
+    return history
+
+
+def regime_candidates(engine, ref_frame):
+    """확정 캔들별 레짐 후보 (detect_global_regime과 같은 EMA50/EMA200 + 같은 조회 봉 수)."""
+    close = ref_frame["close"]
+    ema50 = engine.ewm_live(close, 50, engine.regime_window).to_numpy(dtype=float)
+    ema200 = engine.ewm_live(close, 200, engine.regime_window).to_numpy(dtype=float)
+    close = close.to_numpy(dtype=float)
+    return np.select(
+        [(close > ema50) & (ema50 > ema200), (close < ema50) & (ema50 < ema200)],
+        ["BULL", "BEAR"],
+        default="RANGE",
+    )
+
+
+def regime_series(engine, ref_frame):
+    """기준 자산 확정 캔들 기준 레짐 (update_global_regime의 연속 확인/최소 유지 규칙 적용)."""
+    candidates = regime_candidates(engine, ref_frame)
+
+    step = max(1, int(np.ceil(max(60, engine.regime_check_minutes * 60) / (engine.signal_candle_minutes * 60))))
+    times = ref_frame.index
+    regime = "RANGE"
+    pending = None
+    pending_count = 0
+    changed_at = None
+    out = np.empty(len(candidates), dtype=object)
+    for i, candidate in enumerate(candidates):
+        if i % step == 0:
+            if candidate == regime:
+                pending = None
+                pending_count = 0
+            else:
+                if candidate == pending:
+                    pending_count += 1
+                else:
+                    pending = candidate
+                    pending_count = 1
+                can_switch = True
+                if engine.regime_min_hold_minutes > 0 and changed_at is not None:
+                    can_switch = (times[i] - changed_at).total_seconds() / 60.0 >= engine.regime_min_hold_minutes
+                if pending_count >= engine.regime_confirm_count and can_switch:
+                    regime = candidate
+                    changed_at = times[i]
+                    pending = None
+                    pending_count = 0
+        out[i] = regime
+    return pd.Series(out, index=ref_frame.index)
+
+
+def btc_filter_series(engine, ref_frame):
+    """BTC 추세 필터 (확정 캔들 종가 > EMA)."""
+    if not engine.btc_filter_enabled:
+        return pd.Series(True, index=ref_frame.index)
+    ema = engine.ewm_live(ref_frame["close"], engine.btc_filter_ema_period, engine.btc_filter_window())
+    return (ref_frame["close"] > ema) & (ema > 0)
+
+
+class Backtester:
+    """봉 단위 포트폴리오 시뮬레이션.
+
+    신호는 확정 캔들(i) 기준으로 판단하고 다음 봉(i+1) 시가에 체결합니다.
+    봉 안에서는 손절/트레일링을 익절보다 먼저 확인합니다(보수적).
+    """
+
+    def __init__(self, config, initial_krw=1000000.0):
+        self.config = config
+        self.engine = build_engine(config)
+        self.initial_krw = float(initial_krw)
+        trading_cfg = config.get("trading", {}) or {}
+        self.min_trade = float(trading_cfg.get("min_trade_amount", 5500))
+        self.fee = self.engine.FEE
+
+    def prepare(self, history):
+        """5분봉 -> 신호 캔들 리샘플링 + 지표/진입 조건/레짐 계산 (벡터).
+
+        결과는 simulate()에 여러 번(기간만 바꿔) 재사용할 수 있습니다.
+        """
+        engine = self.engine
+        minutes = engine.signal_candle_minutes
+        frames = {}
+        for ticker, df in history.items():
+            bars = engine.resample_ohlcv(df, minutes)
+            if len(bars) < 3:
+                continue
+            # 마지막 봉은 진행 중일 수 있으므로 제외
+            bars = bars.iloc[:-1]
+            frame = engine.compute_signal_frame(bars, live_window=engine.analysis_window())
+            frames[ticker] = frame.join(engine.compute_entry_frame(frame))
+
+        ref = engine.regime_reference_ticker
+        if ref not in frames:
+            raise ValueError(f"레짐 기준 자산 캔들 없음: {ref}")
+        btc_ref = engine.btc_filter_ticker
+        if engine.btc_filter_enabled and btc_ref not in frames:
+            raise ValueError(f"BTC 필터 자산 캔들 없음: {btc_ref}")
+
+        regime = regime_series(engine, frames[ref])
+        btc_ok = btc_filter_series(engine, frames[btc_ref] if btc_ref in frames else frames[ref])
+        blocked_hours = np.array([engine._is_entry_time_blocked(hour) for hour in range(24)])
+
+        index = frames[ref].index
+        for frame in frames.values():
+            index = index.union(frame.index)
+
+        aligned_frames = {}
+        for ticker, frame in frames.items():
+            aligned = frame.reindex(index)
+            aligned["regime"] = regime.reindex(index, method="ffill").fillna("RANGE")
+            aligned["btc_ok"] = btc_ok.astype(bool).reindex(index, method="ffill").fillna(False).astype(bool)
+            aligned["time_blocked"] = blocked_hours[index.hour]
+            aligned["available"] = frame["close"].reindex(index).notna()
+            aligned_frames[ticker] = aligned
+        return {"index": index, **self._entry_columns(index, aligned_frames)}
+
+    def _entry_columns(self, index, frames):
+        engine = self.engine
+        tickers = [t for t in engine.get_universe() if t in frames] or sorted(frames)
+
+        cols = {}
+        for ticker in tickers:
+            f = frames[ticker]
+            strategy = np.full(len(index), None, dtype=object)
+            regime = f["regime"].to_numpy(dtype=object)
+            symbol = engine._symbol(ticker)
+            entry = np.zeros(len(index), dtype=bool)
+            stop = np.full(len(index), np.nan)
+            target = np.full(len(index), np.nan)
+            if symbol == "SOL":
+                mask = regime == "BULL"
+                strategy[mask] = "SOL_TREND"
+                entry = mask & f["sol_entry"].fillna(False).to_numpy(dtype=bool)
+                stop = f["sol_stop"].to_numpy(dtype=float)
+            elif symbol == "DOGE":
+                strategy[:] = "DOGE_MOMENTUM"
+                entry = f["doge_entry"].fillna(False).to_numpy(dtype=bool)
+                stop = f["doge_stop"].to_numpy(dtype=float)
+            elif symbol == "ADA":
+                mask = regime == "RANGE"
+                strategy[mask] = "ADA_RANGE"
+                entry = mask & f["ada_entry"].fillna(False).to_numpy(dtype=bool)
+                stop = f["ada_stop"].to_numpy(dtype=float)
+                target = f["ada_target"].to_numpy(dtype=float)
+
+            # check_buy_signal 순서: 글로벌 BEAR -> BTC 필터 -> 시간 필터 -> 변동성 -> (포지션 수/사이징은 루프에서)
+            gate = (
+                (regime != "BEAR")
+                & f["btc_ok"].to_numpy(dtype=bool)
+                & ~f["time_blocked"].to_numpy(dtype=bool)
+                & ~(f["tr_atr_ratio"].to_numpy(dtype=float) > engine.volatility_tr_atr_max)
+                & f["available"].to_numpy(dtype=bool)
+            )
+            cols[ticker] = {
+                "open": f["open"].to_numpy(dtype=float),
+                "high": f["high"].to_numpy(dtype=float),
+                "low": f["low"].to_numpy(dtype=float),
+                "close": f["close"].to_numpy(dtype=float),
+                "entry": entry & gate,
+                "strategy": strategy,
+                "stop": stop,
+                "target": target,
+            }
+        return {"tickers": tickers, "cols": cols}
+
+    def run(self, history, start=None, end=None):
+        t0 = time.perf_counter()
+        return self.simulate(self.prepare(history), start=start, end=end, started_at=t0)
+
+    def simulate(self, prepared, start=None, end=None, started_at=None):
+        """prepare() 결과로 [start, end) 구간 시뮬레이션 (지표는 구간 이전 봉으로 이미 워밍업됨)."""
+        engine = self.engine
+        t0 = started_at if started_at is not None else time.perf_counter()
+        full_index = prepared["index"]
+        tickers = prepared["tickers"]
+        cols = prepared["cols"]
+        i0 = full_index.searchsorted(pd.Timestamp(start)) if start is not None else 0
+        i1 = full_index.searchsorted(pd.Timestamp(end)) if end is not None else len(full_index)
+
+        cash = self.initial_krw
+        positions = {}  # ticker -> dict
+        pending = []  # 다음 봉 시가 체결 대기 [(ticker, signal_bar)]
+        trades = []
+        index = full_index[i0:i1]
+        equity = np.empty(len(index))
+        last_price = {t: np.nan for t in tickers}
+        bar_minutes = engine.signal_candle_minutes
+        times = full_index
+
+        for i in range(i0, i1):
+            # 1) 직전 봉 신호 -> 이번 봉 시가 체결
+            for ticker, j in pending:
+                c = cols[ticker]
+                price = c["open"][i]
+                if not np.isfinite(price) or ticker in positions or len(positions) >= engine.max_positions:
+                    continue
+                cash = self._open(positions, ticker, c, j, i, price, cash, last_price)
+            pending = []
+
+            # 2) 보유 포지션 청산 확인
+            for ticker in list(positions):
+                c = cols[ticker]
+                if not np.isfinite(c["close"][i]):
+                    continue
+                cash = self._manage(positions, trades, ticker, c, i, times, bar_minutes, cash)
+
+            for ticker in tickers:
+                price = cols[ticker]["close"][i]
+                if np.isfinite(price):
+                    last_price[ticker] = price
+
+            # 3) 확정 캔들 i 기준 신규 진입 신호 (다음 봉 체결)
+            slots = engine.max_positions - len(positions)
+            if slots > 0 and i + 1 < i1:
+                for ticker in tickers:
+                    if slots <= 0:
+                        break
+                    if ticker not in positions and cols[ticker]["entry"][i]:
+                        pending.append((ticker, i))
+                        slots -= 1
+
+            equity[i - i0] = cash + sum(p["amount"] * last_price[t] for t, p in positions.items())
+
+        # 기간 종료 시 보유 포지션은 마지막 종가로 청산
+        for ticker in list(positions):
+            cash = self._close(positions, trades, ticker, last_price[ticker], i1 - 1, times, 1.0, "기간종료", cash)
+        if len(index):
+            equity[-1] = cash
+
+        equity_curve = pd.Series(equity, index=index)
+        return {
+            "summary": summarize(trades, equity_curve, self.initial_krw, time.perf_counter() - t0),
+            "trades": trades,
+            "equity": equity_curve,
+        }
+
+    def _open(self, positions, ticker, c, j, i, price, cash, last_price):
+        engine = self.engine
+        entry_ref = c["close"][j]
+        stop = c["stop"][j]
+        if not np.isfinite(stop) or stop <= 0 or stop >= price:
+            return cash
+
+        equity = cash + sum(p["amount"] * last_price[t] for t, p in positions.items())
+        risk_krw = equity * engine._risk_pct_for_symbol(ticker)
+        invest = risk_krw / abs(entry_ref - stop) * entry_ref
+        weight_cap = equity * engine.get_base_weight_cap(ticker)
+        if weight_cap <= 0:
+            weight_cap = engine.max_total_investment
+        invested = sum(p["buy_price"] * p["amount"] for p in positions.values())
+        invest = min(invest, weight_cap, max(0.0, engine.max_total_investment - invested), cash / (1.0 + self.fee))
+        if invest < self.min_trade:
+            return cash
+
+        fee = invest * self.fee
+        strategy = c["strategy"][j]
+        positions[ticker] = {
+            "strategy": strategy,
+            "entry_bar": i,
+            "buy_price": price,
+            "amount": invest / price,
+            "stop_price": stop,
+            "risk_unit": max(1e-8, price - stop),
+            "target_price": c["target"][j] if strategy == "ADA_RANGE" else np.nan,
+            "highest_price": price,
+            "buy_fee_remaining": fee,
+            "tp1_done": False,
+            "trailing_active": False,
+            "trailing_stop": stop,
+        }
+        return cash - invest - fee
+
+    def _manage(self, positions, trades, ticker, c, i, times, bar_minutes, cash):
+        engine = self.engine
+        pos = positions[ticker]
+        o, h, lo, cl = c["open"][i], c["high"][i], c["low"][i], c["close"][i]
+        buy = pos["buy_price"]
+        risk = pos["risk_unit"]
+        strategy = pos["strategy"]
+
+        # 손절 (갭 하락은 시가 체결)
+        if lo <= pos["stop_price"]:
+            return self._close(positions, trades, ticker, min(o, pos["stop_price"]), i, times, 1.0, "구조손절", cash)
+
+        if strategy == "SOL_TREND" and pos["trailing_active"] and lo <= pos["trailing_stop"]:
+            return self._close(positions, trades, ticker, min(o, pos["trailing_stop"]), i, times, 1.0, "SOL 트레일링청산", cash)
+
+        if strategy == "SOL_TREND":
+            tp1 = buy + engine.sol_partial_tp_r * risk
+            if not pos["tp1_done"] and h >= tp1:
+                pos["tp1_done"] = True
+                cash = self._close(positions, trades, ticker, max(o, tp1), i, times, 0.30, "SOL 1차익절", cash)
+            pos["highest_price"] = max(pos["highest_price"], h)
+            if not pos["trailing_active"] and h >= buy + engine.sol_trailing_activate_r * risk:
+                pos["trailing_active"] = True
+            if pos["trailing_active"]:
+                pos["trailing_stop"] = max(
+                    pos["trailing_stop"], pos["highest_price"] * (1.0 - engine.sol_trailing_stop_pct)
+                )
+        elif strategy == "DOGE_MOMENTUM":
+            target = buy + engine.doge_target_r * risk
+            if h >= target:
+                return self._close(positions, trades, ticker, max(o, target), i, times, 1.0, "DOGE 목표도달", cash)
+            if (i - pos["entry_bar"] + 1) >= engine.doge_time_stop_candles:
+                return self._close(positions, trades, ticker, cl, i, times, 1.0, "DOGE 시간청산", cash)
+        elif strategy == "ADA_RANGE":
+            target = pos["target_price"]
+            if np.isfinite(target) and target > 0 and h >= target:
+                return self._close(positions, trades, ticker, max(o, target), i, times, 1.0, "ADA 목표청산", cash)
+
+        held_minutes = (i - pos["entry_bar"] + 1) * bar_minutes
+        if engine.max_hold_minutes > 0 and held_minutes >= engine.max_hold_minutes:
+            return self._close(positions, trades, ticker, cl, i, times, 1.0, "최대보유청산", cash)
+        return cash
+
+    def _close(self, positions, trades, ticker, price, i, times, ratio, reason, cash):
+        pos = positions[ticker]
+        amount = pos["amount"] * ratio if ratio < 1.0 else pos["amount"]
+        proceeds = amount * price
+        sell_fee = proceeds * self.fee
+        buy_fee = pos["buy_fee_remaining"] * (amount / pos["amount"])
+        profit_krw = proceeds - sell_fee - amount * pos["buy_price"]
+        trades.append({
+            "coin": ticker,
+            "strategy": pos["strategy"],
+            "entry_time": times[pos["entry_bar"]].isoformat(),
+            "exit_time": times[i].isoformat(),
+            "buy_price": float(pos["buy_price"]),
+            "sell_price": float(price),
+            "amount": float(amount),
+            "profit_krw": float(profit_krw),
+            "buy_fee_krw": float(buy_fee),
+            "sell_fee_krw": float(sell_fee),
+            "profit_after_fees_krw": float(profit_krw - buy_fee),
+            "r_multiple": float((price - pos["buy_price"]) / pos["risk_unit"]),
+            "reason": reason,
+        })
+        pos["buy_fee_remaining"] -= buy_fee
+        pos["amount"] -= amount
+        if ratio >= 1.0 or pos["amount"] <= 0:
+            del positions[ticker]
+        return cash + proceeds - sell_fee
+
+
+def summarize(trades, equity_curve, initial_krw, elapsed_seconds=0.0):
+    """거래/자산 곡선 요약."""
+    pnl = np.array([t["profit_after_fees_krw"] for t in trades], dtype=float)
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl <= 0]
+    final = float(equity_curve.iloc[-1]) if len(equity_curve) else float(initial_krw)
+    peak = equity_curve.cummax() if len(equity_curve) else equity_curve
+    drawdown = ((equity_curve - peak) / peak).min() * 100 if len(equity_curve) else 0.0
+
+    by_strategy = {}
+    for t, p in zip(trades, pnl):
+        row = by_strategy.setdefault(t["strategy"], {"trades": 0, "wins": 0, "profit": 0.0})
+        row["trades"] += 1
+        row["wins"] += int(p > 0)
+        row["profit"] += float(p)
+
+    return {
+        "bars": int(len(equity_curve)),
+        "start": equity_curve.index[0].isoformat() if len(equity_curve) else None,
+        "end": equity_curve.index[-1].isoformat() if len(equity_curve) else None,
+        "trades": int(len(trades)),
+        "wins": int(len(wins)),
+        "win_rate": float(len(wins) / len(pnl) * 100) if len(pnl) else 0.0,
+        "profit_after_fees_krw": float(pnl.sum()) if len(pnl) else 0.0,
+        "fees_krw": float(sum(t["buy_fee_krw"] + t["sell_fee_krw"] for t in trades)),
+        "profit_factor": float(wins.sum() / -losses.sum()) if len(losses) and losses.sum() < 0 else None,
+        "initial_krw": float(initial_krw),
+        "final_krw": final,
+        "total_return_pct": (final / float(initial_krw) - 1.0) * 100 if initial_krw else 0.0,
+        "max_drawdown_pct": float(drawdown) if drawdown == drawdown else 0.0,
+        "by_strategy": by_strategy,
+        "elapsed_seconds": round(float(elapsed_seconds), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="과거 5분봉으로 전략 백테스트")
+    parser.add_argument("--config", default="config.json", help="설정 파일 (기본: config.json)")
+    parser.add_argument("--data", default="cache/backtest_5m.npz", help="5분봉 캔들 파일(npz)")
+    parser.add_argument("--fetch-days", type=int, default=0, help="N일치 5분봉을 조회해 --data에 저장 후 실행")
+    parser.add_argument("--start", help="시작일 'YYYY-MM-DD'")
+    parser.add_argument("--end", help="종료일(미포함) 'YYYY-MM-DD'")
+    parser.add_argument("--initial-krw", type=float, default=1000000, help="초기 자금 (기본: 1,000,000)")
+    parser.add_argument("--trades", help="거래 내역 CSV 저장 경로")
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    backtester = Backtester(config, initial_krw=args.initial_krw)
+    engine = backtester.engine
+    if args.fetch_days:
+        tickers = list(dict.fromkeys(
+            list(engine.get_universe()) + [engine.regime_reference_ticker, engine.btc_filter_ticker]
+        ))
+        fetch_history(engine, tickers, args.fetch_days, args.data)
+
+    history = load_history(args.data, start=args.start, end=args.end)
+    if not history:
+        sys.stderr.write(f"캔들 데이터 없음: {args.data} (--fetch-days로 먼저 조회)\n")
+        return 1
+
+    result = backtester.run(history)
+    sys.stdout.write(json.dumps(result["summary"], ensure_ascii=False, indent=2) + "\n")
+    if args.trades:
+        pd.DataFrame(result["trades"]).to_csv(args.trades, index=False, encoding="utf-8-sig")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
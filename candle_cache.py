@@ -0,0 +1,82 @@
+"""
+캔들 캐시 영속화 모듈 - 재기동 시 과거 캔들을 다시 페이징하지 않도록 로컬 바이너리(npz)로 저장
+"""
+
+from datetime import datetime
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import clock
+
+
+CACHE_VERSION = 1
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume", "value")
+
+
+def save_candle_cache(path, frames, state=None):
+    """캔들 프레임과 엔진 상태를 npz 파일 하나로 저장.
+
+    Args:
+        path: 저장 경로 (*.npz)
+        frames: {(ticker, interval): DataFrame(OHLCV, DatetimeIndex)}
+        state: JSON 직렬화 가능한 엔진 상태(dict)
+    """
+    arrays = {}
+    keys = []
+    for i, ((ticker, interval), df) in enumerate(frames.items()):
+        if df is None or len(df) == 0:
+            continue
+        arrays[f"f{i}_index"] = pd.DatetimeIndex(df.index).to_numpy(dtype="datetime64[ns]")
+        for col in OHLCV_COLUMNS:
+            if col in df.columns:
+                arrays[f"f{i}_{col}"] = df[col].to_numpy(dtype=np.float64)
+        keys.append({"id": i, "ticker": ticker, "interval": interval})
+
+    header = {
+        "version": CACHE_VERSION,
+        "saved_at": clock.now().isoformat(),
+        "frames": keys,
+        "state": state or {},
+    }
+    arrays["header"] = np.array(json.dumps(header, ensure_ascii=False))
+
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+def load_candle_cache(path):
+    """저장된 캔들 캐시 로드.
+
+    Returns:
+        (frames, state, saved_at) - 파일이 없거나 버전이 다르면 ({}, {}, None)
+    """
+    if not os.path.exists(path):
+        return {}, {}, None
+
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(str(data["header"]))
+        if int(header.get("version", 0) or 0) != CACHE_VERSION:
+            return {}, {}, None
+
+        frames = {}
+        for item in header.get("frames", []):
+            i = item["id"]
+            index = pd.DatetimeIndex(data[f"f{i}_index"])
+            columns = {
+                col: data[f"f{i}_{col}"]
+                for col in OHLCV_COLUMNS
+                if f"f{i}_{col}" in data.files
+            }
+            frames[(item["ticker"], item["interval"])] = pd.DataFrame(columns, index=index)
+
+    saved_at = header.get("saved_at")
+    saved_at = datetime.fromisoformat(saved_at) if saved_at else None
+    return frames, header.get("state", {}) or {}, saved_at
@@ -0,0 +1,106 @@
+"""
+시계 모듈 - 봇 전체가 쓰는 현재 시각/대기를 한 지점에서 교체
+
+실거래에서는 SystemClock(datetime.now/time.time/time.sleep 그대로)을 사용하고,
+리플레이에서는 SimulatedClock으로 바꿔 sleep이 실제로 기다리지 않고 시뮬레이션 시각만 앞당깁니다.
+거래 판단/기록에 쓰이는 시각은 모두 `clock.now()`/`clock.time()`/`clock.sleep()`을 거쳐야 합니다.
+(워치독/프로파일러/API 지연 측정처럼 실제 경과 시간을 재는 곳은 time 모듈을 그대로 사용)
+"""
+
+from datetime import datetime, timedelta
+import threading
+import time as _time
+
+
+class SystemClock:
+    """실제 시각 (기본값)."""
+
+    simulated = False
+
+    def now(self):
+        return datetime.now()
+
+    def time(self):
+        return _time.time()
+
+    def sleep(self, seconds):
+        if seconds and seconds > 0:
+            _time.sleep(seconds)
+
+
+class SimulatedClock:
+    """시뮬레이션 시각. sleep(seconds)은 즉시 반환하고 시각만 seconds만큼 이동합니다.
+
+    end에 도달하면 on_end 콜백을 1회 호출합니다(리플레이 종료 신호).
+    """
+
+    simulated = True
+
+    def __init__(self, start, end=None, on_end=None):
+        self._now = _to_datetime(start)
+        self.end = _to_datetime(end) if end is not None else None
+        self.on_end = on_end
+        self.ended = False
+        self._lock = threading.Lock()
+
+    def now(self):
+        with self._lock:
+            return self._now
+
+    def time(self):
+        return self.now().timestamp()
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """시각을 seconds만큼 이동 (음수/None은 무시)."""
+        fire = False
+        with self._lock:
+            if seconds and seconds > 0:
+                self._now = self._now + timedelta(seconds=float(seconds))
+            if self.end is not None and self._now >= self.end and not self.ended:
+                self.ended = True
+                fire = True
+        if fire and self.on_end is not None:
+            self.on_end()
+
+    def set(self, when):
+        with self._lock:
+            self._now = _to_datetime(when)
+
+
+def _to_datetime(value):
+    # pandas.Timestamp -> 순수 datetime으로 통일 (기록되는 문자열 형식 고정)
+    if hasattr(value, "to_pydatetime"):
+        value = value.to_pydatetime()
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    return datetime.fromisoformat(str(value))
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(new_clock):
+    """전역 시계 교체 -> 이전 시계 반환 (None이면 SystemClock 복원)."""
+    global _clock
+    previous = _clock
+    _clock = new_clock if new_clock is not None else SystemClock()
+    return previous
+
+
+def now():
+    return _clock.now()
+
+
+def time():
+    return _clock.time()
+
+
+def sleep(seconds):
+    _clock.sleep(seconds)
@@ -0,0 +1,258 @@
+"""
+의사결정 로그(JSONL) 모듈 - 지연 직렬화/반복 메타 참조, 로테이션 파일 gzip 블록 압축 + 인덱스
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+import clock
+
+
+# 같은 종목의 연속 이벤트에서 반복되는 하위 객체 (처음 1회만 본문 기록, 이후 *_ref로 참조)
+DEDUP_KEYS = ("meta", "detect")
+
+# 종목(체인)별로 기억하는 최근 하위 객체 수
+_CHAIN_MEMORY = 16
+
+
+# 호출 이후에도 원본이 계속 바뀌는 하위 객체 (포지션 meta/레짐 detect) -> 끝까지 복사
+SNAPSHOT_KEYS = ("meta", "detect")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+_CONTAINERS = (dict, list, set)
+
+
+def _copy_tree(value):
+    """dict/list/set을 끝까지 재귀 복사 (tuple/스칼라 등 그 외 값은 그대로, 재귀 호출은 컨테이너에만)."""
+    if isinstance(value, dict):
+        return {key: _copy_tree(item) if isinstance(item, _CONTAINERS) else item for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_tree(item) if isinstance(item, _CONTAINERS) else item for item in value]
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+
+def _freeze(payload):
+    """호출 이후 원본이 바뀌어도 기록 내용이 변하지 않도록 복사.
+
+    최상위와 그 바로 아래 dict/list/set은 얕게 복사하고, SNAPSHOT_KEYS(포지션 meta, 레짐 detect)만
+    중첩 객체까지 복사합니다 (전체 재귀 복사는 호출 스레드 비용이 JSON 직렬화보다 커짐).
+    """
+    if not isinstance(payload, dict):
+        return {} if payload is None else {"value": payload}
+    frozen = {}
+    for key, value in payload.items():
+        if key in SNAPSHOT_KEYS:
+            frozen[key] = _copy_tree(value)
+        elif isinstance(value, dict):
+            frozen[key] = dict(value)
+        elif isinstance(value, list):
+            frozen[key] = list(value)
+        elif isinstance(value, set):
+            frozen[key] = set(value)
+        else:
+            frozen[key] = value
+    return frozen
+
+
+class DecisionSerializer:
+    """DecisionRecord -> JSON 문자열 (기록 스레드 전용, 체인별 중복 제거 상태 보유)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chains = {}  # chain key -> OrderedDict(content hash -> True)
+
+    def reset(self):
+        """로그 파일이 바뀌면(로테이션) 참조 대상이 없으므로 상태 초기화."""
+        with self._lock:
+            self._chains = {}
+
+    def serialize(self, record):
+        payload = dict(record.payload)
+        chain_key = str(payload.get("ticker") or payload.get("coin") or "_global")
+
+        with self._lock:
+            seen = self._chains.setdefault(chain_key, OrderedDict())
+            for key in DEDUP_KEYS:
+                value = payload.get(key)
+                if not isinstance(value, dict) or not value:
+                    continue
+                text = json.dumps(value, ensure_ascii=False, sort_keys=True, default=_json_default)
+                digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+                if digest in seen:
+                    seen.move_to_end(digest)
+                    del payload[key]
+                    payload[f"{key}_ref"] = digest
+                else:
+                    seen[digest] = True
+                    while len(seen) > _CHAIN_MEMORY:
+                        seen.popitem(last=False)
+                    payload[f"{key}_id"] = digest
+
+        return json.dumps(
+            {"ts": record.ts, "event": record.event, "payload": payload},
+            ensure_ascii=False,
+            default=_json_default,
+        )
+
+
+class DecisionRecord:
+    """log_decision 호출 시점의 이벤트 스냅샷.
+
+    호출 스레드에서는 복사만 하고(_freeze: 2단계 얕은 복사 + meta/detect는 중첩까지),
+    JSON 직렬화는 로그 핸들러가 메시지를 만들 때(비동기 모드에서는 기록 스레드) 한 번만 수행합니다.
+    """
+
+    __slots__ = ("ts", "event", "payload", "_serializer", "_text")
+
+    def __init__(self, event, payload, serializer, ts=None):
+        self.ts = (ts or clock.now()).strftime('%Y-%m-%d %H:%M:%S')
+        self.event = str(event)
+        self.payload = _freeze(payload)
+        self._serializer = serializer
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            try:
+                self._text = self._serializer.serialize(self)
+            except Exception as e:
+                self._text = json.dumps(
+                    {"ts": self.ts, "event": self.event, "payload": {}, "error": f"{type(e).__name__}: {e}"},
+                    ensure_ascii=False,
+                )
+        return self._text
+
+
+# ----------------------------------------------------------------------
+# 로테이션 파일 압축 (gzip 블록 + 사이드카 인덱스)
+# ----------------------------------------------------------------------
+
+ARCHIVE_SUFFIX = ".gz"
+INDEX_SUFFIX = ".idx.json"
+INDEX_VERSION = 1
+
+
+def _record_ticker(row):
+    payload = row.get("payload") if isinstance(row.get("payload"), dict) else {}
+    return str(payload.get("ticker") or payload.get("coin") or "")
+
+
+def _inline_refs(row, bodies, block_seen):
+    """블록 안에서 처음 나오는 *_ref는 본문으로 바꿔 블록 단독으로 해석 가능하게 함."""
+    payload = row.get("payload")
+    if not isinstance(payload, dict):
+        return False
+    changed = False
+    for key in DEDUP_KEYS:
+        ref = payload.get(f"{key}_ref")
+        if ref is not None and ref not in block_seen and ref in bodies:
+            del payload[f"{key}_ref"]
+            payload[key] = bodies[ref]
+            payload[f"{key}_id"] = ref
+            block_seen.add(ref)
+            changed = True
+        body_id = payload.get(f"{key}_id")
+        if body_id is not None and key in payload:
+            bodies[body_id] = payload[key]
+            block_seen.add(body_id)
+    return changed
+
+
+def compress_decision_log(source, dest, block_lines=1000):
+    """JSONL 로그를 gzip 블록(멤버)들로 압축하고 사이드카 인덱스를 기록.
+
+    - 각 블록은 독립된 gzip 멤버라 dest 전체도 일반 gzip(zcat 등)으로 읽을 수 있습니다.
+    - 인덱스에는 블록별 offset/length, 시각 범위, 이벤트/종목 목록을 저장합니다.
+    """
+    blocks = []
+    bodies = {}
+
+    def flush_block(out, lines, info):
+        if not lines:
+            return
+        data = gzip.compress("".join(lines).encode("utf-8"))
+        info["offset"] = out.tell()
+        info["length"] = len(data)
+        info["lines"] = len(lines)
+        info["events"] = sorted(info["events"])
+        info["tickers"] = sorted(info["tickers"])
+        out.write(data)
+        blocks.append(info)
+
+    def new_info():
+        return {"ts_min": None, "ts_max": None, "events": set(), "tickers": set()}
+
+    tmp_dest = f"{dest}.tmp"
+    with open(source, "r", encoding="utf-8") as src, open(tmp_dest, "wb") as out:
+        lines, info, block_seen = [], new_info(), set()
+        for line in src:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                lines.append(line if line.endswith("\n") else line + "\n")
+                continue
+
+            if _inline_refs(row, bodies, block_seen):
+                line = json.dumps(row, ensure_ascii=False) + "\n"
+            elif not line.endswith("\n"):
+                line += "\n"
+
+            ts = str(row.get("ts", ""))
+            if ts:
+                info["ts_min"] = ts if info["ts_min"] is None else min(info["ts_min"], ts)
+                info["ts_max"] = ts if info["ts_max"] is None else max(info["ts_max"], ts)
+            info["events"].add(str(row.get("event", "")))
+            ticker = _record_ticker(row)
+            if ticker:
+                info["tickers"].add(ticker)
+            lines.append(line)
+
+            if len(lines) >= block_lines:
+                flush_block(out, lines, info)
+                lines, info, block_seen = [], new_info(), set()
+        flush_block(out, lines, info)
+
+    with open(f"{dest}{INDEX_SUFFIX}", "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "source": os.path.basename(source), "blocks": blocks}, f)
+    os.replace(tmp_dest, dest)
+    return blocks
+
+
+def load_index(archive_path):
+    """사이드카 인덱스 로드 (없거나 버전이 다르면 None)."""
+    path = f"{archive_path}{INDEX_SUFFIX}"
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except Exception:
+        return None
+    if int(index.get("version", 0) or 0) != INDEX_VERSION:
+        return None
+    return index
+
+
+def read_block(archive_path, block):
+    """인덱스 블록 1개만 읽어 압축 해제한 JSONL 줄 목록."""
+    with open(archive_path, "rb") as f:
+        f.seek(int(block["offset"]))
+        data = f.read(int(block["length"]))
+    return gzip.decompress(data).decode("utf-8").splitlines()
@@ -0,0 +1,188 @@
+"""
+의사결정 로그 조회 CLI - 압축 보관본은 인덱스로 필요한 블록만 풀어서 조회
+
+사용 예:
+    python decision_query.py --since "2026-10-13 02:00" --until "2026-10-13 06:00" \\
+        --event BUY_BLOCKED --ticker KRW-DOGE
+    python main.py decisions --event SELL_EXECUTED --limit 20
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+
+from decision_log import ARCHIVE_SUFFIX, DEDUP_KEYS, INDEX_SUFFIX, load_index, read_block
+
+
+def _normalize_ts(value, end=False):
+    """'YYYY-MM-DD[ HH:MM[:SS]]' -> 'YYYY-MM-DD HH:MM:SS' (문자열 비교용)."""
+    if not value:
+        return None
+    value = str(value).strip().replace("T", " ")
+    if len(value) == 10:
+        return value + (" 23:59:59" if end else " 00:00:00")
+    if len(value) == 16:
+        return value + (":59" if end else ":00")
+    return value[:19]
+
+
+def _normalize_ticker(value):
+    if not value:
+        return None
+    value = str(value).strip().upper()
+    return value if value.startswith("KRW-") else f"KRW-{value}"
+
+
+class DecisionQuery:
+    """decisions.log(현재 파일 + 로테이션 보관본) 조건 조회."""
+
+    def __init__(self, log_dir="logs", base_name="decisions.log"):
+        self.log_dir = log_dir
+        self.base_name = base_name
+
+    def _files(self):
+        """조회 대상 파일 (오래된 순): 압축본, 미압축 백업, 현재 파일."""
+        prefix = self.base_name + "."
+        names = []
+        try:
+            listing = os.listdir(self.log_dir)
+        except OSError:
+            return []
+        for name in listing:
+            if name.startswith(prefix) and not name.endswith(INDEX_SUFFIX) and not name.endswith(".tmp"):
+                names.append(name)
+        names.sort()
+        paths = [os.path.join(self.log_dir, name) for name in names]
+        current = os.path.join(self.log_dir, self.base_name)
+        if os.path.exists(current):
+            paths.append(current)
+        return paths
+
+    @staticmethod
+    def _block_matches(block, since, until, events, ticker):
+        if since and block.get("ts_max") and block["ts_max"] < since:
+            return False
+        if until and block.get("ts_min") and block["ts_min"] > until:
+            return False
+        if events and not (set(block.get("events", [])) & events):
+            return False
+        if ticker and ticker not in block.get("tickers", []):
+            return False
+        return True
+
+    @staticmethod
+    def _row_matches(row, since, until, events, ticker):
+        ts = str(row.get("ts", ""))
+        if since and ts < since:
+            return False
+        if until and ts > until:
+            return False
+        if events and str(row.get("event", "")) not in events:
+            return False
+        if ticker:
+            payload = row.get("payload") if isinstance(row.get("payload"), dict) else {}
+            if str(payload.get("ticker") or payload.get("coin") or "") != ticker:
+                return False
+        return True
+
+    @staticmethod
+    def _resolve(row, bodies):
+        """*_ref를 같은 파일/블록에서 앞서 기록된 본문으로 치환."""
+        payload = row.get("payload")
+        if not isinstance(payload, dict):
+            return row
+        for key in DEDUP_KEYS:
+            body_id = payload.get(f"{key}_id")
+            if body_id is not None and key in payload:
+                bodies[body_id] = payload[key]
+            ref = payload.get(f"{key}_ref")
+            if ref is not None and ref in bodies:
+                payload[key] = bodies[ref]
+        return row
+
+    def _scan_lines(self, lines, bodies, since, until, events, ticker, resolve):
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if resolve:
+                self._resolve(row, bodies)
+            if self._row_matches(row, since, until, events, ticker):
+                yield row
+
+    def iter_records(self, since=None, until=None, events=None, ticker=None, resolve=True, stats=None):
+        """조건에 맞는 레코드를 시간 순으로 스트리밍."""
+        since = _normalize_ts(since)
+        until = _normalize_ts(until, end=True)
+        events = {str(e).upper() for e in events} if events else None
+        ticker = _normalize_ticker(ticker)
+        stats = stats if stats is not None else {}
+        stats.setdefault("blocks_total", 0)
+        stats.setdefault("blocks_read", 0)
+
+        for path in self._files():
+            if path.endswith(ARCHIVE_SUFFIX):
+                index = load_index(path)
+                if index is None:
+                    # 인덱스가 없으면 전체를 스트리밍
+                    with gzip.open(path, "rt", encoding="utf-8") as f:
+                        yield from self._scan_lines(f, {}, since, until, events, ticker, resolve)
+                    continue
+
+                for block in index.get("blocks", []):
+                    stats["blocks_total"] += 1
+                    if not self._block_matches(block, since, until, events, ticker):
+                        continue
+                    stats["blocks_read"] += 1
+                    # 블록은 참조 본문을 자체 포함하므로 블록 단위로 해석
+                    yield from self._scan_lines(
+                        read_block(path, block), {}, since, until, events, ticker, resolve
+                    )
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    yield from self._scan_lines(f, {}, since, until, events, ticker, resolve)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="의사결정 로그(decisions.log) 조회")
+    parser.add_argument("--log-dir", default="logs", help="로그 디렉토리 (기본: logs)")
+    parser.add_argument("--since", help="시작 시각 'YYYY-MM-DD[ HH:MM[:SS]]'")
+    parser.add_argument("--until", help="종료 시각 'YYYY-MM-DD[ HH:MM[:SS]]'")
+    parser.add_argument("--event", action="append", help="이벤트 (여러 번 지정 가능, 예: BUY_BLOCKED)")
+    parser.add_argument("--ticker", help="종목 (예: KRW-DOGE 또는 DOGE)")
+    parser.add_argument("--limit", type=int, default=0, help="최대 출력 건수 (0=제한 없음)")
+    parser.add_argument("--raw", action="store_true", help="meta_ref를 본문으로 치환하지 않음")
+    args = parser.parse_args(argv)
+
+    query = DecisionQuery(args.log_dir)
+    stats = {}
+    count = 0
+    try:
+        for row in query.iter_records(
+            since=args.since,
+            until=args.until,
+            events=args.event,
+            ticker=args.ticker,
+            resolve=not args.raw,
+            stats=stats,
+        ):
+            sys.stdout.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+            if args.limit and count >= args.limit:
+                break
+    except BrokenPipeError:
+        return 0
+
+    sys.stderr.write(
+        f"{count}건 | 압축 블록 {stats.get('blocks_read', 0)}/{stats.get('blocks_total', 0)}개 해제\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
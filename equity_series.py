@@ -0,0 +1,267 @@
+"""
+자산 곡선(equity curve) 시계열 모듈 - 컬럼형 바이너리 저장 + 다중 해상도 다운샘플링
+"""
+
+from datetime import datetime, timedelta
+import math
+import os
+import threading
+
+import numpy as np
+
+import clock
+
+
+# 레코드: (epoch 초, 현금 KRW, 총자산 평가액 KRW)
+EQUITY_DTYPE = np.dtype([('ts', '<f8'), ('cash', '<f8'), ('value', '<f8')])
+
+# 해상도별 버킷 크기(초). raw는 샘플 그대로 저장
+RESOLUTIONS = {
+    'raw': None,
+    '1m': 60,
+    '1h': 3600,
+    '1d': 86400,
+}
+
+# 해상도별 청크(파일) 단위: raw/1m은 일별, 1h는 월별, 1d는 연별
+_CHUNK_FORMATS = {
+    'raw': '%Y%m%d',
+    '1m': '%Y%m%d',
+    '1h': '%Y%m',
+    '1d': '%Y',
+}
+
+# 연환산 기간 수 (코인 시장은 24/365)
+_PERIODS_PER_YEAR = {
+    '1m': 365 * 24 * 60,
+    '1h': 365 * 24,
+    '1d': 365,
+}
+
+
+def _to_epoch(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def _bucket(ts, seconds):
+    # 로컬 시각 기준 버킷(일 단위가 자정에 맞도록)
+    dt = datetime.fromtimestamp(ts)
+    if seconds >= 86400:
+        return dt.strftime('%Y%m%d')
+    if seconds >= 3600:
+        return dt.strftime('%Y%m%d%H')
+    return dt.strftime('%Y%m%d%H%M')
+
+
+def max_drawdown_pct(values):
+    """최대 낙폭(%) - 음수(또는 0)"""
+    v = np.asarray(values, dtype=float)
+    if v.size == 0:
+        return 0.0
+    peak = np.maximum.accumulate(v)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dd = np.where(peak > 0, (v - peak) / peak, 0.0)
+    return float(dd.min() * 100)
+
+
+def sharpe_ratio(values, periods_per_year):
+    """단순 수익률 기반 연환산 샤프 지수(무위험수익률 0)"""
+    v = np.asarray(values, dtype=float)
+    if v.size < 3:
+        return 0.0
+    prev = v[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rets = np.where(prev > 0, np.diff(v) / prev, 0.0)
+    std = rets.std(ddof=1)
+    if not np.isfinite(std) or std <= 0:
+        return 0.0
+    return float(rets.mean() / std * math.sqrt(periods_per_year))
+
+
+def exposure_pct(cash, values):
+    """평균 투자 비중(%) = 1 - 현금/총자산"""
+    c = np.asarray(cash, dtype=float)
+    v = np.asarray(values, dtype=float)
+    if v.size == 0:
+        return 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exp = np.where(v > 0, 1.0 - (c / v), 0.0)
+    return float(np.clip(exp, 0.0, 1.0).mean() * 100)
+
+
+class EquitySeries:
+    """자산 곡선 저장소.
+
+    - 샘플은 `equity/<해상도>/<청크>.bin`에 고정 크기 레코드로 append 됩니다.
+    - 1m/1h/1d 해상도는 버킷의 마지막 샘플(종가)만 기록하며, 진행 중인 버킷은 메모리에 둡니다.
+      (같은 버킷 안에서 재시작하면 같은 버킷이 두 번 기록될 수 있어 조회 시 버킷별 마지막 레코드만 사용,
+      비정상 종료로 기록되지 못한 마지막 버킷은 시작 시 raw 마지막 샘플로 복구)
+    - 조회는 np.memmap으로 필요한 청크만 읽고, 지표는 numpy로 벡터 계산합니다.
+    """
+
+    def __init__(self, base_dir="trade_history/equity"):
+        self.base_dir = base_dir
+        self._lock = threading.RLock()
+        # 해상도별 진행 중 버킷: res -> (bucket_key, record)
+        self._pending = {}
+        for res in RESOLUTIONS:
+            os.makedirs(os.path.join(self.base_dir, res), exist_ok=True)
+        self._recover_pending()
+
+    def _last_record(self, res):
+        """해상도의 가장 최근 청크 파일의 마지막 레코드 (없으면 None)."""
+        folder = os.path.join(self.base_dir, res)
+        try:
+            names = sorted(n for n in os.listdir(folder) if n.endswith('.bin'))
+        except OSError:
+            return None
+        for name in reversed(names):
+            path = os.path.join(folder, name)
+            n = os.path.getsize(path) // EQUITY_DTYPE.itemsize
+            if n <= 0:
+                continue
+            with open(path, 'rb') as f:
+                f.seek((n - 1) * EQUITY_DTYPE.itemsize)
+                return np.frombuffer(f.read(EQUITY_DTYPE.itemsize), dtype=EQUITY_DTYPE)[0].copy()
+        return None
+
+    def _recover_pending(self):
+        """flush 없이 종료된 경우 raw 마지막 샘플을 진행 중 버킷으로 되살림 (다음 버킷 전환/flush 때 기록)."""
+        last_raw = self._last_record('raw')
+        if last_raw is None:
+            return
+        ts = float(last_raw['ts'])
+        for res, seconds in RESOLUTIONS.items():
+            if seconds is None:
+                continue
+            last = self._last_record(res)
+            if last is None or float(last['ts']) < ts:
+                self._pending[res] = (_bucket(ts, seconds), np.array(last_raw, dtype=EQUITY_DTYPE))
+
+    def _chunk_path(self, res, ts):
+        chunk = datetime.fromtimestamp(ts).strftime(_CHUNK_FORMATS[res])
+        return os.path.join(self.base_dir, res, f"{chunk}.bin")
+
+    def _write(self, res, record):
+        try:
+            with open(self._chunk_path(res, float(record['ts'])), 'ab') as f:
+                f.write(record.tobytes())
+        except Exception as e:
+            print(f"자산 곡선 저장 실패({res}): {e}")
+
+    def append(self, cash, value, ts=None):
+        """샘플 1건 추가 (raw 기록 + 해상도별 버킷 종가 갱신)."""
+        ts = _to_epoch(ts) if ts is not None else clock.now().timestamp()
+        record = np.array((ts, float(cash or 0), float(value or 0)), dtype=EQUITY_DTYPE)
+
+        with self._lock:
+            self._write('raw', record)
+            for res, seconds in RESOLUTIONS.items():
+                if seconds is None:
+                    continue
+                key = _bucket(ts, seconds)
+                pending = self._pending.get(res)
+                if pending is not None and pending[0] != key:
+                    # 버킷이 넘어가면 직전 버킷의 마지막 샘플을 확정 기록
+                    self._write(res, pending[1])
+                self._pending[res] = (key, record)
+
+    def flush(self):
+        """진행 중인 버킷을 기록 (종료 시 호출)."""
+        with self._lock:
+            for res, (_, record) in list(self._pending.items()):
+                self._write(res, record)
+            self._pending = {}
+
+    def _chunk_paths(self, res, start_ts, end_ts):
+        paths = []
+        seen = set()
+        day = datetime.fromtimestamp(start_ts).replace(hour=0, minute=0, second=0, microsecond=0)
+        end_day = datetime.fromtimestamp(end_ts)
+        while day <= end_day:
+            path = self._chunk_path(res, day.timestamp())
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+            day += timedelta(days=1)
+        return paths
+
+    def read(self, start=None, end=None, resolution='1m'):
+        """기간(start~end) 레코드 배열 조회 (EQUITY_DTYPE 구조 배열)."""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"unknown resolution: {resolution}")
+
+        end_ts = _to_epoch(end) if end is not None else clock.now().timestamp()
+        start_ts = _to_epoch(start) if start is not None else end_ts - 86400
+
+        parts = []
+        for path in self._chunk_paths(resolution, start_ts, end_ts):
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            n = size // EQUITY_DTYPE.itemsize
+            if n <= 0:
+                continue
+            mm = np.memmap(path, dtype=EQUITY_DTYPE, mode='r', shape=(n,))
+            mask = (mm['ts'] >= start_ts) & (mm['ts'] <= end_ts)
+            if mask.any():
+                parts.append(np.array(mm[mask]))
+            del mm
+
+        with self._lock:
+            pending = self._pending.get(resolution)
+        if pending is not None:
+            record = pending[1]
+            if start_ts <= float(record['ts']) <= end_ts:
+                parts.append(record.reshape(1))
+
+        if not parts:
+            return np.empty(0, dtype=EQUITY_DTYPE)
+        out = np.concatenate(parts)
+        out = out[np.argsort(out['ts'], kind='stable')]
+        seconds = RESOLUTIONS[resolution]
+        if seconds is None or out.size < 2:
+            return out
+        # 같은 버킷 중복(재시작) 제거: 시각순이므로 같은 버킷은 이웃 -> 버킷의 마지막만 유지
+        keep = np.ones(out.size, dtype=bool)
+        ts = out['ts']
+        for i in np.flatnonzero(np.diff(ts) < seconds):
+            if _bucket(float(ts[i]), seconds) == _bucket(float(ts[i + 1]), seconds):
+                keep[i] = False
+        return out[keep]
+
+    def window_metrics(self, start=None, end=None, resolution='1m'):
+        """기간 지표: 최대 낙폭/샤프/평균 투자 비중/수익률."""
+        data = self.read(start, end, resolution)
+        if data.size == 0:
+            return {
+                'samples': 0,
+                'resolution': resolution,
+                'return_pct': 0.0,
+                'max_drawdown_pct': 0.0,
+                'sharpe': 0.0,
+                'exposure_pct': 0.0,
+            }
+
+        values = data['value']
+        if resolution in _PERIODS_PER_YEAR:
+            periods = _PERIODS_PER_YEAR[resolution]
+        else:
+            dt = np.diff(data['ts'])
+            step = float(np.median(dt)) if dt.size else 0.0
+            periods = (365 * 86400 / step) if step > 0 else 0.0
+
+        first = float(values[0])
+        return {
+            'samples': int(data.size),
+            'resolution': resolution,
+            'return_pct': ((float(values[-1]) - first) / first * 100) if first > 0 else 0.0,
+            'max_drawdown_pct': max_drawdown_pct(values),
+            'sharpe': sharpe_ratio(values, periods) if periods > 0 else 0.0,
+            'exposure_pct': exposure_pct(data['cash'], values),
+        }
@@ -2,12 +2,122 @@
 로깅 모듈 - 시간별 로테이션 및 상세 거래 로그
 """
 
+import atexit
 import logging
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 import os
-from datetime import datetime
+import queue
+import time
 import json
 
+import clock
+import tracing
+from decision_log import (
+    ARCHIVE_SUFFIX,
+    INDEX_SUFFIX,
+    DecisionRecord,
+    DecisionSerializer,
+    compress_decision_log,
+)
+
+
+class _DecisionFileHandler(TimedRotatingFileHandler):
+    """decisions.log 핸들러.
+
+    - 로테이션된 파일은 gzip 블록 + 사이드카 인덱스로 압축 보관합니다(decision_query.py로 조회).
+    - 로테이션 시 참조(meta_ref) 상태를 초기화합니다.
+    """
+
+    def __init__(self, *args, on_rollover=None, compress=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_rollover = on_rollover
+        if compress:
+            self.namer = self._archive_name
+            self.rotator = self._compress_rotated
+
+    @staticmethod
+    def _archive_name(default_name):
+        return default_name + ARCHIVE_SUFFIX
+
+    @staticmethod
+    def _compress_rotated(source, dest):
+        try:
+            compress_decision_log(source, dest)
+            os.remove(source)
+        except Exception:
+            # 압축 실패 시 일반 로테이션(이름 변경)으로 폴백
+            if os.path.exists(source):
+                os.replace(source, dest[:-len(ARCHIVE_SUFFIX)])
+
+    def getFilesToDelete(self):
+        """보관 개수 초과분(압축본/사이드카 인덱스/미압축 백업) 삭제 대상."""
+        dir_name, base_name = os.path.split(self.baseFilename)
+        prefix = base_name + "."
+        backups = []
+        for name in os.listdir(dir_name):
+            if not name.startswith(prefix) or name.endswith(INDEX_SUFFIX) or name.endswith(".tmp"):
+                continue
+            suffix = name[len(prefix):]
+            if suffix.endswith(ARCHIVE_SUFFIX):
+                suffix = suffix[:-len(ARCHIVE_SUFFIX)]
+            if self.extMatch.match(suffix):
+                backups.append(os.path.join(dir_name, name))
+        backups.sort()
+        if len(backups) <= self.backupCount:
+            return []
+        expired = backups[:len(backups) - self.backupCount]
+        return expired + [f"{p}{INDEX_SUFFIX}" for p in expired if os.path.exists(f"{p}{INDEX_SUFFIX}")]
+
+    def doRollover(self):
+        super().doRollover()
+        if self.on_rollover is not None:
+            self.on_rollover()
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """트레이딩 스레드에서는 레코드를 큐에 넣기만 하는 핸들러.
+
+    - 포맷팅(메시지/예외 traceback)은 리스너 스레드에서 수행하도록 prepare()를 생략합니다.
+    - 큐가 가득 차면 DEBUG 이하는 버리고, 그 외 레벨은 잠시 대기 후 넣습니다.
+    """
+
+    def __init__(self, log_queue, block_timeout=1.0):
+        super().__init__(log_queue)
+        self.block_timeout = float(block_timeout)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno <= logging.DEBUG:
+                self.dropped += 1
+                return
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+            except queue.Full:
+                self.dropped += 1
+
+
+class _RoutingHandler(logging.Handler):
+    """리스너 스레드에서 로거 이름별 원래 핸들러로 레코드를 전달."""
+
+    def __init__(self, routes):
+        super().__init__(logging.NOTSET)
+        self.routes = routes  # logger name -> [handler]
+
+    def handle(self, record):
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
 
 class TradingLogger:
     def __init__(self, config):
@@ -15,6 +125,14 @@ class TradingLogger:
         self.log_dir = config['logging']['log_dir']
         self.max_backup_count = int(config.get('logging', {}).get('max_backup_count', 30) or 30)
         
+        logging_cfg = config.get('logging', {}) or {}
+        self.async_enabled = bool(logging_cfg.get('async', True))
+        self.queue_size = max(100, int(logging_cfg.get('queue_size', 10000) or 10000))
+        self._log_queue = None
+        self._queue_handlers = []
+        self._listener = None
+        self.decision_serializer = DecisionSerializer()
+        
         # 로그 디렉토리 생성
         os.makedirs(self.log_dir, exist_ok=True)
         
@@ -29,6 +147,88 @@ class TradingLogger:
 
         # 의사결정/분석 전용 로거(JSONL)
         self.decision_logger = self._setup_decision_logger()
+
+        # 비동기 모드: 포맷팅/파일 I/O/로테이션은 백그라운드 리스너 스레드에서 처리
+        if self.async_enabled:
+            self._start_async_pipeline()
+    
+    def _start_async_pipeline(self):
+        """4개 로거의 핸들러를 큐 핸들러로 교체하고 단일 리스너 스레드를 시작."""
+        self._log_queue = queue.Queue(maxsize=self.queue_size)
+        routes = {}
+        for logger in (self.logger, self.trade_logger, self.stats_logger, self.decision_logger):
+            handlers = list(logger.handlers)
+            for handler in handlers:
+                logger.removeHandler(handler)
+            routes[logger.name] = handlers
+
+            queue_handler = _BoundedQueueHandler(self._log_queue)
+            logger.addHandler(queue_handler)
+            self._queue_handlers.append(queue_handler)
+
+        self._listener = QueueListener(self._log_queue, _RoutingHandler(routes))
+        self._listener.start()
+        self._listener._thread.name = "log-writer"
+        self._routes = routes
+        atexit.register(self.shutdown)
+
+    def get_queue_stats(self):
+        """비동기 로깅 큐 상태 (대기 건수/드롭 건수)."""
+        if self._log_queue is None:
+            return {"async": False, "pending": 0, "dropped": 0}
+        return {
+            "async": True,
+            "pending": int(self._log_queue.qsize()),
+            "dropped": int(sum(h.dropped for h in self._queue_handlers)),
+        }
+
+    def flush(self, timeout=5.0):
+        """큐에 쌓인 레코드가 모두 기록될 때까지 대기 (최대 timeout초)."""
+        if self._log_queue is not None and self._listener is not None:
+            deadline = time.time() + float(timeout)
+            while self._log_queue.unfinished_tasks > 0 and time.time() < deadline:
+                time.sleep(0.01)
+            handlers = [h for hs in self._routes.values() for h in hs]
+        else:
+            handlers = [
+                h
+                for lg in (self.logger, self.trade_logger, self.stats_logger, self.decision_logger)
+                for h in lg.handlers
+            ]
+        for handler in handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
+    def shutdown(self):
+        """리스너 정지(남은 레코드 기록) 후 핸들러 정리. 여러 번 호출해도 안전."""
+        listener = self._listener
+        if listener is None:
+            return
+        self._listener = None
+
+        dropped = sum(h.dropped for h in self._queue_handlers)
+        if dropped:
+            self.logger.warning(f"⚠️ 로그 큐 포화로 {dropped}건 드롭됨")
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
+        # 이후 로그는 원래 핸들러로 동기 기록
+        for logger in (self.logger, self.trade_logger, self.stats_logger, self.decision_logger):
+            for handler in list(logger.handlers):
+                if isinstance(handler, _BoundedQueueHandler):
+                    logger.removeHandler(handler)
+            for handler in self._routes.get(logger.name, []):
+                logger.addHandler(handler)
+                try:
+                    handler.flush()
+                except Exception:
+                    pass
+        self._queue_handlers = []
+        self._log_queue = None
     
     def _setup_main_logger(self):
         """메인 시스템 로거"""
@@ -146,12 +346,14 @@ class TradingLogger:
             except Exception:
                 pass
 
-        decision_handler = TimedRotatingFileHandler(
+        decision_handler = _DecisionFileHandler(
             filename=os.path.join(self.log_dir, 'decisions.log'),
             when='D',
             interval=1,
             backupCount=self.max_backup_count,
-            encoding='utf-8'
+            encoding='utf-8',
+            on_rollover=self.decision_serializer.reset,
+            compress=bool((self.config.get('logging', {}) or {}).get('compress_decisions', True)),
         )
         decision_format = logging.Formatter('%(message)s')
         decision_handler.setFormatter(decision_format)
@@ -164,21 +366,23 @@ class TradingLogger:
 
         event: 문자열 (예: BUY_SIGNAL, BUY_EXECUTED, SELL_SIGNAL, SELL_EXECUTED, COIN_REFRESH ...)
         payload: dict (JSON 직렬화 가능한 값)
+
+        호출 스레드에서는 payload를 복사만 하고(2단계 얕은 복사 + meta/detect는 중첩까지), JSON 직렬화는 기록 시점에 수행합니다.
+        같은 종목에서 반복되는 meta/detect는 처음 1회만 기록하고 이후 `meta_ref`로 참조합니다.
         """
         try:
-            record = {
-                "ts": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                "event": str(event),
-                "payload": payload or {},
-            }
-            self.decision_logger.info(json.dumps(record, ensure_ascii=False))
+            record = DecisionRecord(event, payload, self.decision_serializer)
+            trace_id = tracing.current_trace_id()
+            if trace_id and "trace_id" not in record.payload:
+                record.payload["trace_id"] = trace_id
+            self.decision_logger.info(record)
         except Exception:
             # 분석 로그는 실패해도 트레이딩에 영향 주지 않도록 무시
             pass
     
     def log_buy(self, coin, price, amount, total_krw, fee, signals, balance_krw):
         """매수 로그"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = clock.now().strftime('%Y-%m-%d %H:%M:%S')
         
         # 상세 로그
         self.logger.info(f"🔵 매수 | {coin} | 가격: {price:,.0f}원 | "
@@ -193,7 +397,7 @@ class TradingLogger:
     
     def log_sell(self, coin, price, amount, total_krw, fee, profit_rate, profit_krw, reason, balance_krw):
         """매도 로그"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = clock.now().strftime('%Y-%m-%d %H:%M:%S')
         
         # 상세 로그
         profit_emoji = "📈" if profit_krw > 0 else "📉"
@@ -218,7 +422,7 @@ class TradingLogger:
     
     def log_daily_stats(self, stats):
         """일일 통계 로그"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = clock.now().strftime('%Y-%m-%d %H:%M:%S')
         stats_json = json.dumps(stats, ensure_ascii=False)
         self.stats_logger.info(f"{timestamp}|{stats_json}")
         
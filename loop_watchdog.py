@@ -0,0 +1,158 @@
+"""
+거래 루프 정지(stall) 감시 모듈 - 단계별 heartbeat, 임계 초과 시 스택 덤프/알림
+
+거래 스레드는 단계가 바뀔 때마다 beat(stage)를 호출합니다(튜플 1개 교체라 락 없음).
+감시 스레드는 마지막 beat 이후 경과 시간이 임계값을 넘으면 거래 스레드의 스택을 떠서
+on_stall 콜백으로 넘기고, 다음 beat가 들어오면 정지 시간을 단계별로 집계합니다.
+"""
+
+import sys
+import threading
+import time
+import traceback
+
+
+class LoopWatchdog:
+    """단일 스레드(거래 루프) heartbeat 감시."""
+
+    def __init__(self, stall_seconds=120, check_seconds=5, on_stall=None, on_recover=None):
+        self.stall_seconds = max(1.0, float(stall_seconds))
+        self.check_seconds = max(0.05, float(check_seconds))
+        self.on_stall = on_stall
+        self.on_recover = on_recover
+        # (seq, stage, detail, monotonic ts, budget seconds)
+        self._beat = None
+        self._seq = 0
+        self._target_ident = None
+        self._stalled = None  # 보고된 정지: (seq, stage, detail, started)
+        self._stall_end = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.stall_stats = {}  # stage -> {"count", "total_seconds", "max_seconds"}
+
+    def attach(self, thread=None):
+        """감시 대상 스레드 지정 (기본: 호출한 스레드)."""
+        self._target_ident = (thread or threading.current_thread()).ident
+
+    def beat(self, stage, detail=None, budget=None):
+        """단계 진입 표시. budget(초)을 주면 이 단계는 stall_seconds 대신 budget+stall_seconds까지 허용."""
+        now = time.monotonic()
+        stalled = self._stalled
+        if stalled is not None and self._beat is not None and stalled[0] == self._beat[0]:
+            self._stall_end = now  # 보고된 정지 단계가 끝난 시각
+        self._seq += 1
+        self._beat = (self._seq, str(stage), detail, now, float(budget or 0))
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2)
+        self._thread = None
+        self._beat = None
+        self._stalled = None
+        self._stall_end = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.check_seconds):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"워치독 점검 오류: {e}")
+
+    def dump_stack(self):
+        frame = sys._current_frames().get(self._target_ident)
+        if frame is None:
+            return ""
+        return "".join(traceback.format_stack(frame))
+
+    def check(self, now=None):
+        """1회 점검 (감시 스레드에서 주기 호출)."""
+        beat = self._beat
+        if beat is None:
+            return None
+        now = time.monotonic() if now is None else now
+        seq, stage, detail, ts, budget = beat
+
+        stalled = self._stalled
+        if stalled is not None and stalled[0] != seq:
+            # 다음 단계로 넘어감 -> 정지 종료, 소요 시간 집계
+            end = self._stall_end if self._stall_end is not None else ts
+            self._stalled = None
+            self._stall_end = None
+            duration = max(0.0, end - stalled[3])
+            self._record(stalled[1], duration)
+            if self.on_recover:
+                self.on_recover({"stage": stalled[1], "detail": stalled[2], "stalled_seconds": round(duration, 3)})
+            return None
+
+        age = now - ts
+        if stalled is None and age >= self.stall_seconds + budget:
+            self._stalled = (seq, stage, detail, ts)
+            info = {
+                "stage": stage,
+                "detail": detail,
+                "age_seconds": round(age, 3),
+                "threshold_seconds": self.stall_seconds + budget,
+                "stack": self.dump_stack(),
+            }
+            if self.on_stall:
+                self.on_stall(info)
+            return info
+        return None
+
+    def _record(self, stage, duration):
+        entry = self.stall_stats.get(stage)
+        if entry is None:
+            entry = self.stall_stats[stage] = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        entry["count"] += 1
+        entry["total_seconds"] += duration
+        entry["max_seconds"] = max(entry["max_seconds"], duration)
+
+    def live_metric_families(self):
+        """수집 시점 메트릭 (현재 단계 경과 시간/진행 중 정지, 단계별 정지 누적)."""
+        beat = self._beat
+        stalled = self._stalled
+        now = time.monotonic()
+        families = [
+            (
+                "loop_stage_age_seconds",
+                "gauge",
+                "Seconds since the trading loop entered its current stage",
+                [({"stage": beat[1]}, now - beat[3])] if beat else [],
+            ),
+            (
+                "loop_stall_active",
+                "gauge",
+                "Whether the trading loop is currently stalled",
+                [(None, stalled is not None)],
+            ),
+        ]
+        stats = sorted(self.stall_stats.items())
+        families.append(
+            ("loop_stalls_total", "counter", "Trading loop stalls by stage", [({"stage": k}, v["count"]) for k, v in stats])
+        )
+        families.append(
+            (
+                "loop_stall_seconds_total",
+                "counter",
+                "Trading loop stall time by stage",
+                [({"stage": k}, round(v["total_seconds"], 3)) for k, v in stats],
+            )
+        )
+        families.append(
+            (
+                "loop_stall_max_seconds",
+                "gauge",
+                "Longest trading loop stall by stage",
+                [({"stage": k}, round(v["max_seconds"], 3)) for k, v in stats],
+            )
+        )
+        return families
@@ -5,7 +5,8 @@
 import json
 import time
 import threading
-from datetime import datetime, timedelta
+from datetime import timedelta
+from html import escape as html_escape
 import os
 import sys
 import readline  # 명령어 히스토리용
@@ -15,18 +16,29 @@ from logger import TradingLogger
 from trading_stats import TradingStats
 from trading_engine import TradingEngine
 from telegram_notifier import TelegramNotifier
+from api_stats import ApiStats, LATENCY_BUCKETS_MS
+from metrics_server import MetricsServer, render_metrics
+from profiler import DEFAULT_THREADS, StackSampler
+from loop_watchdog import LoopWatchdog
+from market_recorder import MarketRecorder
+from report_cache import ReportCache
+import clock
+import tracing
+import upbit_api
 from version import BOT_NAME, BOT_DISPLAY_NAME, BOT_VERSION
 
 
 class TradingBot:
-    def __init__(self, config_path='config.json'):
-        # 설정 로드
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
+    def __init__(self, config_path='config.json', config=None):
+        # 설정 로드 (config dict를 직접 넘기면 파일을 읽지 않음 - 리플레이/테스트용)
+        if config is None:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        self.config = config
         
         # 모듈 초기화
         self.logger = TradingLogger(self.config)
-        self.stats = TradingStats()
+        self.stats = TradingStats(self.config)
         self.engine = TradingEngine(self.config, self.logger, self.stats)
         self.telegram = TelegramNotifier(self.config)
         self.bot_name = BOT_NAME
@@ -68,6 +80,112 @@ class TradingBot:
         except Exception:
             self.analysis_heartbeat_minutes = 10
         self._last_analysis_heartbeat_at = None
+
+        # 자산 곡선 샘플 주기(초) - 루프마다 총자산을 평가해 시계열에 기록
+        try:
+            sample_sec = int(((self.config.get('stats', {}) or {}).get('equity_sample_seconds', 60)))
+            self.equity_sample_seconds = max(10, sample_sec)
+        except Exception:
+            self.equity_sample_seconds = 60
+        self._last_equity_sample_at = None
+
+        # REST 호출 훅 + 엔드포인트별 호출 통계(횟수/오류/지연/Remaining-Req)
+        self.api_stats = ApiStats()
+        try:
+            upbit_api.install()
+            upbit_api.add_observer(self.api_stats.observe)
+        except Exception as e:
+            self.logger.warning(f"⚠️ REST 호출 훅 설치 실패: {e}")
+
+        # 시세 기록(선택): 시세 조회 응답을 일자별 파일로 남겨 리플레이/벤치마크에 사용
+        recorder_cfg = self.config.get('market_recorder', {}) or {}
+        self.market_recorder = None
+        if bool(recorder_cfg.get('enabled', False)):
+            try:
+                self.market_recorder = MarketRecorder(
+                    directory=str(recorder_cfg.get('dir', 'market_data')),
+                    flush_seconds=float(recorder_cfg.get('flush_seconds', 5)),
+                    block_records=int(recorder_cfg.get('block_records', 2000)),
+                    queue_size=int(recorder_cfg.get('queue_size', 20000)),
+                )
+                upbit_api.install()
+                upbit_api.add_observer(self.market_recorder.observe)
+            except Exception as e:
+                self.market_recorder = None
+                self.logger.warning(f"⚠️ 시세 기록 시작 실패: {e}")
+
+        # 요청별 타임아웃 + 시세 조회 헤징(p95까지 응답 없으면 1회 추가 요청, 주문은 제외)
+        http_cfg = self.config.get('upbit_http', {}) or {}
+        hedge_cfg = http_cfg.get('hedge', {}) or {}
+        try:
+            upbit_api.configure(
+                connect_timeout=float(http_cfg.get('connect_timeout_seconds', 3)),
+                read_timeout=float(http_cfg.get('read_timeout_seconds', 10)),
+                order_read_timeout=http_cfg.get('order_read_timeout_seconds'),
+                hedge_enabled=bool(hedge_cfg.get('enabled', False)),
+                hedge_min_delay_ms=float(hedge_cfg.get('min_delay_ms', 80)),
+                hedge_default_delay_ms=float(hedge_cfg.get('default_delay_ms', 400)),
+                hedge_max_per_minute=int(hedge_cfg.get('max_per_minute', 60)),
+                hedge_delay_fn=self.api_stats.get_p95_ms,
+            )
+        except Exception as e:
+            self.logger.warning(f"⚠️ upbit_http 설정 오류(기본값 사용): {e}")
+
+        # 메트릭 엔드포인트(Prometheus): 루프가 스냅샷을 렌더링하고 서버 스레드는 서빙만 함
+        metrics_cfg = self.config.get('metrics', {}) or {}
+        self.metrics_enabled = bool(metrics_cfg.get('enabled', False))
+        self.metrics_host = str(metrics_cfg.get('host', '127.0.0.1'))
+        try:
+            self.metrics_port = int(metrics_cfg.get('port', 9108))
+            self.metrics_refresh_seconds = max(1.0, float(metrics_cfg.get('refresh_seconds', 15)))
+        except Exception:
+            self.metrics_port = 9108
+            self.metrics_refresh_seconds = 15.0
+        self.metrics_server = None
+        self._last_metrics_refresh = 0.0
+        self._loop_metrics = {'count': 0, 'sum_seconds': 0.0, 'last_seconds': 0.0, 'max_seconds': 0.0}
+        self._stage_metrics = {}  # stage -> [count, sum_ms, errors]
+        self._last_equity = (0.0, 0.0)  # (현금, 총자산) 마지막 샘플
+
+        # 리포트 캐시(/status, /daily, /weekly, /monthly): 입력 데이터 버전이 바뀔 때만 다시 렌더링
+        self.reports = ReportCache()
+
+        # 온디맨드 샘플링 프로파일러 (CLI `profile start|stop`, 텔레그램 /profile)
+        profiler_cfg = self.config.get('profiler', {}) or {}
+        try:
+            self.profiler = StackSampler(
+                interval_ms=float(profiler_cfg.get('interval_ms', 10)),
+                thread_names=profiler_cfg.get('threads') or DEFAULT_THREADS,
+                output_dir=str(profiler_cfg.get('output_dir', 'logs/profiles')),
+                max_seconds=float(profiler_cfg.get('max_seconds', 300)),
+            )
+        except Exception:
+            self.profiler = StackSampler()
+
+        # 거래 루프 정지 감시 (단계별 heartbeat, 임계 초과 시 스택 덤프 + LOOP_STALL + 알림)
+        watchdog_cfg = self.config.get('watchdog', {}) or {}
+        self.watchdog = None
+        if bool(watchdog_cfg.get('enabled', True)):
+            try:
+                self.watchdog = LoopWatchdog(
+                    stall_seconds=float(watchdog_cfg.get('stall_seconds', 120)),
+                    check_seconds=float(watchdog_cfg.get('check_seconds', 5)),
+                    on_stall=self._on_loop_stall,
+                    on_recover=self._on_loop_recover,
+                )
+            except Exception:
+                self.watchdog = LoopWatchdog(on_stall=self._on_loop_stall, on_recover=self._on_loop_recover)
+
+        # 의사결정 추적: 종목 평가마다 상관관계 ID + 단계/REST 호출 span 기록
+        tracing_cfg = self.config.get('tracing', {}) or {}
+        self.tracing_enabled = bool(tracing_cfg.get('enabled', True))
+        try:
+            self.trace_slow_ms = float(tracing_cfg.get('slow_ms', 2000))
+        except Exception:
+            self.trace_slow_ms = 2000.0
+        self.trace_emit_all = bool(tracing_cfg.get('emit_all', False))
+        if self.tracing_enabled:
+            self._install_tracing()
         
         # 손절 후 동일 종목 재진입 쿨다운(과매매/휘둘림 방지)
         try:
@@ -106,20 +224,57 @@ class TradingBot:
         self.logger.info("="*80)
         self.logger.info(f"🚀 {self.bot_display_name} 시작 (v{self.bot_version})")
         self.logger.info("="*80)
+
+        if not self._prepare_session():
+            return
+        
+        # 거래 시작
+        self.is_running = True
+        self.trading_thread = threading.Thread(target=self._trading_loop, name="trading-loop", daemon=True)
+        self.trading_thread.start()
+
+        # 메트릭 엔드포인트 (metrics.enabled)
+        self._start_metrics_server()
+        
+        # 시작 시점 시장 상황 스냅샷
+        market_snapshot = self._get_market_snapshot(probe=True)
+
+        # 매수 조건 출력
+        self._print_trading_conditions(market_snapshot=market_snapshot)
+        
+        # 텔레그램 알림
+        self.telegram.notify_start(
+            bot_name=self.bot_name,
+            bot_version=self.bot_version,
+            display_name=self.bot_display_name,
+            selected_coins=self.target_coins,
+            market_summary_lines=self._format_market_snapshot_lines(market_snapshot),
+        )
+        
+        # 텔레그램 명령어 수신 시작
+        if self.telegram.enable_commands:
+            self.telegram.start_listening(self._handle_telegram_command)
+            self.logger.info("📱 텔레그램 명령어 수신 시작")
+        
+        if self.target_coins:
+            print("✅ 트레이딩 시작됨")
+        else:
+            print("✅ 트레이딩 대기 시작됨 (고정 종목 설정 확인 필요)")
+
+    def _prepare_session(self):
+        """API 연결/포지션 복구/기준선/레짐 초기화 (거래 루프 시작 전 단계). 실패 시 False"""
         
         # API 연결
-        if not self.engine.connect(
-            self.config['api']['access_key'],
-            self.config['api']['secret_key']
-        ):
+        api_cfg = self.config.get('api', {}) or {}
+        if not self.engine.connect(api_cfg.get('access_key'), api_cfg.get('secret_key')):
             print("❌ API 연결 실패. 설정을 확인하세요.")
-            return
+            return False
         
         # 초기 잔고 확인
         initial_balance = self.engine.get_balance("KRW")
         if initial_balance < self.config['trading']['min_trade_amount']:
             print(f"❌ 거래 가능 금액이 부족합니다. (최소 {self.config['trading']['min_trade_amount']:,}원)")
-            return
+            return False
 
         # 포지션 복구 시도
         saved_positions = self.stats.load_positions()
@@ -171,6 +326,9 @@ class TradingBot:
         )
         self.stats.start(initial_balance, initial_total_value=initial_total_value)
         
+        # 저장된 캔들/레짐 상태 복원 (이후 조회는 저장 시점 이후 갭만 가져옴)
+        self.engine.load_candle_cache()
+
         # 초기 레짐 계산
         try:
             regime, _ = self.engine.update_global_regime(force=True)
@@ -226,39 +384,11 @@ class TradingBot:
                         "trailing_activation_pct": float(self.config.get("risk_management", {}).get("trailing_activation_pct", 2.0) or 2.0),
                     },
                     "fee_pct": self.config.get("trading", {}).get("fee_pct", None),
+                    "run_mode": self.engine.run_mode,
                 },
             },
         )
-        
-        # 거래 시작
-        self.is_running = True
-        self.trading_thread = threading.Thread(target=self._trading_loop, daemon=True)
-        self.trading_thread.start()
-        
-        # 시작 시점 시장 상황 스냅샷
-        market_snapshot = self._get_market_snapshot(probe=True)
-
-        # 매수 조건 출력
-        self._print_trading_conditions(market_snapshot=market_snapshot)
-        
-        # 텔레그램 알림
-        self.telegram.notify_start(
-            bot_name=self.bot_name,
-            bot_version=self.bot_version,
-            display_name=self.bot_display_name,
-            selected_coins=self.target_coins,
-            market_summary_lines=self._format_market_snapshot_lines(market_snapshot),
-        )
-        
-        # 텔레그램 명령어 수신 시작
-        if self.telegram.enable_commands:
-            self.telegram.start_listening(self._handle_telegram_command)
-            self.logger.info("📱 텔레그램 명령어 수신 시작")
-        
-        if self.target_coins:
-            print("✅ 트레이딩 시작됨")
-        else:
-            print("✅ 트레이딩 대기 시작됨 (고정 종목 설정 확인 필요)")
+        return True
     
     def _print_trading_conditions(self, market_snapshot=None):
         """현재 매수 조건 출력"""
@@ -383,22 +513,34 @@ class TradingBot:
         if not probe:
             return snapshot
 
+        # 레짐 탐지는 확정 캔들 기준이므로 같은 신호 캔들 구간에서는 결과를 재사용 (실패는 캐시하지 않음)
         try:
-            candidate, detect_meta = self.engine.detect_global_regime()
-            snapshot["candidate"] = str(candidate or "")
-            if isinstance(detect_meta, dict):
-                snapshot["reference_ticker"] = str(
-                    detect_meta.get("reference_ticker") or snapshot["reference_ticker"]
-                )
-                snapshot["close"] = detect_meta.get("close")
-                snapshot["ema50"] = detect_meta.get("ema50")
-                snapshot["ema200"] = detect_meta.get("ema200")
-                snapshot["candle_ts"] = str(detect_meta.get("candle_ts") or "")
-                if not snapshot["candidate"]:
-                    snapshot["candidate"] = str(detect_meta.get("candidate") or "")
+            snapshot.update(self.reports.get('market_probe', self._signal_candle_bucket(), self._probe_market))
         except Exception as e:
             snapshot["error"] = str(e).replace("<", "(").replace(">", ")")
+        return snapshot
 
+    def _signal_candle_bucket(self):
+        """현재 신호 캔들 구간 번호 (마지막 확정 캔들이 바뀌면 증가)."""
+        try:
+            minutes = max(1, int(getattr(self.engine, 'signal_candle_minutes', 1) or 1))
+        except Exception:
+            minutes = 1
+        return int(clock.time() // (minutes * 60))
+
+    def _probe_market(self):
+        """레짐 탐지 1회 실행 (API 조회 포함, 예외는 호출자가 처리)."""
+        candidate, detect_meta = self.engine.detect_global_regime()
+        snapshot = {"candidate": str(candidate or "")}
+        if isinstance(detect_meta, dict):
+            if detect_meta.get("reference_ticker"):
+                snapshot["reference_ticker"] = str(detect_meta.get("reference_ticker"))
+            snapshot["close"] = detect_meta.get("close")
+            snapshot["ema50"] = detect_meta.get("ema50")
+            snapshot["ema200"] = detect_meta.get("ema200")
+            snapshot["candle_ts"] = str(detect_meta.get("candle_ts") or "")
+            if not snapshot["candidate"]:
+                snapshot["candidate"] = str(detect_meta.get("candidate") or "")
         return snapshot
 
     def _format_market_snapshot_lines(self, snapshot):
@@ -492,7 +634,7 @@ class TradingBot:
         if not until:
             return False
         
-        if datetime.now() >= until:
+        if clock.now() >= until:
             self.reentry_cooldowns.pop(ticker, None)
             return False
         
@@ -503,7 +645,7 @@ class TradingBot:
         if minutes <= 0:
             return
         
-        until = datetime.now() + timedelta(minutes=minutes)
+        until = clock.now() + timedelta(minutes=minutes)
         self.reentry_cooldowns[ticker] = until
         self.logger.info(
             f"⏳ 재진입 쿨다운 설정: {ticker} | {minutes}분 | 사유: {reason} | "
@@ -593,7 +735,7 @@ class TradingBot:
                 temp_position = {
                     'buy_price': current_price,
                     'amount': actual_balance,
-                    'timestamp': datetime.now(),
+                    'timestamp': clock.now(),
                     'highest_price': current_price
                 }
                 sell_result = self.engine.execute_sell(ticker, temp_position, 1.0)
@@ -669,6 +811,10 @@ class TradingBot:
         final_balance = self.engine.get_balance("KRW")
         final_total_value = self._estimate_total_value(final_balance)
         self.stats.update_balance(final_balance, current_total_value=final_total_value)
+        self.stats.equity.flush()
+        
+        # 캔들 캐시 저장 (다음 기동 시 갭만 조회)
+        self.engine.save_candle_cache(force=True)
         
         # 통계 저장
         self.logger.log_daily_stats(self.stats.get_current_status())
@@ -678,8 +824,14 @@ class TradingBot:
         total_profit = final_status['total_value'] - self.stats.initial_balance
         self.telegram.notify_stop(final_status['total_value'], total_profit)
         
-        # 텔레그램 명령어 수신 중지
+        # 텔레그램 명령어 수신 중지 + 대기 중인 알림 전송
         self.telegram.stop_listening()
+        self.telegram.flush()
+
+        # 메트릭 서버 정지
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
         
         print("✅ 트레이딩 정지됨")
     
@@ -701,6 +853,10 @@ class TradingBot:
             elif cmd == '/weekly' or cmd == '/주간':
                 self._telegram_weekly()
             
+            # /monthly - 월간 통계(최근 30일)
+            elif cmd == '/monthly' or cmd == '/월간':
+                self._telegram_monthly()
+            
             # /positions - 포지션 현황
             elif cmd == '/positions' or cmd == '/포지션':
                 self._telegram_positions()
@@ -717,6 +873,14 @@ class TradingBot:
             elif cmd == '/resume' or cmd == '/재개':
                 self._telegram_resume()
             
+            # /apistats - API 호출 통계
+            elif cmd == '/apistats' or cmd == '/api':
+                self._telegram_apistats()
+            
+            # /profile start [초] | stop - 샘플링 프로파일러
+            elif cmd.startswith('/profile') or cmd.startswith('/프로파일'):
+                self.telegram.send_message(self.profile_command(cmd.split()[1:], html=True))
+            
             # /help - 도움말
             elif cmd == '/help' or cmd == '/도움말':
                 self._telegram_help()
@@ -736,7 +900,33 @@ class TradingBot:
     
     def _telegram_status(self):
         """텔레그램: 상태 확인"""
-        status = self.stats.get_current_status()
+        version = (
+            self.stats.trades.last_trade_id,
+            self.stats.positions_version,
+            self._signal_candle_bucket(),
+            self.stats.last_update,
+            str(getattr(self.engine, "global_regime", "") or ""),
+            self.is_running,
+            self.is_trading_paused,
+            self.cooldown_until,
+        )
+        self.telegram.send_message(self.reports.get('status', version, self._render_status))
+
+    def _status_mark_prices(self):
+        """보유 포지션 평가 가격: 저장된 캔들 최근 종가 (API 호출 없음, 없으면 매수가로 평가)."""
+        prices = {}
+        for coin in list(self.stats.positions.keys()):
+            try:
+                price = self.engine.get_cached_price(coin)
+            except Exception:
+                price = None
+            if price:
+                prices[coin] = price
+        return prices
+
+    def _render_status(self):
+        """상태 메시지 렌더링"""
+        status = self.stats.get_current_status(mark_prices=self._status_mark_prices())
         market_snapshot = self._get_market_snapshot(probe=True)
         market_lines = self._format_market_snapshot_lines(market_snapshot)
         market_block = "\n".join(market_lines)
@@ -783,273 +973,130 @@ class TradingBot:
 승률: {status['win_rate']:.1f}%
 """
         
-        self.telegram.send_message(message)
+        return message
     
+    def _report_version(self, *extra):
+        """기간 리포트 입력 버전: 날짜 + 마지막 거래 ID + 포지션 버전(세션 수수료 반영)"""
+        return (clock.now().date(), self.stats.trades.last_trade_id, self.stats.positions_version) + extra
+
     def _telegram_daily(self):
         """텔레그램: 일일 통계"""
-        today = datetime.now().date()
-        
-        # 파일 + 메모리 통합
-        file_trades = self.stats.load_daily_trades()
-        memory_trades = [t for t in self.stats.trades if t['timestamp'].date() == today]
-        
-        all_trades_dict = {t['timestamp'].isoformat(): t for t in file_trades}
-        for t in memory_trades:
-            all_trades_dict[t['timestamp'].isoformat()] = t
-        
-        today_trades = list(all_trades_dict.values())
-        
-        if not today_trades:
-            self.telegram.send_message("📅 오늘 거래 내역이 없습니다.")
-            return
-
-        fee_rate = getattr(self.engine, "FEE", 0.0005)
-        buy_fee_sum = 0.0
-        sell_fee_sum = 0.0
-        total_profit = 0.0
-        total_profit_after_fees = 0.0
-        turnover_krw = 0.0
-
-        def _paf(tr):
-            paf = tr.get('profit_after_fees_krw', None)
-            if paf is not None:
-                return float(paf or 0)
-            try:
-                bp = float(tr.get('buy_price', 0) or 0)
-                amt = float(tr.get('amount', 0) or 0)
-                bf = float(tr.get('buy_fee_krw', 0) or 0)
-                if bf <= 0:
-                    bf = bp * amt * fee_rate
-                return float(tr.get('profit_krw', 0) or 0) - bf
-            except Exception:
-                return float(tr.get('profit_krw', 0) or 0)
+        self.telegram.send_message(self.reports.get('daily', self._report_version(), self._render_daily))
 
-        for t in today_trades:
-            try:
-                total_profit += float(t.get('profit_krw', 0) or 0)
-                total_profit_after_fees += _paf(t)
-
-                buy_price = float(t.get('buy_price', 0) or 0)
-                sell_price = float(t.get('sell_price', 0) or 0)
-                amount = float(t.get('amount', 0) or 0)
-                turnover_krw += (buy_price * amount) + (sell_price * amount)
-
-                buy_fee = t.get('buy_fee_krw', None)
-                sell_fee = t.get('sell_fee_krw', None)
-                if buy_fee is None:
-                    buy_fee = buy_price * amount * fee_rate
-                if sell_fee is None:
-                    sell_fee = sell_price * amount * fee_rate
-                buy_fee_sum += float(buy_fee or 0)
-                sell_fee_sum += float(sell_fee or 0)
-            except Exception:
-                continue
+    def _render_daily(self):
+        """일일 통계 메시지 렌더링"""
+        today = clock.now().date()
+        summary = self.stats.get_period_summary(today, today)
+        
+        if not summary['trades']:
+            return "📅 오늘 거래 내역이 없습니다."
 
-        wins = [t for t in today_trades if _paf(t) > 0]
-        losses = [t for t in today_trades if _paf(t) <= 0]
-        total_fee_sum = buy_fee_sum + sell_fee_sum
+        turnover_krw = summary['turnover_krw']
+        total_fee_sum = summary['total_fee_krw']
         fee_turnover_str = f"{(total_fee_sum/turnover_krw*100):.3f}%" if turnover_krw > 0 else "N/A"
-        strategy_profit = {}
-        strategy_count = {}
-        strategy_wins = {}
-        for t in today_trades:
-            buy_meta = t.get("buy_meta", {}) if isinstance(t.get("buy_meta"), dict) else {}
-            strategy = str(t.get("strategy") or buy_meta.get("strategy") or "UNKNOWN")
-            strategy_profit[strategy] = strategy_profit.get(strategy, 0.0) + _paf(t)
-            strategy_count[strategy] = strategy_count.get(strategy, 0) + 1
-            if _paf(t) > 0:
-                strategy_wins[strategy] = strategy_wins.get(strategy, 0) + 1
         
         message = f"""📅 <b>일일 통계</b>
 
 날짜: {today.strftime('%Y-%m-%d')}
 
-📊 거래: {len(today_trades)}회
-✅ 승: {len(wins)}회
-❌ 패: {len(losses)}회
-📈 승률: {len(wins)/len(today_trades)*100:.1f}%
+📊 거래: {summary['trades']}회
+✅ 승: {summary['wins']}회
+❌ 패: {summary['losses']}회
+📈 승률: {summary['wins']/summary['trades']*100:.1f}%
 
-💰 총 손익: {total_profit:+,.0f}원
-💰 총 손익(수수료 반영): {total_profit_after_fees:+,.0f}원
-💸 수수료(기간): {total_fee_sum:,.0f}원 (매수 {buy_fee_sum:,.0f} + 매도 {sell_fee_sum:,.0f})
+💰 총 손익: {summary['profit_krw']:+,.0f}원
+💰 총 손익(수수료 반영): {summary['profit_after_fees_krw']:+,.0f}원
+💸 수수료(기간): {total_fee_sum:,.0f}원 (매수 {summary['buy_fee_krw']:,.0f} + 매도 {summary['sell_fee_krw']:,.0f})
 거래대금(왕복): {turnover_krw:,.0f}원
 수수료/거래대금: {fee_turnover_str}
 💸 누적 수수료(세션): {self.stats.get_total_fees_krw():,.0f}원
 """
         
-        if wins:
-            best = max(wins, key=_paf)
-            message += f"\n🏆 최고: {best['coin'].replace('KRW-', '')} {_paf(best):+,.0f}원"
+        if summary['wins'] and summary['best']:
+            best = summary['best']
+            message += f"\n🏆 최고: {best['coin']} {best['profit_after_fees_krw']:+,.0f}원"
         
-        if losses:
-            worst = min(losses, key=_paf)
-            message += f"\n📉 최악: {worst['coin'].replace('KRW-', '')} {_paf(worst):+,.0f}원"
+        if summary['losses'] and summary['worst']:
+            worst = summary['worst']
+            message += f"\n📉 최악: {worst['coin']} {worst['profit_after_fees_krw']:+,.0f}원"
 
-        if strategy_count:
-            message += "\n\n🧠 <b>전략별 성과</b>"
-            ranked = sorted(strategy_profit.items(), key=lambda kv: kv[1], reverse=True)
-            for strategy, pnl in ranked:
-                cnt = strategy_count.get(strategy, 0)
-                win = strategy_wins.get(strategy, 0)
-                wr = (win / cnt * 100) if cnt > 0 else 0
-                message += f"\n{strategy}: {pnl:+,.0f}원 ({cnt}회, 승률 {wr:.1f}%)"
+        message += self._format_strategy_block_html(summary)
         
+        return message
+
+    def _format_strategy_block_html(self, summary):
+        """텔레그램 리포트: 전략별 성과 블록"""
+        by_strategy = summary.get('by_strategy', {}) or {}
+        if not by_strategy:
+            return ""
+        block = "\n\n🧠 <b>전략별 성과</b>"
+        ranked = sorted(by_strategy.items(), key=lambda kv: kv[1]['profit'], reverse=True)
+        for strategy, st in ranked:
+            cnt = st['trades']
+            wr = (st['wins'] / cnt * 100) if cnt > 0 else 0
+            block += f"\n{strategy}: {st['profit']:+,.0f}원 ({cnt}회, 승률 {wr:.1f}%)"
+        return block
+
+    def _telegram_period_report(self, days, title, empty_label):
+        """텔레그램: 기간 리포트 (최근 N일, 일자별 롤업 합산)"""
+        message = self.reports.get(
+            f"period_{days}",
+            self._report_version(days),
+            lambda: self._render_period_report(days, title, empty_label),
+        )
         self.telegram.send_message(message)
 
-    def _telegram_weekly(self):
-        """텔레그램: 주간 리포트 (최근 7일)"""
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=6)
-        
-        # 파일 + 메모리 통합 (중복 제거: timestamp 기준)
-        all_trades_dict = {}
-        
-        for i in range(7):
-            d = start_date + timedelta(days=i)
-            # load_daily_trades는 datetime 또는 YYYYMMDD 문자열을 받음
-            file_trades = self.stats.load_daily_trades(datetime.combine(d, datetime.min.time()))
-            for t in file_trades:
-                all_trades_dict[t['timestamp'].isoformat()] = t
-        
-        memory_trades = [
-            t for t in self.stats.trades
-            if start_date <= t['timestamp'].date() <= end_date
-        ]
-        for t in memory_trades:
-            all_trades_dict[t['timestamp'].isoformat()] = t
+    def _render_period_report(self, days, title, empty_label):
+        """기간 리포트 메시지 렌더링"""
+        end_date = clock.now().date()
+        start_date = end_date - timedelta(days=days - 1)
+        summary = self.stats.get_period_summary(start_date, end_date)
         
-        week_trades = list(all_trades_dict.values())
-        
-        if not week_trades:
-            self.telegram.send_message(
-                f"📆 최근 7일 거래 내역이 없습니다.\n\n"
+        if not summary['trades']:
+            return (
+                f"{empty_label}\n\n"
                 f"기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}"
             )
-            return
-
-        fee_rate = getattr(self.engine, "FEE", 0.0005)
-
-        def _paf(tr):
-            paf = tr.get('profit_after_fees_krw', None)
-            if paf is not None:
-                return float(paf or 0)
-            try:
-                bp = float(tr.get('buy_price', 0) or 0)
-                amt = float(tr.get('amount', 0) or 0)
-                bf = float(tr.get('buy_fee_krw', 0) or 0)
-                if bf <= 0:
-                    bf = bp * amt * fee_rate
-                return float(tr.get('profit_krw', 0) or 0) - bf
-            except Exception:
-                return float(tr.get('profit_krw', 0) or 0)
-
-        buy_fee_sum = 0.0
-        sell_fee_sum = 0.0
-        total_profit = 0.0
-        total_profit_after_fees = 0.0
-        turnover_krw = 0.0
-
-        for t in week_trades:
-            try:
-                total_profit += float(t.get('profit_krw', 0) or 0)
-                total_profit_after_fees += _paf(t)
-
-                buy_price = float(t.get('buy_price', 0) or 0)
-                sell_price = float(t.get('sell_price', 0) or 0)
-                amount = float(t.get('amount', 0) or 0)
-                turnover_krw += (buy_price * amount) + (sell_price * amount)
-
-                buy_fee = t.get('buy_fee_krw', None)
-                sell_fee = t.get('sell_fee_krw', None)
-                if buy_fee is None:
-                    buy_fee = buy_price * amount * fee_rate
-                if sell_fee is None:
-                    sell_fee = sell_price * amount * fee_rate
-                buy_fee_sum += float(buy_fee or 0)
-                sell_fee_sum += float(sell_fee or 0)
-            except Exception:
-                continue
 
-        wins = [t for t in week_trades if _paf(t) > 0]
-        losses = [t for t in week_trades if _paf(t) <= 0]
-        win_rate = (len(wins) / len(week_trades) * 100) if week_trades else 0
-
-        total_fee_sum = buy_fee_sum + sell_fee_sum
+        total_trades = summary['trades']
+        win_rate = (summary['wins'] / total_trades * 100) if total_trades else 0
+        turnover_krw = summary['turnover_krw']
+        total_fee_sum = summary['total_fee_krw']
         fee_turnover_str = f"{(total_fee_sum/turnover_krw*100):.3f}%" if turnover_krw > 0 else "N/A"
         
-        best = max(week_trades, key=_paf)
-        worst = min(week_trades, key=_paf)
-        
-        # 일자별 손익/횟수
-        daily_profit = {}
-        daily_count = {}
-        for i in range(7):
-            d = start_date + timedelta(days=i)
-            daily_profit[d] = 0
-            daily_count[d] = 0
-        
-        # 종목/전략별 손익
-        coin_profit = {}
-        strategy_stats = {}
-        strategy_profit = {}
-        strategy_count = {}
-        strategy_wins = {}
-        
-        for t in week_trades:
-            d = t['timestamp'].date()
-            daily_profit[d] = daily_profit.get(d, 0) + _paf(t)
-            daily_count[d] = daily_count.get(d, 0) + 1
-            
-            coin = t['coin'].replace('KRW-', '')
-            coin_profit[coin] = coin_profit.get(coin, 0) + _paf(t)
-            buy_meta = t.get('buy_meta', {}) if isinstance(t.get('buy_meta'), dict) else {}
-            strategy = str(t.get('strategy') or buy_meta.get('strategy') or 'UNKNOWN')
-            if strategy not in strategy_stats:
-                strategy_stats[strategy] = {'trades': 0, 'wins': 0, 'profit': 0.0}
-            strategy_stats[strategy]['trades'] += 1
-            paf_strategy = _paf(t)
-            strategy_stats[strategy]['profit'] += float(paf_strategy or 0)
-            if paf_strategy > 0:
-                strategy_stats[strategy]['wins'] += 1
-            buy_meta = t.get("buy_meta", {}) if isinstance(t.get("buy_meta"), dict) else {}
-            strategy = str(t.get("strategy") or buy_meta.get("strategy") or "UNKNOWN")
-            strategy_profit[strategy] = strategy_profit.get(strategy, 0.0) + _paf(t)
-            strategy_count[strategy] = strategy_count.get(strategy, 0) + 1
-            if _paf(t) > 0:
-                strategy_wins[strategy] = strategy_wins.get(strategy, 0) + 1
-        
+        coin_profit = {coin: st['profit'] for coin, st in summary['by_symbol'].items()}
         top_winners = sorted(coin_profit.items(), key=lambda kv: kv[1], reverse=True)[:3]
         top_losers = sorted(coin_profit.items(), key=lambda kv: kv[1])[:3]
         
-        best_coin = best['coin'].replace('KRW-', '')
-        worst_coin = worst['coin'].replace('KRW-', '')
-        
-        message = f"""📆 <b>주간 리포트</b>
+        message = f"""{title}
 
 기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}
 
-📊 거래: {len(week_trades)}회
-✅ 승: {len(wins)}회
-❌ 패: {len(losses)}회
+📊 거래: {total_trades}회
+✅ 승: {summary['wins']}회
+❌ 패: {summary['losses']}회
 📈 승률: {win_rate:.1f}%
 
-💰 총 손익: {total_profit:+,.0f}원
-💰 총 손익(수수료 반영): {total_profit_after_fees:+,.0f}원
-💸 수수료(기간): {total_fee_sum:,.0f}원 (매수 {buy_fee_sum:,.0f} + 매도 {sell_fee_sum:,.0f})
+💰 총 손익: {summary['profit_krw']:+,.0f}원
+💰 총 손익(수수료 반영): {summary['profit_after_fees_krw']:+,.0f}원
+💸 수수료(기간): {total_fee_sum:,.0f}원 (매수 {summary['buy_fee_krw']:,.0f} + 매도 {summary['sell_fee_krw']:,.0f})
 거래대금(왕복): {turnover_krw:,.0f}원
 수수료/거래대금: {fee_turnover_str}
 💸 누적 수수료(세션): {self.stats.get_total_fees_krw():,.0f}원
 
 📅 <b>일자별 손익</b>"""
         
-        for d in sorted(daily_profit.keys()):
-            pnl = daily_profit[d]
-            cnt = daily_count.get(d, 0)
+        for d, pnl, cnt in summary['daily']:
+            # 장기 리포트는 거래가 있었던 날만 표시
+            if days > 7 and cnt == 0:
+                continue
             message += f"\n{d.strftime('%m-%d')}: {pnl:+,.0f}원 ({cnt}회)"
         
+        best = summary['best']
+        worst = summary['worst']
         message += (
-            f"\n\n🏆 최고: {best_coin} {_paf(best):+,.0f}원"
-            f"\n📉 최악: {worst_coin} {_paf(worst):+,.0f}원"
+            f"\n\n🏆 최고: {best['coin']} {best['profit_after_fees_krw']:+,.0f}원"
+            f"\n📉 최악: {worst['coin']} {worst['profit_after_fees_krw']:+,.0f}원"
         )
         
         if top_winners:
@@ -1062,16 +1109,17 @@ class TradingBot:
             for coin, pnl in top_losers:
                 message += f"\n{coin}: {pnl:+,.0f}원"
 
-        if strategy_count:
-            message += "\n\n🧠 <b>전략별 성과</b>"
-            ranked_strategy = sorted(strategy_profit.items(), key=lambda kv: kv[1], reverse=True)
-            for strategy, pnl in ranked_strategy:
-                cnt = strategy_count.get(strategy, 0)
-                win = strategy_wins.get(strategy, 0)
-                wr = (win / cnt * 100) if cnt > 0 else 0
-                message += f"\n{strategy}: {pnl:+,.0f}원 ({cnt}회, 승률 {wr:.1f}%)"
+        message += self._format_strategy_block_html(summary)
         
-        self.telegram.send_message(message)
+        return message
+
+    def _telegram_weekly(self):
+        """텔레그램: 주간 리포트 (최근 7일)"""
+        self._telegram_period_report(7, "📆 <b>주간 리포트</b>", "📆 최근 7일 거래 내역이 없습니다.")
+
+    def _telegram_monthly(self):
+        """텔레그램: 월간 리포트 (최근 30일)"""
+        self._telegram_period_report(30, "🗓️ <b>월간 리포트</b>", "🗓️ 최근 30일 거래 내역이 없습니다.")
     
     def _telegram_positions(self):
         """텔레그램: 포지션 현황"""
@@ -1143,12 +1191,15 @@ class TradingBot:
 /status - 현재 상태
 /daily - 일일 통계
 /weekly - 주간 리포트(최근 7일)
+/monthly - 월간 리포트(최근 30일)
 /positions - 보유 포지션
 /balance - 잔고 확인
+/apistats - Upbit API 호출 통계
 
 🎮 <b>제어</b>
 /pause - 일시 정지
 /resume - 거래 재개
+/profile start [초] | stop - 스택 샘플링 프로파일러
 
 ℹ️ <b>기타</b>
 /version - 버전 정보
@@ -1158,6 +1209,97 @@ class TradingBot:
         
         self.telegram.send_message(message)
     
+    def _telegram_apistats(self):
+        """텔레그램: Upbit API 호출 통계 (엔드포인트별 횟수/오류/지연 백분위, 잔여 요청 수)"""
+        snap = self.api_stats.snapshot()
+        window = snap['window']
+        lines = [
+            "📡 <b>Upbit API 통계</b>",
+            "",
+            f"집계 시작: {snap['since'].replace('T', ' ')}",
+            f"누적 호출: {snap['total_calls']:,}회 (오류 {snap['total_errors']:,}회, 루프 {snap['loops']:,}회)",
+        ]
+        if window.get('calls_per_loop') is not None:
+            lines.append(
+                f"최근 {window['seconds'] / 60:.0f}분: {window['calls']:,}회, "
+                f"루프당 {window['calls_per_loop']:.1f}회, {window['calls_per_sec']:.2f}회/초"
+            )
+
+        remaining = snap.get('remaining_req') or {}
+        if remaining:
+            lines.append("")
+            lines.append("<b>잔여 요청(Remaining-Req)</b>")
+            for group, info in sorted(remaining.items()):
+                lines.append(f"• {group}: 초당 {info.get('sec')} / 분당 {info.get('min')} ({info.get('age_sec', 0):.0f}초 전)")
+
+        def _ms(v):
+            return f"{v:.0f}" if v is not None else "-"
+
+        endpoints = sorted(snap['endpoints'].items(), key=lambda kv: kv[1]['count'], reverse=True)
+        if endpoints:
+            lines.append("")
+            lines.append("<b>엔드포인트 (p50/p95/p99 ms)</b>")
+            for key, ep in endpoints[:12]:
+                err = f", 오류 {ep['errors']}" if ep['errors'] else ""
+                if ep.get('hedged'):
+                    err += f", 헤지 {ep['hedged']}(승 {ep['hedge_wins']})"
+                lines.append(
+                    f"• <code>{key}</code>\n"
+                    f"  {ep['count']:,}회{err} | {_ms(ep['p50_ms'])}/{_ms(ep['p95_ms'])}/{_ms(ep['p99_ms'])}"
+                )
+        else:
+            lines.append("")
+            lines.append("아직 기록된 호출이 없습니다.")
+
+        self.telegram.send_message("\n".join(lines))
+    
+    def profile_command(self, args, html=False):
+        """프로파일러 제어: start [초] | stop | (인자 없음) 상태. 결과 메시지 반환"""
+        action = args[0] if args else 'status'
+        bold = (lambda t: f"<b>{t}</b>") if html else (lambda t: t)
+        # 프로파일 라벨(<genexpr>, <module> 등)은 HTML 모드에서 이스케이프해야 텔레그램이 거부하지 않음
+        text = html_escape if html else str
+
+        if action == 'start':
+            seconds = None
+            if len(args) > 1:
+                try:
+                    seconds = max(1.0, float(args[1]))
+                except ValueError:
+                    return "⚠️ 사용법: profile start [초]"
+            if not self.profiler.start(seconds):
+                return "⚠️ 프로파일러가 이미 실행 중입니다."
+            limit = seconds or self.profiler.max_seconds
+            self.logger.info(f"🔬 프로파일러 시작 (최대 {limit:.0f}초)")
+            return (
+                f"🔬 {bold('프로파일러 시작')}\n"
+                f"대상 스레드: {', '.join(self.profiler.thread_names)}\n"
+                f"샘플 주기: {self.profiler.interval * 1000:.0f}ms, 최대 {limit:.0f}초"
+            )
+
+        if action == 'stop':
+            if not self.profiler.running and self.profiler.last_result is None:
+                return "⚠️ 실행 중인 프로파일러가 없습니다."
+            result = self.profiler.stop() or {}
+            lines = [
+                f"🔬 {bold('프로파일러 종료')}",
+                f"샘플: {result.get('samples', 0):,}회, 스택 {result.get('stacks', 0):,}종",
+                f"파일: {text(result.get('path') or '(샘플 없음)')}",
+            ]
+            top = result.get('top') or []
+            if top:
+                lines.append(bold('상위 함수(self)'))
+                total = max(1, int(result.get('samples', 0) or 0))
+                for thread, label, count in top:
+                    lines.append(f"• [{text(thread)}] {text(label)} - {count:,} ({count / total * 100:.0f}%)")
+            if result.get('path'):
+                self.logger.info(f"🔬 프로파일 저장: {result['path']}")
+            return "\n".join(lines)
+
+        status = self.profiler.status()
+        state = "실행 중" if status['running'] else "정지"
+        return f"🔬 프로파일러: {state} (샘플 {status['samples']:,}회)\n사용법: profile start [초] | profile stop"
+    
     def _telegram_version(self):
         """텔레그램: 버전 정보"""
         self.telegram.send_message(
@@ -1235,7 +1377,7 @@ class TradingBot:
             print(f"\n🎯 보유 포지션 ({len(status['positions'])}개)")
             for pos in status['positions']:
                 coin_name = pos['coin'].replace('KRW-', '')
-                holding_time = (datetime.now() - pos['buy_time']).total_seconds() / 60
+                holding_time = (clock.now() - pos['buy_time']).total_seconds() / 60
                 
                 print(f"  {coin_name}: 매수가 {pos['buy_price']:,.0f}원 | "
                       f"수량 {pos['amount']:.8f} | 보유시간 {holding_time:.0f}분")
@@ -1270,116 +1412,31 @@ class TradingBot:
         print("="*80)
         
         # 오늘 날짜
-        today = datetime.now().date()
+        today = clock.now().date()
         
-        # 파일에서 오늘의 거래 로드
-        file_trades = self.stats.load_daily_trades()
+        # 오늘 롤업(파일 기록 포함)
+        summary = self.stats.get_period_summary(today, today)
         
-        # 메모리의 오늘 거래
-        memory_trades = [t for t in self.stats.trades if t['timestamp'].date() == today]
-        
-        # 중복 제거 (timestamp 기준)
-        all_trades_dict = {t['timestamp'].isoformat(): t for t in file_trades}
-        for t in memory_trades:
-            all_trades_dict[t['timestamp'].isoformat()] = t
-        
-        today_trades = list(all_trades_dict.values())
-        
-        if not today_trades:
+        if not summary['trades']:
             print("\n⚠️  오늘 거래 내역이 없습니다.")
             print("="*80 + "\n")
             return
         
         # 통계 계산
-        total_trades = len(today_trades)
-        wins = len([t for t in today_trades if t['profit_krw'] > 0])
-        losses = len([t for t in today_trades if t['profit_krw'] <= 0])
+        total_trades = summary['trades']
+        wins = summary['gross_wins']
+        losses = total_trades - wins
         win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
         
-        total_profit = sum(t['profit_krw'] for t in today_trades)
+        total_profit = summary['profit_krw']
         avg_profit = total_profit / total_trades if total_trades > 0 else 0
 
         fee_rate = getattr(self.engine, "FEE", 0.0005)
-        buy_fee_sum = 0.0
-        sell_fee_sum = 0.0
-        profit_after_fees_sum = 0.0
-        turnover_krw = 0.0
-
-        def _paf_day(tr):
-            paf = tr.get('profit_after_fees_krw', None)
-            if paf is not None:
-                return float(paf or 0)
-            try:
-                buy_price = float(tr.get('buy_price', 0) or 0)
-                amount = float(tr.get('amount', 0) or 0)
-                buy_fee = float(tr.get('buy_fee_krw', 0) or 0)
-                if buy_fee <= 0:
-                    buy_fee = buy_price * amount * fee_rate
-                return float(tr.get('profit_krw', 0) or 0) - buy_fee
-            except Exception:
-                return float(tr.get('profit_krw', 0) or 0)
-
-        for t in today_trades:
-            try:
-                buy_price = float(t.get('buy_price', 0) or 0)
-                sell_price = float(t.get('sell_price', 0) or 0)
-                amount = float(t.get('amount', 0) or 0)
-                turnover_krw += (buy_price * amount) + (sell_price * amount)
-
-                buy_fee = t.get('buy_fee_krw', None)
-                sell_fee = t.get('sell_fee_krw', None)
-
-                if buy_fee is None:
-                    buy_fee = buy_price * amount * fee_rate
-                if sell_fee is None:
-                    sell_fee = sell_price * amount * fee_rate
-
-                buy_fee = float(buy_fee or 0)
-                sell_fee = float(sell_fee or 0)
-
-                buy_fee_sum += buy_fee
-                sell_fee_sum += sell_fee
-
-                paf = t.get('profit_after_fees_krw', None)
-                if paf is None:
-                    paf = float(t.get('profit_krw', 0) or 0) - buy_fee
-                profit_after_fees_sum += float(paf or 0)
-            except Exception:
-                continue
-
-        total_fee_sum = buy_fee_sum + sell_fee_sum
-        
-        best_trade = max(today_trades, key=lambda x: x['profit_rate'])
-        worst_trade = min(today_trades, key=lambda x: x['profit_rate'])
-        
-        # 코인별 통계
-        coin_profits = {}
-        strategy_stats = {}
-        for trade in today_trades:
-            coin = trade['coin'].replace('KRW-', '')
-            if coin not in coin_profits:
-                coin_profits[coin] = {'trades': 0, 'profit': 0}
-            coin_profits[coin]['trades'] += 1
-            paf = trade.get('profit_after_fees_krw', None)
-            if paf is None:
-                try:
-                    buy_fee = float(trade.get('buy_fee_krw', 0) or 0)
-                    if buy_fee <= 0:
-                        buy_fee = float(trade.get('buy_price', 0) or 0) * float(trade.get('amount', 0) or 0) * fee_rate
-                except Exception:
-                    buy_fee = 0.0
-                paf = float(trade.get('profit_krw', 0) or 0) - buy_fee
-            coin_profits[coin]['profit'] += float(paf or 0)
-
-            buy_meta = trade.get('buy_meta', {}) if isinstance(trade.get('buy_meta'), dict) else {}
-            strategy = str(trade.get('strategy') or buy_meta.get('strategy') or 'UNKNOWN')
-            if strategy not in strategy_stats:
-                strategy_stats[strategy] = {'trades': 0, 'wins': 0, 'profit': 0.0}
-            strategy_stats[strategy]['trades'] += 1
-            paf_strategy = _paf_day(trade)
-            strategy_stats[strategy]['profit'] += float(paf_strategy or 0)
-            if paf_strategy > 0:
-                strategy_stats[strategy]['wins'] += 1
+        turnover_krw = summary['turnover_krw']
+        total_fee_sum = summary['total_fee_krw']
+        
+        best_trade = summary['best_rate']
+        worst_trade = summary['worst_rate']
         
         # 출력
         print(f"\n📊 오늘 ({today.strftime('%Y-%m-%d')})")
@@ -1390,28 +1447,28 @@ class TradingBot:
         print(f"\n💰 수익 현황")
         print(f"  총 손익: {total_profit:+,.0f}원")
         print(f"  평균 손익: {avg_profit:+,.0f}원")
-        print(f"  총 손익(수수료 반영): {profit_after_fees_sum:+,.0f}원")
+        print(f"  총 손익(수수료 반영): {summary['profit_after_fees_krw']:+,.0f}원")
         print(f"\n💸 수수료(기간) (수수료율 {fee_rate*100:.3f}%)")
-        print(f"  합계: {total_fee_sum:,.0f}원 (매수 {buy_fee_sum:,.0f}원 + 매도 {sell_fee_sum:,.0f}원)")
+        print(f"  합계: {total_fee_sum:,.0f}원 (매수 {summary['buy_fee_krw']:,.0f}원 + 매도 {summary['sell_fee_krw']:,.0f}원)")
         if turnover_krw > 0:
             print(f"  거래대금(왕복): {turnover_krw:,.0f}원")
             print(f"  수수료/거래대금: {(total_fee_sum/turnover_krw*100):.3f}%")
         print(f"  누적 수수료(세션): {self.stats.get_total_fees_krw():,.0f}원")
         
         print(f"\n🏆 최고 거래")
-        print(f"  코인: {best_trade['coin'].replace('KRW-', '')}")
+        print(f"  코인: {best_trade['coin']}")
         print(f"  수익률: {best_trade['profit_rate']:+.2f}%")
         print(f"  손익: {best_trade['profit_krw']:+,.0f}원")
         print(f"  사유: {best_trade['reason']}")
         
         print(f"\n📉 최악 거래")
-        print(f"  코인: {worst_trade['coin'].replace('KRW-', '')}")
+        print(f"  코인: {worst_trade['coin']}")
         print(f"  수익률: {worst_trade['profit_rate']:+.2f}%")
         print(f"  손익: {worst_trade['profit_krw']:+,.0f}원")
         print(f"  사유: {worst_trade['reason']}")
         
         print(f"\n📌 코인별 성과")
-        sorted_coins = sorted(coin_profits.items(), 
+        sorted_coins = sorted(summary['by_symbol'].items(), 
                             key=lambda x: x[1]['profit'], 
                             reverse=True)
         
@@ -1419,171 +1476,76 @@ class TradingBot:
             emoji = "📈" if stats['profit'] > 0 else "📉"
             print(f"  {emoji} {coin}: {stats['trades']}회 | {stats['profit']:+,.0f}원")
 
-        if strategy_stats:
-            print(f"\n🧠 전략별 성과")
-            sorted_strategies = sorted(strategy_stats.items(), key=lambda x: x[1]['profit'], reverse=True)
-            for strategy, st in sorted_strategies:
-                trades = st['trades']
-                wins = st['wins']
-                wr = (wins / trades * 100) if trades > 0 else 0
-                print(f"  {strategy}: {st['profit']:+,.0f}원 | {trades}회 | 승률 {wr:.1f}%")
+        self._print_strategy_stats(summary)
         
         print("="*80 + "\n")
 
-    def weekly_stats(self):
-        """주간 통계 표시 (최근 7일, 파일 기록 포함)"""
+    def _print_strategy_stats(self, summary):
+        """콘솔 리포트: 전략별 성과"""
+        by_strategy = summary.get('by_strategy', {}) or {}
+        if not by_strategy:
+            return
+        print(f"\n🧠 전략별 성과")
+        sorted_strategies = sorted(by_strategy.items(), key=lambda x: x[1]['profit'], reverse=True)
+        for strategy, st in sorted_strategies:
+            trades = st['trades']
+            wins = st['wins']
+            wr = (wins / trades * 100) if trades > 0 else 0
+            print(f"  {strategy}: {st['profit']:+,.0f}원 | {trades}회 | 승률 {wr:.1f}%")
+
+    def _print_period_stats(self, days, title):
+        """기간 통계 표시 (최근 N일, 일자별 롤업 합산)"""
 
         print("\n" + "="*80)
-        print("📆 주간 거래 통계 (최근 7일)")
+        print(title)
         print("="*80)
 
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=6)
-
-        # 파일 + 메모리 통합 (중복 제거: timestamp 기준)
-        all_trades_dict = {}
-
-        for i in range(7):
-            d = start_date + timedelta(days=i)
-            file_trades = self.stats.load_daily_trades(datetime.combine(d, datetime.min.time()))
-            for t in file_trades:
-                all_trades_dict[t['timestamp'].isoformat()] = t
-
-        memory_trades = [
-            t for t in self.stats.trades
-            if start_date <= t['timestamp'].date() <= end_date
-        ]
-        for t in memory_trades:
-            all_trades_dict[t['timestamp'].isoformat()] = t
-
-        week_trades = list(all_trades_dict.values())
+        end_date = clock.now().date()
+        start_date = end_date - timedelta(days=days - 1)
+        summary = self.stats.get_period_summary(start_date, end_date)
 
-        if not week_trades:
-            print("\n⚠️  최근 7일 거래 내역이 없습니다.")
+        if not summary['trades']:
+            print(f"\n⚠️  최근 {days}일 거래 내역이 없습니다.")
             print(f"  기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
             print("="*80 + "\n")
             return
 
         fee_rate = getattr(self.engine, "FEE", 0.0005)
+        total_trades = summary['trades']
+        win_rate = (summary['wins'] / total_trades * 100) if total_trades else 0
+        turnover_krw = summary['turnover_krw']
+        total_fee_sum = summary['total_fee_krw']
 
-        # 수수료 반영 손익(가능하면 trade_history의 profit_after_fees_krw 사용, 없으면 추정)
-        def _paf(tr):
-            paf = tr.get('profit_after_fees_krw', None)
-            if paf is not None:
-                return float(paf or 0)
-            try:
-                bp = float(tr.get('buy_price', 0) or 0)
-                amt = float(tr.get('amount', 0) or 0)
-                bf = float(tr.get('buy_fee_krw', 0) or 0)
-                if bf <= 0:
-                    bf = bp * amt * fee_rate
-                return float(tr.get('profit_krw', 0) or 0) - bf
-            except Exception:
-                return float(tr.get('profit_krw', 0) or 0)
-
-        buy_fee_sum = 0.0
-        sell_fee_sum = 0.0
-        total_profit = 0.0
-        total_profit_after_fees = 0.0
-        turnover_krw = 0.0
-
-        for t in week_trades:
-            try:
-                total_profit += float(t.get('profit_krw', 0) or 0)
-
-                buy_price = float(t.get('buy_price', 0) or 0)
-                sell_price = float(t.get('sell_price', 0) or 0)
-                amount = float(t.get('amount', 0) or 0)
-                turnover_krw += (buy_price * amount) + (sell_price * amount)
-
-                buy_fee = t.get('buy_fee_krw', None)
-                sell_fee = t.get('sell_fee_krw', None)
-
-                if buy_fee is None:
-                    buy_fee = buy_price * amount * fee_rate
-                if sell_fee is None:
-                    sell_fee = sell_price * amount * fee_rate
-
-                buy_fee = float(buy_fee or 0)
-                sell_fee = float(sell_fee or 0)
-
-                buy_fee_sum += buy_fee
-                sell_fee_sum += sell_fee
-
-                paf = t.get('profit_after_fees_krw', None)
-                if paf is None:
-                    paf = float(t.get('profit_krw', 0) or 0) - buy_fee
-                total_profit_after_fees += float(paf or 0)
-            except Exception:
-                continue
-
-        wins = [t for t in week_trades if _paf(t) > 0]
-        losses = [t for t in week_trades if _paf(t) <= 0]
-        win_rate = (len(wins) / len(week_trades) * 100) if week_trades else 0
-
-        total_fee_sum = buy_fee_sum + sell_fee_sum
-
-        best = max(week_trades, key=_paf)
-        worst = min(week_trades, key=_paf)
-
-        # 일자별 손익/횟수
-        daily_profit = {}
-        daily_count = {}
-        for i in range(7):
-            d = start_date + timedelta(days=i)
-            daily_profit[d] = 0
-            daily_count[d] = 0
-
-        # 종목/전략별 손익
-        coin_profit = {}
-        strategy_stats = {}
-
-        for t in week_trades:
-            d = t['timestamp'].date()
-            daily_profit[d] = daily_profit.get(d, 0) + _paf(t)
-            daily_count[d] = daily_count.get(d, 0) + 1
-
-            coin = t['coin'].replace('KRW-', '')
-            coin_profit[coin] = coin_profit.get(coin, 0) + _paf(t)
-            buy_meta = t.get('buy_meta', {}) if isinstance(t.get('buy_meta'), dict) else {}
-            strategy = str(t.get('strategy') or buy_meta.get('strategy') or 'UNKNOWN')
-            if strategy not in strategy_stats:
-                strategy_stats[strategy] = {'trades': 0, 'wins': 0, 'profit': 0.0}
-            strategy_stats[strategy]['trades'] += 1
-            paf_strategy = _paf(t)
-            strategy_stats[strategy]['profit'] += float(paf_strategy or 0)
-            if paf_strategy > 0:
-                strategy_stats[strategy]['wins'] += 1
-
+        coin_profit = {coin: st['profit'] for coin, st in summary['by_symbol'].items()}
         top_winners = sorted(coin_profit.items(), key=lambda kv: kv[1], reverse=True)[:3]
         top_losers = sorted(coin_profit.items(), key=lambda kv: kv[1])[:3]
 
-        best_coin = best['coin'].replace('KRW-', '')
-        worst_coin = worst['coin'].replace('KRW-', '')
+        best = summary['best']
+        worst = summary['worst']
 
         print(f"\n📅 기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
-        print(f"📊 거래: {len(week_trades)}회")
-        print(f"✅ 승: {len(wins)}회")
-        print(f"❌ 패: {len(losses)}회")
+        print(f"📊 거래: {total_trades}회")
+        print(f"✅ 승: {summary['wins']}회")
+        print(f"❌ 패: {summary['losses']}회")
         print(f"📈 승률: {win_rate:.1f}%")
 
-        print(f"\n💰 총 손익: {total_profit:+,.0f}원")
-        print(f"💰 총 손익(수수료 반영): {total_profit_after_fees:+,.0f}원")
+        print(f"\n💰 총 손익: {summary['profit_krw']:+,.0f}원")
+        print(f"💰 총 손익(수수료 반영): {summary['profit_after_fees_krw']:+,.0f}원")
         print(f"\n💸 수수료(기간) (수수료율 {fee_rate*100:.3f}%)")
-        print(f"  합계: {total_fee_sum:,.0f}원 (매수 {buy_fee_sum:,.0f}원 + 매도 {sell_fee_sum:,.0f}원)")
+        print(f"  합계: {total_fee_sum:,.0f}원 (매수 {summary['buy_fee_krw']:,.0f}원 + 매도 {summary['sell_fee_krw']:,.0f}원)")
         if turnover_krw > 0:
             print(f"  거래대금(왕복): {turnover_krw:,.0f}원")
             print(f"  수수료/거래대금: {(total_fee_sum/turnover_krw*100):.3f}%")
         print(f"  누적 수수료(세션): {self.stats.get_total_fees_krw():,.0f}원")
 
         print(f"\n📅 일자별 손익")
-        for d in sorted(daily_profit.keys()):
-            pnl = daily_profit[d]
-            cnt = daily_count.get(d, 0)
+        for d, pnl, cnt in summary['daily']:
+            if days > 7 and cnt == 0:
+                continue
             print(f"  {d.strftime('%Y-%m-%d')}: {pnl:+,.0f}원 ({cnt}회)")
 
-        print(f"\n🏆 최고 거래: {best_coin} {_paf(best):+,.0f}원")
-        print(f"📉 최악 거래: {worst_coin} {_paf(worst):+,.0f}원")
+        print(f"\n🏆 최고 거래: {best['coin']} {best['profit_after_fees_krw']:+,.0f}원")
+        print(f"📉 최악 거래: {worst['coin']} {worst['profit_after_fees_krw']:+,.0f}원")
 
         if top_winners:
             print(f"\n📈 종목 상위")
@@ -1595,16 +1557,17 @@ class TradingBot:
             for coin, pnl in top_losers:
                 print(f"  {coin}: {pnl:+,.0f}원")
 
-        if strategy_stats:
-            print(f"\n🧠 전략별 성과")
-            sorted_strategies = sorted(strategy_stats.items(), key=lambda x: x[1]['profit'], reverse=True)
-            for strategy, st in sorted_strategies:
-                trades = st['trades']
-                wins = st['wins']
-                wr = (wins / trades * 100) if trades > 0 else 0
-                print(f"  {strategy}: {st['profit']:+,.0f}원 | {trades}회 | 승률 {wr:.1f}%")
+        self._print_strategy_stats(summary)
 
         print("="*80 + "\n")
+
+    def weekly_stats(self):
+        """주간 통계 표시 (최근 7일, 파일 기록 포함)"""
+        self._print_period_stats(7, "📆 주간 거래 통계 (최근 7일)")
+
+    def monthly_stats(self):
+        """월간 통계 표시 (최근 30일, 파일 기록 포함)"""
+        self._print_period_stats(30, "🗓️ 월간 거래 통계 (최근 30일)")
     
     def exit_program(self):
         """프로그램 종료"""
@@ -1612,12 +1575,12 @@ class TradingBot:
         if self.is_running:
             print("⚠️  먼저 트레이딩을 정지합니다.")
             self.stop()
-            time.sleep(2)
+            clock.sleep(2)
         
         # 최종 통계 저장
         if self.stats.total_trades > 0:
             stats_data = self.stats.export_stats()
-            stats_file = f"final_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            stats_file = f"final_stats_{clock.now().strftime('%Y%m%d_%H%M%S')}.json"
             
             with open(stats_file, 'w', encoding='utf-8') as f:
                 json.dump(stats_data, f, ensure_ascii=False, indent=2)
@@ -1625,6 +1588,13 @@ class TradingBot:
             self.logger.info(f"📁 최종 통계 저장: {stats_file}")
         
         self.logger.info("👋 프로그램 종료")
+        self.telegram.flush()
+        # 시세 기록 버퍼 비우기
+        if self.market_recorder is not None:
+            upbit_api.remove_observer(self.market_recorder.observe)
+            self.market_recorder.close()
+        # 비동기 로그 큐 비우기 (종료 전 남은 기록 보존)
+        self.logger.shutdown()
         print("\n✅ 프로그램이 종료되었습니다.")
         sys.exit(0)
     
@@ -1634,7 +1604,7 @@ class TradingBot:
         if not self.trading_hours_enabled:
             return True
         
-        current_hour = datetime.now().hour
+        current_hour = clock.now().hour
         
         for session in self.trading_sessions:
             start = session['start']
@@ -1721,9 +1691,278 @@ class TradingBot:
 
         return float(total)
 
+    def _install_tracing(self):
+        """REST 호출 span 관찰자 + 단계 함수 span 래핑 (인스턴스 속성으로 감싸 클래스 정의는 그대로 둠)"""
+        upbit_api.add_observer(tracing.api_observer)
+
+        def _signal_true(result):
+            return isinstance(result, tuple) and bool(result[0])
+
+        wrap_targets = (
+            (self.engine, 'check_buy_signal', _signal_true),
+            (self.engine, 'check_orderbook_safety', None),
+            (self.engine, 'execute_buy', bool),
+            (self.engine, 'check_sell_signal', _signal_true),
+            (self.engine, 'execute_sell', bool),
+            (self.engine, 'get_balance', None),
+            (self, '_calculate_dynamic_investment', None),
+            (self.stats, 'add_position', None),
+            (self.stats, 'remove_position', None),
+        )
+        for owner, name, emit_if in wrap_targets:
+            func = getattr(owner, name, None)
+            if func is None or getattr(func, '_traced', False):
+                continue
+            setattr(owner, name, tracing.traced(func, name=name, emit_if=emit_if))
+
+    def _traced_tickers(self, tickers):
+        """종목 평가 1회 = trace 1개 (루프 본문의 continue/break에도 종료 처리)"""
+        for ticker in tickers:
+            self._beat('ticker_eval', ticker)
+            if not self.tracing_enabled:
+                yield ticker
+                continue
+            trace = tracing.start_trace("TICKER_EVAL", ticker)
+            trace.attrs['held'] = ticker in self.stats.positions
+            try:
+                yield ticker
+            finally:
+                self._finish_trace(trace)
+
+    def _finish_trace(self, trace):
+        """신호/주문이 있었거나 느린 평가만 DECISION_TRACE로 기록"""
+        tracing.end_trace(trace)
+        try:
+            total_ms = trace.total_ms()
+            self._record_stage(trace.kind.lower(), total_ms, True)
+            for name, _start_ms, dur_ms, _depth, ok in trace.spans:
+                if not name.startswith('api:'):
+                    self._record_stage(name, dur_ms, ok)
+            if not (trace.emit or self.trace_emit_all or total_ms >= self.trace_slow_ms):
+                return
+            payload = trace.to_payload()
+            if not trace.emit and total_ms >= self.trace_slow_ms:
+                payload['slow'] = True
+            self.logger.log_decision("DECISION_TRACE", payload)
+        except Exception:
+            pass
+
+    def _beat(self, stage, detail=None, budget=None):
+        """워치독 heartbeat (거래 루프 단계 진입)"""
+        if self.watchdog is not None:
+            self.watchdog.beat(stage, detail, budget)
+
+    def _loop_sleep(self, seconds):
+        """거래 루프 대기 (대기 시간만큼은 정지로 보지 않음)"""
+        self._beat('sleep', budget=seconds)
+        clock.sleep(seconds)
+
+    def _on_loop_stall(self, info):
+        """워치독 콜백(감시 스레드): 스택 덤프 로그 + LOOP_STALL 기록 + 알림"""
+        stage = info.get('stage')
+        detail = info.get('detail')
+        age = float(info.get('age_seconds', 0) or 0)
+        stack = info.get('stack') or ''
+        where = f"{stage}" + (f" ({detail})" if detail else "")
+        self.logger.warning(
+            f"🧊 거래 루프 정지 감지: {where} 단계에서 {age:.0f}초 경과 "
+            f"(임계 {info.get('threshold_seconds', 0):.0f}초)\n거래 스레드 스택:\n{stack}"
+        )
+        self.logger.log_decision(
+            "LOOP_STALL",
+            {
+                "stage": stage,
+                "ticker": detail,
+                "age_seconds": age,
+                "threshold_seconds": info.get('threshold_seconds'),
+                "stack": stack.splitlines()[-40:],
+            },
+        )
+        # 스택의 가장 안쪽 프레임(어디서 막혔는지)만 알림에 포함
+        frames = [line.strip() for line in stack.splitlines() if line.strip().startswith('File ')]
+        innermost = frames[-1] if frames else '-'
+        # 프레임 텍스트(<genexpr>, <lambda> 등)는 HTML 모드 알림이 거부되지 않도록 이스케이프
+        self.telegram.notify_error(
+            "거래 루프 정지",
+            html_escape(f"{where} 단계 {age:.0f}초 경과\n{innermost}"),
+        )
+
+    def _on_loop_recover(self, info):
+        """워치독 콜백: 정지 해소 (정지 시간 기록)"""
+        self.logger.info(
+            f"✅ 거래 루프 정지 해소: {info.get('stage')} 단계 {float(info.get('stalled_seconds', 0)):.1f}초 소요"
+        )
+        self.logger.log_decision(
+            "LOOP_STALL_RECOVERED",
+            {
+                "stage": info.get('stage'),
+                "ticker": info.get('detail'),
+                "stalled_seconds": info.get('stalled_seconds'),
+            },
+        )
+
+    def _record_stage(self, name, dur_ms, ok=True):
+        entry = self._stage_metrics.get(name)
+        if entry is None:
+            entry = self._stage_metrics[name] = [0, 0.0, 0]
+        entry[0] += 1
+        entry[1] += float(dur_ms)
+        if not ok:
+            entry[2] += 1
+
+    def _record_loop(self, seconds):
+        m = self._loop_metrics
+        m['count'] += 1
+        m['sum_seconds'] += seconds
+        m['last_seconds'] = seconds
+        m['max_seconds'] = max(m['max_seconds'], seconds)
+
+    def _start_metrics_server(self):
+        if not self.metrics_enabled or self.metrics_server is not None:
+            return
+        watched = ['trading-loop']
+        if self.logger.get_queue_stats().get('async'):
+            watched.append('log-writer')
+        if self.telegram.enabled and self.telegram.enable_commands:
+            watched.append('telegram-listener')
+        if self.telegram.enabled and self.telegram.outbox_enabled:
+            watched.append('telegram-outbox')
+        if self.market_recorder is not None:
+            watched.append('market-recorder')
+        live_collectors = []
+        if self.watchdog is not None:
+            watched.append('loop-watchdog')
+            live_collectors.append(self.watchdog.live_metric_families)
+        try:
+            server = MetricsServer(
+                self.metrics_host, self.metrics_port, watched_threads=watched, live_collectors=live_collectors
+            )
+            server.publish(self._render_metrics())
+            server.start()
+            self.metrics_server = server
+            self._last_metrics_refresh = clock.time()
+            self.logger.info(f"📈 메트릭 엔드포인트: http://{self.metrics_host}:{server.port}/metrics")
+        except Exception as e:
+            self.logger.warning(f"⚠️ 메트릭 서버 시작 실패: {e}")
+
+    def _refresh_metrics(self, force=False):
+        """메트릭 스냅샷 재렌더링 (refresh_seconds 주기, 거래 루프 스레드에서 호출)"""
+        if self.metrics_server is None:
+            return
+        now = clock.time()
+        if not force and (now - self._last_metrics_refresh) < self.metrics_refresh_seconds:
+            return
+        self._last_metrics_refresh = now
+        try:
+            self.metrics_server.publish(self._render_metrics())
+        except Exception as e:
+            self.logger.debug(f"메트릭 렌더링 실패: {e}")
+
+    def _render_metrics(self):
+        """Prometheus 텍스트 렌더링 (네트워크 호출 없이 메모리 상태만 사용)"""
+        loop = self._loop_metrics
+        cash, total = self._last_equity
+        peak = float(self.stats.peak_balance or 0)
+        drawdown_pct = ((total - peak) / peak * 100) if peak > 0 and total > 0 else 0.0
+        invested = sum(p.buy_price * p.amount for p in list(self.stats.positions.values()))
+
+        families = [
+            ("loop_iterations_total", "counter", "Trading loop iterations", [(None, loop['count'])]),
+            ("loop_duration_seconds_total", "counter", "Total trading loop busy time (excluding sleep)",
+             [(None, loop['sum_seconds'])]),
+            ("loop_last_duration_seconds", "gauge", "Last trading loop busy time", [(None, loop['last_seconds'])]),
+            ("loop_max_duration_seconds", "gauge", "Max trading loop busy time", [(None, loop['max_seconds'])]),
+        ]
+
+        stages = sorted(self._stage_metrics.items())
+        families.append(("stage_calls_total", "counter", "Traced stage calls",
+                         [({'stage': k}, v[0]) for k, v in stages]))
+        families.append(("stage_duration_ms_total", "counter", "Traced stage time in milliseconds",
+                         [({'stage': k}, round(v[1], 3)) for k, v in stages]))
+        families.append(("stage_errors_total", "counter", "Traced stage calls that raised",
+                         [({'stage': k}, v[2]) for k, v in stages]))
+
+        cache = dict(getattr(self.engine, 'cache_stats', {}) or {})
+        lookups = sum(cache.values())
+        families.append(("cache_requests_total", "counter", "OHLCV lookups by result (hit/gap/full)",
+                         [({'cache': 'ohlcv', 'result': k.split('_', 1)[-1]}, v) for k, v in sorted(cache.items())]))
+        report_cache = self.reports.stats()
+        families.append(("report_cache_requests_total", "counter", "Telegram report renders served from cache (hit) or rebuilt (miss)",
+                         [({'result': 'hit'}, report_cache['hits']), ({'result': 'miss'}, report_cache['misses'])]))
+        families.append(("cache_hit_ratio", "gauge", "OHLCV lookups served without a full fetch",
+                         [({'cache': 'ohlcv'},
+                           ((cache.get('ohlcv_hit', 0) + cache.get('ohlcv_gap', 0)) / lookups) if lookups else None)]))
+
+        api_hist = self.api_stats.histograms()
+        bounds = [str(b) for b in LATENCY_BUCKETS_MS] + ['+Inf']
+        families.append(("api_requests_total", "counter", "Upbit REST calls",
+                         [({'endpoint': k}, v['count']) for k, v in sorted(api_hist.items())]))
+        families.append(("api_errors_total", "counter", "Upbit REST calls that failed",
+                         [({'endpoint': k}, v['errors']) for k, v in sorted(api_hist.items())]))
+        families.append(("api_hedged_total", "counter", "Quotation calls that fired a hedge request",
+                         [({'endpoint': k}, v['hedged']) for k, v in sorted(api_hist.items())]))
+        latency_samples = []
+        for key, h in sorted(api_hist.items()):
+            for le, n in zip(bounds, h['buckets']):
+                latency_samples.append(({'__name__': 'api_latency_ms_bucket', 'endpoint': key, 'le': le}, n))
+            latency_samples.append(({'__name__': 'api_latency_ms_sum', 'endpoint': key}, round(h['sum_ms'], 3)))
+            latency_samples.append(({'__name__': 'api_latency_ms_count', 'endpoint': key}, h['count']))
+        families.append(("api_latency_ms", "histogram", "Upbit REST call latency in milliseconds", latency_samples))
+        remaining = self.api_stats.remaining()
+        families.append(("api_remaining_requests", "gauge", "Last Remaining-Req value by group and window",
+                         [({'group': g, 'window': w}, info.get(w))
+                          for g, info in sorted(remaining.items()) for w in ('sec', 'min')]))
+
+        families.extend([
+            ("positions_open", "gauge", "Open positions", [(None, len(self.stats.positions))]),
+            ("invested_krw", "gauge", "Cost basis of open positions (KRW)", [(None, invested)]),
+            ("cash_krw", "gauge", "Cash balance at last equity sample (KRW)", [(None, cash)]),
+            ("equity_krw", "gauge", "Total equity at last equity sample (KRW)", [(None, total)]),
+            ("drawdown_pct", "gauge", "Current drawdown from peak equity (%)", [(None, round(drawdown_pct, 4))]),
+            ("max_drawdown_pct", "gauge", "Max drawdown since start (%)", [(None, self.stats.max_drawdown)]),
+        ])
+
+        log_queue = self.logger.get_queue_stats()
+        families.append(("log_queue_pending", "gauge", "Log records waiting for the writer thread",
+                         [(None, log_queue.get('pending', 0))]))
+        families.append(("log_queue_dropped_total", "counter", "Log records dropped on a full queue",
+                         [(None, log_queue.get('dropped', 0))]))
+        notify_stats = getattr(self.telegram, 'get_queue_stats', None)
+        if callable(notify_stats):
+            nq = notify_stats() or {}
+            families.append(("notify_queue_pending", "gauge", "Telegram messages waiting to be sent",
+                             [(None, nq.get('pending', 0))]))
+            families.append(("notify_dropped_total", "counter", "Telegram messages dropped",
+                             [(None, nq.get('dropped', 0))]))
+        if self.market_recorder is not None:
+            rq = self.market_recorder.get_queue_stats()
+            families.append(("recorder_queue_pending", "gauge", "Market data records waiting for the recorder thread",
+                             [(None, rq.get('pending', 0))]))
+            families.append(("recorder_records_total", "counter", "Market data records written",
+                             [(None, rq.get('recorded', 0))]))
+            families.append(("recorder_dropped_total", "counter", "Market data records dropped on a full queue",
+                             [(None, rq.get('dropped', 0))]))
+
+        families.append(("running", "gauge", "Trading loop running", [(None, self.is_running)]))
+        families.append(("trading_paused", "gauge", "Trading paused by command", [(None, self.is_trading_paused)]))
+        return render_metrics(families)
+
+    def _sample_equity(self):
+        """자산 곡선 샘플 기록 (equity_sample_seconds 주기, MDD도 함께 갱신)."""
+        now = clock.now()
+        if self._last_equity_sample_at:
+            if (now - self._last_equity_sample_at).total_seconds() < self.equity_sample_seconds:
+                return
+        self._last_equity_sample_at = now
+
+        cash = float(self.stats.current_balance or 0)
+        total = self._estimate_total_value(cash)
+        self.stats.update_balance(cash, current_total_value=total)
+        self._last_equity = (cash, float(total or 0))
+
     def _emit_analysis_heartbeat(self, daily_profit_krw=None, daily_profit_pct=None):
         """주기적 운영 상태 로그(분석용)."""
-        now = datetime.now()
+        now = clock.now()
         if self._last_analysis_heartbeat_at:
             elapsed = (now - self._last_analysis_heartbeat_at).total_seconds()
             if elapsed < (self.analysis_heartbeat_minutes * 60):
@@ -1762,6 +2001,9 @@ class TradingBot:
                 "daily_profit_pct": float(daily_profit_pct if daily_profit_pct is not None else 0),
                 "total_fees_krw": float(status.get("total_fees_krw", 0) or 0),
             },
+            "equity_24h": self.stats.get_equity_metrics(hours=24),
+            "log_queue": self.logger.get_queue_stats(),
+            "api": self.api_stats.snapshot(reset_window=True),
             "state": {
                 "running": bool(self.is_running),
                 "trading_paused": bool(self.is_trading_paused),
@@ -1774,16 +2016,22 @@ class TradingBot:
         """거래 루프 (별도 스레드에서 실행)"""
         
         self.logger.info("🔄 거래 루프 시작")
+        if self.watchdog is not None:
+            self.watchdog.attach()
+            self.watchdog.start()
         
         while self.is_running:
+            self.api_stats.mark_loop()
+            self._beat('loop_start')
+            loop_started = time.perf_counter()
             try:
                 # 쿨다운 체크
                 if self.cooldown_until:
-                    if datetime.now() < self.cooldown_until:
-                        remaining = (self.cooldown_until - datetime.now()).seconds // 60
+                    if clock.now() < self.cooldown_until:
+                        remaining = (self.cooldown_until - clock.now()).seconds // 60
                         if remaining % 5 == 0:  # 5분마다 로그
                             self.logger.info(f"❄️  쿨다운 중... 남은 시간: {remaining}분")
-                        time.sleep(60)
+                        self._loop_sleep(60)
                         continue
                     else:
                         self.logger.info("✅ 쿨다운 종료, 거래 재개")
@@ -1796,7 +2044,7 @@ class TradingBot:
                 if daily_profit_pct <= self.daily_loss_limit:
                     self.logger.warning(f"⛔ 일일 손실 제한 도달: {daily_profit_pct:.2f}%")
                     self.logger.warning(f"   {self.cooldown_minutes}분간 거래 중지")
-                    self.cooldown_until = datetime.now() + timedelta(minutes=self.cooldown_minutes)
+                    self.cooldown_until = clock.now() + timedelta(minutes=self.cooldown_minutes)
                     
                     # 텔레그램 알림
                     self.telegram.notify_cooldown(
@@ -1816,7 +2064,7 @@ class TradingBot:
                         self.is_trading_paused = True
                         
                         # 다음 거래 시간 안내
-                        current_hour = datetime.now().hour
+                        current_hour = clock.now().hour
                         next_session = None
                         for session in self.trading_sessions:
                             if session['start'] > current_hour:
@@ -1833,10 +2081,11 @@ class TradingBot:
                     
                     # 일시 정지 중이면 대기
                     if self.is_trading_paused:
-                        time.sleep(60)  # 1분마다 체크
+                        self._loop_sleep(60)  # 1분마다 체크
                         continue
 
                 # 글로벌 레짐 주기 갱신
+                self._beat('regime')
                 try:
                     _, regime_payload = self.engine.update_global_regime(force=False)
 
@@ -1859,6 +2108,17 @@ class TradingBot:
                 except Exception as e:
                     self.logger.warning(f"⚠️ 레짐 갱신 오류: {e}")
 
+                # 자산 곡선 샘플(총자산 평가)
+                self._beat('equity_sample')
+                try:
+                    self._sample_equity()
+                except Exception as e:
+                    self.logger.warning(f"⚠️ 자산 곡선 샘플 기록 오류: {e}")
+
+                # 캔들 캐시 주기 저장
+                self._beat('housekeeping')
+                self.engine.save_candle_cache()
+
                 # 주기적 분석 로그(운영 상태 스냅샷)
                 try:
                     self._emit_analysis_heartbeat(
@@ -1875,7 +2135,7 @@ class TradingBot:
 
                     # 대상 종목도 없고 보유 포지션도 없으면 대기만 하고 루프 종료
                     if not self.stats.positions:
-                        time.sleep(self.check_interval)
+                        self._loop_sleep(self.check_interval)
                         continue
                 
                 # 각 코인별로 매매 체크
@@ -1885,7 +2145,7 @@ class TradingBot:
                     if held not in tickers_to_check:
                         tickers_to_check.append(held)
 
-                for ticker in tickers_to_check:
+                for ticker in self._traced_tickers(tickers_to_check):
                     
                     # 포지션 없을 때 - 매수 검토
                     if ticker not in self.stats.positions:
@@ -2202,8 +2462,7 @@ class TradingBot:
                                 profit_rate = ((sell_result['price'] - position['buy_price']) / position['buy_price']) * 100
                                 if not isinstance(sell_meta, dict):
                                     sell_meta = {}
-                                buy_meta = position.get("buy_meta", {}) if isinstance(position.get("buy_meta"), dict) else {}
-                                stop_price = float(buy_meta.get("stop_price", 0) or 0)
+                                stop_price = float(position.stop_price or 0)
                                 risk_unit = (position['buy_price'] - stop_price) if stop_price > 0 else 0.0
                                 if risk_unit > 0:
                                     realized_r = (sell_result['price'] - position['buy_price']) / risk_unit
@@ -2277,7 +2536,7 @@ class TradingBot:
                                         )
                                     
                                     # 전량 매도 시에만 텔레그램 알림
-                                    holding_time = (datetime.now() - position['timestamp']).total_seconds()
+                                    holding_time = (clock.now() - position['timestamp']).total_seconds()
                                     success = self.telegram.notify_sell(
                                         ticker,
                                         position['buy_price'],
@@ -2321,7 +2580,7 @@ class TradingBot:
                                     self.stats.save_positions()
 
                                     # 분할 매도도 텔레그램 알림 전송
-                                    holding_time = (datetime.now() - position['timestamp']).total_seconds()
+                                    holding_time = (clock.now() - position['timestamp']).total_seconds()
                                     partial_reason = (
                                         f"{reason} | 부분청산 {sell_ratio*100:.0f}% "
                                         f"(잔여 {position['amount']:.8f})"
@@ -2354,7 +2613,7 @@ class TradingBot:
                                         if final_sell:
                                             self.stats.add_fee(final_sell.get('fee', 0))
                                             final_profit = final_sell['total_krw'] - (position['buy_price'] * position['amount'])
-                                            holding_time = (datetime.now() - position['timestamp']).total_seconds()
+                                            holding_time = (clock.now() - position['timestamp']).total_seconds()
                                             self.stats.remove_position(
                                                 ticker,
                                                 final_sell['price'],
@@ -2384,12 +2643,18 @@ class TradingBot:
                                             )
                 
                 # 대기
-                time.sleep(self.check_interval)
+                self._record_loop(time.perf_counter() - loop_started)
+                self._refresh_metrics()
+                self._loop_sleep(self.check_interval)
                 
             except Exception as e:
                 self.logger.log_error("거래 루프 오류", e)
-                time.sleep(self.check_interval)
+                self._record_loop(time.perf_counter() - loop_started)
+                self._refresh_metrics()
+                self._loop_sleep(self.check_interval)
         
+        if self.watchdog is not None:
+            self.watchdog.stop()
         self.logger.info("🔄 거래 루프 종료")
 
 
@@ -2405,6 +2670,8 @@ def print_help():
     print("  status  - 현재 거래 상태 및 통계 표시")
     print("  daily   - 오늘의 거래 통계 표시")
     print("  weekly  - 최근 7일 거래 통계 표시")
+    print("  monthly - 최근 30일 거래 통계 표시")
+    print("  profile start [초] | stop - 스택 샘플링 프로파일러 (logs/profiles/*.folded)")
     print("  version - 버전 정보 표시")
     print("  help    - 도움말 표시")
     print("  exit    - 프로그램 종료")
@@ -2416,6 +2683,23 @@ def print_help():
 def main():
     """메인 함수"""
     
+    # 서브커맨드: python main.py decisions [--since ... --event ... --ticker ...]
+    if len(sys.argv) > 1 and sys.argv[1] == 'decisions':
+        import decision_query
+        sys.exit(decision_query.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'backtest':
+        import backtest
+        sys.exit(backtest.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'sweep':
+        import sweep
+        sys.exit(sweep.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'walkforward':
+        import walk_forward
+        sys.exit(walk_forward.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'replay':
+        import replay
+        sys.exit(replay.main(sys.argv[2:]))
+    
     print("="*80)
     print(f"🤖 {BOT_DISPLAY_NAME} v{BOT_VERSION}")
     print("="*80)
@@ -2472,6 +2756,12 @@ def main():
 
             elif command == 'weekly':
                 bot.weekly_stats()
+
+            elif command == 'monthly':
+                bot.monthly_stats()
+            
+            elif command.startswith('profile'):
+                print(bot.profile_command(command.split()[1:]))
             
             elif command == 'version':
                 print(f"ℹ️ {BOT_NAME} v{BOT_VERSION}")
@@ -0,0 +1,312 @@
+"""
+시세 기록 모듈 - 봇이 받은 시세 응답(캔들/현재가/호가 등)을 일자별 append-only 파일로 기록
+
+upbit_api 관찰자로 등록되어 인증 없는 시세 조회 GET 응답 본문을 그대로 남깁니다.
+관찰자는 대기열 적재만 하고(O(1)), JSON 해석/압축/파일 쓰기는 기록 스레드(`market-recorder`)가 맡습니다.
+WebSocket 등 REST 외 수신 데이터는 `record(kind, payload)`로 같은 파일에 남길 수 있습니다.
+
+파일 형식 (`<dir>/YYYYMMDD.jsonl.gz`, 날짜는 수신 시각 기준):
+- 한 줄 = {"t": 수신 epoch초, "k": 종류, "ep": 엔드포인트, "q": 요청 파라미터, "d": 응답 JSON}
+- flush마다 독립 gzip 블록(멤버)을 덧붙여 씀 -> 파일 전체를 일반 gzip(zcat 등)으로도 읽을 수 있음
+- 사이드카 인덱스(`.idx`, JSONL)에 블록별 offset/length, 시각 범위, 종류/마켓 목록 기록
+  (인덱스에 없는 꼬리 블록은 읽을 때 그대로 포함)
+
+읽기: `iter_records(dir, start, end, kinds)` / 리플레이: `replay.load_recording`
+"""
+
+from datetime import datetime
+import glob
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+
+
+RECORD_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".idx"
+
+# 엔드포인트 접두사 -> 기록 종류
+ENDPOINT_KINDS = (
+    ("/v1/candles", "candles"),
+    ("/v1/ticker", "ticker"),
+    ("/v1/orderbook", "orderbook"),
+    ("/v1/trades/ticks", "trades"),
+    ("/v1/market/all", "markets"),
+)
+
+_FLUSH = object()
+_STOP = object()
+
+
+def endpoint_kind(endpoint):
+    """기록 대상 시세 엔드포인트면 종류 이름, 아니면 None."""
+    endpoint = str(endpoint or "")
+    for prefix, kind in ENDPOINT_KINDS:
+        if endpoint.startswith(prefix):
+            return kind
+    return None
+
+
+def _record_markets(params, data):
+    """요청 파라미터(market/markets) 또는 응답의 market 필드에서 마켓 목록."""
+    markets = set()
+    if isinstance(params, dict):
+        for key in ("market", "markets"):
+            value = params.get(key)
+            values = value if isinstance(value, (list, tuple)) else str(value or "").split(",")
+            markets.update(str(m).strip() for m in values if str(m).strip())
+    if not markets:
+        rows = data if isinstance(data, list) else [data]
+        markets.update(str(r["market"]) for r in rows if isinstance(r, dict) and r.get("market"))
+    return markets
+
+
+def _to_epoch(value):
+    """epoch초/datetime/pandas.Timestamp/문자열 -> epoch초 (None은 그대로)."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if hasattr(value, "to_pydatetime"):
+        value = value.to_pydatetime()
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return value.timestamp()
+
+
+class MarketRecorder:
+    """시세 응답 기록기 (버퍼링 + 백그라운드 기록 스레드)."""
+
+    def __init__(self, directory="market_data", flush_seconds=5.0, block_records=2000, queue_size=20000):
+        self.directory = str(directory)
+        self.flush_seconds = max(0.1, float(flush_seconds))
+        self.block_records = max(1, int(block_records))
+        self._queue = queue.Queue(maxsize=max(100, int(queue_size)))
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._closed = False
+        self.stats = {"recorded": 0, "dropped": 0, "blocks": 0, "bytes": 0, "errors": 0}
+
+    # ---- 적재 (호출 스레드) ----
+    def observe(self, call):
+        """upbit_api 관찰자 콜백: 성공한 시세 조회 GET만 적재."""
+        if call.get("method") != "GET" or call.get("error") is not None or call.get("status") != 200:
+            return
+        kind = endpoint_kind(call.get("endpoint"))
+        if kind is None:
+            return
+        self.record(
+            kind,
+            call.get("response"),
+            ts=call.get("started_at"),
+            endpoint=call.get("endpoint"),
+            params=call.get("params"),
+        )
+
+    def record(self, kind, payload, ts=None, endpoint=None, params=None):
+        """1건 적재 (가득 차면 버리고 False).
+
+        payload는 JSON 직렬화 가능한 값 또는 requests.Response (본문 해석은 기록 스레드에서).
+        """
+        if self._closed:
+            return False
+        self._ensure_thread()
+        item = (float(ts) if ts is not None else time.time(), str(kind), endpoint, params, payload)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+        return True
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="market-recorder", daemon=True)
+                self._thread.start()
+
+    def get_queue_stats(self):
+        stats = dict(self.stats)
+        stats["pending"] = int(self._queue.qsize())
+        return stats
+
+    def flush(self, timeout=10.0):
+        """대기열과 버퍼를 파일에 모두 기록할 때까지 대기."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((_FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=10.0):
+        """남은 기록을 쓰고 기록 스레드 종료 (이후 record는 무시)."""
+        self._closed = True
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    # ---- 기록 스레드 ----
+    def _run(self):
+        pending = {}  # 파일 경로 -> (줄 목록, 블록 정보)
+        next_flush = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.05, next_flush - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            stop = item is _STOP
+            marker = item[1] if isinstance(item, tuple) and item[0] is _FLUSH else None
+            if item is not None and not stop and marker is None:
+                self._append(pending, item)
+
+            full = [path for path, (lines, _info) in pending.items() if len(lines) >= self.block_records]
+            if stop or marker is not None or time.monotonic() >= next_flush:
+                full = list(pending)
+                next_flush = time.monotonic() + self.flush_seconds
+            for path in full:
+                lines, info = pending.pop(path)
+                self._write_block(path, lines, info)
+
+            if item is not None:
+                self._queue.task_done()
+            if marker is not None:
+                marker.set()
+            if stop:
+                return
+
+    def _append(self, pending, item):
+        ts, kind, endpoint, params, payload = item
+        try:
+            data = payload.json() if hasattr(payload, "json") else payload
+            line = json.dumps(
+                {"t": round(ts, 3), "k": kind, "ep": endpoint, "q": params, "d": data},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        except Exception:
+            self.stats["errors"] += 1
+            return
+        path = os.path.join(self.directory, datetime.fromtimestamp(ts).strftime("%Y%m%d") + RECORD_SUFFIX)
+        entry = pending.get(path)
+        if entry is None:
+            entry = pending[path] = ([], {"t_min": ts, "t_max": ts, "kinds": set(), "markets": set()})
+        lines, info = entry
+        lines.append(line + "\n")
+        info["t_min"] = min(info["t_min"], ts)
+        info["t_max"] = max(info["t_max"], ts)
+        info["kinds"].add(kind)
+        info["markets"].update(_record_markets(params, data))
+
+    def _write_block(self, path, lines, info):
+        if not lines:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            data = gzip.compress("".join(lines).encode("utf-8"))
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(data)
+            block = {
+                "offset": offset,
+                "length": len(data),
+                "records": len(lines),
+                "t_min": round(info["t_min"], 3),
+                "t_max": round(info["t_max"], 3),
+                "kinds": sorted(info["kinds"]),
+                "markets": sorted(info["markets"]),
+            }
+            with open(f"{path}{INDEX_SUFFIX}", "a", encoding="utf-8") as f:
+                f.write(json.dumps(block, ensure_ascii=False) + "\n")
+            self.stats["recorded"] += len(lines)
+            self.stats["blocks"] += 1
+            self.stats["bytes"] += len(data)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"시세 기록 실패: {e}")
+
+
+# ----------------------------------------------------------------------
+# 읽기
+# ----------------------------------------------------------------------
+
+def record_files(directory):
+    """기록 파일 목록 (날짜순)."""
+    return sorted(glob.glob(os.path.join(str(directory), f"*{RECORD_SUFFIX}")))
+
+
+def load_blocks(path):
+    """파일의 블록 목록. 인덱스 뒤에 남은 꼬리(인덱스 기록 전 종료)는 시각 정보 없는 블록으로 추가."""
+    blocks = []
+    index_path = f"{path}{INDEX_SUFFIX}"
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    blocks.append(json.loads(line))
+                except ValueError:
+                    continue
+    covered = max((int(b["offset"]) + int(b["length"]) for b in blocks), default=0)
+    size = os.path.getsize(path)
+    if size > covered:
+        blocks.append({"offset": covered, "length": size - covered})
+    return blocks
+
+
+def _read_lines(path, block):
+    with open(path, "rb") as f:
+        f.seek(int(block["offset"]))
+        data = f.read(int(block["length"]))
+    try:
+        return gzip.decompress(data).decode("utf-8").splitlines()
+    except Exception:
+        # 쓰다 끊긴 블록은 건너뜀
+        return []
+
+
+def iter_records(directory, start=None, end=None, kinds=None):
+    """기록을 파일/블록 순서(대략 수신 시각순)로 yield.
+
+    Args:
+        start/end: 수신 시각 범위 [start, end) - epoch초/datetime/문자열
+        kinds: 종류 필터 (예: ("candles", "orderbook"))
+    """
+    t0, t1 = _to_epoch(start), _to_epoch(end)
+    kinds = set(kinds) if kinds else None
+    day0 = datetime.fromtimestamp(t0 - 86400).strftime("%Y%m%d") if t0 is not None else None
+    day1 = datetime.fromtimestamp(t1 + 86400).strftime("%Y%m%d") if t1 is not None else None
+
+    for path in record_files(directory):
+        day = os.path.basename(path)[: -len(RECORD_SUFFIX)]
+        if (day0 is not None and day < day0) or (day1 is not None and day > day1):
+            continue
+        for block in load_blocks(path):
+            if t0 is not None and "t_max" in block and block["t_max"] < t0:
+                continue
+            if t1 is not None and "t_min" in block and block["t_min"] >= t1:
+                continue
+            if kinds is not None and "kinds" in block and not kinds.intersection(block["kinds"]):
+                continue
+            for line in _read_lines(path, block):
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                t = rec.get("t", 0)
+                if (t0 is not None and t < t0) or (t1 is not None and t >= t1):
+                    continue
+                if kinds is not None and rec.get("k") not in kinds:
+                    continue
+                yield rec
@@ -0,0 +1,145 @@
+"""
+메트릭 HTTP 엔드포인트 모듈 - Prometheus 텍스트 포맷(/metrics)
+
+거래 루프가 주기적으로 렌더링한 스냅샷(문자열)을 게시하고, 수집 요청은 별도 스레드에서
+그 스냅샷만 돌려줍니다. 수집 요청이 stats.lock을 잡거나 네트워크 호출을 하는 일은 없습니다.
+"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import math
+import threading
+import time
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def render_metrics(families, prefix="upbit_bot_"):
+    """메트릭 목록 -> Prometheus 텍스트.
+
+    Args:
+        families: [(name, type, help, [(labels: dict|None, value), ...]), ...]
+            histogram은 name_bucket/name_sum/name_count 샘플을 직접 넣습니다
+            (샘플 이름은 labels의 "__name__" 키로 지정).
+    """
+    lines = []
+    for name, metric_type, help_text, samples in families:
+        full_name = f"{prefix}{name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        for labels, value in samples:
+            labels = dict(labels or {})
+            sample_name = f"{prefix}{labels.pop('__name__')}" if "__name__" in labels else full_name
+            if labels:
+                label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{sample_name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """미리 렌더링된 스냅샷을 서빙하는 경량 HTTP 서버 (전용 스레드)."""
+
+    def __init__(self, host="127.0.0.1", port=9108, watched_threads=(), live_collectors=(), prefix="upbit_bot_"):
+        self.host = host
+        self.port = int(port)
+        self.prefix = prefix
+        # 수집 시점에 생존 여부를 표시할 스레드 이름
+        self.watched_threads = tuple(watched_threads)
+        # 수집 시점에 호출하는 추가 메트릭 (락/네트워크 없이 속성만 읽는 함수여야 함)
+        self.live_collectors = list(live_collectors)
+        self._snapshot = b""
+        self._published_at = None
+        self._httpd = None
+        self._thread = None
+        self.scrapes = 0
+
+    def publish(self, text):
+        """렌더링된 메트릭 텍스트 교체 (참조 1개 교체라 락 불필요)."""
+        self._snapshot = text.encode("utf-8")
+        self._published_at = time.time()
+
+    def _live_metrics(self):
+        """수집 시점에 계산하는 값: 스냅샷 나이, 스레드 생존 여부, live_collectors."""
+        alive = {t.name for t in threading.enumerate() if t.is_alive()}
+        age = (time.time() - self._published_at) if self._published_at else None
+        families = [
+            ("snapshot_age_seconds", "gauge", "Seconds since the metrics snapshot was rendered", [(None, age)]),
+            ("metrics_scrapes_total", "counter", "Metrics endpoint scrapes", [(None, self.scrapes)]),
+        ]
+        if self.watched_threads:
+            families.append(
+                (
+                    "thread_alive",
+                    "gauge",
+                    "Whether a named bot thread is alive",
+                    [({"thread": name}, name in alive) for name in self.watched_threads],
+                )
+            )
+        for collector in self.live_collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                pass
+        return render_metrics(families, self.prefix).encode("utf-8")
+
+    def body(self):
+        self.scrapes += 1
+        return self._snapshot + self._live_metrics()
+
+    def start(self):
+        if self._thread is not None:
+            return True
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                payload = server.body()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                return  # 수집 요청은 로그에 남기지 않음
+
+        self._httpd = HTTPServer((self.host, self.port), Handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if self._httpd is None:
+            return
+        try:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+        finally:
+            self._httpd = None
+            self._thread = None
@@ -0,0 +1,440 @@
+"""
+모의 거래소 모듈 - pyupbit.Upbit 호환 주문/잔고 API를 호가창 대조 체결로 흉내냄 (실제 주문 없음)
+
+- 호가 소스: 실시간(pyupbit.get_orderbook), 리플레이에서는 재생 호가(합성 또는 시세 기록의 스냅샷)
+- 지연: 주문은 latency_ms 뒤에 거래소에 도착한 것으로 보고 그 이후 호가로만 체결
+- 부분 체결: 상대 호가를 가격 순서대로 소진, 각 호가 잔량 x liquidity_ratio까지만 체결
+  (같은 호가 스냅샷으로는 주문당 1회만 대조 -> 새 스냅샷이 올 때마다 남은 수량 체결)
+- 시장가 주문은 도착 시점 호가로 체결하고 남은 수량은 취소 (업비트와 동일)
+- 수수료: 체결 금액 x fee_rate (매수는 KRW에서 추가 차감, 매도는 수령액에서 차감)
+
+응답 형식은 업비트 REST 응답(dict, 숫자는 문자열)을 따르고, 엔진이 읽는 avg_buy_price/avg_sell_price를 포함합니다.
+`trading.run_mode: "paper"`로 실거래 대신 사용하며(API 키 불필요), 잔고는 state_file에 저장해 재시작 후 이어갑니다.
+"""
+
+import bisect
+import json
+import os
+
+import pyupbit
+
+import clock
+import market_recorder
+
+
+_EPS = 1e-12
+
+
+def _normalize_book(book):
+    """pyupbit.get_orderbook 응답(dict 또는 list) -> 단일 호가 dict (없으면 None)."""
+    if isinstance(book, list):
+        book = book[0] if book else None
+    if not isinstance(book, dict) or not book.get("orderbook_units"):
+        return None
+    return book
+
+
+class RecordedOrderbooks:
+    """시세 기록의 호가 스냅샷을 현재 시각(clock) 기준으로 돌려주는 호가 소스 (미래 스냅샷은 보이지 않음)."""
+
+    def __init__(self, directory, start=None, end=None):
+        self._times = {}  # market -> [t...]
+        self._books = {}  # market -> [book...]
+        for rec in market_recorder.iter_records(directory, start=start, end=end, kinds=("orderbook",)):
+            data = rec.get("d")
+            for book in data if isinstance(data, list) else [data]:
+                if not isinstance(book, dict) or not book.get("market") or not book.get("orderbook_units"):
+                    continue
+                market = str(book["market"])
+                t = float(rec.get("t", 0))
+                times = self._times.setdefault(market, [])
+                books = self._books.setdefault(market, [])
+                pos = bisect.bisect_right(times, t)
+                times.insert(pos, t)
+                books.insert(pos, book)
+
+    def markets(self):
+        return sorted(self._times)
+
+    def get_orderbook(self, ticker="KRW-BTC", limit_info=False):
+        if isinstance(ticker, (list, tuple)):
+            return [self.get_orderbook(t) for t in ticker]
+        times = self._times.get(ticker)
+        if not times:
+            return None
+        pos = bisect.bisect_right(times, clock.time())
+        return self._books[ticker][pos - 1] if pos > 0 else None
+
+    __call__ = get_orderbook
+
+
+class PaperExchange:
+    """pyupbit.Upbit 대체 모의 계좌."""
+
+    def __init__(
+        self,
+        orderbook_fn=None,
+        initial_krw=1000000.0,
+        fee_rate=0.0005,
+        latency_ms=0.0,
+        liquidity_ratio=1.0,
+        state_file=None,
+    ):
+        # 기본은 실시간 호가 (호출 시점에 조회해 pyupbit 교체/훅도 그대로 반영)
+        self.orderbook_fn = orderbook_fn or (lambda ticker: pyupbit.get_orderbook(ticker))
+        self.fee_rate = float(fee_rate)
+        self.latency_seconds = max(0.0, float(latency_ms) / 1000.0)
+        self.liquidity_ratio = min(1.0, max(0.0, float(liquidity_ratio)))
+        self.state_file = state_file
+        self.balances = {"KRW": {"balance": float(initial_krw), "locked": 0.0, "avg_buy_price": 0.0}}
+        self.orders = {}
+        self._seq = 0
+        if state_file:
+            self.load_state()
+
+    # ---- 상태 저장 ----
+    def load_state(self):
+        """저장된 잔고 복원 (미체결 주문은 복원하지 않고 잠금을 풀어 잔고로 되돌림)."""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return False
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            balances = {}
+            for currency, acc in (state.get("balances") or {}).items():
+                balances[currency] = {
+                    "balance": float(acc.get("balance", 0)) + float(acc.get("locked", 0)),
+                    "locked": 0.0,
+                    "avg_buy_price": float(acc.get("avg_buy_price", 0)),
+                }
+            if "KRW" in balances:
+                self.balances = balances
+                self._seq = int(state.get("seq", 0) or 0)
+                return True
+        except Exception as e:
+            print(f"모의 계좌 로드 실패: {e}")
+        return False
+
+    def save_state(self):
+        if not self.state_file:
+            return
+        try:
+            dirname = os.path.dirname(self.state_file)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            tmp_path = f"{self.state_file}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"balances": self.balances, "seq": self._seq, "saved_at": clock.now().isoformat()}, f, indent=2)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            print(f"모의 계좌 저장 실패: {e}")
+
+    # ---- 내부 ----
+    def _account(self, currency):
+        return self.balances.setdefault(currency, {"balance": 0.0, "locked": 0.0, "avg_buy_price": 0.0})
+
+    @staticmethod
+    def _currency(ticker):
+        ticker = str(ticker or "KRW")
+        return ticker.split("-")[1] if "-" in ticker else ticker
+
+    def _book(self, ticker):
+        try:
+            return _normalize_book(self.orderbook_fn(ticker))
+        except Exception:
+            return None
+
+    def best_prices(self, ticker):
+        """(최우선 매수호가, 최우선 매도호가) - 호가 없으면 (None, None)."""
+        book = self._book(ticker)
+        if book is None:
+            return None, None
+        top = book["orderbook_units"][0]
+        return float(top["bid_price"]), float(top["ask_price"])
+
+    def _new_order(self, ticker, side, ord_type, price, volume):
+        self._seq += 1
+        now = clock.time()
+        order = {
+            "uuid": f"paper-{self._seq:08d}",
+            "side": side,
+            "ord_type": ord_type,
+            "price": price,
+            "state": "wait",
+            "market": ticker,
+            "created_at": clock.now().isoformat(),
+            "active_at": now + self.latency_seconds,
+            "volume": volume,
+            "remaining_volume": volume,
+            "remaining_funds": price if ord_type == "price" else None,
+            "executed_volume": 0.0,
+            "paid_fee": 0.0,
+            "locked": 0.0,
+            "book_stamp": None,
+            "trades": [],
+        }
+        self.orders[order["uuid"]] = order
+        return order
+
+    def _fill(self, order, price, volume):
+        funds = price * volume
+        fee = funds * self.fee_rate
+        coin = self._account(self._currency(order["market"]))
+        krw = self._account("KRW")
+        if order["side"] == "bid":
+            held = coin["balance"] + coin["locked"]
+            coin["avg_buy_price"] = (coin["avg_buy_price"] * held + funds) / (held + volume) if held + volume > 0 else 0.0
+            coin["balance"] += volume
+            release = min(order["locked"], funds + fee)
+            krw["locked"] -= release
+            order["locked"] -= release
+            if order["ord_type"] == "price":
+                order["remaining_funds"] = max(0.0, order["remaining_funds"] - funds)
+        else:
+            coin["locked"] -= volume
+            order["locked"] -= volume
+            krw["balance"] += funds - fee
+            if coin["balance"] + coin["locked"] <= _EPS:
+                coin["avg_buy_price"] = 0.0
+        order["executed_volume"] += volume
+        if order["remaining_volume"] is not None:
+            order["remaining_volume"] = max(0.0, order["remaining_volume"] - volume)
+        order["paid_fee"] += fee
+        order["trades"].append({"price": price, "volume": volume, "funds": funds, "created_at": clock.now().isoformat()})
+
+    def _release(self, order):
+        """체결 완료/취소 시 남은 잠금 해제."""
+        if order["locked"] <= 0:
+            return
+        if order["side"] == "bid":
+            krw = self._account("KRW")
+            krw["locked"] -= order["locked"]
+            krw["balance"] += order["locked"]
+        else:
+            coin = self._account(self._currency(order["market"]))
+            coin["locked"] -= order["locked"]
+            coin["balance"] += order["locked"]
+        order["locked"] = 0.0
+
+    def _remaining(self, order):
+        if order["ord_type"] == "price":
+            return order["remaining_funds"]
+        return order["remaining_volume"]
+
+    def _match_order(self, order):
+        """도착한 주문 1건을 현재 호가와 대조. 체결이 있으면 True."""
+        if order["state"] != "wait" or clock.time() < order["active_at"]:
+            return False
+        book = self._book(order["market"])
+        if book is None:
+            return False
+        stamp = book.get("timestamp")
+        if stamp is not None and stamp == order["book_stamp"]:
+            return False
+        order["book_stamp"] = stamp
+
+        side = "ask" if order["side"] == "bid" else "bid"
+        limit = order["price"] if order["ord_type"] == "limit" else None
+        filled = False
+        for unit in book["orderbook_units"]:
+            price = float(unit.get(f"{side}_price", 0) or 0)
+            size = float(unit.get(f"{side}_size", 0) or 0) * self.liquidity_ratio
+            if price <= 0 or size <= 0:
+                continue
+            if limit is not None and (price > limit if order["side"] == "bid" else price < limit):
+                break
+            remaining = self._remaining(order)
+            volume = min(size, remaining / price if order["ord_type"] == "price" else remaining)
+            if volume <= _EPS:
+                break
+            self._fill(order, price, volume)
+            filled = True
+            if self._remaining(order) <= 1e-9:
+                break
+
+        if self._remaining(order) <= 1e-9:
+            order["state"] = "done"
+            self._release(order)
+        elif order["ord_type"] != "limit":
+            # 시장가 잔량은 취소 (호가 부족)
+            order["state"] = "cancel"
+            self._release(order)
+        if filled or order["state"] != "wait":
+            self.save_state()
+        return filled
+
+    def match(self):
+        """미체결 주문 전체를 현재 호가와 대조."""
+        for order in list(self.orders.values()):
+            if order["state"] == "wait":
+                self._match_order(order)
+
+    @staticmethod
+    def _response(order):
+        executed = order["executed_volume"]
+        funds = sum(t["funds"] for t in order["trades"])
+        avg = funds / executed if executed > 0 else 0.0
+
+        def num(value):
+            return None if value is None else f"{value:.8f}"
+
+        out = {
+            "uuid": order["uuid"],
+            "side": order["side"],
+            "ord_type": order["ord_type"],
+            "price": num(order["price"]),
+            "state": order["state"],
+            "market": order["market"],
+            "created_at": order["created_at"],
+            "volume": num(order["volume"]),
+            "remaining_volume": num(order["remaining_volume"]),
+            "reserved_fee": num(order["locked"] if order["side"] == "bid" else 0.0),
+            "locked": num(order["locked"]),
+            "executed_volume": num(executed),
+            "executed_funds": num(funds),
+            "paid_fee": num(order["paid_fee"]),
+            "trades_count": len(order["trades"]),
+            "trades": [
+                {"price": num(t["price"]), "volume": num(t["volume"]), "funds": num(t["funds"]), "created_at": t["created_at"]}
+                for t in order["trades"]
+            ],
+        }
+        # 엔진은 체결 평균가를 avg_buy_price/avg_sell_price로 읽음
+        out["avg_buy_price" if order["side"] == "bid" else "avg_sell_price"] = num(avg)
+        return out
+
+    def _submit(self, order):
+        self.save_state()
+        self._match_order(order)
+        return self._response(order)
+
+    # ---- pyupbit.Upbit 메서드 ----
+    def get_balance(self, ticker="KRW", verbose=False, contain_req=False):
+        self.match()
+        return float(self._account(self._currency(ticker))["balance"])
+
+    def get_balances(self, contain_req=False):
+        self.match()
+        rows = []
+        for currency, acc in sorted(self.balances.items()):
+            if currency != "KRW" and acc["balance"] + acc["locked"] <= 0:
+                continue
+            rows.append({
+                "currency": currency,
+                "balance": f"{acc['balance']:.8f}",
+                "locked": f"{acc['locked']:.8f}",
+                "avg_buy_price": f"{acc['avg_buy_price']:.8f}",
+                "avg_buy_price_modified": False,
+                "unit_currency": "KRW",
+            })
+        return rows
+
+    def get_avg_buy_price(self, ticker="KRW-BTC", contain_req=False):
+        return float(self._account(self._currency(ticker))["avg_buy_price"])
+
+    def buy_market_order(self, ticker, price, contain_req=False):
+        """시장가 매수 (price = 사용할 KRW, 수수료는 별도 차감)."""
+        price = float(price)
+        need = price * (1 + self.fee_rate)
+        krw = self._account("KRW")
+        if price <= 0 or need > krw["balance"] + 1e-6:
+            return None
+        order = self._new_order(ticker, "bid", "price", price, None)
+        krw["balance"] -= need
+        krw["locked"] += need
+        order["locked"] = need
+        return self._submit(order)
+
+    def sell_market_order(self, ticker, volume, contain_req=False):
+        volume = float(volume)
+        coin = self._account(self._currency(ticker))
+        if volume <= 0 or volume > coin["balance"] + _EPS:
+            return None
+        volume = min(volume, coin["balance"])
+        order = self._new_order(ticker, "ask", "market", None, volume)
+        coin["balance"] -= volume
+        coin["locked"] += volume
+        order["locked"] = volume
+        return self._submit(order)
+
+    def buy_limit_order(self, ticker, price, volume, contain_req=False):
+        price, volume = float(price), float(volume)
+        need = price * volume * (1 + self.fee_rate)
+        krw = self._account("KRW")
+        if price <= 0 or volume <= 0 or need > krw["balance"] + 1e-6:
+            return None
+        order = self._new_order(ticker, "bid", "limit", price, volume)
+        krw["balance"] -= need
+        krw["locked"] += need
+        order["locked"] = need
+        return self._submit(order)
+
+    def sell_limit_order(self, ticker, price, volume, contain_req=False):
+        price, volume = float(price), float(volume)
+        coin = self._account(self._currency(ticker))
+        if price <= 0 or volume <= 0 or volume > coin["balance"] + _EPS:
+            return None
+        volume = min(volume, coin["balance"])
+        order = self._new_order(ticker, "ask", "limit", price, volume)
+        coin["balance"] -= volume
+        coin["locked"] += volume
+        order["locked"] = volume
+        return self._submit(order)
+
+    def get_order(self, ticker_or_uuid, state="wait", page=1, limit=100, contain_req=False):
+        order = self.orders.get(ticker_or_uuid)
+        if order is None:
+            return None
+        self._match_order(order)
+        return self._response(order)
+
+    def cancel_order(self, uuid, contain_req=False):
+        order = self.orders.get(uuid)
+        if order is None:
+            return None
+        self._match_order(order)
+        if order["state"] != "wait":
+            return None
+        order["state"] = "cancel"
+        self._release(order)
+        self.save_state()
+        return self._response(order)
+
+    def total_value(self, price_fn=None):
+        """현금 + 보유 코인 평가액 (price_fn 없으면 최우선 매수호가로 평가)."""
+        total = 0.0
+        for currency, acc in self.balances.items():
+            amount = acc["balance"] + acc["locked"]
+            if currency == "KRW":
+                total += amount
+            elif amount > 0:
+                ticker = f"KRW-{currency}"
+                price = price_fn(ticker) if price_fn is not None else self.best_prices(ticker)[0]
+                total += amount * (price or 0.0)
+        return total
+
+
+def from_config(config, orderbook_fn=None):
+    """config의 paper 블록으로 PaperExchange 생성 (실거래 시세와 함께 쓰므로 호가도 실시간만 허용).
+
+    기록된 호가는 시뮬레이션 시계로 재생할 때만 의미가 있으므로 replay(`--data <기록 디렉토리>`)에서만 사용합니다.
+    """
+    trading_cfg = config.get("trading", {}) or {}
+    paper_cfg = config.get("paper", {}) or {}
+    try:
+        fee_rate = float(paper_cfg.get("fee_pct", trading_cfg.get("fee_pct", 0.05))) / 100
+    except Exception:
+        fee_rate = 0.0005
+
+    source = str(paper_cfg.get("orderbook") or "live")
+    if source != "live":
+        raise ValueError(f"paper.orderbook은 live만 지원합니다 ({source}) - 기록된 호가는 replay --data로 재생하세요")
+
+    return PaperExchange(
+        orderbook_fn=orderbook_fn,
+        initial_krw=float(paper_cfg.get("initial_krw", 1000000)),
+        fee_rate=fee_rate,
+        latency_ms=float(paper_cfg.get("latency_ms", 100)),
+        liquidity_ratio=float(paper_cfg.get("liquidity_ratio", 1.0)),
+        state_file=paper_cfg.get("state_file", "paper_account.json") or None,
+    )
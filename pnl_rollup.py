@@ -0,0 +1,307 @@
+"""
+손익 롤업 모듈 - 일자별 집계(횟수/승패/손익/수수료/거래대금/전략·종목별)를 증분 유지
+"""
+
+from datetime import date as date_cls, datetime, timedelta
+import json
+import os
+import threading
+
+import clock
+
+
+ROLLUP_VERSION = 1
+
+
+def trade_fees(trade, fee_rate=0.0005):
+    """거래 기록의 (매수 수수료, 매도 수수료). 기록이 없으면 수수료율로 추정."""
+    buy_price = float(trade.get('buy_price', 0) or 0)
+    sell_price = float(trade.get('sell_price', 0) or 0)
+    amount = float(trade.get('amount', 0) or 0)
+
+    buy_fee = trade.get('buy_fee_krw', None)
+    sell_fee = trade.get('sell_fee_krw', None)
+    if buy_fee is None:
+        buy_fee = buy_price * amount * fee_rate
+    if sell_fee is None:
+        sell_fee = sell_price * amount * fee_rate
+    return float(buy_fee or 0), float(sell_fee or 0)
+
+
+def trade_profit_after_fees(trade, fee_rate=0.0005):
+    """수수료 반영 손익(가능하면 trade_history의 profit_after_fees_krw 사용, 없으면 추정)."""
+    paf = trade.get('profit_after_fees_krw', None)
+    if paf is not None:
+        return float(paf or 0)
+    try:
+        bp = float(trade.get('buy_price', 0) or 0)
+        amt = float(trade.get('amount', 0) or 0)
+        bf = float(trade.get('buy_fee_krw', 0) or 0)
+        if bf <= 0:
+            bf = bp * amt * fee_rate
+        return float(trade.get('profit_krw', 0) or 0) - bf
+    except Exception:
+        return float(trade.get('profit_krw', 0) or 0)
+
+
+def trade_strategy(trade):
+    buy_meta = trade.get('buy_meta', {}) if isinstance(trade.get('buy_meta'), dict) else {}
+    return str(trade.get('strategy') or buy_meta.get('strategy') or 'UNKNOWN')
+
+
+def _empty_row(day_key):
+    return {
+        'date': day_key,
+        'trades': 0,
+        'wins': 0,
+        'losses': 0,
+        'gross_wins': 0,
+        'profit_krw': 0.0,
+        'profit_after_fees_krw': 0.0,
+        'buy_fee_krw': 0.0,
+        'sell_fee_krw': 0.0,
+        'turnover_krw': 0.0,
+        'by_strategy': {},
+        'by_symbol': {},
+        'best': None,
+        'worst': None,
+        'best_rate': None,
+        'worst_rate': None,
+    }
+
+
+def _trade_summary(trade, paf):
+    return {
+        'coin': str(trade.get('coin', '')).replace('KRW-', ''),
+        'profit_after_fees_krw': float(paf),
+        'profit_rate': float(trade.get('profit_rate', 0) or 0),
+        'profit_krw': float(trade.get('profit_krw', 0) or 0),
+        'reason': str(trade.get('reason', '') or ''),
+    }
+
+
+def _merge_bucket(buckets, key, trades, wins, profit):
+    bucket = buckets.setdefault(key, {'trades': 0, 'wins': 0, 'profit': 0.0})
+    bucket['trades'] += int(trades)
+    bucket['wins'] += int(wins)
+    bucket['profit'] += float(profit)
+
+
+def _pick(current, candidate, field, prefer_max):
+    if candidate is None:
+        return current
+    if current is None:
+        return candidate
+    if prefer_max:
+        return candidate if candidate[field] > current[field] else current
+    return candidate if candidate[field] < current[field] else current
+
+
+def _add_trade_to_row(row, trade, fee_rate):
+    paf = trade_profit_after_fees(trade, fee_rate)
+    try:
+        buy_fee, sell_fee = trade_fees(trade, fee_rate)
+        buy_price = float(trade.get('buy_price', 0) or 0)
+        sell_price = float(trade.get('sell_price', 0) or 0)
+        amount = float(trade.get('amount', 0) or 0)
+        turnover = (buy_price * amount) + (sell_price * amount)
+    except Exception:
+        buy_fee, sell_fee, turnover = 0.0, 0.0, 0.0
+
+    profit_krw = float(trade.get('profit_krw', 0) or 0)
+    win = paf > 0
+
+    row['trades'] += 1
+    row['wins'] += 1 if win else 0
+    row['losses'] += 0 if win else 1
+    row['gross_wins'] += 1 if profit_krw > 0 else 0
+    row['profit_krw'] += profit_krw
+    row['profit_after_fees_krw'] += paf
+    row['buy_fee_krw'] += buy_fee
+    row['sell_fee_krw'] += sell_fee
+    row['turnover_krw'] += turnover
+
+    _merge_bucket(row['by_strategy'], trade_strategy(trade), 1, 1 if win else 0, paf)
+    coin = str(trade.get('coin', '')).replace('KRW-', '') or 'UNKNOWN'
+    _merge_bucket(row['by_symbol'], coin, 1, 1 if win else 0, paf)
+
+    summary = _trade_summary(trade, paf)
+    row['best'] = _pick(row['best'], summary, 'profit_after_fees_krw', True)
+    row['worst'] = _pick(row['worst'], summary, 'profit_after_fees_krw', False)
+    row['best_rate'] = _pick(row['best_rate'], summary, 'profit_rate', True)
+    row['worst_rate'] = _pick(row['worst_rate'], summary, 'profit_rate', False)
+
+
+class PnLRollupStore:
+    """일자별 손익 롤업 저장소.
+
+    청산 거래가 발생할 때마다 해당 일자 롤업 행을 증분 갱신하고
+    `trade_history/rollups/YYYYMMDD.json`(일자별 파일)에 그 일자만 저장합니다. 리포트는 거래를 재스캔하지 않고
+    기간 내 롤업 행 몇 개만 합산합니다. 롤업이 없는 일자는 거래 파일로 1회 백필하고,
+    시작 시 가장 최근 롤업 일자는 거래 파일 건수와 비교해 어긋나면(거래 기록 후 롤업 저장 전 종료) 다시 만듭니다.
+    """
+
+    def __init__(self, history_dir="trade_history", fee_rate=0.0005, trade_loader=None):
+        self.history_dir = history_dir
+        self.fee_rate = float(fee_rate)
+        self.trade_loader = trade_loader
+        self.rollup_dir = os.path.join(history_dir, "rollups")
+
+        self._lock = threading.RLock()
+        self._rows = {}
+        self._empty_days = set()
+        self._load()
+
+    def _row_path(self, key):
+        return os.path.join(self.rollup_dir, f"{key}.json")
+
+    def _read_row(self, key):
+        try:
+            path = self._row_path(key)
+            if not os.path.exists(path):
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if int(data.get('version', 0) or 0) != ROLLUP_VERSION:
+                return None
+            row = data.get('row')
+            return row if isinstance(row, dict) else None
+        except Exception as e:
+            print(f"손익 롤업 로드 실패({key}): {e}")
+            return None
+
+    def _load(self):
+        """가장 최근 롤업 일자를 거래 파일과 대조해 어긋나면 재구성."""
+        try:
+            names = sorted(n for n in os.listdir(self.rollup_dir) if n.endswith('.json'))
+        except OSError:
+            return
+        if not names or self.trade_loader is None:
+            return
+        key = names[-1][: -len('.json')]
+        row = self._read_row(key)
+        try:
+            expected = len(self.trade_loader(key) or [])
+        except Exception as e:
+            print(f"손익 롤업 검증 실패({key}): {e}")
+            return
+        if row is not None and int(row.get('trades', 0) or 0) == expected:
+            self._rows[key] = row
+            return
+        row = self._backfill(key)
+        if row is not None:
+            self._rows[key] = row
+            self._save(key)
+
+    def _save(self, key):
+        """변경된 일자 행만 저장."""
+        try:
+            os.makedirs(self.rollup_dir, exist_ok=True)
+            path = self._row_path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': ROLLUP_VERSION, 'row': self._rows[key]}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"손익 롤업 저장 실패: {e}")
+
+    @staticmethod
+    def _day_key(value):
+        if isinstance(value, (datetime, date_cls)):
+            return value.strftime('%Y%m%d')
+        return str(value)
+
+    def _backfill(self, key):
+        """롤업 행이 없는 일자를 거래 파일로 재구성."""
+        if self.trade_loader is None:
+            return None
+        trades = self.trade_loader(key) or []
+        if not trades:
+            return None
+        row = _empty_row(key)
+        for trade in trades:
+            _add_trade_to_row(row, trade, self.fee_rate)
+        return row
+
+    def _cached_row(self, key):
+        """메모리 -> 일자 파일 순으로 롤업 행 조회 (없으면 None)."""
+        row = self._rows.get(key)
+        if row is None:
+            row = self._read_row(key)
+            if row is not None:
+                self._rows[key] = row
+        return row
+
+    def add_trade(self, trade):
+        """청산 거래 1건을 해당 일자 롤업에 반영."""
+        ts = trade.get('timestamp')
+        if isinstance(ts, str):
+            ts = datetime.fromisoformat(ts)
+        if not isinstance(ts, datetime):
+            ts = clock.now()
+        key = self._day_key(ts)
+
+        with self._lock:
+            row = self._cached_row(key)
+            if row is None:
+                # 거래 파일에는 이미 이번 거래가 기록되어 있으므로 백필로 충분
+                row = self._backfill(key)
+                if row is None:
+                    row = _empty_row(key)
+                    _add_trade_to_row(row, trade, self.fee_rate)
+            else:
+                _add_trade_to_row(row, trade, self.fee_rate)
+            self._rows[key] = row
+            self._empty_days.discard(key)
+            self._save(key)
+
+    def get_day(self, value=None):
+        """일자 롤업 행 (거래 없으면 빈 행)."""
+        key = self._day_key(value if value is not None else clock.now())
+        with self._lock:
+            row = self._cached_row(key)
+            if row is not None:
+                return row
+            if key in self._empty_days:
+                return _empty_row(key)
+
+            row = self._backfill(key)
+            if row is None:
+                self._empty_days.add(key)
+                return _empty_row(key)
+            self._rows[key] = row
+            self._save(key)
+            return row
+
+    def summarize(self, start_date, end_date):
+        """start_date~end_date(포함) 롤업 합산."""
+        start = start_date.date() if isinstance(start_date, datetime) else start_date
+        end = end_date.date() if isinstance(end_date, datetime) else end_date
+
+        total = _empty_row(f"{self._day_key(start)}-{self._day_key(end)}")
+        daily = []
+        day = start
+        while day <= end:
+            row = self.get_day(day)
+            daily.append((day, float(row['profit_after_fees_krw']), int(row['trades'])))
+            for field in (
+                'trades', 'wins', 'losses', 'gross_wins',
+                'profit_krw', 'profit_after_fees_krw',
+                'buy_fee_krw', 'sell_fee_krw', 'turnover_krw',
+            ):
+                total[field] += row[field]
+            for name, bucket in row['by_strategy'].items():
+                _merge_bucket(total['by_strategy'], name, bucket['trades'], bucket['wins'], bucket['profit'])
+            for name, bucket in row['by_symbol'].items():
+                _merge_bucket(total['by_symbol'], name, bucket['trades'], bucket['wins'], bucket['profit'])
+            total['best'] = _pick(total['best'], row['best'], 'profit_after_fees_krw', True)
+            total['worst'] = _pick(total['worst'], row['worst'], 'profit_after_fees_krw', False)
+            total['best_rate'] = _pick(total['best_rate'], row['best_rate'], 'profit_rate', True)
+            total['worst_rate'] = _pick(total['worst_rate'], row['worst_rate'], 'profit_rate', False)
+            day = day + timedelta(days=1)
+
+        total['start_date'] = start
+        total['end_date'] = end
+        total['daily'] = daily
+        total['total_fee_krw'] = total['buy_fee_krw'] + total['sell_fee_krw']
+        return total
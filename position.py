@@ -0,0 +1,240 @@
+"""
+포지션 레코드 모듈 - 자주 읽는 필드는 __slots__ 속성, 나머지 매수 메타는 지연 직렬화 블롭
+"""
+
+from datetime import datetime
+import json
+
+import clock
+
+
+# buy_meta 키 -> Position 속성 (청산 판단에서 매 루프 읽고/갱신하는 값)
+HOT_META_KEYS = {
+    'strategy': 'strategy',
+    'stop_price': 'stop_price',
+    'sol_tp1_done': 'tp1_done',
+    'sol_trailing_active': 'trailing_active',
+    'sol_trailing_stop_price': 'trailing_stop_price',
+}
+
+# dict 호환 키 (기존 positions[coin]['amount'] 형태 접근 유지)
+FIELD_KEYS = (
+    'buy_price',
+    'amount',
+    'original_amount',
+    'timestamp',
+    'highest_price',
+    'uuid',
+    'buy_fee_krw',
+    'buy_signals',
+    'buy_score',
+)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class Position:
+    """보유 포지션.
+
+    가격/수량/손절/트레일링 상태 등은 타입이 고정된 속성으로 두고,
+    진입 시점의 분석 메타(사이징, BTC 필터 등)는 cold 블롭으로 분리해
+    변경될 때만 JSON으로 다시 직렬화합니다. 기존 코드 호환을 위해
+    `pos['amount']`, `pos.get('buy_meta')` 같은 dict 접근도 지원합니다.
+    """
+
+    __slots__ = (
+        'coin',
+        'buy_price',
+        'amount',
+        'original_amount',
+        'timestamp',
+        'highest_price',
+        'uuid',
+        'buy_fee_krw',
+        'buy_signals',
+        'buy_score',
+        'strategy',
+        'stop_price',
+        'tp1_done',
+        'trailing_active',
+        'trailing_stop_price',
+        '_meta',
+        '_meta_json',
+    )
+
+    def __init__(
+        self,
+        coin,
+        buy_price,
+        amount,
+        timestamp=None,
+        original_amount=None,
+        highest_price=None,
+        uuid=None,
+        buy_fee_krw=0,
+        buy_signals=None,
+        buy_score=0,
+        buy_meta=None,
+    ):
+        self.coin = coin
+        self.buy_price = float(buy_price or 0)
+        self.amount = float(amount or 0)
+        self.original_amount = float(original_amount if original_amount is not None else self.amount)
+        self.timestamp = timestamp if isinstance(timestamp, datetime) else clock.now()
+        self.highest_price = float(highest_price if highest_price is not None else self.buy_price)
+        self.uuid = uuid
+        self.buy_fee_krw = float(buy_fee_krw or 0)
+        self.buy_signals = list(buy_signals) if buy_signals else []
+        self.buy_score = int(buy_score or 0)
+
+        self.strategy = None
+        self.stop_price = 0.0
+        self.tp1_done = False
+        self.trailing_active = False
+        self.trailing_stop_price = 0.0
+        self._meta = {}
+        self._meta_json = None
+        self._set_meta(buy_meta)
+
+    # ------------------------------------------------------------------
+    # 메타
+    # ------------------------------------------------------------------
+    def _set_meta(self, buy_meta):
+        meta = dict(buy_meta) if isinstance(buy_meta, dict) else {}
+        strategy = meta.pop('strategy', None)
+        self.strategy = str(strategy) if strategy else None
+        self.stop_price = float(meta.pop('stop_price', 0) or 0)
+        self.tp1_done = bool(meta.pop('sol_tp1_done', False))
+        self.trailing_active = bool(meta.pop('sol_trailing_active', False))
+        self.trailing_stop_price = float(meta.pop('sol_trailing_stop_price', 0) or 0)
+        self._meta = meta
+        self._meta_json = None
+
+    def meta_get(self, key, default=None):
+        """매수 메타 값 조회 (hot 필드는 속성에서 바로 반환)."""
+        attr = HOT_META_KEYS.get(key)
+        if attr is not None:
+            value = getattr(self, attr)
+            return default if value in (None, 0, 0.0) and not isinstance(value, bool) else value
+        return self._meta.get(key, default)
+
+    def update_meta(self, **fields):
+        """매수 메타 갱신 (hot 필드는 속성, 나머지는 cold 블롭 - 블롭 변경 시에만 재직렬화)."""
+        for key, value in fields.items():
+            attr = HOT_META_KEYS.get(key)
+            if attr is not None:
+                setattr(self, attr, value)
+            else:
+                self._meta[key] = value
+                self._meta_json = None
+
+    @property
+    def buy_meta(self):
+        """hot/cold를 합친 매수 메타 사본 (기록/리포트용)."""
+        meta = dict(self._meta)
+        if self.strategy:
+            meta['strategy'] = self.strategy
+        if self.stop_price:
+            meta['stop_price'] = self.stop_price
+        if self.tp1_done:
+            meta['sol_tp1_done'] = True
+        if self.trailing_active:
+            meta['sol_trailing_active'] = True
+        if self.trailing_stop_price:
+            meta['sol_trailing_stop_price'] = self.trailing_stop_price
+        return meta
+
+    def meta_json(self):
+        """cold 메타 JSON (캐시)."""
+        if self._meta_json is None:
+            self._meta_json = json.dumps(self._meta, ensure_ascii=False, default=_json_default)
+        return self._meta_json
+
+    # ------------------------------------------------------------------
+    # 스냅샷
+    # ------------------------------------------------------------------
+    def to_snapshot_json(self):
+        """스냅샷 JSON 문자열. cold 메타는 캐시된 JSON을 그대로 이어 붙입니다."""
+        hot = {
+            'buy_price': self.buy_price,
+            'amount': self.amount,
+            'original_amount': self.original_amount,
+            'timestamp': self.timestamp.isoformat(),
+            'highest_price': self.highest_price,
+            'uuid': self.uuid,
+            'buy_fee_krw': self.buy_fee_krw,
+            'buy_signals': self.buy_signals,
+            'buy_score': self.buy_score,
+            'strategy': self.strategy,
+            'stop_price': self.stop_price,
+            'sol_tp1_done': self.tp1_done,
+            'sol_trailing_active': self.trailing_active,
+            'sol_trailing_stop_price': self.trailing_stop_price,
+        }
+        hot_json = json.dumps(hot, ensure_ascii=False, default=_json_default)
+        return f'{hot_json[:-1]}, "buy_meta": {self.meta_json()}}}'
+
+    @classmethod
+    def from_snapshot(cls, coin, data):
+        """스냅샷 dict -> Position (hot 필드가 buy_meta 안에만 있던 이전 형식도 지원)."""
+        buy_meta = data.get('buy_meta', {}) if isinstance(data.get('buy_meta'), dict) else {}
+        buy_meta = dict(buy_meta)
+        for key in HOT_META_KEYS:
+            if key in data and data[key] not in (None, 0, 0.0, False):
+                buy_meta[key] = data[key]
+
+        ts = data.get('timestamp')
+        if isinstance(ts, str):
+            ts = datetime.fromisoformat(ts)
+
+        return cls(
+            coin,
+            data['buy_price'],
+            data['amount'],
+            timestamp=ts,
+            original_amount=data.get('original_amount'),
+            highest_price=data.get('highest_price'),
+            uuid=data.get('uuid'),
+            buy_fee_krw=data.get('buy_fee_krw', 0),
+            buy_signals=data.get('buy_signals', []),
+            buy_score=data.get('buy_score', 0),
+            buy_meta=buy_meta,
+        )
+
+    # ------------------------------------------------------------------
+    # dict 호환
+    # ------------------------------------------------------------------
+    def __getitem__(self, key):
+        if key in FIELD_KEYS:
+            return getattr(self, key)
+        if key == 'buy_meta':
+            return self.buy_meta
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in FIELD_KEYS:
+            setattr(self, key, value)
+        elif key == 'buy_meta':
+            self._set_meta(value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in FIELD_KEYS or key == 'buy_meta'
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __repr__(self):
+        return (
+            f"Position({self.coin}, buy_price={self.buy_price}, amount={self.amount}, "
+            f"strategy={self.strategy}, stop_price={self.stop_price})"
+        )
@@ -0,0 +1,150 @@
+"""
+샘플링 프로파일러 모듈 - sys._current_frames 기반 스택 샘플링, collapsed stack 출력
+
+재시작 없이 운영 중에 켜고 끌 수 있으며, 결과는 flamegraph 도구(flamegraph.pl, speedscope 등)가
+읽을 수 있는 collapsed 형식("스레드;바깥;...;안쪽 횟수")으로 저장합니다.
+"""
+
+from collections import Counter
+from datetime import datetime
+import os
+import sys
+import threading
+import time
+
+
+# 끝이 "*"인 이름은 접두어로 매칭 (작업 풀 스레드: telegram-cmd_0, telegram-cmd_1 ...)
+DEFAULT_THREADS = (
+    "trading-loop", "telegram-listener", "telegram-outbox", "telegram-cmd*", "log-writer", "metrics-http",
+)
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame, limit=128):
+    """프레임 -> 바깥쪽부터의 함수 라벨 목록."""
+    labels = []
+    while frame is not None and len(labels) < limit:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class StackSampler:
+    """지정한 이름의 스레드 스택을 주기적으로 샘플링."""
+
+    def __init__(self, interval_ms=10, thread_names=DEFAULT_THREADS, output_dir="logs/profiles", max_seconds=300):
+        self.interval = max(0.001, float(interval_ms) / 1000.0)
+        self.thread_names = tuple(thread_names or ())
+        self.output_dir = output_dir
+        self.max_seconds = float(max_seconds) if max_seconds else None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._counts = Counter()
+        self._samples = 0
+        self._started_at = None
+        self._deadline = None
+        self.last_result = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds=None):
+        """샘플링 시작. seconds(없으면 max_seconds) 경과 시 자동 종료/저장."""
+        with self._lock:
+            if self.running:
+                return False
+            self._counts = Counter()
+            self._samples = 0
+            self._started_at = datetime.now()
+            limit = float(seconds) if seconds else self.max_seconds
+            if self.max_seconds:
+                limit = min(limit, self.max_seconds)
+            self._deadline = (time.monotonic() + limit) if limit else None
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        """샘플링 종료 후 결과 저장. 이미 종료됐으면 마지막 결과 반환."""
+        thread = self._thread
+        if thread is None:
+            return self.last_result
+        self._stop_event.set()
+        if thread is not threading.current_thread():
+            thread.join(timeout=5)
+        return self.last_result
+
+    def status(self):
+        return {
+            "running": self.running,
+            "samples": self._samples,
+            "started_at": self._started_at.isoformat(timespec="seconds") if self._started_at else None,
+            "interval_ms": round(self.interval * 1000.0, 2),
+            "threads": list(self.thread_names),
+        }
+
+    def sample_once(self):
+        """현재 스택 1회 샘플링 (대상 스레드만)."""
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        wanted = {n for n in self.thread_names if not n.endswith("*")}
+        prefixes = tuple(n[:-1] for n in self.thread_names if n.endswith("*"))
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            name = names.get(ident)
+            if name is None:
+                continue
+            if self.thread_names and name not in wanted and not (prefixes and name.startswith(prefixes)):
+                continue
+            self._counts[";".join([name] + collapse_stack(frame))] += 1
+        self._samples += 1
+
+    def _run(self):
+        try:
+            while not self._stop_event.is_set():
+                self.sample_once()
+                if self._deadline is not None and time.monotonic() >= self._deadline:
+                    break
+                self._stop_event.wait(self.interval)
+        finally:
+            self.last_result = self._write()
+            self._thread = None
+
+    def _write(self):
+        ended_at = datetime.now()
+        result = {
+            "path": None,
+            "samples": self._samples,
+            "stacks": len(self._counts),
+            "started_at": self._started_at.isoformat(timespec="seconds") if self._started_at else None,
+            "ended_at": ended_at.isoformat(timespec="seconds"),
+            "top": self.top_functions(5),
+        }
+        if not self._counts:
+            return result
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(self.output_dir, f"profile-{ended_at.strftime('%Y%m%d-%H%M%S')}.folded")
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in self._counts.most_common():
+                    f.write(f"{stack} {count}\n")
+            result["path"] = path
+        except Exception as e:
+            print(f"프로파일 저장 실패: {e}")
+        return result
+
+    def top_functions(self, limit=5):
+        """가장 안쪽(self time) 함수 상위 N개: [(thread, label, samples), ...]"""
+        leaf = Counter()
+        for stack, count in self._counts.items():
+            parts = stack.split(";")
+            leaf[(parts[0], parts[-1])] += count
+        return [(thread, label, count) for (thread, label), count in leaf.most_common(limit)]
@@ -0,0 +1,452 @@
+"""
+리플레이 모듈 - 기록된 5분봉으로 실제 TradingBot 거래 루프(_trading_loop)를 가속 재생
+
+- 시각: clock.SimulatedClock (루프의 sleep은 기다리지 않고 시뮬레이션 시각만 이동)
+- 시세: ReplayMarket이 pyupbit 시세 함수(get_ohlcv/get_current_price/get_orderbook/get_tickers)를 대체
+  현재 진행 중인 5분봉은 시가만 공개(고가/저가/종가 미래 정보 차단)하고, 호가는 현재가 기준 합성
+  (시세 기록을 재생할 때 기록된 호가가 있으면 그 시각까지의 최신 스냅샷 사용)
+- 계좌: paper_exchange.PaperExchange가 pyupbit.Upbit을 대체 (재생 호가와 대조해 체결, 지연/부분 체결/수수료 반영)
+
+텔레그램/메트릭/워치독/추적/캔들 캐시는 끄고 로그/거래 기록은 출력 디렉토리에 따로 남깁니다.
+같은 데이터/설정이면 decisions.log가 실행마다 바이트 단위로 같아야 합니다(회귀 비교용).
+
+입력은 백테스트 캔들 파일(npz) 또는 시세 기록 디렉토리(market_recorder, 5분봉 응답 사용)입니다.
+
+사용 예:
+    python main.py replay --data cache/backtest_5m.npz --start "2026-03-02 00:00" --end "2026-03-03 00:00" --out replay_out
+    python main.py replay --data market_data --start "2026-03-02 00:00" --end "2026-03-03 00:00"
+"""
+
+from contextlib import contextmanager
+import argparse
+import copy
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyupbit
+
+import clock
+import market_recorder
+from backtest import load_history
+from paper_exchange import PaperExchange, RecordedOrderbooks
+
+
+BASE_MINUTES = 5
+REPLAY_KEY = "R" * 40  # connect()의 키 형식 검사 통과용 (실제 API 호출 없음)
+
+# 업비트 원화 마켓 호가 단위 (가격 하한, 단위)
+TICK_TABLE = (
+    (2000000, 1000),
+    (1000000, 500),
+    (500000, 100),
+    (100000, 50),
+    (10000, 10),
+    (1000, 1),
+    (100, 0.1),
+    (10, 0.01),
+    (1, 0.001),
+    (0.1, 0.0001),
+    (0.01, 0.00001),
+    (0.001, 0.000001),
+    (0.0001, 0.0000001),
+)
+
+
+def tick_size(price):
+    for floor, unit in TICK_TABLE:
+        if price >= floor:
+            return unit
+    return 0.00000001
+
+
+def _round_tick(price, unit, method):
+    steps = price / unit
+    steps = math.floor(steps + 1e-9) if method == "floor" else math.ceil(steps - 1e-9)
+    return round(steps * unit, 8)
+
+
+def _parse_to(to):
+    """pyupbit `to` 인자 -> KST 기준 naive Timestamp ('...Z'/tz 포함이면 UTC로 보고 +9h)."""
+    if to is None:
+        return None
+    ts = pd.Timestamp(to)
+    if ts.tzinfo is not None:
+        return ts.tz_convert("Asia/Seoul").tz_localize(None)
+    return ts
+
+
+class ReplayMarket:
+    """시뮬레이션 시각 기준 시세 조회 (pyupbit 시세 함수 대체).
+
+    history: {ticker: 5분봉 DataFrame} (index = 캔들 시작 시각, KST naive - pyupbit.get_ohlcv와 동일)
+    """
+
+    def __init__(self, history, depth_krw=50000000.0, levels=5, orderbooks=None):
+        self.depth_krw = float(depth_krw)
+        self.orderbooks = orderbooks  # RecordedOrderbooks (없으면 합성 호가)
+        self.levels = max(1, int(levels))
+        self._series = {}
+        for ticker, df in history.items():
+            if df is None or len(df) == 0:
+                continue
+            df = df.sort_index()
+            columns = [c for c in ("open", "high", "low", "close", "volume", "value") if c in df.columns]
+            self._series[ticker] = {
+                "index": pd.DatetimeIndex(df.index).as_unit("ns").asi8,
+                "columns": columns,
+                "values": df[columns].to_numpy(dtype=float),
+            }
+        self._bar_ns = BASE_MINUTES * 60 * 10**9
+        # 같은 봉 안에서는 응답이 같으므로 (종목, 개수, 끝 위치, 진행 중 여부)로 재사용
+        self._frames = {}
+
+    def tickers(self):
+        return sorted(self._series)
+
+    def _now_ns(self):
+        return pd.Timestamp(clock.now()).as_unit("ns").value
+
+    def _bars(self, ticker, until_ns):
+        """until_ns 시각에 보이는 5분봉 (마지막 진행 중 봉은 시가로만 채움)."""
+        series = self._series.get(ticker)
+        if series is None:
+            return None, None, 0
+        index = series["index"]
+        end = int(np.searchsorted(index, until_ns, side="right"))
+        return series, index, end
+
+    def _frame(self, ticker, count, until_ns):
+        series, index, end = self._bars(ticker, until_ns)
+        if series is None or end == 0:
+            return None
+        start = max(0, end - int(count))
+        partial = bool(index[end - 1] + self._bar_ns > until_ns)
+        key = (ticker, start, end, partial)
+        cached = self._frames.get(key)
+        if cached is not None:
+            return cached.copy()
+        values = series["values"][start:end].copy()
+        if partial:
+            # 진행 중인 봉: 시가만 알려진 상태
+            columns = series["columns"]
+            open_ = values[-1, columns.index("open")]
+            for col in ("high", "low", "close"):
+                values[-1, columns.index(col)] = open_
+            for col in ("volume", "value"):
+                if col in columns:
+                    values[-1, columns.index(col)] = 0.0
+        frame = pd.DataFrame(values, index=pd.DatetimeIndex(index[start:end]), columns=series["columns"])
+        if len(self._frames) >= 256:
+            self._frames.clear()
+        self._frames[key] = frame
+        return frame.copy()
+
+    # ---- pyupbit 시세 함수 ----
+    def get_ohlcv(self, ticker="KRW-BTC", interval="day", count=200, to=None, period=0.1):
+        now_ns = self._now_ns()
+        to_ts = _parse_to(to)
+        # to는 '그 시각 이전' 캔들 -> 직전 나노초까지 조회
+        until_ns = min(now_ns, to_ts.as_unit("ns").value - 1) if to_ts is not None else now_ns
+
+        if interval in ("minute5", "minutes5"):
+            return self._frame(ticker, count, until_ns)
+
+        minutes = 1440 if interval in ("day", "days") else None
+        if minutes is None and str(interval).startswith("minute"):
+            minutes = int(str(interval).replace("minutes", "").replace("minute", "") or 0)
+        if not minutes or minutes % BASE_MINUTES:
+            # 5분봉으로 만들 수 없는 단위는 지원하지 않음 (실거래 엔진은 minute5만 사용)
+            return None
+        factor = minutes // BASE_MINUTES
+        base = self._frame(ticker, (int(count) + 1) * factor, until_ns)
+        if base is None:
+            return None
+        agg = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum", "value": "sum"}
+        rule = "1D" if minutes == 1440 else f"{minutes}min"
+        # 업비트 일봉은 KST 09:00 시작
+        offset = pd.Timedelta(hours=9) if minutes == 1440 else None
+        out = base.resample(rule, label="left", closed="left", offset=offset).agg(
+            {col: how for col, how in agg.items() if col in base.columns}
+        )
+        return out.dropna().tail(int(count))
+
+    def price(self, ticker):
+        """현재가 = 진행 중인 봉의 시가 (없으면 마지막 종가)."""
+        series, index, end = self._bars(ticker, self._now_ns())
+        if series is None or end == 0:
+            return None
+        columns = series["columns"]
+        row = series["values"][end - 1]
+        if index[end - 1] + self._bar_ns > self._now_ns():
+            return float(row[columns.index("open")])
+        return float(row[columns.index("close")])
+
+    def get_current_price(self, ticker="KRW-BTC", limit_info=False, verbose=False):
+        if isinstance(ticker, (list, tuple)):
+            prices = {t: self.price(t) for t in ticker}
+            return prices if len(ticker) != 1 else prices[ticker[0]]
+        return self.price(ticker)
+
+    def quote(self, ticker):
+        """합성 최우선 호가 (bid, ask): 현재가 아래/위 1호가."""
+        price = self.price(ticker)
+        if not price:
+            return None, None
+        unit = tick_size(price)
+        bid = _round_tick(price, unit, "floor")
+        ask = _round_tick(price, unit, "ceil")
+        if ask <= bid:
+            ask = round(bid + unit, 8)
+        return bid, ask
+
+    def orderbook(self, ticker):
+        if self.orderbooks is not None:
+            book = self.orderbooks.get_orderbook(ticker)
+            if book is not None:
+                return book
+        bid, ask = self.quote(ticker)
+        if bid is None:
+            return None
+        unit = tick_size(bid)
+        units = []
+        for level in range(self.levels):
+            ask_price = round(ask + unit * level, 8)
+            bid_price = round(bid - unit * level, 8)
+            units.append({
+                "ask_price": ask_price,
+                "bid_price": bid_price,
+                "ask_size": round(self.depth_krw / ask_price, 8),
+                "bid_size": round(self.depth_krw / bid_price, 8),
+            })
+        return {
+            "market": ticker,
+            "timestamp": int(clock.time() * 1000),
+            "total_ask_size": sum(u["ask_size"] for u in units),
+            "total_bid_size": sum(u["bid_size"] for u in units),
+            "orderbook_units": units,
+        }
+
+    def get_orderbook(self, ticker="KRW-BTC", limit_info=False):
+        if isinstance(ticker, (list, tuple)):
+            return [self.orderbook(t) for t in ticker]
+        return self.orderbook(ticker)
+
+    def get_tickers(self, fiat="", is_details=False, limit_info=False, verbose=False):
+        return [t for t in self.tickers() if not fiat or t.startswith(f"{fiat}-")]
+
+
+# 업비트 캔들 응답 필드 -> OHLCV 열
+CANDLE_FIELDS = (
+    ("open", "opening_price"),
+    ("high", "high_price"),
+    ("low", "low_price"),
+    ("close", "trade_price"),
+    ("volume", "candle_acc_trade_volume"),
+    ("value", "candle_acc_trade_price"),
+)
+
+
+def load_recording(directory, start=None, end=None):
+    """시세 기록(market_recorder) 디렉토리의 5분봉 응답 -> {ticker: DataFrame}
+
+    같은 봉이 여러 번 기록되었으면 가장 늦게 받은 값(봉 마감 후 값)을 사용합니다.
+    start/end는 봉 시각 범위 [start, end)이며, 기록은 start 하루 전부터 읽습니다.
+    """
+    start_ts = pd.Timestamp(start) if start is not None else None
+    end_ts = pd.Timestamp(end) if end is not None else None
+    rows = {}
+    for rec in market_recorder.iter_records(
+        directory,
+        start=start_ts - pd.Timedelta(days=1) if start_ts is not None else None,
+        end=end_ts + pd.Timedelta(days=1) if end_ts is not None else None,
+        kinds=("candles",),
+    ):
+        if rec.get("ep") != f"/v1/candles/minutes/{BASE_MINUTES}" or not isinstance(rec.get("d"), list):
+            continue
+        for candle in rec["d"]:
+            try:
+                ticker = str(candle["market"])
+                values = [float(candle[field]) for _col, field in CANDLE_FIELDS]
+                rows.setdefault(ticker, {})[pd.Timestamp(candle["candle_date_time_kst"])] = values
+            except Exception:
+                continue
+
+    history = {}
+    for ticker, bars in rows.items():
+        df = pd.DataFrame.from_dict(bars, orient="index", columns=[col for col, _field in CANDLE_FIELDS]).sort_index()
+        df.index = pd.DatetimeIndex(df.index).as_unit("ns")
+        if start_ts is not None:
+            df = df[df.index >= start_ts]
+        if end_ts is not None:
+            df = df[df.index < end_ts]
+        if len(df):
+            history[ticker] = df
+    return history
+
+
+@contextmanager
+def patched_pyupbit(market, account):
+    """pyupbit 시세 함수/Upbit 클래스를 리플레이 구현으로 교체 (종료 시 복원)."""
+    names = ("get_ohlcv", "get_current_price", "get_orderbook", "get_tickers", "Upbit")
+    original = {name: getattr(pyupbit, name) for name in names}
+    pyupbit.get_ohlcv = market.get_ohlcv
+    pyupbit.get_current_price = market.get_current_price
+    pyupbit.get_orderbook = market.get_orderbook
+    pyupbit.get_tickers = market.get_tickers
+    pyupbit.Upbit = lambda *args, **kwargs: account
+    try:
+        yield
+    finally:
+        for name, value in original.items():
+            setattr(pyupbit, name, value)
+
+
+def replay_config(config, out_dir, check_interval=None):
+    """리플레이용 설정: 외부 연동/실시간 감시 끄고 기록 경로를 out_dir로 분리.
+
+    check_interval(초)을 주면 루프 주기를 덮어씁니다 (시세가 5분봉 단위로만 바뀌므로 30~60초로도 충분).
+    """
+    cfg = copy.deepcopy(config)
+    if check_interval:
+        cfg.setdefault("trading", {})["check_interval_seconds"] = int(check_interval)
+    cfg["api"] = {"access_key": REPLAY_KEY, "secret_key": REPLAY_KEY}
+    cfg.setdefault("telegram", {})["enabled"] = False
+    cfg.setdefault("metrics", {})["enabled"] = False
+    cfg.setdefault("watchdog", {})["enabled"] = False
+    cfg.setdefault("tracing", {})["enabled"] = False
+    cfg.setdefault("candle_cache", {})["enabled"] = False
+    cfg.setdefault("market_recorder", {})["enabled"] = False
+    # 계좌는 pyupbit.Upbit 자리에 끼운 PaperExchange (엔진이 따로 모의 계좌를 만들지 않도록 live 경로 사용)
+    cfg.setdefault("trading", {})["run_mode"] = "live"
+    cfg.setdefault("upbit_http", {}).setdefault("hedge", {})["enabled"] = False
+    logging_cfg = cfg.setdefault("logging", {})
+    logging_cfg["log_dir"] = os.path.join(out_dir, "logs")
+    # 동기 기록: 로그 큐 상태(heartbeat payload)가 실행마다 달라지지 않도록
+    logging_cfg["async"] = False
+    logging_cfg["compress_decisions"] = False
+    stats_cfg = cfg.setdefault("stats", {})
+    stats_cfg["history_dir"] = os.path.join(out_dir, "trade_history")
+    stats_cfg["position_file"] = os.path.join(out_dir, "positions_snapshot.json")
+    cfg.setdefault("coin_selection", {}).setdefault("excluded_coins", [])
+    return cfg
+
+
+def run_replay(
+    config,
+    history,
+    start,
+    end,
+    out_dir,
+    initial_krw=1000000.0,
+    depth_krw=50000000.0,
+    check_interval=None,
+    orderbooks=None,
+):
+    """[start, end) 구간을 실제 거래 루프로 재생 -> 결과 요약 dict
+
+    history에는 지표 워밍업을 위해 start 이전 며칠치 5분봉이 포함되어 있어야 합니다.
+    """
+    from main import TradingBot
+
+    os.makedirs(out_dir, exist_ok=True)
+    cfg = replay_config(config, out_dir, check_interval=check_interval)
+    try:
+        fee_rate = float((cfg.get("trading", {}) or {}).get("fee_pct", 0.05)) / 100
+    except Exception:
+        fee_rate = 0.0005
+
+    sim = clock.SimulatedClock(start, end)
+    previous = clock.set_clock(sim)
+    market = ReplayMarket(history, depth_krw=depth_krw, orderbooks=orderbooks)
+    paper_cfg = cfg.get("paper", {}) or {}
+    account = PaperExchange(
+        orderbook_fn=market.get_orderbook,
+        initial_krw=initial_krw,
+        fee_rate=fee_rate,
+        latency_ms=float(paper_cfg.get("latency_ms", 100)),
+        liquidity_ratio=float(paper_cfg.get("liquidity_ratio", 1.0)),
+    )
+    t0 = time.perf_counter()
+    bot = None
+    try:
+        with patched_pyupbit(market, account):
+            bot = TradingBot(config=cfg)
+            sim.on_end = lambda: setattr(bot, "is_running", False)
+            if not bot._prepare_session():
+                raise RuntimeError("리플레이 세션 시작 실패 (잔고/데이터 확인)")
+            bot.is_running = True
+            bot._trading_loop()
+            bot.stats.save_positions()
+            final_value = account.total_value(price_fn=market.price)
+    finally:
+        clock.set_clock(previous)
+        if bot is not None:
+            bot.logger.flush()
+            bot.logger.shutdown()
+
+    return {
+        "start": pd.Timestamp(start).isoformat(),
+        "end": pd.Timestamp(end).isoformat(),
+        "sim_end": sim.now().isoformat(),
+        "initial_krw": float(initial_krw),
+        "final_value_krw": float(final_value),
+        "cash_krw": float(account.balances["KRW"]["balance"]),
+        "orders": len(account.orders),
+        "filled_orders": sum(1 for o in account.orders.values() if o["executed_volume"] > 0),
+        "positions": sorted(bot.stats.positions),
+        "decisions_path": os.path.join(cfg["logging"]["log_dir"], "decisions.log"),
+        "elapsed_seconds": time.perf_counter() - t0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기록된 5분봉으로 실제 거래 루프 가속 재생")
+    parser.add_argument("--config", default="config.json", help="설정 파일 (기본: config.json)")
+    parser.add_argument("--data", default="cache/backtest_5m.npz", help="5분봉 캔들 파일(npz) 또는 시세 기록 디렉토리")
+    parser.add_argument("--start", required=True, help="재생 시작 시각 'YYYY-MM-DD[ HH:MM]'")
+    parser.add_argument("--end", required=True, help="재생 종료 시각(미포함)")
+    parser.add_argument("--warmup-days", type=float, default=5, help="시작 전 지표 워밍업용 캔들 일수 (기본: 5)")
+    parser.add_argument("--out", default="replay_out", help="로그/거래 기록 출력 디렉토리")
+    parser.add_argument("--initial-krw", type=float, default=1000000, help="초기 자금 (기본: 1,000,000)")
+    parser.add_argument("--check-interval", type=int, default=None, help="루프 주기(초) 덮어쓰기 (기본: 설정값)")
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    start = pd.Timestamp(args.start)
+    warmup_start = start - pd.Timedelta(days=args.warmup_days)
+    orderbooks = None
+    if os.path.isdir(args.data):
+        # 시세 기록 디렉토리 (market_recorder): 기록된 호가가 있으면 체결/호가 조회에 사용
+        history = load_recording(args.data, start=warmup_start, end=args.end)
+        orderbooks = RecordedOrderbooks(args.data, start=start, end=args.end)
+        if not orderbooks.markets():
+            orderbooks = None
+    else:
+        history = load_history(args.data, start=warmup_start, end=args.end)
+    if not history:
+        sys.stderr.write(f"캔들 데이터 없음: {args.data} (python main.py backtest --fetch-days로 먼저 조회)\n")
+        return 1
+
+    result = run_replay(
+        config,
+        history,
+        start,
+        args.end,
+        args.out,
+        initial_krw=args.initial_krw,
+        check_interval=args.check_interval,
+        orderbooks=orderbooks,
+    )
+    sys.stdout.write(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+리포트 캐시 모듈 - 입력 데이터 버전이 같으면 미리 렌더링된 메시지를 재사용
+
+버전은 리포트가 의존하는 값(마지막 거래 ID, 포지션 버전, 마지막 확정 캔들 등)의 튜플이며,
+버전이 바뀔 때만 다시 렌더링합니다. 같은 명령어를 반복해도 API 호출/파일 I/O가 없습니다.
+"""
+
+import threading
+
+
+class ReportCache:
+    """이름별 (버전, 렌더링 결과) 1개씩 보관."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # name -> (version, value)
+        self._rendering = {}  # name -> threading.Lock (같은 리포트 동시 렌더링 방지)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, version, render):
+        """버전이 같으면 캐시 값, 다르면 render() 결과를 저장 후 반환.
+
+        render()가 예외를 던지면 캐시하지 않고 그대로 전파합니다.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            render_lock = self._rendering.setdefault(name, threading.Lock())
+
+        with render_lock:
+            # 대기하는 동안 다른 스레드가 같은 버전을 렌더링했을 수 있음
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None and entry[0] == version:
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+            value = render()
+            with self._lock:
+                self._entries[name] = (version, value)
+            return value
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
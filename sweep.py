@@ -0,0 +1,258 @@
+"""
+파라미터 스윕 모듈 - strategy/risk_management 설정 조합별 백테스트를 프로세스 풀에서 병렬 실행
+
+캔들 배열은 공유 메모리 블록 하나에 담아 워커가 이름으로 붙어 읽습니다(조합마다 pickle 전달 없음).
+
+스펙 예 (JSON):
+    {
+      "grid": {"strategy.sol_breakout_lookback": [36, 48, 60], "strategy.regime_confirm_count": [2, 3]},
+      "random": {"samples": 40, "seed": 7, "params": {
+          "strategy.doge_volume_spike_min": {"min": 1.1, "max": 1.8},
+          "strategy.risk_per_symbol_pct.SOL": {"choices": [0.3, 0.5, 0.7]}}},
+      "rank_by": ["total_return_pct", "max_drawdown_pct"],
+      "min_trades": 20
+    }
+
+사용 예:
+    python main.py sweep --spec sweep.json --data cache/backtest_5m.npz --workers 8 --top 10
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import argparse
+import copy
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest import Backtester, load_history
+from candle_cache import OHLCV_COLUMNS
+
+
+SWEEPABLE_SECTIONS = ("strategy", "risk_management")
+
+# 워커 프로세스 전역 (initializer에서 1회 설정)
+_WORKER = {}
+
+
+# ---- 스펙 ----
+def expand_spec(spec):
+    """스펙 -> 설정 덮어쓰기 목록 [{"strategy.x": v, ...}, ...] (grid 전체 조합 + random 샘플)"""
+    combos = []
+    grid = spec.get("grid", {}) or {}
+    if grid:
+        keys = list(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            combos.append(dict(zip(keys, values)))
+
+    rnd = spec.get("random", {}) or {}
+    if rnd:
+        rng = random.Random(rnd.get("seed"))
+        params = rnd.get("params", {}) or {}
+        for _ in range(int(rnd.get("samples", 0) or 0)):
+            combo = {}
+            for key, dist in params.items():
+                if "choices" in dist:
+                    combo[key] = rng.choice(dist["choices"])
+                elif isinstance(dist.get("min"), int) and isinstance(dist.get("max"), int):
+                    combo[key] = rng.randint(dist["min"], dist["max"])
+                else:
+                    combo[key] = round(rng.uniform(float(dist["min"]), float(dist["max"])), 6)
+            combos.append(combo)
+
+    for combo in combos:
+        for key in combo:
+            if key.split(".", 1)[0] not in SWEEPABLE_SECTIONS or "." not in key:
+                raise ValueError(f"스윕 불가 키: {key} (strategy./risk_management. 하위만 가능)")
+    return combos or [{}]
+
+
+def apply_overrides(config, overrides):
+    """'strategy.risk_per_symbol_pct.SOL' 같은 점 경로로 설정 덮어쓰기 (원본 미변경)."""
+    cfg = copy.deepcopy(config)
+    for path, value in overrides.items():
+        node = cfg
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {}
+            node = child
+        node[parts[-1]] = value
+    return cfg
+
+
+def rank_results(results, rank_by=("total_return_pct",), min_trades=0):
+    """지표 순서대로 정렬 (기본 내림차순, 'metric:asc'는 오름차순). 거래 수 미달 결과는 뒤로."""
+    def key(row):
+        summary = row["summary"]
+        values = [0 if summary.get("trades", 0) >= min_trades else 1]
+        for item in rank_by:
+            metric, _, order = str(item).partition(":")
+            value = summary.get(metric)
+            value = float("-inf") if value is None else float(value)
+            values.append(value if order == "asc" else -value)
+        return values
+
+    return sorted(results, key=key)
+
+
+# ---- 공유 메모리 ----
+def share_history(history):
+    """{ticker: DataFrame} -> (SharedMemory, layout). layout은 워커에 전달할 작은 dict."""
+    layout = []
+    offset = 0
+    for ticker, df in history.items():
+        n = len(df)
+        cols = [c for c in OHLCV_COLUMNS if c in df.columns]
+        layout.append({"ticker": ticker, "rows": n, "columns": cols, "offset": offset})
+        offset += n * 8 * (len(cols) + 1)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, offset))
+    for item, df in zip(layout, history.values()):
+        for block, values in enumerate(_frame_arrays(df, item["columns"])):
+            start = item["offset"] + block * item["rows"] * 8
+            np.ndarray(item["rows"], dtype=values.dtype, buffer=shm.buf, offset=start)[:] = values
+    return shm, layout
+
+
+def _frame_arrays(df, columns):
+    yield pd.DatetimeIndex(df.index).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    for col in columns:
+        yield df[col].to_numpy(dtype=np.float64)
+
+
+def attach_history(buf, layout):
+    """공유 메모리 버퍼 -> {ticker: DataFrame} (워커 초기화 시 1회 로컬 복사, 조합별 전달 없음)."""
+    history = {}
+    for item in layout:
+        n = item["rows"]
+        base = item["offset"]
+        index = np.ndarray(n, dtype=np.int64, buffer=buf, offset=base).copy().view("datetime64[ns]")
+        columns = {
+            col: np.ndarray(n, dtype=np.float64, buffer=buf, offset=base + (i + 1) * n * 8).copy()
+            for i, col in enumerate(item["columns"])
+        }
+        history[item["ticker"]] = pd.DataFrame(columns, index=pd.DatetimeIndex(index))
+    return history
+
+
+def init_worker(shm_name, layout, config, initial_krw):
+    """풀 initializer: 공유 메모리의 캔들/설정을 워커 상태에 1회 적재 (sweep/walk_forward 공용)."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _WORKER.clear()
+    _WORKER["history"] = attach_history(shm.buf, layout)
+    shm.close()
+    _WORKER["config"] = config
+    _WORKER["initial_krw"] = initial_krw
+
+
+def worker_state():
+    """현재 프로세스의 워커 상태 dict (history/config/initial_krw + 호출 측 캐시)."""
+    return _WORKER
+
+
+def _run_one(overrides):
+    cfg = apply_overrides(_WORKER["config"], overrides)
+    t0 = time.perf_counter()
+    try:
+        summary = Backtester(cfg, initial_krw=_WORKER["initial_krw"]).run(_WORKER["history"])["summary"]
+        error = None
+    except Exception as e:
+        summary = {}
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "params": overrides,
+        "summary": summary,
+        "error": error,
+        "pid": os.getpid(),
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def run_sweep(config, history, combos, workers=None, initial_krw=1000000.0, rank_by=("total_return_pct",), min_trades=0):
+    """조합별 백테스트 병렬 실행 후 순위 정렬된 결과 반환."""
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    shm, layout = share_history(history)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(shm.name, layout, config, initial_krw),
+        ) as pool:
+            chunksize = max(1, len(combos) // (workers * 4))
+            results = list(pool.map(_run_one, combos, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+    ok = [r for r in results if r["error"] is None]
+    failed = [r for r in results if r["error"] is not None]
+    return rank_results(ok, rank_by, min_trades) + failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전략 파라미터 스윕 (병렬 백테스트)")
+    parser.add_argument("--config", default="config.json", help="기준 설정 파일 (기본: config.json)")
+    parser.add_argument("--spec", required=True, help="스윕 스펙 JSON 파일")
+    parser.add_argument("--data", default="cache/backtest_5m.npz", help="5분봉 캔들 파일(npz)")
+    parser.add_argument("--start", help="시작일 'YYYY-MM-DD'")
+    parser.add_argument("--end", help="종료일(미포함) 'YYYY-MM-DD'")
+    parser.add_argument("--workers", type=int, default=0, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--initial-krw", type=float, default=1000000, help="초기 자금 (기본: 1,000,000)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 상위 결과 수")
+    parser.add_argument("--out", help="전체 결과 CSV 저장 경로")
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    with open(args.spec, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+
+    history = load_history(args.data, start=args.start, end=args.end)
+    if not history:
+        sys.stderr.write(f"캔들 데이터 없음: {args.data} (python main.py backtest --fetch-days로 먼저 조회)\n")
+        return 1
+
+    combos = expand_spec(spec)
+    t0 = time.perf_counter()
+    results = run_sweep(
+        config,
+        history,
+        combos,
+        workers=args.workers or None,
+        initial_krw=args.initial_krw,
+        rank_by=spec.get("rank_by") or ["total_return_pct"],
+        min_trades=int(spec.get("min_trades", 0) or 0),
+    )
+    elapsed = time.perf_counter() - t0
+
+    for rank, row in enumerate(results[: args.top], 1):
+        s = row["summary"]
+        if row["error"]:
+            sys.stdout.write(f"{rank:>3}. 오류 {row['error']} {json.dumps(row['params'], ensure_ascii=False)}\n")
+            continue
+        sys.stdout.write(
+            f"{rank:>3}. 수익률 {s['total_return_pct']:+.2f}% | MDD {s['max_drawdown_pct']:.2f}% | "
+            f"거래 {s['trades']} | 승률 {s['win_rate']:.1f}% | {json.dumps(row['params'], ensure_ascii=False)}\n"
+        )
+    sys.stderr.write(f"{len(combos)}개 조합 | {elapsed:.1f}초\n")
+
+    if args.out:
+        rows = []
+        for row in results:
+            flat = dict(row["params"])
+            flat.update({k: v for k, v in row["summary"].items() if not isinstance(v, dict)})
+            flat["error"] = row["error"]
+            rows.append(flat)
+        pd.DataFrame(rows).to_csv(args.out, index=False, encoding="utf-8-sig")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,10 @@
 """
 
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import random
 import threading
 import time
 import re
@@ -23,13 +26,59 @@ class TelegramNotifier:
         self.is_listening = False
         self.command_handler = None
         self.silent_mode = False
-        self.poll_timeout_seconds = 3
+        self.poll_timeout_seconds = 50
+        self.poll_backoff_max_seconds = 60.0
         self.notify_buy_enabled = True
         self.notify_sell_enabled = True
         self.notify_error_enabled = True
         self.notify_daily_enabled = True
         self.notify_market_enabled = True
         
+        # 전송 대기열(outbox): 거래 루프는 적재만 하고 전송/재시도/속도 제한은 전용 스레드가 처리
+        outbox_cfg = self.config.get('outbox', {}) or {}
+        self.outbox_enabled = bool(outbox_cfg.get('enabled', True))
+        try:
+            self.outbox_max_size = max(1, int(outbox_cfg.get('max_size', 200)))
+            self.coalesce_seconds = max(0.0, float(outbox_cfg.get('coalesce_seconds', 3)))
+            self.min_send_interval = max(0.0, float(outbox_cfg.get('min_interval_seconds', 1.0)))
+            self.max_send_retries = max(0, int(outbox_cfg.get('max_retries', 5)))
+        except Exception:
+            self.outbox_max_size = 200
+            self.coalesce_seconds = 3.0
+            self.min_send_interval = 1.0
+            self.max_send_retries = 5
+        self._outbox = deque()  # (text, coalesce_key, enqueued_at)
+        self._outbox_cond = threading.Condition()
+        self._outbox_thread = None
+        self._outbox_closed = False
+        self._outbox_flushing = False
+        self._outbox_inflight = False
+        self._last_sent_at = 0.0
+        self.outbox_stats = {"sent": 0, "failed": 0, "dropped": 0, "retries": 0, "coalesced": 0}
+        
+        # 명령어 작업 풀: 수신 루프(getUpdates)는 막지 않고, 같은 명령어는 처리 중이면 중복 실행하지 않음
+        command_cfg = self.config.get('commands', {}) or {}
+        try:
+            self.command_workers = max(1, int(command_cfg.get('workers', 2)))
+            self.command_timeout_seconds = max(1.0, float(command_cfg.get('timeout_seconds', 20)))
+        except Exception:
+            self.command_workers = 2
+            self.command_timeout_seconds = 20.0
+        # 명령어별 타임아웃(초) 예: {"/weekly": 60}
+        self.command_timeouts = {
+            str(k).lower(): float(v) for k, v in (command_cfg.get('timeouts', {}) or {}).items()
+        }
+        self._command_executor = None
+        self._commands_inflight = {}  # 정규화된 명령어 -> 시작 시각
+        self._commands_lock = threading.Lock()
+        self.command_stats = {"completed": 0, "failed": 0, "deduped": 0, "timed_out": 0}
+        
+        # 명령어 수신: 롱 폴링(getUpdates timeout=poll_timeout_seconds) + 연결 재사용 세션
+        self._poll_session = None
+        self._listen_stop = threading.Event()
+        self._poll_failures = 0
+        self.poll_stats = {"requests": 0, "errors": 0, "updates": 0, "reconnects": 0}
+        
         # enabled=true인 경우 필수 정보 검증
         if self.enabled:
             self.bot_token = self.config.get('bot_token', '')
@@ -65,7 +114,9 @@ class TelegramNotifier:
                     self.enabled = False
                     return
                 
-                self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
+                # api_base_url: 로컬 Bot API 서버/테스트용 가짜 서버로 교체 가능
+                api_base = str(self.config.get('api_base_url', 'https://api.telegram.org')).rstrip('/')
+                self.base_url = f"{api_base}/bot{self.bot_token}"
                 
                 # 알림 설정
                 self.notify_buy_enabled = self.config.get('notify_buy', True)
@@ -77,15 +128,35 @@ class TelegramNotifier:
                 
                 # 명령어 처리
                 self.enable_commands = self.config.get('enable_commands', False)
-                self.poll_timeout_seconds = int(self.config.get('poll_timeout_seconds', 3))
+                try:
+                    self.poll_timeout_seconds = max(0, int(self.config.get('poll_timeout_seconds', 50)))
+                    self.poll_backoff_max_seconds = max(1.0, float(self.config.get('poll_backoff_max_seconds', 60)))
+                except Exception:
+                    self.poll_timeout_seconds = 50
+                    self.poll_backoff_max_seconds = 60.0
                 
                 print("✅ 텔레그램 알림 활성화됨")
     
-    def send_message(self, message):
-        """텔레그램 메시지 전송"""
+    def send_message(self, message, coalesce_key=None, sync=False):
+        """텔레그램 메시지 전송 (기본: outbox에 적재 후 즉시 반환)
+
+        Args:
+            coalesce_key: 같은 키의 메시지가 coalesce_seconds 안에 여러 건 쌓이면 1건으로 묶어 전송
+            sync: True면 대기열을 거치지 않고 바로 전송(결과 반환)
+        """
         if not self.enabled:
             return False
         
+        if sync or not self.outbox_enabled:
+            return self._send_with_retry(message)
+        return self._enqueue(message, coalesce_key)
+    
+    def _post_message(self, message):
+        """sendMessage 1회 호출.
+
+        Returns:
+            (성공 여부, 재시도 대기 초 또는 None(재시도 불가))
+        """
         try:
             url = f"{self.base_url}/sendMessage"
             data = {
@@ -96,31 +167,210 @@ class TelegramNotifier:
             }
             
             response = requests.post(url, data=data, timeout=10)
-            return response.status_code == 200
+            if response.status_code == 200:
+                return True, None
+            if response.status_code == 429:
+                # 텔레그램 속도 제한: parameters.retry_after(초)만큼 대기 후 재시도
+                retry_after = 1.0
+                try:
+                    retry_after = float(response.json().get('parameters', {}).get('retry_after', 1))
+                except Exception:
+                    pass
+                return False, max(0.5, retry_after)
+            if response.status_code >= 500:
+                return False, 0.0
+            print(f"텔레그램 전송 거부: HTTP {response.status_code} {response.text[:200]}")
+            return False, None
             
         except Exception as e:
             print(f"텔레그램 전송 실패: {e}")
-            return False
+            return False, 0.0
+    
+    def _send_with_retry(self, message):
+        """속도 제한(min_interval) + 재시도(429는 retry_after, 그 외 지수 백오프)"""
+        for attempt in range(self.max_send_retries + 1):
+            wait = self.min_send_interval - (time.monotonic() - self._last_sent_at)
+            if wait > 0:
+                time.sleep(wait)
+            self._last_sent_at = time.monotonic()
+            
+            ok, retry_after = self._post_message(message)
+            if ok:
+                self.outbox_stats["sent"] += 1
+                return True
+            if retry_after is None or attempt >= self.max_send_retries:
+                break
+            self.outbox_stats["retries"] += 1
+            backoff = retry_after if retry_after > 0 else min(30.0, 2.0 ** attempt)
+            time.sleep(backoff)
+        
+        self.outbox_stats["failed"] += 1
+        return False
+    
+    def _enqueue(self, message, coalesce_key=None):
+        """outbox 적재 (O(1)). 가득 차면 새 메시지를 버리고 False."""
+        with self._outbox_cond:
+            if len(self._outbox) >= self.outbox_max_size:
+                self.outbox_stats["dropped"] += 1
+                return False
+            self._outbox.append((message, coalesce_key, time.monotonic()))
+            if self._outbox_thread is None or not self._outbox_thread.is_alive():
+                self._outbox_thread = threading.Thread(
+                    target=self._outbox_loop, name="telegram-outbox", daemon=True
+                )
+                self._outbox_thread.start()
+            self._outbox_cond.notify()
+        return True
+    
+    def _take_batch(self):
+        """맨 앞 메시지(+ 같은 coalesce_key 메시지들)를 꺼냄. 종료 시 None."""
+        with self._outbox_cond:
+            while True:
+                if not self._outbox:
+                    if self._outbox_closed:
+                        return None
+                    self._outbox_cond.wait()
+                    continue
+                text, key, enqueued_at = self._outbox[0]
+                if key is not None and not (self._outbox_closed or self._outbox_flushing):
+                    # 묶음 대기: 첫 메시지 적재 후 coalesce_seconds 동안 같은 키 메시지를 모음
+                    remaining = enqueued_at + self.coalesce_seconds - time.monotonic()
+                    if remaining > 0:
+                        self._outbox_cond.wait(remaining)
+                        continue
+                self._outbox.popleft()
+                texts = [text]
+                if key is not None:
+                    rest = deque()
+                    for item in self._outbox:
+                        if item[1] == key:
+                            texts.append(item[0])
+                        else:
+                            rest.append(item)
+                    self._outbox = rest
+                self._outbox_inflight = True
+                return texts
+    
+    @staticmethod
+    def _merge_texts(texts, limit=4000):
+        """여러 메시지를 구분선으로 합침 (텔레그램 4096자 제한 내로 분할)"""
+        if len(texts) == 1:
+            return list(texts)
+        header = f"📦 <b>알림 {len(texts)}건</b>\n\n"
+        separator = "\n──────────\n"
+        chunks = []
+        current = header
+        for text in texts:
+            piece = text.strip()
+            candidate = current + (separator if current != header else "") + piece
+            if len(candidate) > limit and current != header:
+                chunks.append(current)
+                current = piece
+            else:
+                current = candidate
+        chunks.append(current)
+        return chunks
+    
+    def _outbox_loop(self):
+        """outbox 전송 스레드"""
+        while True:
+            texts = self._take_batch()
+            if texts is None:
+                return
+            try:
+                if len(texts) > 1:
+                    self.outbox_stats["coalesced"] += len(texts) - 1
+                for chunk in self._merge_texts(texts):
+                    self._send_with_retry(chunk)
+            except Exception as e:
+                print(f"텔레그램 outbox 오류: {e}")
+            finally:
+                with self._outbox_cond:
+                    self._outbox_inflight = False
+                    self._outbox_cond.notify_all()
+    
+    def get_queue_stats(self):
+        """outbox 상태 (대기/전송/실패/드롭/재시도/묶음 건수)"""
+        stats = dict(self.outbox_stats)
+        stats["pending"] = len(self._outbox)
+        stats["enabled"] = bool(self.enabled and self.outbox_enabled)
+        stats["commands_inflight"] = len(self._commands_inflight)
+        stats.update({f"commands_{k}": v for k, v in self.command_stats.items()})
+        return stats
+    
+    def flush(self, timeout=15.0):
+        """outbox가 비고 전송 중인 메시지가 없을 때까지 대기 (묶음 대기는 즉시 해제)"""
+        deadline = time.monotonic() + float(timeout)
+        with self._outbox_cond:
+            self._outbox_flushing = True  # 묶음 대기 없이 바로 전송
+            self._outbox_cond.notify_all()
+            while self._outbox or self._outbox_inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._outbox_thread is None or not self._outbox_thread.is_alive():
+                    break
+                self._outbox_cond.wait(min(remaining, 0.2))
+            empty = not self._outbox and not self._outbox_inflight
+            self._outbox_flushing = False
+        return empty
     
     def get_updates(self):
-        """새 메시지 확인"""
+        """새 메시지 확인 (롱 폴링, 실패 시 빈 목록)"""
+        updates, _ = self._poll_updates()
+        return updates or []
+    
+    def _poll_updates(self):
+        """getUpdates 1회 (새 메시지가 오거나 poll_timeout_seconds가 지날 때까지 서버에서 대기).
+
+        Returns:
+            (업데이트 목록 또는 실패 시 None, 재시도 대기 초 또는 None)
+        """
+        self.poll_stats["requests"] += 1
         try:
+            if self._poll_session is None:
+                self._poll_session = requests.Session()
             url = f"{self.base_url}/getUpdates"
             params = {
                 'offset': self.last_update_id + 1,
-                'timeout': self.poll_timeout_seconds
+                'timeout': self.poll_timeout_seconds,
+                'allowed_updates': '["message"]',
             }
             
-            response = requests.get(url, params=params, timeout=self.poll_timeout_seconds + 5)
+            # 읽기 타임아웃은 서버 대기 시간보다 길게
+            response = self._poll_session.get(url, params=params, timeout=(5, self.poll_timeout_seconds + 10))
             if response.status_code == 200:
                 data = response.json()
                 if data.get('ok'):
-                    return data.get('result', [])
-            return []
+                    return data.get('result', []), None
+            retry_after = None
+            if response.status_code == 429:
+                try:
+                    retry_after = float(response.json().get('parameters', {}).get('retry_after', 1))
+                except Exception:
+                    retry_after = 1.0
+            print(f"업데이트 확인 실패: HTTP {response.status_code}")
+            return None, retry_after
             
         except Exception as e:
             print(f"업데이트 확인 실패: {e}")
-            return []
+            return None, None
+    
+    def _poll_backoff(self, retry_after=None):
+        """연속 실패 횟수 기반 지수 백오프 + 지터 (동시 재접속 분산)"""
+        delay = min(self.poll_backoff_max_seconds, 1.0 * (2 ** max(0, self._poll_failures - 1)))
+        delay = random.uniform(delay / 2.0, delay)
+        if retry_after:
+            delay = max(delay, float(retry_after))
+        return delay
+    
+    def _reset_poll_session(self):
+        """실패한 연결은 버리고 다음 요청에서 새로 연결"""
+        session = self._poll_session
+        self._poll_session = None
+        if session is not None:
+            try:
+                session.close()
+            except Exception:
+                pass
     
     def start_listening(self, command_handler):
         """명령어 수신 시작"""
@@ -132,20 +382,87 @@ class TelegramNotifier:
         
         self.command_handler = command_handler
         self.is_listening = True
-        self.command_thread = threading.Thread(target=self._listen_loop, daemon=True)
+        self._listen_stop.clear()
+        self.command_thread = threading.Thread(target=self._listen_loop, name="telegram-listener", daemon=True)
         self.command_thread.start()
         
         return True
     
     def stop_listening(self):
-        """명령어 수신 중지"""
+        """명령어 수신 중지 (처리 중인 명령어는 끝까지 실행)"""
         self.is_listening = False
+        self._listen_stop.set()
+        with self._commands_lock:
+            executor, self._command_executor = self._command_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+    
+    def dispatch_command(self, text):
+        """명령어를 작업 풀에 제출. 같은 명령어가 처리 중이면 건너뜀."""
+        key = " ".join(str(text).strip().lower().split())
+        now = time.monotonic()
+        with self._commands_lock:
+            if key in self._commands_inflight:
+                self.command_stats["deduped"] += 1
+                elapsed = now - self._commands_inflight[key]
+                self.send_message(f"⏳ 이미 처리 중인 명령어입니다: {key} ({elapsed:.0f}초 경과)")
+                return None
+            self._commands_inflight[key] = now
+            if self._command_executor is None:
+                self._command_executor = ThreadPoolExecutor(
+                    max_workers=self.command_workers, thread_name_prefix="telegram-cmd"
+                )
+            # 잠금 밖에서 stop_listening이 None으로 바꾸거나 종료해도 같은 풀에 제출하도록 지역 변수로 보관
+            executor = self._command_executor
+        
+        timeout = self.command_timeouts.get(key.split()[0], self.command_timeout_seconds)
+        timer = threading.Timer(timeout, self._on_command_timeout, args=(key, timeout))
+        timer.daemon = True
+        try:
+            future = executor.submit(self._run_command, key, text, timer)
+        except RuntimeError:
+            # 종료 중(풀 shutdown 이후 제출) -> 명령어 실행 안 함
+            with self._commands_lock:
+                self._commands_inflight.pop(key, None)
+            print(f"명령어 무시(수신 종료 중): {key}")
+            return None
+        timer.start()
+        return future
+    
+    def _run_command(self, key, text, timer):
+        try:
+            self.command_handler(text)
+            self.command_stats["completed"] += 1
+        except Exception as e:
+            self.command_stats["failed"] += 1
+            print(f"명령어 처리 오류({key}): {e}")
+        finally:
+            timer.cancel()
+            with self._commands_lock:
+                self._commands_inflight.pop(key, None)
+    
+    def _on_command_timeout(self, key, timeout):
+        """명령어가 제한 시간을 넘김 (스레드는 중단할 수 없으므로 안내만, 결과는 완료 시 전송)"""
+        with self._commands_lock:
+            if key not in self._commands_inflight:
+                return
+        self.command_stats["timed_out"] += 1
+        self.send_message(f"⌛ 명령어 처리가 {timeout:.0f}초를 넘었습니다: {key}\n완료되면 결과를 보내드립니다.")
     
     def _listen_loop(self):
         """명령어 수신 루프"""
         while self.is_listening:
             try:
-                updates = self.get_updates()
+                updates, retry_after = self._poll_updates()
+                if updates is None:
+                    self.poll_stats["errors"] += 1
+                    self._poll_failures += 1
+                    self.poll_stats["reconnects"] += 1
+                    self._reset_poll_session()
+                    self._listen_stop.wait(self._poll_backoff(retry_after))
+                    continue
+                self._poll_failures = 0
+                self.poll_stats["updates"] += len(updates)
                 
                 for update in updates:
                     self.last_update_id = update['update_id']
@@ -158,15 +475,20 @@ class TelegramNotifier:
                             text = message.get('text', '')
                             
                             if text.startswith('/'):
-                                # 명령어 처리
+                                # 명령어 처리 (작업 풀에서 실행, 수신 루프는 계속)
                                 if self.command_handler:
-                                    self.command_handler(text)
+                                    self.dispatch_command(text)
                 
-                time.sleep(1)  # API 호출 제한
+                # 롱 폴링이므로 대기 없이 바로 다음 요청 (서버가 새 메시지까지 응답을 보류)
+                if self.poll_timeout_seconds <= 0:
+                    self._listen_stop.wait(1)
                 
             except Exception as e:
                 print(f"명령어 수신 오류: {e}")
-                time.sleep(5)
+                self._poll_failures += 1
+                self._listen_stop.wait(self._poll_backoff())
+        
+        self._reset_poll_session()
     
     def notify_start(
         self,
@@ -245,7 +567,7 @@ class TelegramNotifier:
 🕐 {datetime.now().strftime('%H:%M:%S')}
 """
         
-        success = self.send_message(message)
+        success = self.send_message(message, coalesce_key='buy')
         
         if not success:
             print(f"⚠️  텔레그램 매수 알림 전송 실패: {ticker}")
@@ -295,7 +617,7 @@ class TelegramNotifier:
 🕐 {datetime.now().strftime('%H:%M:%S')}
 """
         
-        success = self.send_message(message)
+        success = self.send_message(message, coalesce_key='sell')
         
         if not success:
             print(f"⚠️  텔레그램 매도 알림 전송 실패: {ticker}")
@@ -314,7 +636,7 @@ class TelegramNotifier:
 
 🕐 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 """
-        self.send_message(message)
+        self.send_message(message, coalesce_key='error')
     
     def notify_daily_summary(self, stats):
         """일일 요약 알림"""
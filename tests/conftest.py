@@ -0,0 +1,21 @@
+import pytest
+
+from fake_telegram import FakeTelegramServer
+from telegram_notifier import TelegramNotifier
+
+
+@pytest.fixture
+def fake_telegram():
+    """가짜 Telegram Bot API 서버 (테스트 종료 시 정지)."""
+    server = FakeTelegramServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def telegram_notifier(fake_telegram):
+    """fake_telegram에 연결된 TelegramNotifier (종료 시 수신/전송 정리)."""
+    notifier = TelegramNotifier(fake_telegram.notifier_config())
+    yield notifier
+    notifier.stop_listening()
+    notifier.flush(timeout=2)
@@ -0,0 +1,174 @@
+"""
+테스트/벤치마크용 가짜 Telegram Bot API 서버 (프로세스 내 HTTP 서버)
+
+sendMessage, getUpdates(롱 폴링), getMe를 구현하며 지연/오류/429 응답을 주입할 수 있습니다.
+TelegramNotifier의 telegram.api_base_url을 base_url로 지정해 사용합니다.
+"""
+
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import json
+import threading
+import time
+
+
+TEST_TOKEN = "123456789:" + "A" * 35
+TEST_CHAT_ID = "1"
+
+
+class FakeTelegramServer:
+    """가짜 Bot API. start() 후 base_url을 TelegramNotifier에 연결."""
+
+    def __init__(self, latency=0.0):
+        self.latency = float(latency)
+        self.sent = []  # sendMessage 요청 본문(dict)
+        self.calls = Counter()  # 메서드별 요청 수
+        self._faults = {}  # method -> deque[(status, retry_after)]
+        self._updates = []
+        self._next_update_id = 1
+        self._cond = threading.Condition()
+        self._closed = False
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                server._handle(self, parsed.path, parse_qs(parsed.query))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                parsed = urlparse(self.path)
+                params = parse_qs(parsed.query)
+                params.update(parse_qs(body))
+                server._handle(self, parsed.path, params)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-telegram", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    def notifier_config(self, **overrides):
+        """이 서버에 연결된 TelegramNotifier 설정."""
+        cfg = {
+            "enabled": True,
+            "bot_token": TEST_TOKEN,
+            "chat_id": TEST_CHAT_ID,
+            "api_base_url": self.base_url,
+            "enable_commands": True,
+            "poll_timeout_seconds": 2,
+            "outbox": {"coalesce_seconds": 0, "min_interval_seconds": 0},
+        }
+        cfg.update(overrides)
+        return {"telegram": cfg}
+
+    # ---- 주입 ----
+    def inject(self, method, status, count=1, retry_after=None):
+        """다음 count회 method 요청에 status로 응답 (429는 retry_after 포함)."""
+        with self._cond:
+            queue = self._faults.setdefault(method, deque())
+            for _ in range(count):
+                queue.append((int(status), retry_after))
+
+    def push_message(self, text, chat_id=TEST_CHAT_ID):
+        """사용자가 봇에게 보낸 메시지 1건 추가 (대기 중인 getUpdates 즉시 응답)."""
+        with self._cond:
+            update = {
+                "update_id": self._next_update_id,
+                "message": {
+                    "message_id": self._next_update_id,
+                    "chat": {"id": int(chat_id)},
+                    "date": int(time.time()),
+                    "text": text,
+                },
+            }
+            self._next_update_id += 1
+            self._updates.append(update)
+            self._cond.notify_all()
+            return update["update_id"]
+
+    def wait_for_sent(self, count, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(self.sent) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    # ---- 처리 ----
+    def _handle(self, handler, path, params):
+        method = path.rsplit("/", 1)[-1]
+        if f"/bot{TEST_TOKEN}/" not in path:
+            return self._reply(handler, 401, {"ok": False, "error_code": 401, "description": "Unauthorized"})
+        with self._cond:
+            self.calls[method] += 1
+            queue = self._faults.get(method)
+            fault = queue.popleft() if queue else None
+        if self.latency:
+            time.sleep(self.latency)
+        if fault is not None:
+            status, retry_after = fault
+            body = {"ok": False, "error_code": status, "description": "injected"}
+            if retry_after is not None:
+                body["parameters"] = {"retry_after": retry_after}
+            return self._reply(handler, status, body)
+
+        first = lambda key, default=None: (params.get(key) or [default])[0]
+        if method == "sendMessage":
+            message = {k: first(k) for k in params}
+            with self._cond:
+                self.sent.append(message)
+                self._cond.notify_all()
+            return self._reply(handler, 200, {"ok": True, "result": {"message_id": len(self.sent)}})
+        if method == "getUpdates":
+            offset = int(first("offset", 0) or 0)
+            wait = float(first("timeout", 0) or 0)
+            deadline = time.monotonic() + wait
+            with self._cond:
+                while True:
+                    result = [u for u in self._updates if u["update_id"] >= offset]
+                    remaining = deadline - time.monotonic()
+                    if result or remaining <= 0 or self._closed:
+                        break
+                    self._cond.wait(remaining)
+            return self._reply(handler, 200, {"ok": True, "result": result})
+        if method == "getMe":
+            return self._reply(handler, 200, {"ok": True, "result": {"id": 123456789, "username": "fake_bot"}})
+        return self._reply(handler, 404, {"ok": False, "error_code": 404, "description": "Not Found"})
+
+    @staticmethod
+    def _reply(handler, status, body):
+        data = json.dumps(body).encode("utf-8")
+        try:
+            handler.send_response(status)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(data)))
+            handler.end_headers()
+            handler.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
@@ -0,0 +1,66 @@
+import unittest
+
+import upbit_api
+from api_stats import ApiStats, parse_remaining_req
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, remaining="group=candles; min=599; sec=9"):
+        self.headers = {"Remaining-Req": remaining}
+
+
+class ApiStatsTests(unittest.TestCase):
+    def test_parse_remaining_req(self):
+        self.assertEqual(
+            parse_remaining_req("group=market; min=573; sec=2"),
+            {"group": "market", "min": 573, "sec": 2},
+        )
+        self.assertIsNone(parse_remaining_req(""))
+        self.assertIsNone(parse_remaining_req("garbage"))
+
+    def test_counts_errors_and_percentiles(self):
+        stats = ApiStats()
+        for ms in range(1, 101):
+            stats.observe({"method": "GET", "endpoint": "/v1/ticker", "elapsed_ms": float(ms)})
+        stats.observe(
+            {"method": "POST", "endpoint": "/v1/orders", "elapsed_ms": 40.0, "status": 429, "error": "TooManyRequests"}
+        )
+        stats.mark_loop()
+        stats.mark_loop()
+
+        snap = stats.snapshot(reset_window=True)
+        ticker = snap["endpoints"]["GET /v1/ticker"]
+        self.assertEqual(ticker["count"], 100)
+        self.assertEqual(ticker["errors"], 0)
+        self.assertEqual(ticker["p50_ms"], 51.0)
+        self.assertEqual(ticker["p95_ms"], 95.0)
+        self.assertEqual(ticker["p99_ms"], 99.0)
+        orders = snap["endpoints"]["POST /v1/orders"]
+        self.assertEqual((orders["errors"], orders["status_429"]), (1, 1))
+        self.assertEqual(snap["window"]["calls"], 101)
+        self.assertEqual(snap["window"]["calls_per_loop"], 50.5)
+        self.assertEqual(stats.snapshot()["window"]["calls"], 0)
+
+        hist = stats.histograms()["GET /v1/ticker"]
+        self.assertEqual(hist["buckets"][-1], 100)
+        self.assertEqual(hist["buckets"][0], 10)  # <= 10ms
+
+    def test_hook_feeds_stats(self):
+        stats = ApiStats()
+        hook = upbit_api._make_wrapper("GET", lambda url, **kwargs: FakeResponse())
+        upbit_api.add_observer(stats.observe)
+        try:
+            hook("https://api.upbit.com/v1/candles/minutes/5", params={"market": "KRW-BTC"})
+        finally:
+            upbit_api.remove_observer(stats.observe)
+
+        snap = stats.snapshot()
+        self.assertEqual(snap["endpoints"]["GET /v1/candles/minutes/5"]["count"], 1)
+        self.assertEqual(snap["remaining_req"]["candles"]["sec"], 9)
+        self.assertEqual(snap["remaining_req"]["candles"]["min"], 599)
+
+
+if __name__ == "__main__":
+    unittest.main()
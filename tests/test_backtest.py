@@ -0,0 +1,165 @@
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backtest import Backtester, btc_filter_series, build_engine, regime_candidates
+
+
+CONFIG = {
+    "trading": {"fee_pct": 0.05, "min_trade_amount": 5000, "max_total_investment": 10000000},
+    "strategy": {
+        "signal_candle_minutes": 20,
+        "doge_volume_spike_min": 1.0,
+        "doge_rsi_min": 50,
+        "ada_rsi_max": 40,
+        "ada_entry_lower_pct": 0.25,
+        "entry_time_filter": {"start_hour": 0, "end_hour": 0},
+    },
+}
+
+
+def make_5m(seed, periods, start="2025-01-01", drift=0.0):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=periods, freq="5min")
+    # 추세 구간이 번갈아 나오도록 느린 사인 드리프트 추가
+    trend = drift + 0.0004 * np.sin(np.arange(periods) / 700.0)
+    close = 100 * np.exp(np.cumsum(trend + rng.normal(0, 0.004, periods)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, periods)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, periods)))
+    volume = rng.lognormal(0, 0.6, periods)
+    return pd.DataFrame(
+        {"open": open_, "high": high, "low": low, "close": close, "volume": volume, "value": volume * close},
+        index=idx,
+    )
+
+
+def make_history(days):
+    """BTC(약한 상승 드리프트) + 전략 3종목의 5분봉 dict."""
+    periods = days * 24 * 12
+    return {
+        "KRW-BTC": make_5m(1, periods, drift=0.00002),
+        "KRW-SOL": make_5m(2, periods),
+        "KRW-DOGE": make_5m(3, periods),
+        "KRW-ADA": make_5m(4, periods),
+    }
+
+
+class _Stats:
+    positions = {}
+
+
+class LiveAgreementTests(unittest.TestCase):
+    def test_entry_signals_match_check_buy_signal_bar_for_bar(self):
+        engine = build_engine(CONFIG)
+        engine.stats = _Stats()
+        engine._check_btc_trend_filter = lambda: (True, {})
+        engine._is_entry_time_blocked = lambda hour=None: False
+        engine._size_by_risk = lambda ticker, entry, stop: {"recommended_invest_krw": 1e9, "risk_pct": 0.5}
+
+        cases = (
+            ("KRW-SOL", "BULL", "sol_entry", 10),
+            ("KRW-DOGE", "RANGE", "doge_entry", 10),
+            ("KRW-ADA", "RANGE", "ada_entry", 14),
+        )
+        for ticker, regime, column, seed in cases:
+            with self.subTest(ticker=ticker):
+                bars = engine.resample_ohlcv(make_5m(seed, 4 * 400), 20)
+                lookback = engine.analysis_window()
+                frame = engine.compute_signal_frame(bars, live_window=lookback)
+                vector = (
+                    frame.join(engine.compute_entry_frame(frame))[column]
+                    & ~(frame["tr_atr_ratio"] > engine.volatility_tr_atr_max)
+                )
+                engine.update_global_regime = lambda force=False, r=regime: (r, {})
+
+                live = []
+                for k in range(208, len(bars) - 1):
+                    # 실거래와 같은 조회 봉 수 (EMA는 프레임 첫 봉에서 시작)
+                    engine._get_resampled_ohlcv = lambda *a, k=k, **kw: bars.iloc[: k + 2].tail(lookback)
+                    ok = engine.check_buy_signal(ticker)[0]
+                    live.append(bool(ok))
+
+                expected = vector.iloc[208 : len(bars) - 1].tolist()
+                self.assertEqual(live, expected)
+                self.assertGreater(sum(live), 0)
+
+    def test_regime_and_btc_filter_match_live_bar_for_bar(self):
+        engine = build_engine(CONFIG)
+        bars = engine.resample_ohlcv(make_5m(1, 4 * 600, drift=0.00002), 20)
+        candidates = regime_candidates(engine, bars)
+        btc_ok = btc_filter_series(engine, bars)
+
+        live_regime, live_btc = [], []
+        for k in range(208, len(bars) - 1):
+            window = {engine.regime_window: bars.iloc[: k + 2].tail(engine.regime_window),
+                      engine.btc_filter_window(): bars.iloc[: k + 2].tail(engine.btc_filter_window())}
+            engine._get_resampled_ohlcv = lambda *a, count=None, w=window, **kw: w[count]
+            live_regime.append(engine.detect_global_regime()[0])
+            live_btc.append(bool(engine._check_btc_trend_filter()[0]))
+
+        self.assertEqual(live_regime, list(candidates[208 : len(bars) - 1]))
+        self.assertEqual(live_btc, btc_ok.iloc[208 : len(bars) - 1].tolist())
+        self.assertEqual(len(set(live_regime)), 3)
+
+
+class BacktesterTests(unittest.TestCase):
+    def test_year_of_bars_runs_in_seconds(self):
+        history = make_history(365)
+        t0 = time.perf_counter()
+        result = Backtester(CONFIG, initial_krw=1000000).run(history)
+        elapsed = time.perf_counter() - t0
+
+        summary = result["summary"]
+        self.assertLess(elapsed, 15)
+        self.assertGreater(summary["bars"], 26000)
+        self.assertGreater(summary["trades"], 0)
+        self.assertEqual(set(summary["by_strategy"]) - {"SOL_TREND", "DOGE_MOMENTUM", "ADA_RANGE"}, set())
+        for trade in result["trades"]:
+            self.assertGreater(trade["sell_fee_krw"], 0)
+            self.assertLessEqual(trade["entry_time"], trade["exit_time"])
+        total = sum(t["profit_after_fees_krw"] for t in result["trades"])
+        self.assertAlmostEqual(summary["final_krw"] - summary["initial_krw"], total, places=4)
+
+    def test_stop_partial_take_profit_and_time_stop(self):
+        bt = Backtester(CONFIG, initial_krw=1000000)
+        times = pd.date_range("2025-01-01", periods=4, freq="20min")
+        trades = []
+
+        def bar(o, h, lo, c):
+            return {"open": np.array([o]), "high": np.array([h]), "low": np.array([lo]), "close": np.array([c])}
+
+        def position(strategy, stop):
+            return {
+                "strategy": strategy, "entry_bar": 0, "buy_price": 100.0, "amount": 10.0,
+                "stop_price": stop, "risk_unit": 100.0 - stop, "target_price": np.nan,
+                "highest_price": 100.0, "buy_fee_remaining": 0.5, "tp1_done": False,
+                "trailing_active": False, "trailing_stop": stop,
+            }
+
+        # 시가가 손절가 아래로 갭 하락 -> 시가 체결
+        positions = {"KRW-SOL": position("SOL_TREND", 98.0)}
+        bt._manage(positions, trades, "KRW-SOL", bar(97.0, 97.5, 96.0, 97.0), 0, times, 20, 0.0)
+        self.assertEqual((trades[-1]["reason"], trades[-1]["sell_price"]), ("구조손절", 97.0))
+        self.assertNotIn("KRW-SOL", positions)
+
+        # 1.2R 도달 -> 30% 분할 익절, 나머지 보유
+        positions = {"KRW-SOL": position("SOL_TREND", 98.0)}
+        bt._manage(positions, trades, "KRW-SOL", bar(100.0, 102.5, 99.5, 102.0), 0, times, 20, 0.0)
+        self.assertEqual(trades[-1]["reason"], "SOL 1차익절")
+        self.assertAlmostEqual(trades[-1]["amount"], 3.0)
+        self.assertAlmostEqual(positions["KRW-SOL"]["amount"], 7.0)
+
+        # DOGE: 목표 미도달 상태로 time_stop_candles 경과 -> 종가 청산
+        positions = {"KRW-DOGE": position("DOGE_MOMENTUM", 99.2)}
+        idx = bt.engine.doge_time_stop_candles - 1
+        times = pd.date_range("2025-01-01", periods=idx + 1, freq="20min")
+        flat = {k: np.full(idx + 1, 100.1) for k in ("open", "high", "low", "close")}
+        bt._manage(positions, trades, "KRW-DOGE", flat, idx, times, 20, 0.0)
+        self.assertEqual(trades[-1]["reason"], "DOGE 시간청산")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import clock
+from test_orderbook import FakeLogger, FakeStats, make_config
+from trading_engine import TradingEngine
+
+
+def make_candles(end, count, minutes=5, base=100.0):
+    index = pd.date_range(end=end, periods=count, freq=f"{minutes}min")
+    close = base + np.arange(count, dtype=float)
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": np.ones(count),
+            "value": close,
+        },
+        index=index,
+    )
+
+
+class CandleCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.config = make_config()
+        self.config["candle_cache"] = {"path": os.path.join(self.tmpdir, "candles.npz")}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_restart_fetches_only_gap(self):
+        last = pd.Timestamp.now().floor("5min")
+        history = make_candles(last - pd.Timedelta(minutes=5), 300)
+
+        engine = TradingEngine(self.config, FakeLogger(), FakeStats())
+        with patch("trading_engine.pyupbit.get_ohlcv", return_value=history):
+            engine._get_cached_ohlcv("KRW-SOL", interval="minute5", count=200, ttl_seconds=0)
+        engine.global_regime = "TREND_UP"
+        self.assertTrue(engine.save_candle_cache(force=True))
+
+        restarted = TradingEngine(self.config, FakeLogger(), FakeStats())
+        self.assertEqual(restarted.load_candle_cache(), 1)
+        self.assertEqual(restarted.global_regime, "TREND_UP")
+
+        # 마지막 저장 캔들과 겹치는 2개 + 신규 1개만 돌려주는 응답
+        gap = make_candles(last, 3, base=1000.0)
+        with patch("trading_engine.pyupbit.get_ohlcv", return_value=gap) as mocked:
+            df = restarted._get_cached_ohlcv("KRW-SOL", interval="minute5", count=200, ttl_seconds=0)
+
+        self.assertEqual(mocked.call_count, 1)
+        self.assertLessEqual(mocked.call_args.kwargs["count"], 4)
+        self.assertEqual(len(df), 200)
+        self.assertEqual(df.index[-1], last)
+        self.assertEqual(float(df["close"].iloc[-1]), 1002.0)
+        self.assertTrue(df.index.is_monotonic_increasing)
+
+    def test_shorter_request_does_not_shrink_store(self):
+        # 레짐(1080개)과 BTC 필터(920개)가 같은 KRW-BTC 5분봉을 번갈아 조회
+        history = make_candles(pd.Timestamp("2025-01-10 12:00"), 3000)
+        sim = clock.SimulatedClock("2025-01-10 11:00:30")
+        previous = clock.set_clock(sim)
+
+        def fake_get_ohlcv(ticker, interval="minute5", count=200, to=None):
+            df = history[history.index <= pd.Timestamp(clock.now())]
+            if to is not None:
+                df = df[df.index < pd.Timestamp(to).tz_localize(None) + pd.Timedelta(hours=9)]
+            return df.tail(count)
+
+        engine = TradingEngine(self.config, FakeLogger(), FakeStats())
+        try:
+            with patch("trading_engine.pyupbit.get_ohlcv", side_effect=fake_get_ohlcv), \
+                    patch("trading_engine.clock.sleep"):
+                for step in range(4):
+                    for count in (1080, 920):
+                        df = engine._get_cached_ohlcv("KRW-BTC", interval="minute5", count=count, ttl_seconds=0)
+                        self.assertEqual(len(df), count)
+                        self.assertEqual(df.index[-1], pd.Timestamp(clock.now()).floor("5min"))
+                    sim.advance(300)
+        finally:
+            clock.set_clock(previous)
+
+        self.assertEqual(engine.cache_stats["ohlcv_full"], 1)
+        self.assertEqual(engine.cache_stats["ohlcv_gap"], 7)
+        self.assertEqual(len(engine._candle_store[("KRW-BTC", "minute5")]), 1080)
+
+
+if __name__ == "__main__":
+    unittest.main()
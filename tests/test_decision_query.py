@@ -0,0 +1,110 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import timeit
+import unittest
+from datetime import datetime, timedelta
+
+from decision_log import DecisionRecord, DecisionSerializer, compress_decision_log, load_index
+from decision_query import DecisionQuery
+from logger import TradingLogger
+
+
+class DecisionArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _write_log(self, path):
+        serializer = DecisionSerializer()
+        base = datetime(2026, 10, 13, 0, 0, 0)
+        meta = {"strategy": "DOGE_MOMENTUM", "blocked_by": ["시간필터"]}
+        with open(path, "w", encoding="utf-8") as f:
+            for i in range(40):
+                ticker = "KRW-DOGE" if i % 2 else "KRW-SOL"
+                event = "BUY_BLOCKED" if i % 4 in (1, 2) else "LOOP_HEARTBEAT"
+                record = DecisionRecord(event, {"ticker": ticker, "meta": meta}, serializer,
+                                        ts=base + timedelta(minutes=15 * i))
+                f.write(str(record) + "\n")
+
+    def test_record_snapshots_nested_payload(self):
+        meta = {"sizing": {"risk_pct": 0.5, "caps": [1, 2]}}
+        record = DecisionRecord("BUY_SIGNAL", {"ticker": "KRW-SOL", "meta": meta}, DecisionSerializer())
+        meta["sizing"]["risk_pct"] = 9.9
+        meta["sizing"]["caps"].append(3)
+        self.assertEqual(record.payload["meta"]["sizing"], {"risk_pct": 0.5, "caps": [1, 2]})
+        # tuple은 복사 없이 그대로 (불변)
+        record = DecisionRecord("BUY_SIGNAL", {"ticker": "KRW-SOL", "range": (1, 2)}, DecisionSerializer())
+        self.assertEqual(record.payload["range"], (1, 2))
+
+    def test_caller_cost_below_inline_json(self):
+        # 매수 시그널 크기의 payload: 호출 스레드 비용(스냅샷)이 직렬화보다 작아야 함
+        meta = {f"field_{i}": 1.25 * i for i in range(20)}
+        meta.update(
+            ticker="KRW-SOL", strategy="SOL_TREND", candle_ts="2026-10-01 12:00:00", signals=["a", "b", "c"],
+            blocked_by=[], btc_filter={"enabled": True, "close": 1.0, "ema": 2.0, "passed": True},
+            sizing={"risk_pct": 0.5, "recommended_invest_krw": 100000.0},
+        )
+        payload = {"ticker": "KRW-SOL", "current_price": 123.0, "signals": ["a", "b", "c"], "score": 4, "meta": meta}
+        serializer = DecisionSerializer()
+
+        def best(fn):
+            return min(timeit.repeat(fn, number=2000, repeat=5))
+
+        inline = best(lambda: json.dumps(payload, ensure_ascii=False))
+        snapshot = best(lambda: DecisionRecord("BUY_SIGNAL", payload, serializer))
+        self.assertLess(snapshot, inline)
+
+    def test_compressed_blocks_are_self_contained_and_indexed(self):
+        source = os.path.join(self.tmpdir, "decisions.log.2026-10-13")
+        self._write_log(source)
+        dest = os.path.join(self.tmpdir, "decisions.log.2026-10-13.gz")
+        blocks = compress_decision_log(source, dest, block_lines=8)
+        os.remove(source)
+
+        self.assertEqual(len(blocks), 5)
+        self.assertEqual(len(load_index(dest)["blocks"]), 5)
+        # 블록 멤버를 이어 붙인 파일도 일반 gzip으로 읽힘
+        with gzip.open(dest, "rt", encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 40)
+
+        stats = {}
+        rows = list(DecisionQuery(self.tmpdir).iter_records(
+            since="2026-10-13 02:00", until="2026-10-13 06:00",
+            events=["BUY_BLOCKED"], ticker="DOGE", stats=stats,
+        ))
+        self.assertTrue(rows)
+        for row in rows:
+            self.assertEqual(row["payload"]["ticker"], "KRW-DOGE")
+            self.assertEqual(row["payload"]["meta"]["strategy"], "DOGE_MOMENTUM")
+            self.assertTrue("2026-10-13 02:00:00" <= row["ts"] <= "2026-10-13 06:00:59")
+        self.assertLess(stats["blocks_read"], stats["blocks_total"])
+
+    def test_rollover_compresses_decision_log(self):
+        config = {"logging": {
+            "log_dir": self.tmpdir, "rotation_hours": 24, "max_backup_count": 3,
+            "console_log_level": "CRITICAL", "file_log_level": "DEBUG", "async": False,
+        }}
+        logger = TradingLogger(config)
+        logger.log_decision("BUY_BLOCKED", {"ticker": "KRW-DOGE", "meta": {"a": 1}})
+        handler = logger.decision_logger.handlers[0]
+        handler.doRollover()
+        logger.log_decision("BUY_BLOCKED", {"ticker": "KRW-DOGE", "meta": {"a": 1}})
+        logger.flush()
+
+        archives = [n for n in os.listdir(self.tmpdir) if n.startswith("decisions.log.") and n.endswith(".gz")]
+        self.assertEqual(len(archives), 1)
+        self.assertIsNotNone(load_index(os.path.join(self.tmpdir, archives[0])))
+
+        rows = list(DecisionQuery(self.tmpdir).iter_records(ticker="KRW-DOGE"))
+        self.assertEqual(len(rows), 2)
+        # 로테이션 후 새 파일은 참조가 아닌 본문으로 시작
+        self.assertIn("meta_id", rows[1]["payload"])
+
+
+if __name__ == "__main__":
+    unittest.main()
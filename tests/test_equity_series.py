@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from equity_series import EQUITY_DTYPE, EquitySeries
+
+
+class EquitySeriesTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_downsampling_keeps_bucket_close(self):
+        series = EquitySeries(self.tmpdir)
+        base = datetime(2026, 10, 1, 12, 0, 0)
+        # 1분 버킷마다 3개 샘플(20초 간격), 3분 동안
+        for i in range(9):
+            series.append(1000.0, 1000.0 + i, ts=base + timedelta(seconds=20 * i))
+
+        raw = series.read(base, base + timedelta(minutes=5), 'raw')
+        self.assertEqual(raw.size, 9)
+        self.assertEqual(raw.dtype, EQUITY_DTYPE)
+
+        minute = series.read(base, base + timedelta(minutes=5), '1m')
+        self.assertEqual(list(minute['value']), [1002.0, 1005.0, 1008.0])
+
+        # flush 이후에는 새 인스턴스에서도 파일로 동일하게 조회
+        series.flush()
+        reopened = EquitySeries(self.tmpdir)
+        self.assertEqual(list(reopened.read(base, base + timedelta(minutes=5), '1m')['value']),
+                         [1002.0, 1005.0, 1008.0])
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir, '1h', '202610.bin')))
+
+    def test_restart_within_bucket_keeps_one_close(self):
+        base = datetime(2026, 10, 1, 12, 10, 0)
+        series = EquitySeries(self.tmpdir)
+        series.append(500.0, 1000.0, ts=base)
+        series.flush()
+        # 같은 시간대 안에서 재시작 -> 1h 버킷이 파일에 두 번 기록되어도 마지막 종가 1건만 조회
+        series = EquitySeries(self.tmpdir)
+        series.append(500.0, 1010.0, ts=base + timedelta(minutes=20))
+        series.flush()
+        hourly = EquitySeries(self.tmpdir).read(base - timedelta(hours=1), base + timedelta(hours=1), '1h')
+        self.assertEqual(list(hourly['value']), [1010.0])
+
+        # flush 없이 종료(크래시) -> 다음 시작 시 raw 마지막 샘플로 진행 중 버킷 복구
+        series = EquitySeries(self.tmpdir)
+        series.append(500.0, 1020.0, ts=base + timedelta(minutes=30))
+        del series
+        series = EquitySeries(self.tmpdir)
+        series.append(500.0, 1030.0, ts=base + timedelta(hours=1))
+        series.flush()
+        hourly = EquitySeries(self.tmpdir).read(base - timedelta(hours=1), base + timedelta(hours=2), '1h')
+        self.assertEqual(list(hourly['value']), [1020.0, 1030.0])
+
+    def test_window_metrics(self):
+        series = EquitySeries(self.tmpdir)
+        base = datetime(2026, 10, 1, 0, 0, 0)
+        values = [100.0, 110.0, 99.0, 105.0, 120.0]
+        for i, v in enumerate(values):
+            series.append(v / 2, v, ts=base + timedelta(minutes=i))
+
+        m = series.window_metrics(base, base + timedelta(minutes=10), '1m')
+        self.assertEqual(m['samples'], 5)
+        self.assertAlmostEqual(m['max_drawdown_pct'], -10.0)
+        self.assertAlmostEqual(m['exposure_pct'], 50.0)
+        self.assertAlmostEqual(m['return_pct'], 20.0)
+        self.assertTrue(np.isfinite(m['sharpe']))
+
+        empty = series.window_metrics(base - timedelta(days=3), base - timedelta(days=2))
+        self.assertEqual(empty['samples'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
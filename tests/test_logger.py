@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import unittest
+
+from logger import TradingLogger, _BoundedQueueHandler
+
+
+def make_config(log_dir, **overrides):
+    logging_cfg = {
+        "log_dir": log_dir,
+        "rotation_hours": 24,
+        "max_backup_count": 3,
+        "console_log_level": "CRITICAL",
+        "file_log_level": "DEBUG",
+    }
+    logging_cfg.update(overrides)
+    return {"logging": logging_cfg}
+
+
+class AsyncLoggerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_records_reach_files_after_flush(self):
+        logger = TradingLogger(make_config(self.tmpdir))
+        try:
+            self.assertTrue(logger.get_queue_stats()["async"])
+            logger.info("hello-async")
+            logger.log_decision("TEST_EVENT", {"k": 1})
+            try:
+                raise ValueError("boom")
+            except ValueError as e:
+                logger.log_error("failure", e)
+            logger.flush()
+
+            with open(os.path.join(self.tmpdir, "trading_bot.log"), encoding="utf-8") as f:
+                main_log = f.read()
+            self.assertIn("hello-async", main_log)
+            self.assertIn("ValueError: boom", main_log)
+
+            with open(os.path.join(self.tmpdir, "decisions.log"), encoding="utf-8") as f:
+                line = f.read().strip().splitlines()[-1]
+            self.assertEqual(json.loads(line)["event"], "TEST_EVENT")
+        finally:
+            logger.shutdown()
+
+    def test_full_queue_drops_debug_only(self):
+        handler = _BoundedQueueHandler(queue.Queue(maxsize=1), block_timeout=0.01)
+        make = lambda level: logging.LogRecord("TradingBot", level, __file__, 1, "m", None, None)
+
+        handler.handle(make(logging.INFO))
+        handler.handle(make(logging.DEBUG))
+        self.assertEqual(handler.dropped, 1)
+        self.assertEqual(handler.queue.qsize(), 1)
+
+    def test_sync_mode_keeps_direct_handlers(self):
+        logger = TradingLogger(make_config(self.tmpdir, **{"async": False}))
+        self.assertFalse(logger.get_queue_stats()["async"])
+        logger.info("hello-sync")
+        logger.flush()
+        with open(os.path.join(self.tmpdir, "trading_bot.log"), encoding="utf-8") as f:
+            self.assertIn("hello-sync", f.read())
+
+
+class DecisionLogTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_repeated_meta_is_referenced_and_payload_is_snapshotted(self):
+        logger = TradingLogger(make_config(self.tmpdir))
+        try:
+            meta = {"strategy": "SOL_TREND", "stop_price": 95.0, "sizing": {"risk_krw": 1000}}
+            logger.log_decision("BUY_SIGNAL", {"ticker": "KRW-SOL", "meta": meta})
+            logger.log_decision("BUY_EXECUTED", {"ticker": "KRW-SOL", "meta": meta})
+            logger.log_decision("BUY_SIGNAL", {"ticker": "KRW-DOGE", "meta": meta})
+            # 호출 이후 원본 변경은 기록에 반영되지 않아야 함
+            meta["stop_price"] = 1.0
+            logger.flush()
+        finally:
+            logger.shutdown()
+
+        with open(os.path.join(self.tmpdir, "decisions.log"), encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+        first, second, other = rows[-3:]
+        self.assertEqual(first["payload"]["meta"]["stop_price"], 95.0)
+        self.assertNotIn("meta", second["payload"])
+        self.assertEqual(second["payload"]["meta_ref"], first["payload"]["meta_id"])
+        # 다른 종목(체인)은 본문을 다시 기록
+        self.assertIn("meta", other["payload"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import threading
+import time
+import unittest
+
+from loop_watchdog import LoopWatchdog
+
+
+def _blocking_call(event):
+    event.wait(5)
+
+
+class LoopWatchdogTests(unittest.TestCase):
+    def test_stall_reports_stack_and_records_duration(self):
+        stalls = []
+        recovered = []
+        watchdog = LoopWatchdog(stall_seconds=1, check_seconds=1, on_stall=stalls.append, on_recover=recovered.append)
+
+        release = threading.Event()
+        attached = threading.Event()
+
+        def loop():
+            watchdog.attach()
+            watchdog.beat("ticker_eval", "KRW-BTC")
+            attached.set()
+            _blocking_call(release)
+            watchdog.beat("sleep", budget=10)
+
+        worker = threading.Thread(target=loop, name="trading-loop", daemon=True)
+        worker.start()
+        attached.wait(2)
+
+        t0 = watchdog._beat[3]
+        self.assertIsNone(watchdog.check(now=t0 + 0.5))
+        info = watchdog.check(now=t0 + 1.5)
+        self.assertIsNotNone(info)
+        self.assertEqual((info["stage"], info["detail"]), ("ticker_eval", "KRW-BTC"))
+        self.assertIn("_blocking_call", info["stack"])
+        # 같은 정지는 한 번만 보고
+        self.assertIsNone(watchdog.check(now=t0 + 3.0))
+        self.assertEqual(len(stalls), 1)
+
+        release.set()
+        worker.join(2)
+        watchdog.check()
+        self.assertEqual(len(recovered), 1)
+        stats = watchdog.stall_stats["ticker_eval"]
+        self.assertEqual(stats["count"], 1)
+        self.assertGreater(stats["total_seconds"], 0)
+
+        families = {f[0]: f for f in watchdog.live_metric_families()}
+        self.assertEqual(families["loop_stalls_total"][3], [({"stage": "ticker_eval"}, 1)])
+        self.assertEqual(families["loop_stall_active"][3], [(None, False)])
+
+    def test_sleep_budget_extends_threshold(self):
+        stalls = []
+        watchdog = LoopWatchdog(stall_seconds=1, on_stall=stalls.append)
+        watchdog.attach()
+        watchdog.beat("sleep", budget=10)
+        t0 = watchdog._beat[3]
+        self.assertIsNone(watchdog.check(now=t0 + 5))
+        self.assertIsNotNone(watchdog.check(now=t0 + 11.5))
+        self.assertEqual(stalls[0]["threshold_seconds"], 11.0)
+
+    def test_watchdog_thread_detects_stall(self):
+        stalls = []
+        watchdog = LoopWatchdog(stall_seconds=1, check_seconds=0.05, on_stall=stalls.append)
+        watchdog.attach()
+        watchdog.beat("regime")
+        watchdog.start()
+        try:
+            deadline = time.time() + 3
+            while not stalls and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            watchdog.stop()
+        self.assertEqual(stalls[0]["stage"], "regime")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from market_recorder import MarketRecorder, iter_records, load_blocks
+from replay import load_recording
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+def _call(endpoint, data, ts, params=None, status=200, method="GET"):
+    return {
+        "method": method,
+        "endpoint": endpoint,
+        "params": params,
+        "started_at": ts,
+        "status": status,
+        "error": None,
+        "response": FakeResponse(data),
+    }
+
+
+def _candle(market, kst, price):
+    return {
+        "market": market,
+        "candle_date_time_kst": kst,
+        "opening_price": price,
+        "high_price": price + 2,
+        "low_price": price - 2,
+        "trade_price": price + 1,
+        "candle_acc_trade_volume": 3.0,
+        "candle_acc_trade_price": 3.0 * price,
+    }
+
+
+def _ts(text):
+    return datetime.fromisoformat(text).timestamp()
+
+
+class RecorderTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+        self.recorder = MarketRecorder(self.dir, flush_seconds=60, block_records=3)
+
+    def tearDown(self):
+        self.recorder.close()
+        self._tmp.cleanup()
+
+    def test_records_quotation_blocks_per_day(self):
+        r = self.recorder
+        r.observe(_call("/v1/ticker", [{"market": "KRW-BTC", "trade_price": 1.0}], _ts("2025-01-01 23:59:50"),
+                        params={"markets": "KRW-BTC"}))
+        r.observe(_call("/v1/orderbook", [{"market": "KRW-SOL"}], _ts("2025-01-02 00:00:10"),
+                        params={"markets": ["KRW-SOL"]}))
+        # 주문/실패 응답은 기록하지 않음
+        r.observe(_call("/v1/orders", {"uuid": "x"}, _ts("2025-01-02 00:00:11"), method="POST"))
+        r.observe(_call("/v1/ticker", [], _ts("2025-01-02 00:00:12"), status=429))
+        for i in range(4):
+            r.observe(_call("/v1/candles/minutes/5", [], _ts("2025-01-02 00:01:00") + i, params={"market": "KRW-BTC"}))
+        self.assertTrue(r.flush())
+        self.assertEqual(r.get_queue_stats()["recorded"], 6)
+
+        files = sorted(f for f in os.listdir(self.dir) if f.endswith(".jsonl.gz"))
+        self.assertEqual(files, ["20250101.jsonl.gz", "20250102.jsonl.gz"])
+        path = os.path.join(self.dir, "20250102.jsonl.gz")
+        blocks = load_blocks(path)
+        self.assertEqual([b["records"] for b in blocks], [3, 2])
+        self.assertEqual(blocks[0]["markets"], ["KRW-BTC", "KRW-SOL"])
+        # 블록을 이어 붙인 파일도 일반 gzip으로 읽힘
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 5)
+
+        rows = list(iter_records(self.dir))
+        self.assertEqual([row["k"] for row in rows[:2]], ["ticker", "orderbook"])
+        rows = list(iter_records(self.dir, start="2025-01-02 00:00:00", kinds=("candles",)))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["q"], {"market": "KRW-BTC"})
+        self.assertEqual(len(list(iter_records(self.dir, end="2025-01-02 00:00:00"))), 1)
+
+    def test_unindexed_tail_is_read(self):
+        self.recorder.record("ws", {"type": "trade"}, ts=_ts("2025-01-02 00:00:00"))
+        self.recorder.flush()
+        path = os.path.join(self.dir, "20250102.jsonl.gz")
+        line = json.dumps({"t": _ts("2025-01-02 00:00:01"), "k": "ws", "d": {"type": "orderbook"}}) + "\n"
+        with open(path, "ab") as f:
+            f.write(gzip.compress(line.encode("utf-8")))
+        self.assertEqual([row["d"]["type"] for row in iter_records(self.dir)], ["trade", "orderbook"])
+
+    def test_replay_loads_recorded_candles(self):
+        r = self.recorder
+        # 진행 중일 때 받은 봉 -> 마감 후 다시 받은 봉이 우선
+        r.observe(_call("/v1/candles/minutes/5", [_candle("KRW-BTC", "2025-01-02T00:05:00", 100.0),
+                                                   _candle("KRW-BTC", "2025-01-02T00:00:00", 90.0)],
+                        _ts("2025-01-02 00:06:00")))
+        r.observe(_call("/v1/candles/minutes/5", [_candle("KRW-BTC", "2025-01-02T00:10:00", 120.0),
+                                                   _candle("KRW-BTC", "2025-01-02T00:05:00", 110.0)],
+                        _ts("2025-01-02 00:11:00")))
+        r.observe(_call("/v1/candles/minutes/60", [_candle("KRW-BTC", "2025-01-02T00:00:00", 1.0)],
+                        _ts("2025-01-02 00:11:00")))
+        r.flush()
+
+        history = load_recording(self.dir, start="2025-01-02 00:00", end="2025-01-02 00:10")
+        df = history["KRW-BTC"]
+        self.assertEqual(list(df.index), [pd.Timestamp("2025-01-02 00:00"), pd.Timestamp("2025-01-02 00:05")])
+        self.assertEqual(list(df["open"]), [90.0, 110.0])
+        self.assertEqual(df.loc[pd.Timestamp("2025-01-02 00:05"), "close"], 111.0)
+        self.assertEqual(list(df.columns), ["open", "high", "low", "close", "volume", "value"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import threading
+import unittest
+import urllib.request
+
+from metrics_server import MetricsServer, render_metrics
+
+
+class RenderMetricsTests(unittest.TestCase):
+    def test_text_format(self):
+        text = render_metrics(
+            [
+                ("positions_open", "gauge", "Open positions", [(None, 2)]),
+                (
+                    "api_latency_ms",
+                    "histogram",
+                    "Latency",
+                    [
+                        ({"__name__": "api_latency_ms_bucket", "endpoint": "GET /v1/ticker", "le": "10"}, 3),
+                        ({"__name__": "api_latency_ms_bucket", "endpoint": "GET /v1/ticker", "le": "+Inf"}, 4),
+                        ({"__name__": "api_latency_ms_sum", "endpoint": "GET /v1/ticker"}, 31.5),
+                        ({"__name__": "api_latency_ms_count", "endpoint": "GET /v1/ticker"}, 4),
+                    ],
+                ),
+                ("cache_hit_ratio", "gauge", "Ratio", [({"cache": 'o"hlcv'}, None)]),
+            ]
+        )
+        lines = text.splitlines()
+        self.assertIn("# TYPE upbit_bot_positions_open gauge", lines)
+        self.assertIn("upbit_bot_positions_open 2", lines)
+        self.assertIn('upbit_bot_api_latency_ms_bucket{endpoint="GET /v1/ticker",le="+Inf"} 4', lines)
+        self.assertIn('upbit_bot_api_latency_ms_sum{endpoint="GET /v1/ticker"} 31.5', lines)
+        self.assertIn('upbit_bot_cache_hit_ratio{cache="o\\"hlcv"} NaN', lines)
+
+
+class MetricsServerTests(unittest.TestCase):
+    def test_serves_published_snapshot_with_thread_liveness(self):
+        server = MetricsServer("127.0.0.1", 0, watched_threads=["metrics-test-worker", "missing-thread"])
+        stop = threading.Event()
+        worker = threading.Thread(target=stop.wait, name="metrics-test-worker", daemon=True)
+        worker.start()
+        server.publish(render_metrics([("loop_iterations_total", "counter", "Loops", [(None, 7)])]))
+        server.start()
+        try:
+            url = f"http://127.0.0.1:{server.port}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as resp:
+                self.assertTrue(resp.headers["Content-Type"].startswith("text/plain"))
+                body = resp.read().decode("utf-8")
+        finally:
+            server.stop()
+            stop.set()
+
+        self.assertIn("upbit_bot_loop_iterations_total 7", body)
+        self.assertIn('upbit_bot_thread_alive{thread="metrics-test-worker"} 1', body)
+        self.assertIn('upbit_bot_thread_alive{thread="missing-thread"} 0', body)
+        self.assertIn("upbit_bot_metrics_scrapes_total 1", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import clock
+from paper_exchange import PaperExchange, RecordedOrderbooks
+from market_recorder import MarketRecorder
+from test_orderbook import FakeLogger, FakeStats, make_config
+from trading_engine import TradingEngine
+
+
+class FakeBook:
+    """호출마다 현재 스냅샷을 돌려주는 호가 소스 (set으로 새 스냅샷 게시)."""
+
+    def __init__(self, asks, bids):
+        self.stamp = 0
+        self.set(asks, bids)
+
+    def set(self, asks, bids):
+        self.stamp += 1
+        self.book = {
+            "market": "KRW-TEST",
+            "timestamp": self.stamp,
+            "orderbook_units": [
+                {"ask_price": a[0], "ask_size": a[1], "bid_price": b[0], "bid_size": b[1]}
+                for a, b in zip(asks, bids)
+            ],
+        }
+
+    def __call__(self, ticker):
+        return [self.book]
+
+
+class PaperExchangeTests(unittest.TestCase):
+    def setUp(self):
+        self.sim = clock.SimulatedClock("2025-01-02 00:00")
+        self.previous = clock.set_clock(self.sim)
+        self.book = FakeBook(asks=[(101.0, 10.0), (102.0, 10.0)], bids=[(100.0, 10.0), (99.0, 10.0)])
+
+    def tearDown(self):
+        clock.set_clock(self.previous)
+
+    def test_market_orders_walk_book_with_fees(self):
+        ex = PaperExchange(self.book, initial_krw=10000.0, fee_rate=0.001)
+        order = ex.buy_market_order("KRW-TEST", 1520.0)
+        self.assertEqual(order["state"], "done")
+        # 101 x 10 소진 후 나머지 510원은 102에 체결
+        self.assertAlmostEqual(float(order["executed_volume"]), 10.0 + 510.0 / 102.0)
+        self.assertAlmostEqual(float(order["paid_fee"]), 1.52)
+        self.assertAlmostEqual(ex.get_balance("KRW"), 10000.0 - 1520.0 * 1.001)
+        self.assertAlmostEqual(ex.get_avg_buy_price("KRW-TEST"), 1520.0 / 15.0)
+
+        order = ex.sell_market_order("KRW-TEST", 15.0)
+        self.assertAlmostEqual(float(order["avg_sell_price"]), (100.0 * 10 + 99.0 * 5) / 15.0)
+        self.assertAlmostEqual(ex.get_balance("KRW-TEST"), 0.0)
+        self.assertAlmostEqual(ex.get_balance("KRW"), 10000.0 - 1520.0 * 1.001 + 1495.0 * 0.999)
+        self.assertIsNone(ex.sell_market_order("KRW-TEST", 1.0))
+
+    def test_latency_partial_fills_and_cancel(self):
+        ex = PaperExchange(self.book, initial_krw=100000.0, fee_rate=0.0, latency_ms=200, liquidity_ratio=0.5)
+        order = ex.buy_limit_order("KRW-TEST", 102.0, 20.0)
+        self.assertEqual(order["state"], "wait")
+        self.assertEqual(float(order["executed_volume"]), 0.0)
+        self.assertAlmostEqual(ex.get_balance("KRW"), 100000.0 - 2040.0)
+
+        self.sim.advance(0.2)
+        # 호가 잔량의 50%씩, 주문가 이하 2개 호가에서 체결
+        info = ex.get_order(order["uuid"])
+        self.assertEqual(info["state"], "wait")
+        self.assertAlmostEqual(float(info["executed_volume"]), 10.0)
+        # 같은 스냅샷으로는 다시 체결하지 않음
+        self.assertAlmostEqual(float(ex.get_order(order["uuid"])["executed_volume"]), 10.0)
+
+        self.book.set(asks=[(103.0, 10.0), (104.0, 10.0)], bids=[(100.0, 10.0), (99.0, 10.0)])
+        info = ex.cancel_order(order["uuid"])
+        self.assertEqual(info["state"], "cancel")
+        self.assertAlmostEqual(ex.get_balance("KRW"), 100000.0 - (101.0 * 5 + 102.0 * 5))
+        self.assertAlmostEqual(ex.get_balance("KRW-TEST"), 10.0)
+        self.assertIsNone(ex.cancel_order(order["uuid"]))
+
+    def test_state_file_persists_balances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "paper.json")
+            ex = PaperExchange(self.book, initial_krw=10000.0, fee_rate=0.0, state_file=path)
+            ex.buy_market_order("KRW-TEST", 1010.0)
+            ex.sell_limit_order("KRW-TEST", 200.0, 5.0)  # 미체결 -> 재시작 시 잠금 해제
+            again = PaperExchange(self.book, initial_krw=1.0, state_file=path)
+            self.assertAlmostEqual(again.get_balance("KRW"), 10000.0 - 1010.0)
+            self.assertAlmostEqual(again.get_balance("KRW-TEST"), 10.0)
+            self.assertAlmostEqual(again.get_avg_buy_price("KRW-TEST"), 101.0)
+
+    def test_recorded_orderbooks_follow_clock(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            recorder = MarketRecorder(tmp)
+            for minute, ask in ((0, 101.0), (1, 105.0)):
+                book = dict(self.book.book, timestamp=minute)
+                book["orderbook_units"] = [dict(book["orderbook_units"][0], ask_price=ask)]
+                recorder.record("orderbook", [book], ts=self.sim.time() + minute * 60)
+            recorder.close()
+
+            books = RecordedOrderbooks(tmp)
+            self.assertEqual(books.markets(), ["KRW-TEST"])
+            self.sim.advance(30)
+            self.assertEqual(books("KRW-TEST")["orderbook_units"][0]["ask_price"], 101.0)
+            self.sim.advance(60)
+            self.assertEqual(books("KRW-TEST")["orderbook_units"][0]["ask_price"], 105.0)
+
+    def test_engine_paper_mode_limit_timeout_falls_back_to_market(self):
+        config = make_config()
+        config["trading"]["run_mode"] = "paper"
+        config["paper"] = {"initial_krw": 100000, "latency_ms": 100, "state_file": None}
+        engine = TradingEngine(config, FakeLogger(), FakeStats())
+        with patch("trading_engine.pyupbit.get_current_price", return_value=100.0):
+            with patch("trading_engine.pyupbit.get_orderbook", side_effect=self.book):
+                self.assertTrue(engine.connect(None, None))
+                self.assertIsInstance(engine.upbit, PaperExchange)
+                result = engine.execute_buy("KRW-TEST", 1010.0)
+
+        self.assertIsNotNone(result)
+        # 지정가(매수 1호가)는 체결되지 않아 취소 -> 시장가로 매도 1호가 체결
+        self.assertAlmostEqual(result["price"], 101.0)
+        self.assertAlmostEqual(result["amount"], 10.0)
+        self.assertEqual([o["state"] for o in engine.upbit.orders.values()], ["cancel", "done"])
+        self.assertAlmostEqual(engine.upbit.get_balance("KRW"), 100000 - 1010.0 * 1.0005)
+
+        # 실시간 시세와 섞이는 기록 호가는 paper 모드에서 거부
+        config["paper"]["orderbook"] = "market_data"
+        engine = TradingEngine(config, FakeLogger(), FakeStats())
+        self.assertFalse(engine.connect(None, None))
+        self.assertIsNone(engine.upbit)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import unittest
+from datetime import datetime
+
+from position import Position
+
+
+def make_position():
+    return Position(
+        "KRW-SOL",
+        100.0,
+        2.0,
+        timestamp=datetime(2026, 10, 1, 12, 0, 0),
+        uuid="u-1",
+        buy_fee_krw=0.1,
+        buy_signals=["trend"],
+        buy_score=3,
+        buy_meta={
+            "strategy": "SOL_TREND",
+            "stop_price": 95.0,
+            "tp1_r": 1.2,
+            "sizing": {"risk_krw": 1000, "weight": 0.5},
+        },
+    )
+
+
+class PositionTests(unittest.TestCase):
+    def test_hot_fields_and_dict_compat(self):
+        pos = make_position()
+        self.assertEqual(pos.strategy, "SOL_TREND")
+        self.assertEqual(pos.stop_price, 95.0)
+        self.assertEqual(pos["amount"], 2.0)
+        self.assertEqual(pos.get("highest_price"), 100.0)
+        self.assertEqual(pos.meta_get("tp1_r"), 1.2)
+        self.assertEqual(pos.buy_meta["strategy"], "SOL_TREND")
+        self.assertIsNone(pos.get("missing"))
+
+        pos["amount"] = 1.5
+        self.assertEqual(pos.amount, 1.5)
+
+    def test_snapshot_roundtrip_reuses_cold_meta_json(self):
+        pos = make_position()
+        cold = pos.meta_json()
+        pos.update_meta(sol_trailing_active=True, sol_trailing_stop_price=110.0)
+        # hot 필드 갱신은 cold 메타 직렬화 캐시를 무효화하지 않음
+        self.assertIs(pos.meta_json(), cold)
+
+        data = json.loads(pos.to_snapshot_json())
+        restored = Position.from_snapshot("KRW-SOL", data)
+        self.assertTrue(restored.trailing_active)
+        self.assertEqual(restored.trailing_stop_price, 110.0)
+        self.assertEqual(restored.buy_meta, pos.buy_meta)
+        self.assertEqual(restored.timestamp, pos.timestamp)
+
+    def test_legacy_snapshot_with_meta_only(self):
+        legacy = {
+            "buy_price": 100.0,
+            "amount": 1.0,
+            "original_amount": 1.0,
+            "timestamp": "2026-10-01T12:00:00",
+            "highest_price": 105.0,
+            "buy_meta": {"strategy": "DOGE_MOMENTUM", "stop_price": 90.0, "sol_tp1_done": True},
+        }
+        pos = Position.from_snapshot("KRW-DOGE", legacy)
+        self.assertEqual(pos.strategy, "DOGE_MOMENTUM")
+        self.assertEqual(pos.stop_price, 90.0)
+        self.assertTrue(pos.tp1_done)
+        self.assertEqual(pos.highest_price, 105.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
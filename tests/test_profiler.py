@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from profiler import StackSampler
+
+
+def _busy_leaf(stop):
+    while not stop.is_set():
+        sum(range(200))
+
+
+def _busy_outer(stop):
+    _busy_leaf(stop)
+
+
+class StackSamplerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.stop = threading.Event()
+        self.worker = threading.Thread(target=_busy_outer, args=(self.stop,), name="trading-loop", daemon=True)
+        self.worker.start()
+
+    def tearDown(self):
+        self.stop.set()
+        self.worker.join(timeout=2)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_collapsed_output_tagged_by_thread(self):
+        sampler = StackSampler(interval_ms=2, thread_names=["trading-loop"], output_dir=self.tmpdir)
+        self.assertTrue(sampler.start())
+        self.assertFalse(sampler.start())
+        time.sleep(0.2)
+        result = sampler.stop()
+
+        self.assertFalse(sampler.running)
+        self.assertGreater(result["samples"], 0)
+        self.assertTrue(os.path.exists(result["path"]))
+        with open(result["path"], encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("trading-loop;"))
+            self.assertGreater(int(count), 0)
+        self.assertTrue(any("_busy_outer (test_profiler.py" in line and "_busy_leaf" in line for line in lines))
+        self.assertEqual(result["top"][0][0], "trading-loop")
+
+    def test_auto_stop_after_seconds(self):
+        sampler = StackSampler(interval_ms=2, thread_names=["trading-loop"], output_dir=self.tmpdir)
+        sampler.start(seconds=0.05)
+        deadline = time.time() + 3
+        while sampler.running and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(sampler.running)
+        self.assertIsNotNone(sampler.last_result)
+        self.assertIsNotNone(sampler.stop()["path"])
+
+
+if __name__ == "__main__":
+    unittest.main()
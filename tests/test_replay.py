@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+import clock
+from paper_exchange import PaperExchange
+from replay import ReplayMarket, run_replay
+from test_backtest import make_history
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ClockTests(unittest.TestCase):
+    def test_simulated_sleep_advances_and_fires_end(self):
+        ended = []
+        sim = clock.SimulatedClock("2025-01-01 00:00", end="2025-01-01 00:01", on_end=lambda: ended.append(1))
+        previous = clock.set_clock(sim)
+        try:
+            clock.sleep(30)
+            self.assertEqual(clock.now(), pd.Timestamp("2025-01-01 00:00:30").to_pydatetime())
+            self.assertEqual(ended, [])
+            clock.sleep(45)
+            clock.sleep(10)
+            self.assertEqual(ended, [1])
+        finally:
+            clock.set_clock(previous)
+        self.assertFalse(clock.get_clock().simulated)
+
+
+class MarketTests(unittest.TestCase):
+    def setUp(self):
+        self.history = make_history(2)
+        self.market = ReplayMarket(self.history)
+        self.sim = clock.SimulatedClock("2025-01-02 00:02")
+        self.previous = clock.set_clock(self.sim)
+
+    def tearDown(self):
+        clock.set_clock(self.previous)
+
+    def test_no_lookahead(self):
+        src = self.history["KRW-SOL"]
+        df = self.market.get_ohlcv("KRW-SOL", interval="minute5", count=50)
+        self.assertEqual(len(df), 50)
+        self.assertEqual(df.index[-1], pd.Timestamp("2025-01-02 00:00"))
+        # 진행 중인 봉은 시가만 공개
+        bar = src.loc[pd.Timestamp("2025-01-02 00:00")]
+        self.assertEqual(df["close"].iloc[-1], bar["open"])
+        self.assertEqual(df["volume"].iloc[-1], 0.0)
+        self.assertEqual(df["close"].iloc[-2], src.loc[pd.Timestamp("2025-01-01 23:55"), "close"])
+        self.assertEqual(self.market.get_current_price("KRW-SOL"), bar["open"])
+
+        self.sim.set("2025-01-02 00:05")
+        df = self.market.get_ohlcv("KRW-SOL", interval="minute5", count=50)
+        self.assertEqual(df["close"].iloc[-2], bar["close"])
+
+        hourly = self.market.get_ohlcv("KRW-SOL", interval="minute60", count=3)
+        self.assertEqual(hourly.index[-1], pd.Timestamp("2025-01-02 00:00"))
+        self.assertEqual(hourly["high"].iloc[-2], src.loc["2025-01-01 23:00":"2025-01-01 23:55", "high"].max())
+
+    def test_account_fills_and_fees(self):
+        account = PaperExchange(self.market.get_orderbook, initial_krw=1000000.0, fee_rate=0.001)
+        bid, ask = self.market.quote("KRW-SOL")
+        self.assertLess(bid, ask)
+
+        order = account.buy_market_order("KRW-SOL", 100000)
+        self.assertEqual(order["state"], "done")
+        volume = 100000 / ask
+        self.assertAlmostEqual(account.get_balance("KRW-SOL"), volume)
+        self.assertAlmostEqual(account.get_balance("KRW"), 1000000 - 100000 * 1.001)
+        self.assertAlmostEqual(account.get_avg_buy_price("KRW-SOL"), ask)
+
+        # 호가에 닿지 않는 지정가 매도는 대기 -> 취소 시 잠금 해제
+        order = account.sell_limit_order("KRW-SOL", ask * 2, volume)
+        self.assertEqual(order["state"], "wait")
+        self.assertAlmostEqual(account.get_balance("KRW-SOL"), 0.0)
+        self.assertEqual(account.cancel_order(order["uuid"])["state"], "cancel")
+        self.assertAlmostEqual(account.get_balance("KRW-SOL"), volume)
+
+        order = account.sell_limit_order("KRW-SOL", bid, volume)
+        self.assertEqual(account.get_order(order["uuid"])["state"], "done")
+        self.assertAlmostEqual(float(order["avg_sell_price"]), bid)
+        self.assertAlmostEqual(
+            account.total_value(price_fn=self.market.price), 1000000 - 100000 * 1.001 + bid * volume * 0.999
+        )
+
+
+class ReplayRunTests(unittest.TestCase):
+    def test_replay_is_deterministic(self):
+        with open(os.path.join(ROOT, "config.example.json"), "r", encoding="utf-8") as f:
+            config = json.load(f)
+        history = make_history(6)
+
+        logs = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("a", "b"):
+                result = run_replay(
+                    config, history, "2025-01-05 00:00", "2025-01-05 01:00", os.path.join(tmp, name), check_interval=60
+                )
+                self.assertGreaterEqual(result["sim_end"], "2025-01-05T01:00:00")
+                with open(result["decisions_path"], "rb") as f:
+                    logs.append(f.read())
+        self.assertFalse(clock.get_clock().simulated)
+        self.assertIn(b"LOOP_HEARTBEAT", logs[0])
+        self.assertEqual(logs[0], logs[1])
+
+    def test_day_at_configured_interval_is_bounded(self):
+        with open(os.path.join(ROOT, "config.example.json"), "r", encoding="utf-8") as f:
+            config = json.load(f)
+        history = make_history(6)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            result = run_replay(config, history, "2025-01-05 00:00", "2025-01-06 00:00", tmp)
+            elapsed = time.perf_counter() - t0
+        self.assertGreaterEqual(result["sim_end"], "2025-01-06T00:00:00")
+        # 루프 주기 10초 = 하루 8640회 (캔들 저장본/리샘플 재사용이 깨지면 수 배로 느려짐)
+        self.assertLess(elapsed, 45)
+
+
+if __name__ == "__main__":
+    unittest.main()
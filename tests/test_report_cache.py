@@ -0,0 +1,59 @@
+import threading
+import time
+import unittest
+
+from report_cache import ReportCache
+
+
+class ReportCacheTests(unittest.TestCase):
+    def test_renders_only_when_version_changes(self):
+        cache = ReportCache()
+        calls = []
+
+        def render():
+            calls.append(1)
+            return f"msg{len(calls)}"
+
+        self.assertEqual(cache.get("daily", (1, 10), render), "msg1")
+        self.assertEqual(cache.get("daily", (1, 10), render), "msg1")
+        self.assertEqual(cache.get("daily", (1, 11), render), "msg2")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "entries": 1})
+
+        cache.invalidate("daily")
+        self.assertEqual(cache.get("daily", (1, 11), render), "msg3")
+
+    def test_failed_render_is_not_cached(self):
+        cache = ReportCache()
+
+        def boom():
+            raise RuntimeError("api down")
+
+        with self.assertRaises(RuntimeError):
+            cache.get("market", 5, boom)
+        self.assertEqual(cache.get("market", 5, lambda: "ok"), "ok")
+
+    def test_concurrent_requests_render_once(self):
+        cache = ReportCache()
+        calls = []
+
+        def slow_render():
+            calls.append(1)
+            time.sleep(0.1)
+            return "status"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get("status", 1, slow_render)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(2)
+        self.assertEqual(results, ["status"] * 4)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
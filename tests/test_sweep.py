@@ -0,0 +1,75 @@
+import unittest
+
+import pandas as pd
+
+from backtest import Backtester
+from sweep import apply_overrides, attach_history, expand_spec, rank_results, run_sweep, share_history
+from test_backtest import CONFIG, make_5m, make_history
+
+
+class SpecTests(unittest.TestCase):
+    def test_grid_and_random_expand(self):
+        combos = expand_spec({
+            "grid": {"strategy.sol_breakout_lookback": [36, 48], "risk_management.stop_loss_pct": [-1.5, -2.0]},
+            "random": {"samples": 3, "seed": 1, "params": {
+                "strategy.regime_confirm_count": {"min": 2, "max": 4},
+                "strategy.doge_volume_spike_min": {"min": 1.1, "max": 1.8},
+                "strategy.risk_per_symbol_pct.SOL": {"choices": [0.3, 0.5]},
+            }},
+        })
+        self.assertEqual(len(combos), 4 + 3)
+        for combo in combos[4:]:
+            self.assertIn(combo["strategy.regime_confirm_count"], (2, 3, 4))
+            self.assertTrue(1.1 <= combo["strategy.doge_volume_spike_min"] <= 1.8)
+        with self.assertRaises(ValueError):
+            expand_spec({"grid": {"trading.fee_pct": [0.01]}})
+
+    def test_overrides_do_not_touch_base_config(self):
+        cfg = apply_overrides(CONFIG, {"strategy.risk_per_symbol_pct.SOL": 0.7, "strategy.doge_rsi_min": 60})
+        self.assertEqual(cfg["strategy"]["risk_per_symbol_pct"], {"SOL": 0.7})
+        self.assertEqual(cfg["strategy"]["doge_rsi_min"], 60)
+        self.assertNotIn("risk_per_symbol_pct", CONFIG["strategy"])
+
+    def test_rank_by_metrics_and_min_trades(self):
+        rows = [
+            {"params": {"a": 1}, "summary": {"trades": 5, "total_return_pct": 9.0, "max_drawdown_pct": -3.0}},
+            {"params": {"a": 2}, "summary": {"trades": 50, "total_return_pct": 4.0, "max_drawdown_pct": -2.0}},
+            {"params": {"a": 3}, "summary": {"trades": 50, "total_return_pct": 4.0, "max_drawdown_pct": -1.0}},
+        ]
+        ranked = rank_results(rows, ["total_return_pct", "max_drawdown_pct"], min_trades=10)
+        self.assertEqual([r["params"]["a"] for r in ranked], [3, 2, 1])
+        ranked = rank_results(rows, ["trades:asc"])
+        self.assertEqual(ranked[0]["params"]["a"], 1)
+
+
+class SharedMemoryTests(unittest.TestCase):
+    def test_roundtrip(self):
+        history = {"KRW-BTC": make_5m(1, 500), "KRW-SOL": make_5m(2, 300).drop(columns=["value"])}
+        shm, layout = share_history(history)
+        try:
+            attached = attach_history(shm.buf, layout)
+            for ticker, df in history.items():
+                expected = df.set_axis(df.index.as_unit("ns"))
+                pd.testing.assert_frame_equal(attached[ticker], expected, check_freq=False)
+            del attached
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_parallel_sweep_matches_serial_backtest(self):
+        history = make_history(40)
+        combos = expand_spec({"grid": {"strategy.sol_breakout_lookback": [36, 60], "strategy.regime_confirm_count": [2, 4]}})
+        results = run_sweep(CONFIG, history, combos, workers=2)
+
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(r["error"] is None for r in results))
+        returns = [r["summary"]["total_return_pct"] for r in results]
+        self.assertEqual(returns, sorted(returns, reverse=True))
+        best = results[0]
+        serial = Backtester(apply_overrides(CONFIG, best["params"])).run(history)["summary"]
+        self.assertEqual(serial["trades"], best["summary"]["trades"])
+        self.assertAlmostEqual(serial["final_krw"], best["summary"]["final_krw"], places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
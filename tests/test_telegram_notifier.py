@@ -0,0 +1,374 @@
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from fake_telegram import FakeTelegramServer
+from main import TradingBot
+from report_cache import ReportCache
+from telegram_notifier import TelegramNotifier
+from trading_stats import TradingStats
+
+
+def make_notifier(**outbox):
+    cfg = {"coalesce_seconds": 0.2, "min_interval_seconds": 0.0, "max_retries": 3}
+    cfg.update(outbox)
+    notifier = TelegramNotifier({"telegram": {"enabled": False, "outbox": cfg}})
+    # 네트워크 없이 outbox만 검증 (전송 함수는 테스트에서 교체)
+    notifier.enabled = True
+    notifier.base_url = "http://telegram.invalid"
+    notifier.chat_id = "1"
+    return notifier
+
+
+class OutboxTests(unittest.TestCase):
+    def test_enqueue_returns_immediately(self):
+        notifier = make_notifier()
+        gate = threading.Event()
+        sent = []
+
+        def slow_post(message):
+            gate.wait(2)
+            sent.append(message)
+            return True, None
+
+        notifier._post_message = slow_post
+        t0 = time.perf_counter()
+        self.assertTrue(notifier.send_message("hello"))
+        self.assertLess(time.perf_counter() - t0, 0.05)
+        gate.set()
+        self.assertTrue(notifier.flush(timeout=3))
+        self.assertEqual(sent, ["hello"])
+        self.assertEqual(notifier.get_queue_stats()["sent"], 1)
+
+    def test_burst_is_coalesced(self):
+        notifier = make_notifier()
+        sent = []
+        notifier._post_message = lambda message: (sent.append(message), (True, None))[1]
+
+        for i in range(3):
+            notifier.send_message(f"sell-{i}", coalesce_key="sell")
+        notifier.send_message("status")
+
+        deadline = time.time() + 3
+        while len(sent) < 2 and time.time() < deadline:
+            time.sleep(0.02)
+
+        self.assertEqual(len(sent), 2)
+        self.assertIn("알림 3건", sent[0])
+        self.assertTrue(all(f"sell-{i}" in sent[0] for i in range(3)))
+        self.assertEqual(sent[1], "status")
+        self.assertEqual(notifier.get_queue_stats()["coalesced"], 2)
+
+    def test_retry_after_and_backoff(self):
+        notifier = make_notifier()
+        results = [(False, 0.05), (False, 0.0), (True, None)]
+        calls = []
+
+        def flaky(message):
+            calls.append(time.monotonic())
+            return results[len(calls) - 1]
+
+        notifier._post_message = flaky
+        self.assertTrue(notifier.send_message("x", sync=True))
+        self.assertEqual(len(calls), 3)
+        self.assertGreaterEqual(calls[1] - calls[0], 0.05)
+        self.assertEqual(notifier.get_queue_stats()["retries"], 2)
+
+    def test_rejected_message_is_not_retried(self):
+        notifier = make_notifier()
+        calls = []
+        notifier._post_message = lambda message: (calls.append(message), (False, None))[1]
+        self.assertFalse(notifier.send_message("bad", sync=True))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(notifier.get_queue_stats()["failed"], 1)
+
+    def test_bounded_queue_drops(self):
+        notifier = make_notifier(max_size=2)
+        gate = threading.Event()
+        notifier._post_message = lambda message: (gate.wait(2), (True, None))[1]
+        accepted = [notifier.send_message(f"m{i}") for i in range(5)]
+        gate.set()
+        notifier.flush(timeout=3)
+        self.assertIn(False, accepted)
+        self.assertGreater(notifier.get_queue_stats()["dropped"], 0)
+
+    def test_merge_respects_length_limit(self):
+        chunks = TelegramNotifier._merge_texts(["a" * 3000, "b" * 3000], limit=4000)
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(all(len(c) <= 4000 for c in chunks))
+
+
+class CommandDispatchTests(unittest.TestCase):
+    def setUp(self):
+        self.notifier = make_notifier()
+        self.messages = []
+        self.notifier.send_message = lambda message, **kwargs: self.messages.append(message) or True
+
+    def tearDown(self):
+        self.notifier.stop_listening()
+
+    def test_slow_command_does_not_block_dispatch(self):
+        release = threading.Event()
+        handled = []
+
+        def handler(text):
+            if text == "/weekly":
+                release.wait(2)
+            handled.append(text)
+
+        self.notifier.command_handler = handler
+        t0 = time.perf_counter()
+        slow = self.notifier.dispatch_command("/weekly")
+        fast = self.notifier.dispatch_command("/status")
+        self.assertLess(time.perf_counter() - t0, 0.1)
+        fast.result(timeout=2)
+        self.assertEqual(handled, ["/status"])
+        release.set()
+        slow.result(timeout=2)
+        self.assertEqual(handled, ["/status", "/weekly"])
+
+    def test_identical_inflight_command_is_deduped(self):
+        release = threading.Event()
+        calls = []
+        self.notifier.command_handler = lambda text: (calls.append(text), release.wait(2))
+        first = self.notifier.dispatch_command("/weekly")
+        self.assertIsNone(self.notifier.dispatch_command(" /WEEKLY "))
+        release.set()
+        first.result(timeout=2)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.notifier.command_stats["deduped"], 1)
+        self.assertIn("이미 처리 중", self.messages[0])
+        # 완료 후에는 다시 실행 가능
+        self.notifier.dispatch_command("/weekly").result(timeout=2)
+        self.assertEqual(len(calls), 2)
+
+    def test_dispatch_while_shutting_down_skips_command(self):
+        calls = []
+        self.notifier.command_handler = calls.append
+        # 잠금 해제 직후 stop_listening이 풀을 종료한 상황 재현
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.shutdown(wait=False)
+        self.notifier._command_executor = executor
+        self.assertIsNone(self.notifier.dispatch_command("/status"))
+        self.assertEqual(calls, [])
+        self.assertEqual(self.notifier._commands_inflight, {})
+
+    def test_timeout_notice(self):
+        release = threading.Event()
+        self.notifier.command_timeouts = {"/monthly": 0.05}
+        self.notifier.command_handler = lambda text: release.wait(2)
+        future = self.notifier.dispatch_command("/monthly")
+        deadline = time.time() + 2
+        while not self.messages and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        future.result(timeout=2)
+        self.assertIn("명령어 처리가", self.messages[0])
+        self.assertEqual(self.notifier.command_stats["timed_out"], 1)
+
+
+class ListenerTests(unittest.TestCase):
+    def test_backoff_grows_with_jitter_and_cap(self):
+        notifier = make_notifier()
+        notifier.poll_backoff_max_seconds = 8.0
+        for failures, upper in ((1, 1.0), (3, 4.0), (10, 8.0)):
+            notifier._poll_failures = failures
+            delays = [notifier._poll_backoff() for _ in range(50)]
+            self.assertTrue(all(upper / 2.0 <= d <= upper for d in delays))
+            self.assertGreater(len(set(delays)), 1)
+        notifier._poll_failures = 1
+        self.assertGreaterEqual(notifier._poll_backoff(retry_after=5), 5)
+
+    def test_polls_back_to_back_and_recovers_after_errors(self):
+        notifier = make_notifier()
+        notifier.enable_commands = True
+        notifier._poll_backoff = lambda retry_after=None: 0.01
+        dispatched = []
+        notifier.dispatch_command = dispatched.append
+        responses = [
+            (None, None),
+            (None, None),
+            ([{"update_id": 7, "message": {"chat": {"id": 1}, "text": "/status"}}], None),
+            ([], None),
+        ]
+        polls = []
+
+        def poll():
+            polls.append(time.monotonic())
+            if len(polls) > len(responses):
+                notifier.is_listening = False
+                return [], None
+            return responses[len(polls) - 1]
+
+        notifier._poll_updates = poll
+        notifier.start_listening(lambda text: None)
+        notifier.command_thread.join(2)
+
+        self.assertEqual(dispatched, ["/status"])
+        self.assertEqual(notifier.last_update_id, 7)
+        self.assertEqual(notifier._poll_failures, 0)
+        self.assertEqual(notifier.poll_stats["errors"], 2)
+        # 성공한 폴링 사이에는 대기가 없음
+        self.assertLess(polls[4] - polls[2], 0.5)
+
+
+class FakeApiTests(unittest.TestCase):
+    """가짜 Bot API 서버를 통한 실제 HTTP 경로 검증."""
+
+    def setUp(self):
+        self.server = FakeTelegramServer().start()
+        self.notifier = TelegramNotifier(self.server.notifier_config())
+
+    def tearDown(self):
+        self.notifier.stop_listening()
+        self.notifier.flush(timeout=2)
+        self.server.stop()
+
+    def test_notify_buy_and_sell_delivered(self):
+        self.assertTrue(self.notifier.test_connection()[0])
+        self.notifier.notify_buy("KRW-BTC", 50000000, 0.001, 50000, ["EMA"], 3)
+        self.notifier.notify_sell("KRW-BTC", 50000000, 51000000, 2.0, 1000, 600, "익절")
+        self.assertTrue(self.notifier.flush(timeout=3))
+        self.assertTrue(self.server.wait_for_sent(2))
+        self.assertIn("매수 완료", self.server.sent[0]["text"])
+        self.assertIn("BTC", self.server.sent[1]["text"])
+        self.assertEqual(self.server.sent[0]["parse_mode"], "HTML")
+        self.assertEqual(self.server.sent[0]["chat_id"], "1")
+
+    def test_rate_limit_and_server_errors_are_retried(self):
+        self.server.inject("sendMessage", 429, retry_after=0.5)
+        self.server.inject("sendMessage", 502)
+        t0 = time.monotonic()
+        self.assertTrue(self.notifier.send_message("hello", sync=True))
+        self.assertGreaterEqual(time.monotonic() - t0, 0.5)
+        self.assertEqual(self.server.calls["sendMessage"], 3)
+        self.assertEqual([m["text"] for m in self.server.sent], ["hello"])
+
+    def test_long_poll_delivers_commands_quickly(self):
+        received = []
+        got = threading.Event()
+        self.notifier.start_listening(lambda text: (received.append(text), got.set()))
+        time.sleep(0.3)
+        t0 = time.monotonic()
+        self.server.push_message("/status")
+        self.assertTrue(got.wait(2))
+        self.assertLess(time.monotonic() - t0, 1.0)
+        self.assertEqual(received, ["/status"])
+        # 대기 중에는 요청이 쌓이지 않음 (서버가 응답을 보류)
+        self.assertLessEqual(self.server.calls["getUpdates"], 3)
+
+    def test_listener_recovers_after_errors(self):
+        self.notifier.poll_backoff_max_seconds = 1.0
+        self.server.inject("getUpdates", 500, count=2)
+        got = threading.Event()
+        self.notifier.start_listening(lambda text: got.set())
+        self.server.push_message("/help")
+        self.assertTrue(got.wait(5))
+        self.assertEqual(self.notifier.poll_stats["errors"], 2)
+        self.assertEqual(self.notifier._poll_failures, 0)
+
+    def test_other_chat_is_ignored(self):
+        received = []
+        self.notifier.start_listening(received.append)
+        self.server.push_message("/pause", chat_id="999")
+        self.server.push_message("/status")
+        deadline = time.time() + 3
+        while not received and time.time() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.1)
+        self.assertEqual(received, ["/status"])
+
+
+class BotCommandTests(unittest.TestCase):
+    """TradingBot 명령어 처리 -> 가짜 Bot API로 전송되는 응답 검증."""
+
+    def setUp(self):
+        self.server = FakeTelegramServer().start()
+        self.tmp = tempfile.TemporaryDirectory()
+        bot = TradingBot.__new__(TradingBot)
+        bot.telegram = TelegramNotifier(self.server.notifier_config())
+        bot.stats = TradingStats({"stats": {"history_dir": self.tmp.name}})
+        bot.reports = ReportCache()
+        bot.bot_name = "upbit_bot"
+        bot.bot_display_name = "Upbit Bot"
+        bot.bot_version = "0.0.0"
+        self.bot = bot
+
+    def tearDown(self):
+        self.bot.telegram.stop_listening()
+        self.bot.telegram.flush(timeout=2)
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def _command(self, text):
+        before = len(self.server.sent)
+        self.bot._handle_telegram_command(text)
+        self.assertTrue(self.server.wait_for_sent(before + 1))
+        return self.server.sent[before]["text"]
+
+    def test_report_commands(self):
+        self.assertIn("사용 가능한 명령어", self._command("/help"))
+        self.assertIn("v0.0.0", self._command("/version"))
+        self.assertIn("오늘 거래 내역이 없습니다", self._command("/daily"))
+        self.assertIn("최근 7일 거래 내역이 없습니다", self._command("/weekly"))
+        self.assertIn("알 수 없는 명령어", self._command("/nope"))
+
+    def test_repeated_report_is_served_from_cache(self):
+        self._command("/weekly")
+        self._command("/weekly")
+        self.assertEqual(self.bot.reports.stats()["hits"], 1)
+
+    def test_command_roundtrip_through_listener(self):
+        self.bot.telegram.start_listening(self.bot._handle_telegram_command)
+        self.server.push_message("/version")
+        self.assertTrue(self.server.wait_for_sent(1, timeout=3))
+        self.assertIn("버전 정보", self.server.sent[0]["text"])
+
+    def test_profile_stop_escapes_labels_and_uses_sample_total(self):
+        class FakeProfiler:
+            running = True
+            last_result = None
+
+            def stop(self):
+                top = [("trading-loop", "<genexpr> (x.py:3)", 30), ("trading-loop", "<module>", 10)]
+                return {"samples": 200, "stacks": 5, "path": "profile.txt", "top": top}
+
+        self.bot.profiler = FakeProfiler()
+        self.bot.logger = mock.Mock()
+        message = self.bot.profile_command(["stop"], html=True)
+        self.assertIn("&lt;genexpr&gt; (x.py:3) - 30 (15%)", message)
+        self.assertIn("&lt;module&gt; - 10 (5%)", message)
+        self.assertNotIn("<genexpr>", message)
+        self.assertIn("<genexpr>", self.bot.profile_command(["stop"]))
+
+    def test_loop_stall_alert_escapes_frame(self):
+        self.bot.logger = mock.Mock()
+        stack = '  File "main.py", line 10, in _trading_loop\n  File "x.py", line 3, in <genexpr>\n'
+        self.bot._on_loop_stall({"stage": "evaluate", "detail": "KRW-SOL", "age_seconds": 90,
+                                 "threshold_seconds": 60, "stack": stack})
+        self.assertTrue(self.server.wait_for_sent(1))
+        text = self.server.sent[0]["text"]
+        self.assertIn('File "x.py", line 3, in &lt;genexpr&gt;', text.replace("&quot;", '"'))
+        self.assertNotIn("<genexpr>", text)
+
+
+def test_outbox_throughput(fake_telegram, telegram_notifier):
+    """부하: 지연 20ms 서버에 200건 적재 -> 병합 포함 전량 전달 (속도 제한 준수)."""
+    fake_telegram.latency = 0.02
+    telegram_notifier.coalesce_seconds = 0.5
+    t0 = time.monotonic()
+    for i in range(200):
+        telegram_notifier.send_message(f"sell-{i}", coalesce_key="sell")
+    enqueue_seconds = time.monotonic() - t0
+    assert telegram_notifier.flush(timeout=10)
+    delivered = "\n".join(m["text"] for m in fake_telegram.sent)
+    assert all(f"sell-{i}" in delivered for i in range(200))
+    assert len(fake_telegram.sent) < 200
+    assert enqueue_seconds < 0.5
+
+
+if __name__ == "__main__":
+    unittest.main()
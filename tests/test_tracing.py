@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import tracing
+import upbit_api
+from logger import TradingLogger
+from test_logger import make_config
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {"Remaining-Req": "group=candles; min=599; sec=9"}
+
+
+class TracingTests(unittest.TestCase):
+    def tearDown(self):
+        trace = tracing.current_trace()
+        if trace is not None:
+            tracing.end_trace(trace)
+
+    def test_traced_passthrough_without_trace(self):
+        calls = []
+        wrapped = tracing.traced(lambda x: calls.append(x) or x * 2, name="double")
+        self.assertEqual(wrapped(3), 6)
+        self.assertEqual(calls, [3])
+        self.assertIsNone(tracing.current_trace_id())
+
+    def test_nested_spans_with_api_calls(self):
+        observed = []
+        hook = upbit_api._make_wrapper("GET", lambda url, **kwargs: FakeResponse())
+        upbit_api.add_observer(tracing.api_observer)
+        upbit_api.add_observer(observed.append)
+        try:
+            inner = tracing.traced(
+                lambda: hook("https://api.upbit.com/v1/orderbook", params={"markets": "KRW-BTC"}),
+                name="check_orderbook_safety",
+            )
+            outer = tracing.traced(lambda: (inner(), True), name="check_buy_signal", emit_if=lambda r: r[1])
+
+            trace = tracing.start_trace("TICKER_EVAL", "KRW-BTC")
+            outer()
+            tracing.end_trace(trace)
+        finally:
+            upbit_api.remove_observer(tracing.api_observer)
+            upbit_api.remove_observer(observed.append)
+
+        self.assertEqual(observed[0]["endpoint"], "/v1/orderbook")
+        self.assertEqual(observed[0]["status"], 200)
+        self.assertEqual(observed[0]["remaining_req"], "group=candles; min=599; sec=9")
+
+        payload = trace.to_payload()
+        self.assertTrue(trace.emit)
+        self.assertEqual(payload["ticker"], "KRW-BTC")
+        self.assertEqual(payload["api_calls"], 1)
+        # span은 종료 순서대로 쌓임: REST 호출(깊이 2) -> 내부 단계(1) -> 외부 단계(0)
+        names = [(s[0], s[3]) for s in payload["spans"]]
+        self.assertEqual(
+            names,
+            [("api:GET /v1/orderbook", 2), ("check_orderbook_safety", 1), ("check_buy_signal", 0)],
+        )
+        outer_span = payload["spans"][2]
+        api_span = payload["spans"][0]
+        self.assertGreaterEqual(api_span[1], outer_span[1])
+        self.assertLessEqual(api_span[2], outer_span[2])
+        self.assertIsNone(tracing.current_trace())
+
+    def test_failed_span_is_marked(self):
+        def boom():
+            raise RuntimeError("x")
+
+        trace = tracing.start_trace("TICKER_EVAL", "KRW-ETH")
+        with self.assertRaises(RuntimeError):
+            tracing.traced(boom, name="execute_buy")()
+        tracing.end_trace(trace)
+        self.assertEqual(trace.spans[0][0], "execute_buy")
+        self.assertFalse(trace.spans[0][4])
+
+
+class DecisionTraceIdTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_decisions_carry_trace_id(self):
+        logger = TradingLogger(make_config(self.tmpdir))
+        try:
+            trace = tracing.start_trace("TICKER_EVAL", "KRW-XRP")
+            logger.log_decision("BUY_BLOCKED", {"ticker": "KRW-XRP", "reason": "spread"})
+            tracing.end_trace(trace)
+            logger.log_decision("DECISION_TRACE", trace.to_payload())
+            logger.log_decision("START", {"ticker": "KRW-XRP"})
+            logger.flush()
+        finally:
+            logger.shutdown()
+
+        with open(os.path.join(self.tmpdir, "decisions.log"), encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        self.assertEqual(rows[0]["payload"]["trace_id"], trace.trace_id)
+        self.assertEqual(rows[1]["payload"]["trace_id"], trace.trace_id)
+        self.assertNotIn("trace_id", rows[2]["payload"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from pnl_rollup import PnLRollupStore
+from trade_store import TradeStore
+
+
+def make_trade(ts, coin="KRW-SOL", profit=100.0):
+    return {
+        "timestamp": ts.isoformat(),
+        "coin": coin,
+        "buy_price": 100.0,
+        "sell_price": 101.0,
+        "amount": 1.0,
+        "profit_rate": 1.0,
+        "profit_krw": profit,
+        "profit_after_fees_krw": profit - 0.05,
+        "reason": "test",
+    }
+
+
+class TradeStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_recent_ring_is_bounded(self):
+        store = TradeStore(self.tmpdir, max_recent=3)
+        base = datetime(2026, 10, 1, 12, 0, 0)
+        for i in range(5):
+            store.append(make_trade(base + timedelta(minutes=i), profit=float(i)))
+
+        self.assertEqual(len(store), 3)
+        recent = store.recent(2)
+        self.assertEqual([t["profit_krw"] for t in recent], [3.0, 4.0])
+        self.assertIsInstance(recent[0]["timestamp"], datetime)
+        self.assertEqual(store.last_trade_id, 5)
+
+    def test_day_reads_fall_back_to_history_files(self):
+        base = datetime(2026, 10, 1, 12, 0, 0)
+        writer = TradeStore(self.tmpdir, max_recent=2)
+        for i in range(4):
+            writer.append(make_trade(base + timedelta(days=i % 2, minutes=i)))
+
+        # 새 인스턴스(재기동)에서도 파일 기록으로 일자 조회 가능
+        reader = TradeStore(self.tmpdir, max_recent=2, max_cached_days=1)
+        self.assertEqual(len(reader.get_day(base.date())), 2)
+        self.assertEqual(len(reader.get_day("20261002")), 2)
+        self.assertEqual(len(reader.get_range(base.date(), base.date() + timedelta(days=6))), 4)
+        self.assertEqual(reader.get_day(datetime(2026, 9, 1)), [])
+
+
+class PnLRollupTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_incremental_rollup_matches_backfill(self):
+        store = TradeStore(self.tmpdir)
+        rollups = PnLRollupStore(self.tmpdir, trade_loader=store.get_day)
+        base = datetime(2026, 10, 1, 12, 0, 0)
+        for i, profit in enumerate([100.0, -50.0, 30.0]):
+            trade = store.append(make_trade(base + timedelta(days=i % 2, minutes=i), profit=profit))
+            rollups.add_trade(trade)
+
+        summary = rollups.summarize(base.date(), base.date() + timedelta(days=1))
+        self.assertEqual(summary["trades"], 3)
+        self.assertEqual(summary["wins"], 2)
+        self.assertEqual(summary["losses"], 1)
+        self.assertAlmostEqual(summary["profit_krw"], 80.0)
+        self.assertEqual(summary["by_symbol"]["SOL"]["trades"], 3)
+        self.assertEqual(summary["best"]["profit_krw"], 100.0)
+        self.assertEqual(summary["worst"]["profit_krw"], -50.0)
+        self.assertEqual([d[2] for d in summary["daily"]], [2, 1])
+
+        # 롤업 파일 없이 재기동해도 거래 파일 백필로 동일한 결과
+        shutil.rmtree(os.path.join(self.tmpdir, "rollups"))
+        rebuilt = PnLRollupStore(self.tmpdir, trade_loader=TradeStore(self.tmpdir).get_day)
+        again = rebuilt.summarize(base.date(), base.date() + timedelta(days=1))
+        self.assertEqual(again["trades"], 3)
+        self.assertAlmostEqual(again["profit_after_fees_krw"], summary["profit_after_fees_krw"])
+
+    def test_stale_latest_day_is_rebuilt_on_load(self):
+        store = TradeStore(self.tmpdir)
+        rollups = PnLRollupStore(self.tmpdir, trade_loader=store.get_day)
+        base = datetime(2026, 10, 1, 12, 0, 0)
+        rollups.add_trade(store.append(make_trade(base, profit=100.0)))
+        self.assertEqual(os.listdir(os.path.join(self.tmpdir, "rollups")), ["20261001.json"])
+        # 거래 기록 후 롤업 반영 전에 종료된 경우
+        store.append(make_trade(base + timedelta(minutes=5), profit=-40.0))
+
+        reloaded = PnLRollupStore(self.tmpdir, trade_loader=TradeStore(self.tmpdir).get_day)
+        row = reloaded.get_day(base)
+        self.assertEqual(row["trades"], 2)
+        self.assertAlmostEqual(row["profit_krw"], 60.0)
+        again = PnLRollupStore(self.tmpdir)
+        self.assertEqual(again.get_day(base)["trades"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import threading
+import time
+import unittest
+
+import upbit_api
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, tag):
+        self.tag = tag
+
+
+class HookTests(unittest.TestCase):
+    def setUp(self):
+        self.saved = dict(upbit_api._settings)
+        upbit_api._hedge_times.clear()
+        self.calls = []
+
+    def tearDown(self):
+        upbit_api._settings.clear()
+        upbit_api._settings.update(self.saved)
+
+    def test_default_timeouts(self):
+        hook = upbit_api._make_wrapper("GET", lambda url, **kw: self.calls.append(kw) or FakeResponse("a"))
+        hook("https://api.upbit.com/v1/ticker", params={"markets": "KRW-BTC"})
+        self.assertEqual(self.calls[-1]["timeout"], (3.0, 10.0))
+
+        post = upbit_api._make_wrapper("POST", lambda url, **kw: self.calls.append(kw) or FakeResponse("b"))
+        post("https://api.upbit.com/v1/orders", headers={"Authorization": "Bearer x"}, data="{}")
+        self.assertEqual(self.calls[-1]["timeout"], (3.0, None))
+
+        hook("https://api.upbit.com/v1/ticker", timeout=1)
+        self.assertEqual(self.calls[-1]["timeout"], 1)
+
+    def test_hedgeable_only_public_quotation_get(self):
+        self.assertTrue(upbit_api.is_hedgeable("GET", "/v1/candles/minutes/5", {}))
+        self.assertTrue(upbit_api.is_hedgeable("GET", "/v1/orderbook", {"params": {}}))
+        self.assertFalse(upbit_api.is_hedgeable("POST", "/v1/orders", {}))
+        self.assertFalse(upbit_api.is_hedgeable("GET", "/v1/accounts", {}))
+        self.assertFalse(
+            upbit_api.is_hedgeable("GET", "/v1/ticker", {"headers": {"Authorization": "Bearer x"}})
+        )
+
+    def test_slow_primary_is_hedged(self):
+        upbit_api.configure(hedge_enabled=True, hedge_min_delay_ms=20, hedge_delay_fn=lambda key: 30.0)
+        lock = threading.Lock()
+        attempt = {"n": 0}
+
+        def original(url, **kwargs):
+            with lock:
+                attempt["n"] += 1
+                n = attempt["n"]
+            if n == 1:
+                time.sleep(0.5)
+            return FakeResponse(n)
+
+        observed = []
+        hook = upbit_api._make_wrapper("GET", original)
+        upbit_api.add_observer(observed.append)
+        try:
+            t0 = time.perf_counter()
+            resp = hook("https://api.upbit.com/v1/candles/minutes/5")
+            elapsed = time.perf_counter() - t0
+        finally:
+            upbit_api.remove_observer(observed.append)
+
+        self.assertEqual(resp.tag, 2)
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual((observed[0]["attempts"], observed[0]["hedge_won"]), (2, True))
+
+    def test_fast_primary_and_orders_are_not_hedged(self):
+        upbit_api.configure(hedge_enabled=True, hedge_min_delay_ms=20, hedge_delay_fn=lambda key: 20.0)
+        count = {"n": 0}
+
+        def slow(url, **kwargs):
+            count["n"] += 1
+            time.sleep(0.1)
+            return FakeResponse(count["n"])
+
+        upbit_api._make_wrapper("POST", slow)("https://api.upbit.com/v1/orders", data="{}")
+        upbit_api._make_wrapper("GET", slow)(
+            "https://api.upbit.com/v1/ticker", headers={"Authorization": "Bearer x"}
+        )
+        self.assertEqual(count["n"], 2)
+
+        fast = upbit_api._make_wrapper("GET", lambda url, **kw: FakeResponse("fast"))
+        self.assertEqual(fast("https://api.upbit.com/v1/ticker").tag, "fast")
+
+    def test_hedge_budget(self):
+        upbit_api.configure(hedge_max_per_minute=1)
+        self.assertTrue(upbit_api._take_hedge_token())
+        self.assertFalse(upbit_api._take_hedge_token())
+
+
+if __name__ == "__main__":
+    unittest.main()
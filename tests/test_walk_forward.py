@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from backtest import Backtester
+from sweep import apply_overrides, expand_spec, init_worker, share_history, worker_state
+from test_backtest import CONFIG, make_history
+from walk_forward import _evaluate, build_proposal, build_tasks, make_windows, run_walk_forward
+
+
+class WindowTests(unittest.TestCase):
+    def test_rolling_windows(self):
+        windows = make_windows("2025-01-01", "2025-03-01", train_days=20, test_days=7, warmup_days=3)
+        self.assertEqual(windows[0]["train_start"], pd.Timestamp("2025-01-04"))
+        self.assertEqual(windows[0]["test_start"], windows[0]["train_end"])
+        for prev, cur in zip(windows, windows[1:]):
+            self.assertEqual(cur["test_start"], prev["test_end"])
+        self.assertLessEqual(windows[-1]["test_end"], pd.Timestamp("2025-03-01"))
+        self.assertEqual(len(windows), 5)
+
+        overlapping = make_windows("2025-01-01", "2025-03-01", train_days=20, test_days=7, step_days=2)
+        self.assertEqual(overlapping[1]["train_start"] - overlapping[0]["train_start"], pd.Timedelta(days=2))
+        with self.assertRaises(ValueError):
+            make_windows("2025-01-01", "2025-03-01", train_days=0, test_days=7)
+
+    def test_tasks_fill_workers(self):
+        spans = [(w, "train", None, None) for w in range(6)]
+        self.assertEqual(len(build_tasks([{}, {}, {}, {}], spans, workers=2)), 4)
+        tasks = build_tasks([{}], spans, workers=3)
+        self.assertEqual(len(tasks), 3)
+        self.assertEqual(sorted(s[0] for t in tasks for s in t[2]), list(range(6)))
+
+
+class CacheTests(unittest.TestCase):
+    def setUp(self):
+        shm, layout = share_history(make_history(20))
+        try:
+            init_worker(shm.name, layout, CONFIG, 1000000.0)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def tearDown(self):
+        worker_state().clear()
+
+    def test_prepare_once_per_combo_and_slices_match_run(self):
+        overrides = {"strategy.regime_confirm_count": 2}
+        spans = [
+            (0, "train", pd.Timestamp("2025-01-05"), pd.Timestamp("2025-01-12")),
+            (0, "test", pd.Timestamp("2025-01-12"), pd.Timestamp("2025-01-15")),
+        ]
+        with mock.patch.object(Backtester, "prepare", autospec=True, side_effect=Backtester.prepare) as prepare:
+            rows = _evaluate((0, overrides, spans[:1])) + _evaluate((0, overrides, spans[1:]))
+            self.assertEqual(prepare.call_count, 1)
+            _evaluate((1, {}, spans))
+            self.assertEqual(prepare.call_count, 2)
+        self.assertEqual(worker_state()["cache_hits"], 1)
+
+        self.assertTrue(all(r["error"] is None for r in rows))
+        direct = Backtester(apply_overrides(CONFIG, overrides)).run(
+            worker_state()["history"], start="2025-01-12", end="2025-01-15"
+        )["summary"]
+        self.assertEqual(rows[1]["summary"]["trades"], direct["trades"])
+        self.assertAlmostEqual(rows[1]["summary"]["final_krw"], direct["final_krw"], places=6)
+        self.assertEqual(rows[1]["summary"]["start"], pd.Timestamp("2025-01-12").isoformat())
+
+
+class WalkForwardTests(unittest.TestCase):
+    def test_oos_stats_and_proposal(self):
+        combos = expand_spec({"grid": {"strategy.sol_breakout_lookback": [36, 60], "risk_management.stop_loss_pct": [-1.5]}})
+        result = run_walk_forward(CONFIG, make_history(40), combos, train_days=12, test_days=6, warmup_days=4, workers=2)
+
+        self.assertEqual(len(result["windows"]), 4)
+        for w in result["windows"]:
+            self.assertIsNone(w["error"])
+            self.assertIn(w["params"], combos)
+            self.assertEqual(w["test"]["start"][:10], w["test_start"][:10])
+            self.assertLess(w["test"]["end"], w["test_end"])
+        growth = 1.0
+        for w in result["windows"]:
+            growth *= 1 + w["test"]["total_return_pct"] / 100
+        self.assertAlmostEqual(result["oos"]["compounded_return_pct"], (growth - 1) * 100, places=6)
+
+        proposal = result["proposal"]
+        self.assertEqual(set(proposal), {"strategy", "risk_management"})
+        self.assertIn(proposal["strategy"]["sol_breakout_lookback"], (36, 60))
+        self.assertEqual(proposal["strategy"]["signal_candle_minutes"], CONFIG["strategy"]["signal_candle_minutes"])
+        self.assertEqual(proposal["risk_management"], {"stop_loss_pct": -1.5})
+        self.assertEqual(build_proposal(CONFIG, {"strategy.doge_rsi_min": 55}), {"strategy": {**CONFIG["strategy"], "doge_rsi_min": 55}})
+
+
+if __name__ == "__main__":
+    unittest.main()
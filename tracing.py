@@ -0,0 +1,144 @@
+"""
+의사결정 추적 모듈 - 종목 평가 1회마다 상관관계 ID와 단계별(span) 소요 시간 기록
+
+거래 루프는 종목 평가마다 trace를 시작하고, 감싼 단계 함수(check_buy_signal,
+check_orderbook_safety, execute_buy ...)와 그 안의 REST 호출이 span으로 쌓입니다.
+평가가 끝나면 DECISION_TRACE 레코드 1건(span 목록)을 기록합니다.
+"""
+
+from datetime import datetime
+import functools
+import itertools
+import os
+import threading
+import time
+
+
+_local = threading.local()
+_id_counter = itertools.count(1)
+_id_prefix = f"{os.getpid() % 10000:04d}"
+
+
+class Trace:
+    """종목 평가 1회의 추적 상태 (스레드 로컬)."""
+
+    __slots__ = ("trace_id", "kind", "ticker", "started_at", "t0", "spans", "depth", "attrs", "emit")
+
+    def __init__(self, kind, ticker=None):
+        self.trace_id = f"{_id_prefix}-{next(_id_counter):x}"
+        self.kind = str(kind)
+        self.ticker = ticker
+        self.started_at = datetime.now()
+        self.t0 = time.perf_counter()
+        self.spans = []  # [name, start_ms, dur_ms, depth, ok]
+        self.depth = 0
+        self.attrs = {}
+        self.emit = False
+
+    def add_span(self, name, perf_start, elapsed_ms, depth, ok=True):
+        self.spans.append(
+            [name, round((perf_start - self.t0) * 1000.0, 2), round(elapsed_ms, 2), int(depth), bool(ok)]
+        )
+
+    def total_ms(self):
+        return (time.perf_counter() - self.t0) * 1000.0
+
+    def to_payload(self):
+        api_spans = [s for s in self.spans if s[0].startswith("api:")]
+        return {
+            "trace_id": self.trace_id,
+            "kind": self.kind,
+            "ticker": self.ticker,
+            "started_at": self.started_at.isoformat(timespec="milliseconds"),
+            "total_ms": round(self.total_ms(), 2),
+            "api_calls": len(api_spans),
+            "api_ms": round(sum(s[2] for s in api_spans), 2),
+            "attrs": dict(self.attrs),
+            # [이름, 시작 오프셋(ms), 소요(ms), 깊이, 성공 여부]
+            "spans": self.spans,
+        }
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+def current_trace_id():
+    trace = getattr(_local, "trace", None)
+    return trace.trace_id if trace is not None else None
+
+
+def start_trace(kind, ticker=None):
+    """현재 스레드에서 새 trace 시작 (이전 trace는 버림)."""
+    trace = Trace(kind, ticker)
+    _local.trace = trace
+    return trace
+
+
+def end_trace(trace):
+    """현재 스레드의 trace 해제 후 반환."""
+    if getattr(_local, "trace", None) is trace:
+        _local.trace = None
+    return trace
+
+
+def set_attr(**attrs):
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.attrs.update(attrs)
+
+
+def mark_emit():
+    """이 trace는 소요 시간과 무관하게 기록 (신호 발생/주문 등)."""
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.emit = True
+
+
+def traced(func, name=None, emit_if=None):
+    """함수를 span으로 감쌈. 활성 trace가 없으면 그대로 호출.
+
+    emit_if(result) -> bool 이 참이면 해당 trace를 기록 대상으로 표시합니다.
+    """
+    span_name = name or getattr(func, "__name__", "span")
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        trace = getattr(_local, "trace", None)
+        if trace is None:
+            return func(*args, **kwargs)
+
+        depth = trace.depth
+        trace.depth += 1
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            result = func(*args, **kwargs)
+            ok = True
+            if emit_if is not None:
+                try:
+                    if emit_if(result):
+                        trace.emit = True
+                except Exception:
+                    pass
+            return result
+        finally:
+            trace.depth = depth
+            trace.add_span(span_name, t0, (time.perf_counter() - t0) * 1000.0, depth, ok)
+
+    wrapper._traced = True
+    return wrapper
+
+
+def api_observer(call):
+    """upbit_api 관찰자: 활성 trace에 REST 호출 span 추가."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return
+    trace.add_span(
+        f"api:{call.get('method')} {call.get('endpoint')}",
+        call.get("perf_start", time.perf_counter()),
+        float(call.get("elapsed_ms", 0) or 0),
+        trace.depth,
+        call.get("error") is None,
+    )
@@ -0,0 +1,143 @@
+"""
+거래 기록 저장소 - 최근 거래 링 버퍼 + 일자별 인덱스 (오래된 기록은 파일에서 조회)
+"""
+
+from collections import OrderedDict, deque
+from datetime import date as date_cls, datetime
+from itertools import islice
+import json
+import os
+import threading
+
+import clock
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class TradeStore:
+    """청산 거래 기록 저장소.
+
+    - 메모리에는 최근 `max_recent`건만 링 버퍼로 유지합니다(장기 실행 시 메모리 증가 방지).
+    - 일자별 인덱스(`YYYYMMDD` -> 거래 목록)를 최근 `max_cached_days`일만 캐시합니다.
+    - 캐시에 없는 날짜는 `trade_history/YYYYMMDD.json`에서 한 번만 읽어 인덱스에 올립니다.
+    """
+
+    def __init__(self, history_dir="trade_history", max_recent=500, max_cached_days=8):
+        self.history_dir = history_dir
+        self.max_recent = max(1, int(max_recent))
+        self.max_cached_days = max(1, int(max_cached_days))
+
+        self._lock = threading.RLock()
+        self._recent = deque(maxlen=self.max_recent)
+        self._days = OrderedDict()  # day_key -> [trade(timestamp=datetime)]
+
+        # 세션 내 누적 거래 수 (리포트 캐시 버전 키 등으로 사용)
+        self.last_trade_id = 0
+
+        os.makedirs(self.history_dir, exist_ok=True)
+
+    @staticmethod
+    def day_key(value=None):
+        """datetime/date/'YYYYMMDD' 값을 'YYYYMMDD' 키로 정규화."""
+        if value is None:
+            return clock.now().strftime('%Y%m%d')
+        if isinstance(value, (datetime, date_cls)):
+            return value.strftime('%Y%m%d')
+        return str(value)
+
+    def _day_path(self, key):
+        return os.path.join(self.history_dir, f"{key}.json")
+
+    def _read_day_file(self, key):
+        filepath = self._day_path(key)
+        if not os.path.exists(filepath):
+            return []
+
+        with open(filepath, 'r', encoding='utf-8') as f:
+            trades = json.load(f)
+
+        # timestamp를 datetime 객체로 변환
+        for trade in trades:
+            if isinstance(trade.get('timestamp'), str):
+                trade['timestamp'] = datetime.fromisoformat(trade['timestamp'])
+        return trades
+
+    def _get_day_list(self, key, strict=False):
+        """일자별 인덱스 조회 (미캐시 시 파일에서 로드 후 LRU 캐시)."""
+        trades = self._days.get(key)
+        if trades is None:
+            try:
+                trades = self._read_day_file(key)
+            except Exception as e:
+                if strict:
+                    raise
+                print(f"거래 히스토리 로드 실패: {e}")
+                return []
+            self._days[key] = trades
+        self._days.move_to_end(key)
+        while len(self._days) > self.max_cached_days:
+            self._days.popitem(last=False)
+        return trades
+
+    def append(self, trade_record):
+        """거래 기록 추가 (메모리 링/일자 인덱스 반영 + 일자별 파일 영속화)."""
+        trade = dict(trade_record)
+        ts = trade.get('timestamp')
+        if isinstance(ts, str):
+            ts = datetime.fromisoformat(ts)
+        if not isinstance(ts, datetime):
+            ts = clock.now()
+        trade['timestamp'] = ts
+
+        with self._lock:
+            key = self.day_key(ts)
+            self._recent.append(trade)
+            self.last_trade_id += 1
+
+            try:
+                day_trades = self._get_day_list(key, strict=True)
+                day_trades.append(trade)
+                with open(self._day_path(key), 'w', encoding='utf-8') as f:
+                    json.dump(day_trades, f, indent=2, ensure_ascii=False, default=_json_default)
+            except Exception as e:
+                print(f"거래 히스토리 저장 실패: {e}")
+        return trade
+
+    def recent(self, limit=10):
+        """최근 거래 limit건 (오래된 순)."""
+        with self._lock:
+            limit = max(0, int(limit))
+            if limit <= 0:
+                return []
+            if limit >= len(self._recent):
+                return list(self._recent)
+            out = list(islice(reversed(self._recent), limit))
+            out.reverse()
+            return out
+
+    def get_day(self, value=None):
+        """특정 날짜의 전체 거래 목록 (O(k))."""
+        with self._lock:
+            return list(self._get_day_list(self.day_key(value)))
+
+    def get_range(self, start_date, end_date):
+        """start_date~end_date(포함) 거래 목록."""
+        start = start_date.date() if isinstance(start_date, datetime) else start_date
+        end = end_date.date() if isinstance(end_date, datetime) else end_date
+        out = []
+        day = start
+        while day <= end:
+            out.extend(self.get_day(day))
+            day = date_cls.fromordinal(day.toordinal() + 1)
+        return out
+
+    def __len__(self):
+        return len(self._recent)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._recent))
@@ -4,11 +4,17 @@
 
 import pyupbit
 import pyupbit.request_api as request_api
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
-import time
 import re
 from datetime import datetime
 
+import clock
+import paper_exchange
+from position import Position
+from candle_cache import load_candle_cache, save_candle_cache
+
 
 class TradingEngine:
     def __init__(self, config, logger, stats):
@@ -34,6 +40,8 @@ class TradingEngine:
         self.max_spread_pct = float(trading_cfg.get("max_spread_percent", 0.5))
         self.min_orderbook_depth = float(trading_cfg.get("min_orderbook_depth_krw", 5000000))
         self.order_type = trading_cfg.get("order_type", "market")
+        # live: 실제 업비트 주문 / paper: 모의 거래소(paper_exchange)로 체결 시뮬레이션
+        self.run_mode = str(trading_cfg.get("run_mode", "live") or "live").lower()
         self.limit_wait_seconds = int(trading_cfg.get("limit_order_wait_seconds", 3))
 
         self.rsi_period = int(ind_cfg.get("rsi_period", 14))
@@ -56,6 +64,8 @@ class TradingEngine:
         self.strategy_mode = str(strategy_cfg.get("mode", "regime_spec")).lower()
         self.regime_reference_ticker = self._normalize_ticker(strategy_cfg.get("regime_reference", "KRW-BTC"))
         self.regime_check_minutes = int(strategy_cfg.get("regime_check_minutes", 20))
+        # 레짐 판정용 신호 캔들 수 (진행 중 봉 포함)
+        self.regime_window = 260
         self.regime_confirm_count = int(strategy_cfg.get("regime_confirm_count", 3))
         self.regime_min_hold_minutes = int(strategy_cfg.get("regime_min_hold_minutes", 0))
         self.max_positions = int(strategy_cfg.get("max_positions", 2))
@@ -103,6 +113,19 @@ class TradingEngine:
         self._regime_changed_at = None
 
         self._ohlcv_cache = {}
+        # OHLCV 조회 경로별 횟수: 단기 캐시 적중 / 갭만 조회 / 전체 조회
+        self.cache_stats = {"ohlcv_hit": 0, "ohlcv_gap": 0, "ohlcv_full": 0, "frame_hit": 0, "frame_miss": 0}
+        # 입력 캔들이 같으면 리샘플/지표 계산 결과 재사용: key -> (입력 서명, 결과)
+        self._frame_memo = {}
+        # 기준 캔들 저장소: (ticker, interval) -> DataFrame (갭만 추가 조회, 재기동 시 파일에서 복원)
+        self._candle_store = {}
+
+        cache_cfg = config.get("candle_cache", {}) or {}
+        self.candle_cache_enabled = bool(cache_cfg.get("enabled", True))
+        self.candle_cache_path = str(cache_cfg.get("path", "cache/candles.npz"))
+        self.candle_cache_save_minutes = max(1, int(cache_cfg.get("save_minutes", 10) or 10))
+        self.candle_cache_state_max_age_minutes = int(cache_cfg.get("state_max_age_minutes", 60) or 60)
+        self._last_candle_cache_save = None
         self._last_resample_closed_ts = {}
         self._last_log_bucket = {}
         self._last_btc_filter_signature = None
@@ -118,9 +141,9 @@ class TradingEngine:
 
     def _throttled_info(self, key, message, bucket_seconds=60):
         try:
-            bucket = int(time.time() // max(1, int(bucket_seconds)))
+            bucket = int(clock.time() // max(1, int(bucket_seconds)))
         except Exception:
-            bucket = int(time.time())
+            bucket = int(clock.time())
         if self._last_log_bucket.get(key) == bucket:
             return
         self._last_log_bucket[key] = bucket
@@ -145,7 +168,7 @@ class TradingEngine:
                         f"CANCEL_ORDER_ERROR | side={side} ticker={ticker} "
                         f"uuid={uuid} try={attempt}/{retries} err=upbit_none"
                     )
-                    time.sleep(0.2)
+                    clock.sleep(0.2)
                     continue
                 result = self.upbit.cancel_order(uuid)
                 ok = result is not None
@@ -160,7 +183,7 @@ class TradingEngine:
                     f"CANCEL_ORDER_ERROR | side={side} ticker={ticker} "
                     f"uuid={uuid} try={attempt}/{retries} err={type(e).__name__}: {e}"
                 )
-            time.sleep(0.2)
+            clock.sleep(0.2)
         return False
 
     @staticmethod
@@ -356,20 +379,26 @@ class TradingEngine:
             return False, f"호가 체크 오류: {e}", {"ticker": ticker, "error": f"{type(e).__name__}: {e}"}
 
     def connect(self, access_key, secret_key):
-        """업비트 API 연결"""
+        """업비트 API 연결 (paper 모드는 키 없이 모의 거래소 연결)"""
         try:
-            if not access_key or not secret_key:
+            if self.run_mode == "paper":
+                self.upbit = paper_exchange.from_config(self.config)
+                self.logger.info(
+                    f"📝 모의 거래(paper) 모드 | 지연 {self.upbit.latency_seconds * 1000:.0f}ms | "
+                    f"호가 소진율 {self.upbit.liquidity_ratio:.0%} | 실제 주문 없음"
+                )
+            elif not access_key or not secret_key:
                 self.logger.error("업비트 API 연결 실패: access_key 또는 secret_key 누락")
                 return False
-            if access_key.startswith("YOUR_") or secret_key.startswith("YOUR_"):
+            elif access_key.startswith("YOUR_") or secret_key.startswith("YOUR_"):
                 self.logger.error("업비트 API 연결 실패: 플레이스홀더 키가 설정되어 있습니다")
                 return False
-            if len(access_key) != 40 or len(secret_key) != 40:
-                self.logger.warning(
-                    f"업비트 API 키 길이 비정상 가능성: access({len(access_key)}), secret({len(secret_key)})"
-                )
-
-            self.upbit = pyupbit.Upbit(access_key, secret_key)
+            else:
+                if len(access_key) != 40 or len(secret_key) != 40:
+                    self.logger.warning(
+                        f"업비트 API 키 길이 비정상 가능성: access({len(access_key)}), secret({len(secret_key)})"
+                    )
+                self.upbit = pyupbit.Upbit(access_key, secret_key)
 
             last_error = None
             for attempt in range(1, 6):
@@ -377,7 +406,7 @@ class TradingEngine:
                     balance = self.upbit.get_balance("KRW")
                     if balance is None:
                         last_error = "KRW 잔고 조회 결과가 None"
-                        time.sleep(0.7)
+                        clock.sleep(0.7)
                         continue
                     balance = float(balance)
                     self.logger.info(f"✅ 업비트 API 연결 성공 | 보유 현금: {balance:,.0f}원")
@@ -385,7 +414,7 @@ class TradingEngine:
                 except Exception as e:
                     last_error = f"{type(e).__name__}: {e}"
                     self.logger.warning(f"API 연결 재시도 {attempt}/5 실패 - {last_error}")
-                    time.sleep(0.7)
+                    clock.sleep(0.7)
 
             diag = None
             try:
@@ -420,16 +449,102 @@ class TradingEngine:
         return true_range.rolling(self.atr_period).mean()
 
     def _get_cached_ohlcv(self, ticker, interval="minute1", count=200, ttl_seconds=2):
-        """OHLCV 조회 with 단기 캐시 (요청 수 제한 완화)."""
-        now = time.time()
+        """OHLCV 조회 with 단기 캐시 (요청 수 제한 완화).
+
+        반환 프레임은 캐시와 공유하므로 호출자는 수정하지 않습니다 (리샘플/지표 계산은 복사본 사용).
+        저장본이 바뀌지 않았으면 직전과 같은 프레임 객체를 돌려줘 _memo_frame이 서명 계산 없이 재사용합니다.
+        """
+        now = clock.time()
         key = (ticker, interval, int(count))
+        cached = self._ohlcv_cache.get(key)
 
-        if ttl_seconds and key in self._ohlcv_cache:
-            ts, cached_df = self._ohlcv_cache[key]
+        if ttl_seconds and cached is not None:
+            ts, cached_df, _ = cached
             if (now - ts) < ttl_seconds and cached_df is not None:
-                return cached_df.copy()
+                self.cache_stats["ohlcv_hit"] += 1
+                return cached_df
 
         count_int = max(1, int(count))
+        stored = self._fetch_ohlcv_gap(ticker, interval, count_int)
+        if stored is None:
+            self.cache_stats["ohlcv_full"] += 1
+            # 저장본은 호출자 중 가장 긴 요청 길이로 유지 (짧은 요청이 덮어써 긴 요청이 전체 조회하는 일 방지)
+            base = self._candle_store.get((ticker, interval))
+            keep = max(count_int, len(base)) if base is not None else count_int
+            stored = self._fetch_ohlcv_full(ticker, interval, keep)
+        else:
+            self.cache_stats["ohlcv_gap"] += 1
+
+        if stored is None:
+            return None
+        self._candle_store[(ticker, interval)] = stored
+        if cached is not None and cached[2] is stored:
+            df = cached[1]
+        else:
+            df = stored.tail(count_int)
+        self._ohlcv_cache[key] = (now, df, stored)
+        return df
+
+    def get_cached_price(self, ticker):
+        """저장된 캔들 중 가장 최근 종가 (API 호출 없음). 없으면 None."""
+        latest = None
+        for (t, _interval), df in list(self._candle_store.items()):
+            if t != ticker or df is None or len(df) == 0:
+                continue
+            ts = pd.Timestamp(df.index[-1])
+            if latest is None or ts > latest[0]:
+                latest = (ts, df["close"].iloc[-1])
+        if latest is None:
+            return None
+        try:
+            return float(latest[1])
+        except Exception:
+            return None
+
+    @staticmethod
+    def _interval_minutes(interval):
+        if interval == "day":
+            return 1440
+        m = re.fullmatch(r"minute(\d+)", str(interval))
+        return int(m.group(1)) if m else None
+
+    def _fetch_ohlcv_gap(self, ticker, interval, count_int):
+        """저장된 캔들 이후 구간(갭)만 조회해 병합한 저장본(저장본 길이 유지). 불가하면 None."""
+        base = self._candle_store.get((ticker, interval))
+        minutes = self._interval_minutes(interval)
+        if base is None or minutes is None or len(base) < count_int:
+            return None
+
+        last_ts = pd.Timestamp(base.index[-1])
+        elapsed_minutes = (pd.Timestamp(clock.now()) - last_ts).total_seconds() / 60.0
+        # 마지막(진행 중) 캔들을 덮어쓰기 위해 1~2개 겹치게 조회
+        gap = max(2, int(elapsed_minutes // minutes) + 2)
+        if gap > 200:
+            return None
+
+        part = pyupbit.get_ohlcv(ticker, interval=interval, count=gap)
+        if part is None or len(part) == 0:
+            return None
+        first_new = pd.Timestamp(part.index[0])
+        if first_new > last_ts:
+            # 겹치는 캔들이 없으면 누락 구간이 있을 수 있으므로 전체 조회
+            return None
+
+        # 겹친 구간이 저장본과 같으면(새 캔들/진행 중 캔들 변화 없음) 병합 생략
+        n = len(part)
+        if (
+            n <= len(base)
+            and list(part.columns) == list(base.columns)
+            and base.index[-n:].equals(part.index)
+            and np.array_equal(base.iloc[-n:].to_numpy(), part.to_numpy(), equal_nan=True)
+        ):
+            return base
+
+        merged = pd.concat([base[base.index < first_new], part])
+        return merged.tail(len(base))
+
+    def _fetch_ohlcv_full(self, ticker, interval, count_int):
+        """count_int개 캔들 전체 조회 (200개 초과 시 페이징)."""
         if count_int <= 200:
             df = pyupbit.get_ohlcv(ticker, interval=interval, count=count_int)
         else:
@@ -452,7 +567,7 @@ class TradingEngine:
                 to = to_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
                 if len(part) < batch:
                     break
-                time.sleep(0.05)
+                clock.sleep(0.05)
 
             if frames:
                 df = pd.concat(frames).sort_index()
@@ -460,11 +575,87 @@ class TradingEngine:
                 df = df.tail(count_int)
             else:
                 df = None
-
-        if df is not None:
-            self._ohlcv_cache[key] = (now, df.copy())
         return df
 
+    def _regime_state(self):
+        return {
+            "global_regime": self.global_regime,
+            "regime_candidate": self._regime_candidate,
+            "regime_candidate_count": int(self._regime_candidate_count),
+            "regime_changed_at": self._regime_changed_at.isoformat() if self._regime_changed_at else None,
+            "last_resample_closed_ts": dict(self._last_resample_closed_ts),
+        }
+
+    def save_candle_cache(self, force=False):
+        """기준 캔들 + 레짐 상태 저장 (save_minutes 주기, force 시 즉시)."""
+        if not self.candle_cache_enabled:
+            return False
+        now = clock.now()
+        if not force and self._last_candle_cache_save:
+            elapsed = (now - self._last_candle_cache_save).total_seconds()
+            if elapsed < self.candle_cache_save_minutes * 60:
+                return False
+        self._last_candle_cache_save = now
+
+        try:
+            count = save_candle_cache(self.candle_cache_path, dict(self._candle_store), self._regime_state())
+            self.logger.debug(f"캔들 캐시 저장: {count}개 시리즈 -> {self.candle_cache_path}")
+            return True
+        except Exception as e:
+            self.logger.warning(f"⚠️ 캔들 캐시 저장 실패: {e}")
+            return False
+
+    def load_candle_cache(self):
+        """저장된 캔들/레짐 상태 복원 (이후 조회는 갭만 추가로 가져옴)."""
+        if not self.candle_cache_enabled:
+            return 0
+        try:
+            frames, state, saved_at = load_candle_cache(self.candle_cache_path)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 캔들 캐시 로드 실패: {e}")
+            return 0
+
+        self._candle_store.update(frames)
+
+        # 레짐 상태는 저장 후 오래 지나지 않았을 때만 이어서 사용
+        if state and saved_at:
+            age_minutes = (clock.now() - saved_at).total_seconds() / 60.0
+            if age_minutes <= self.candle_cache_state_max_age_minutes:
+                self.global_regime = str(state.get("global_regime") or self.global_regime)
+                self._regime_candidate = state.get("regime_candidate")
+                self._regime_candidate_count = int(state.get("regime_candidate_count", 0) or 0)
+                changed_at = state.get("regime_changed_at")
+                self._regime_changed_at = datetime.fromisoformat(changed_at) if changed_at else None
+                self._last_resample_closed_ts.update(state.get("last_resample_closed_ts", {}) or {})
+
+        if frames:
+            self.logger.info(
+                f"💾 캔들 캐시 복원: {len(frames)}개 시리즈 "
+                f"(저장 {saved_at.strftime('%Y-%m-%d %H:%M:%S') if saved_at else '-'}, 레짐 {self.global_regime})"
+            )
+        return len(frames)
+
+    @staticmethod
+    def _frame_signature(df, row=-1):
+        """캔들 프레임 서명: 길이/시작/기준 행 시각 + 기준 행 값 (기준 행 이후 봉은 무시)."""
+        return (len(df), df.index[0], df.index[row], tuple(df.to_numpy()[row].tolist()))
+
+    def _memo_frame(self, key, df, compute, row=-1):
+        """입력 프레임이 직전과 같은 객체이거나 서명(_frame_signature)이 같으면 직전 결과 재사용 (키당 1개만 보관)."""
+        cached = self._frame_memo.get(key)
+        if cached is not None and cached[2] is df:
+            self.cache_stats["frame_hit"] += 1
+            return cached[1]
+        signature = self._frame_signature(df, row)
+        if cached is not None and cached[0] == signature:
+            self.cache_stats["frame_hit"] += 1
+            self._frame_memo[key] = (signature, cached[1], df)
+            return cached[1]
+        self.cache_stats["frame_miss"] += 1
+        value = compute()
+        self._frame_memo[key] = (signature, value, df)
+        return value
+
     def _get_resampled_ohlcv(self, ticker, minutes=20, count=220, ttl_seconds=4):
         """5분봉을 기반으로 N분봉으로 리샘플링."""
         base_minutes = 5
@@ -480,27 +671,13 @@ class TradingEngine:
         if df is None or len(df) < max(80, factor * 20):
             return None
 
-        work = df.copy()
-        if not isinstance(work.index, pd.DatetimeIndex):
-            work.index = pd.to_datetime(work.index)
-
-        rule = f"{int(minutes)}min"
-        resampled = (
-            work.resample(rule, label="right", closed="right")
-            .agg(
-                {
-                    "open": "first",
-                    "high": "max",
-                    "low": "min",
-                    "close": "last",
-                    "volume": "sum",
-                    "value": "sum",
-                }
-            )
-            .dropna()
+        # 조회 봉 수별로 보관 (같은 종목을 다른 길이로 번갈아 조회해도 서로 덮어쓰지 않음)
+        resampled = self._memo_frame(
+            ("resample", ticker, int(minutes), int(count)),
+            df,
+            lambda: self._resample_tail(df, minutes, count),
         )
-
-        if len(resampled) < 210:
+        if resampled is None:
             return None
 
         if int(minutes) == 20 and len(resampled) >= 2:
@@ -510,10 +687,31 @@ class TradingEngine:
                 self._last_resample_closed_ts[ticker] = last_closed
                 self.logger.info(f"Resampled to 20min for {ticker}, last closed candle: {last_closed}")
 
+        return resampled
+
+    def _resample_tail(self, df, minutes, count):
+        resampled = self.resample_ohlcv(df, minutes)
+        if len(resampled) < 210:
+            return None
         return resampled.tail(max(count, 210))
 
-    def _is_entry_time_blocked(self):
-        now_hour = datetime.now().hour
+    @staticmethod
+    def resample_ohlcv(df, minutes):
+        """N분봉 리샘플링 (라벨/구간 모두 오른쪽 기준, 빈 구간 제거)."""
+        work = df.copy()
+        if not isinstance(work.index, pd.DatetimeIndex):
+            work.index = pd.to_datetime(work.index)
+
+        agg = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum", "value": "sum"}
+        rule = f"{int(minutes)}min"
+        return (
+            work.resample(rule, label="right", closed="right")
+            .agg({col: how for col, how in agg.items() if col in work.columns})
+            .dropna()
+        )
+
+    def _is_entry_time_blocked(self, hour=None):
+        now_hour = clock.now().hour if hour is None else int(hour)
         start = int(self.entry_block_start_hour)
         end = int(self.entry_block_end_hour)
         if start == end:
@@ -533,18 +731,19 @@ class TradingEngine:
         df = self._get_resampled_ohlcv(
             self.btc_filter_ticker,
             minutes=self.signal_candle_minutes,
-            count=max(220, self.btc_filter_ema_period + 40),
+            count=self.btc_filter_window(),
             ttl_seconds=10,
         )
         if df is None or len(df) < self.btc_filter_ema_period + 2:
             self._throttled_info("btc_filter_short", "BUY_BLOCKED: BTC_FILTER (btc_data_short)", bucket_seconds=60)
             return False, {"enabled": True, "reason": "btc_data_short"}
 
-        work = df.copy()
-        work["ema_btc"] = work["close"].ewm(span=self.btc_filter_ema_period, adjust=False).mean()
-        row = work.iloc[-2]
-        close = self._safe_float(row.get("close", 0), 0)
-        ema = self._safe_float(row.get("ema_btc", 0), 0)
+        close, ema, candle_ts = self._memo_frame(
+            ("btc_filter", self.btc_filter_ticker),
+            df,
+            lambda: self._btc_filter_values(df),
+            row=-2,
+        )
         passed = close > ema > 0
         meta = {
             "enabled": True,
@@ -552,7 +751,7 @@ class TradingEngine:
             "close": float(close),
             "ema": float(ema),
             "passed": bool(passed),
-            "candle_ts": str(getattr(row, "name", "") or ""),
+            "candle_ts": candle_ts,
         }
         sig = (meta["candle_ts"], bool(passed))
         if sig != self._last_btc_filter_signature:
@@ -567,10 +766,20 @@ class TradingEngine:
                 )
         return passed, meta
 
-    def _persist_position_meta(self, ticker, position, buy_meta):
-        if not isinstance(position, dict):
+    def _btc_filter_values(self, df):
+        """BTC 직전 확정봉 종가/EMA/봉 시각."""
+        work = df.copy()
+        work["ema_btc"] = work["close"].ewm(span=self.btc_filter_ema_period, adjust=False).mean()
+        row = work.iloc[-2]
+        close = self._safe_float(row.get("close", 0), 0)
+        ema = self._safe_float(row.get("ema_btc", 0), 0)
+        return close, ema, str(getattr(row, "name", "") or "")
+
+    def _update_position_exit_state(self, ticker, position, **fields):
+        """청산 상태(익절/트레일링) 갱신 후 스냅샷 저장."""
+        if not isinstance(position, Position):
             return
-        position["buy_meta"] = buy_meta if isinstance(buy_meta, dict) else {}
+        position.update_meta(**fields)
         try:
             self.stats.save_positions()
         except Exception:
@@ -687,7 +896,7 @@ class TradingEngine:
         df = self._get_resampled_ohlcv(
             self.regime_reference_ticker,
             minutes=self.signal_candle_minutes,
-            count=260,
+            count=self.regime_window,
             ttl_seconds=12,
         )
         if df is None or len(df) < 210:
@@ -721,7 +930,7 @@ class TradingEngine:
 
     def update_global_regime(self, force=False):
         """3연속 확인으로 레짐 전환 확정."""
-        now = datetime.now()
+        now = clock.now()
         if not force and self._last_regime_check:
             elapsed = (now - self._last_regime_check).total_seconds()
             if elapsed < max(60, self.regime_check_minutes * 60):
@@ -781,126 +990,228 @@ class TradingEngine:
             self.logger.info(f"📈 글로벌 레짐 전환: {previous_regime} -> {self.global_regime}")
         return self.global_regime, payload
 
+    def analysis_window(self):
+        """analyze_symbol이 조회하는 신호 캔들 수 (진행 중 봉 포함)."""
+        return max(self.analysis_lookback, self.ada_range_lookback + 20, self.sol_breakout_lookback + 20, 220)
+
+    def btc_filter_window(self):
+        """BTC 추세 필터가 조회하는 신호 캔들 수 (진행 중 봉 포함)."""
+        return max(220, self.btc_filter_ema_period + 40)
+
+    @staticmethod
+    def ewm_live(close, span, live_window=None):
+        """EMA(adjust=False).
+
+        live_window가 있으면 각 봉 값을 "그 봉이 마지막 확정 캔들인 실거래 프레임(진행 중 봉 포함 live_window개)"에서
+        계산했을 때와 같게 맞춥니다. 실거래는 프레임 첫 봉에서 EMA를 다시 시작하므로
+        (예: EMA200을 약 230봉으로 계산) 전체 이력으로 계산한 값과 다릅니다.
+        """
+        ema = close.ewm(span=span, adjust=False).mean()
+        n = int(live_window or 0) - 1  # 확정 봉까지의 봉 수
+        values = close.to_numpy(dtype=float)
+        if n < 2 or len(values) <= n:
+            return ema
+        alpha = 2.0 / (span + 1.0)
+        decay = (1.0 - alpha) ** np.arange(n - 1, -1, -1, dtype=float)
+        weights = alpha * decay
+        weights[0] = decay[0]  # 프레임 첫 봉 = 시드
+        out = ema.to_numpy(dtype=float, copy=True)
+        out[n - 1:] = sliding_window_view(values, n) @ weights
+        return pd.Series(out, index=close.index)
+
     def analyze_symbol(self, ticker):
         """20분봉 기반 전략 상태 계산."""
-        lookback = max(self.analysis_lookback, self.ada_range_lookback + 20, self.sol_breakout_lookback + 20, 220)
         df = self._get_resampled_ohlcv(
             ticker=ticker,
             minutes=self.signal_candle_minutes,
-            count=lookback,
+            count=self.analysis_window(),
             ttl_seconds=4,
         )
         if df is None or len(df) < 210:
             return None
 
-        df = df.copy()
-        df["ema20"] = df["close"].ewm(span=20, adjust=False).mean()
-        df["ema50"] = df["close"].ewm(span=50, adjust=False).mean()
-        df["ema200"] = df["close"].ewm(span=200, adjust=False).mean()
-        df["rsi"] = self._calc_rsi(df["close"])
-        df["tr"] = self._calc_true_range(df)
-        df["atr"] = self._calc_atr(df)
-        df["volume_ma20"] = df["volume"].rolling(20).mean()
-
-        cur = df.iloc[-2]
-        prev = df.iloc[-3]
-        close = self._safe_float(cur.get("close", 0), 0)
-        prev_close = self._safe_float(prev.get("close", close), close)
-        high = self._safe_float(cur.get("high", close), close)
-        low = self._safe_float(cur.get("low", close), close)
-        tr = self._safe_float(cur.get("tr", 0), 0)
-        atr = self._safe_float(cur.get("atr", 0), 0)
-        rsi = self._safe_float(cur.get("rsi", 50), 50)
-        ema20 = self._safe_float(cur.get("ema20", close), close)
-        ema50 = self._safe_float(cur.get("ema50", close), close)
-        ema200 = self._safe_float(cur.get("ema200", close), close)
-        volume = self._safe_float(cur.get("volume", 0), 0)
-        volume_ma = self._safe_float(cur.get("volume_ma20", 0), 0)
-        volume_ratio = (volume / volume_ma) if volume_ma > 0 else 0
-
-        breakout_window = df["high"].iloc[-(self.sol_breakout_lookback + 2):-2]
-        breakout_level = self._safe_float(breakout_window.max(), close) if len(breakout_window) > 0 else close
-        breakout_above = bool(close > breakout_level and high >= breakout_level)
-        retest_band = max(atr * self.sol_retest_atr_tolerance, close * 0.0015)
-        retest_ok_sol = (
-            breakout_above
-            and low <= (breakout_level + retest_band)
-            and close >= breakout_level
-            and abs(close - breakout_level) <= max(retest_band * 1.4, close * 0.01)
+        # 지표는 인과적이므로 마지막 확정 캔들(-2)까지 같으면 결과도 같음 (진행 중 봉 변화는 무시)
+        analysis = self._memo_frame(
+            ("analysis", ticker),
+            df,
+            lambda: self._analyze_frame(ticker, df),
+            row=-2,
         )
+        return dict(analysis)
 
-        swing_window = df.iloc[-(self.ada_range_lookback + 2):-2]
-        swing_high = self._safe_float(swing_window["high"].max(), close) if len(swing_window) > 0 else close
-        swing_low = self._safe_float(swing_window["low"].min(), close) if len(swing_window) > 0 else close
-        range_width = max(0.0, swing_high - swing_low)
-        range_position = ((close - swing_low) / range_width) if range_width > 0 else 0.5
-        middle_zone = 0.40 <= range_position <= 0.60
-        range_bounce = close >= prev_close
-        ada_in_lower_zone = bool(range_position <= self.ada_entry_lower_pct)
-        ada_target_price = swing_low + (range_width * self.ada_take_profit_upper_pct)
-
-        tr_atr_ratio = (tr / atr) if atr > 0 else 0.0
-        atr_pct = (atr / close) * 100 if close > 0 else 0.0
-        range_width_pct = (range_width / close) * 100 if close > 0 else 0.0
-
-        if close > ema50 > ema200:
-            structure = "BULL"
-        elif close < ema50 < ema200:
-            structure = "BEAR"
-        else:
-            structure = "RANGE"
-
-        pullback_to_ema20 = abs(close - ema20) <= max(atr * self.doge_pullback_atr_tolerance, close * 0.0025)
-        volatility_ok = tr_atr_ratio <= self.volatility_tr_atr_max
-        trend_bias_pct = ((ema50 / ema200) - 1.0) * 100.0 if ema200 > 0 else 0.0
-
-        quality_score = 0.0
-        quality_score += 20.0 if volatility_ok else -20.0
-        quality_score += min(18.0, max(0.0, volume_ratio * 9.0))
-        quality_score += 10.0 if breakout_above else 0.0
-        quality_score += 8.0 if retest_ok_sol else 0.0
-        quality_score += 8.0 if pullback_to_ema20 else 0.0
-        quality_score += 10.0 if ada_in_lower_zone else 0.0
-        quality_score += 8.0 if range_bounce else 0.0
+    def _analyze_frame(self, ticker, df):
+        frame = self.compute_signal_frame(df)
+        cur = frame.iloc[-2]
+        close = float(cur["close"])
 
+        structure = str(cur["structure"])
         return {
             "ticker": ticker,
             "candle_ts": str(getattr(cur, "name", "") or ""),
-            "close": float(close),
-            "prev_close": float(prev_close),
-            "high": float(high),
-            "low": float(low),
-            "ema20": float(ema20),
-            "ema50": float(ema50),
-            "ema200": float(ema200),
-            "rsi": float(rsi),
-            "atr": float(atr),
-            "atr_pct": float(atr_pct),
-            "tr": float(tr),
-            "tr_atr_ratio": float(tr_atr_ratio),
-            "volume_ratio": float(volume_ratio),
-            "breakout_level": float(breakout_level),
-            "swing_high": float(swing_high),
-            "swing_low": float(swing_low),
-            "range_width_pct": float(range_width_pct),
-            "range_position": float(max(0.0, min(1.0, range_position))),
-            "middle_zone": bool(middle_zone),
+            "close": close,
+            "prev_close": float(cur["prev_close"]),
+            "high": float(cur["high"]),
+            "low": float(cur["low"]),
+            "ema20": float(cur["ema20"]),
+            "ema50": float(cur["ema50"]),
+            "ema200": float(cur["ema200"]),
+            "rsi": float(cur["rsi"]),
+            "atr": float(cur["atr"]),
+            "atr_pct": float(cur["atr_pct"]),
+            "tr": float(cur["tr"]),
+            "tr_atr_ratio": float(cur["tr_atr_ratio"]),
+            "volume_ratio": float(cur["volume_ratio"]),
+            "breakout_level": float(cur["breakout_level"]),
+            "swing_high": float(cur["swing_high"]),
+            "swing_low": float(cur["swing_low"]),
+            "range_width_pct": float(cur["range_width_pct"]),
+            "range_position": float(max(0.0, min(1.0, float(cur["range_position"])))),
+            "middle_zone": bool(cur["middle_zone"]),
             "range_clarity": bool(structure == "RANGE"),
-            "retest_ok_bull": bool(retest_ok_sol),
-            "retest_ok_sol": bool(retest_ok_sol),
-            "breakout_above_48": bool(breakout_above),
-            "near_lower_extreme": bool(ada_in_lower_zone),
-            "range_bounce": bool(range_bounce),
-            "volatility_ok": bool(volatility_ok),
+            "retest_ok_bull": bool(cur["retest_ok_sol"]),
+            "retest_ok_sol": bool(cur["retest_ok_sol"]),
+            "breakout_above_48": bool(cur["breakout_above"]),
+            "near_lower_extreme": bool(cur["ada_in_lower_zone"]),
+            "range_bounce": bool(cur["range_bounce"]),
+            "volatility_ok": bool(cur["volatility_ok"]),
             "structure": structure,
             "symbol_regime": structure,
-            "trend_bias_pct": float(trend_bias_pct),
-            "pullback_to_ema20": bool(pullback_to_ema20),
-            "ada_in_lower_zone": bool(ada_in_lower_zone),
-            "ada_target_price": float(ada_target_price),
-            "quality_score": float(quality_score),
+            "trend_bias_pct": float(cur["trend_bias_pct"]),
+            "pullback_to_ema20": bool(cur["pullback_to_ema20"]),
+            "ada_in_lower_zone": bool(cur["ada_in_lower_zone"]),
+            "ada_target_price": float(cur["ada_target_price"]),
+            "quality_score": float(cur["quality_score"]),
         }
 
+    def compute_signal_frame(self, df, live_window=None):
+        """전략 상태 지표를 전체 봉에 대해 벡터 계산 (각 행 = 해당 봉이 마지막 확정 캔들일 때의 상태).
+
+        analyze_symbol(실거래)과 backtest가 같은 계산을 사용합니다.
+        돌파/스윙 구간은 현재 봉 이전 N개 봉(현재 봉 제외) 기준입니다.
+        live_window: 백테스트에서 EMA를 실거래 프레임 길이(analysis_window) 기준으로 맞출 때 사용 (ewm_live 참고)
+        """
+        out = df.copy()
+        close = out["close"]
+        high = out["high"]
+        low = out["low"]
+
+        out["ema20"] = self.ewm_live(close, 20, live_window)
+        out["ema50"] = self.ewm_live(close, 50, live_window)
+        out["ema200"] = self.ewm_live(close, 200, live_window)
+        out["rsi"] = self._calc_rsi(close)
+        out["tr"] = self._calc_true_range(out)
+        out["atr"] = self._calc_atr(out)
+        out["volume_ma20"] = out["volume"].rolling(20).mean()
+        out["prev_close"] = close.shift(1).fillna(close)
+
+        atr = out["atr"].to_numpy(dtype=float)
+        tr = out["tr"].to_numpy(dtype=float)
+        c = close.to_numpy(dtype=float)
+        h = high.to_numpy(dtype=float)
+        lo = low.to_numpy(dtype=float)
+        volume = out["volume"].to_numpy(dtype=float)
+        volume_ma = out["volume_ma20"].to_numpy(dtype=float)
+        ema20 = out["ema20"].to_numpy(dtype=float)
+        ema50 = out["ema50"].to_numpy(dtype=float)
+        ema200 = out["ema200"].to_numpy(dtype=float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["volume_ratio"] = np.where(volume_ma > 0, volume / volume_ma, 0.0)
+
+            breakout_level = high.shift(1).rolling(self.sol_breakout_lookback, min_periods=1).max().fillna(close)
+            bl = breakout_level.to_numpy(dtype=float)
+            breakout_above = (c > bl) & (h >= bl)
+            retest_band = np.maximum(atr * self.sol_retest_atr_tolerance, c * 0.0015)
+            out["breakout_level"] = bl
+            out["breakout_above"] = breakout_above
+            out["retest_ok_sol"] = (
+                breakout_above
+                & (lo <= bl + retest_band)
+                & (c >= bl)
+                & (np.abs(c - bl) <= np.maximum(retest_band * 1.4, c * 0.01))
+            )
+
+            swing_high = high.shift(1).rolling(self.ada_range_lookback, min_periods=1).max().fillna(close)
+            swing_low = low.shift(1).rolling(self.ada_range_lookback, min_periods=1).min().fillna(close)
+            sh = swing_high.to_numpy(dtype=float)
+            sl = swing_low.to_numpy(dtype=float)
+            range_width = np.maximum(0.0, sh - sl)
+            range_position = np.where(range_width > 0, (c - sl) / range_width, 0.5)
+            out["swing_high"] = sh
+            out["swing_low"] = sl
+            out["range_position"] = range_position
+            out["middle_zone"] = (range_position >= 0.40) & (range_position <= 0.60)
+            out["range_bounce"] = c >= out["prev_close"].to_numpy(dtype=float)
+            out["ada_in_lower_zone"] = range_position <= self.ada_entry_lower_pct
+            out["ada_target_price"] = sl + (range_width * self.ada_take_profit_upper_pct)
+
+            tr_atr_ratio = np.where(atr > 0, tr / atr, 0.0)
+            out["tr_atr_ratio"] = tr_atr_ratio
+            out["atr_pct"] = np.where(c > 0, (atr / c) * 100, 0.0)
+            out["range_width_pct"] = np.where(c > 0, (range_width / c) * 100, 0.0)
+
+            out["structure"] = np.select(
+                [(c > ema50) & (ema50 > ema200), (c < ema50) & (ema50 < ema200)],
+                ["BULL", "BEAR"],
+                default="RANGE",
+            )
+            out["pullback_to_ema20"] = np.abs(c - ema20) <= np.maximum(
+                atr * self.doge_pullback_atr_tolerance, c * 0.0025
+            )
+            out["volatility_ok"] = tr_atr_ratio <= self.volatility_tr_atr_max
+            out["trend_bias_pct"] = np.where(ema200 > 0, ((ema50 / ema200) - 1.0) * 100.0, 0.0)
+
+        quality = np.where(out["volatility_ok"], 20.0, -20.0)
+        quality = quality + np.clip(out["volume_ratio"].to_numpy(dtype=float) * 9.0, 0.0, 18.0)
+        quality = quality + np.where(out["breakout_above"], 10.0, 0.0)
+        quality = quality + np.where(out["retest_ok_sol"], 8.0, 0.0)
+        quality = quality + np.where(out["pullback_to_ema20"], 8.0, 0.0)
+        quality = quality + np.where(out["ada_in_lower_zone"], 10.0, 0.0)
+        quality = quality + np.where(out["range_bounce"], 8.0, 0.0)
+        out["quality_score"] = quality
+        return out
+
+    def compute_entry_frame(self, frame):
+        """전략별 진입 조건/손절가를 전체 봉에 대해 계산 (check_buy_signal의 전략 조건과 동일).
+
+        레짐/BTC 필터/시간 필터/포지션 수/사이징은 포함하지 않습니다.
+        Returns:
+            DataFrame(sol_entry, doge_entry, ada_entry, sol_stop, doge_stop, ada_stop, ada_target)
+        """
+        close = frame["close"].to_numpy(dtype=float)
+        atr = frame["atr"].to_numpy(dtype=float)
+        rsi = frame["rsi"].to_numpy(dtype=float)
+
+        def stop_ok(stop):
+            # check_buy_signal: not stop or stop <= 0 or stop >= entry -> 손절가산출실패 (NaN은 통과)
+            return ~((stop == 0) | (stop < 0) | (stop >= close))
+
+        sol_stop = close - (self.sol_stop_atr * atr)
+        doge_stop = close * (1.0 - self.doge_stop_pct)
+        ada_stop = close * (1.0 - self.ada_stop_pct)
+
+        with np.errstate(invalid="ignore"):
+            sol_entry = frame["breakout_above"].to_numpy(dtype=bool) & frame["retest_ok_sol"].to_numpy(dtype=bool)
+            doge_entry = (
+                ~(frame["volume_ratio"].to_numpy(dtype=float) < self.doge_volume_spike_min)
+                & ~(rsi <= self.doge_rsi_min)
+                & frame["pullback_to_ema20"].to_numpy(dtype=bool)
+            )
+            ada_entry = ~(rsi > self.ada_rsi_max) & frame["ada_in_lower_zone"].to_numpy(dtype=bool)
+
+            return pd.DataFrame(
+                {
+                    "sol_entry": sol_entry & stop_ok(sol_stop),
+                    "doge_entry": doge_entry & stop_ok(doge_stop),
+                    "ada_entry": ada_entry & stop_ok(ada_stop),
+                    "sol_stop": sol_stop,
+                    "doge_stop": doge_stop,
+                    "ada_stop": ada_stop,
+                    "ada_target": frame["ada_target_price"].to_numpy(dtype=float),
+                },
+                index=frame.index,
+            )
+
     def select_strategy(self, symbol_state, global_regime=None):
         regime = str(global_regime or self.global_regime)
         if not symbol_state:
@@ -1159,24 +1470,23 @@ class TradingEngine:
             if current_price is None:
                 return False, "HOLD", 1.0, {"blocked_by": ["가격조회실패"]}
 
-            buy_price = self._safe_float(position.get("buy_price", 0), 0)
+            buy_price = position.buy_price
             if buy_price <= 0:
                 return False, "HOLD", 1.0, {"blocked_by": ["매수가없음"]}
 
-            highest_price = self._safe_float(position.get("highest_price", buy_price), buy_price)
+            highest_price = position.highest_price or buy_price
             if current_price > highest_price:
                 highest_price = current_price
                 self.stats.update_position_highest(ticker, highest_price)
 
             hold_minutes = 0.0
             try:
-                hold_minutes = (datetime.now() - position["timestamp"]).total_seconds() / 60.0
+                hold_minutes = (clock.now() - position.timestamp).total_seconds() / 60.0
             except Exception:
                 hold_minutes = 0.0
 
-            buy_meta = position.get("buy_meta", {}) if isinstance(position.get("buy_meta"), dict) else {}
-            strategy = buy_meta.get("strategy")
-            stop_price = self._safe_float(buy_meta.get("stop_price", 0), 0)
+            strategy = position.strategy
+            stop_price = position.stop_price
             if stop_price <= 0:
                 stop_price = buy_price * (1 + self.stop_loss)
 
@@ -1207,45 +1517,47 @@ class TradingEngine:
                 return True, reason, 1.0, meta
 
             if strategy == "SOL_TREND":
-                tp1_done = bool(buy_meta.get("sol_tp1_done", False))
-                tp1_r = self._safe_float(buy_meta.get("tp1_r", self.sol_partial_tp_r), self.sol_partial_tp_r)
+                tp1_done = position.tp1_done
+                tp1_r = self._safe_float(position.meta_get("tp1_r", self.sol_partial_tp_r), self.sol_partial_tp_r)
                 trail_activate_r = self._safe_float(
-                    buy_meta.get("trail_activate_r", self.sol_trailing_activate_r),
+                    position.meta_get("trail_activate_r", self.sol_trailing_activate_r),
                     self.sol_trailing_activate_r,
                 )
                 trailing_pct = self._safe_float(
-                    buy_meta.get("sol_trailing_stop_pct", self.sol_trailing_stop_pct),
+                    position.meta_get("sol_trailing_stop_pct", self.sol_trailing_stop_pct),
                     self.sol_trailing_stop_pct,
                 )
 
                 if (not tp1_done) and progress_r >= tp1_r:
-                    buy_meta["sol_tp1_done"] = True
-                    buy_meta["tp1_executed_at"] = datetime.now().isoformat()
-                    self._persist_position_meta(ticker, position, buy_meta)
+                    self._update_position_exit_state(
+                        ticker,
+                        position,
+                        sol_tp1_done=True,
+                        tp1_executed_at=clock.now().isoformat(),
+                    )
                     reason = f"SOL 1차익절({progress_r:.2f}R)"
                     meta["reason"] = reason
                     meta["r_multiple"] = float(progress_r)
                     return True, reason, 0.30, meta
 
-                trailing_active = bool(buy_meta.get("sol_trailing_active", False))
+                trailing_active = position.trailing_active
                 if (not trailing_active) and progress_r >= trail_activate_r:
                     trailing_active = True
-                    buy_meta["sol_trailing_active"] = True
-                    buy_meta["sol_trailing_stop_price"] = float(
-                        max(stop_price, highest_price * (1.0 - trailing_pct))
+                    self._update_position_exit_state(
+                        ticker,
+                        position,
+                        sol_trailing_active=True,
+                        sol_trailing_stop_price=float(max(stop_price, highest_price * (1.0 - trailing_pct))),
+                        sol_trailing_started_at=clock.now().isoformat(),
                     )
-                    buy_meta["sol_trailing_started_at"] = datetime.now().isoformat()
-                    self._persist_position_meta(ticker, position, buy_meta)
 
                 if trailing_active:
-                    prev_trailing = self._safe_float(
-                        buy_meta.get("sol_trailing_stop_price", stop_price),
-                        stop_price,
-                    )
+                    prev_trailing = position.trailing_stop_price or stop_price
                     new_trailing = max(prev_trailing, highest_price * (1.0 - trailing_pct))
                     if new_trailing > prev_trailing * 1.000001:
-                        buy_meta["sol_trailing_stop_price"] = float(new_trailing)
-                        self._persist_position_meta(ticker, position, buy_meta)
+                        self._update_position_exit_state(
+                            ticker, position, sol_trailing_stop_price=float(new_trailing)
+                        )
 
                     meta["trailing_stop_price"] = float(new_trailing)
                     if current_price <= new_trailing:
@@ -1255,10 +1567,10 @@ class TradingEngine:
                         return True, reason, 1.0, meta
 
             elif strategy == "DOGE_MOMENTUM":
-                target_r = self._safe_float(buy_meta.get("target_r", self.doge_target_r), self.doge_target_r)
+                target_r = self._safe_float(position.meta_get("target_r", self.doge_target_r), self.doge_target_r)
                 time_stop_candles = int(
                     self._safe_float(
-                        buy_meta.get("time_stop_candles", self.doge_time_stop_candles),
+                        position.meta_get("time_stop_candles", self.doge_time_stop_candles),
                         self.doge_time_stop_candles,
                     )
                 )
@@ -1278,7 +1590,7 @@ class TradingEngine:
                     return True, reason, 1.0, meta
 
             elif strategy == "ADA_RANGE":
-                target_price = self._safe_float(buy_meta.get("take_profit_price", 0), 0)
+                target_price = self._safe_float(position.meta_get("take_profit_price", 0), 0)
                 if target_price > 0:
                     meta["take_profit_price"] = float(target_price)
                     if current_price >= target_price:
@@ -1353,12 +1665,12 @@ class TradingEngine:
                             poll_interval = 0.3
                         poll_interval = max(0.1, min(2.0, poll_interval))
                         wait_seconds = max(0.0, float(self.limit_wait_seconds))
-                        deadline = time.time() + wait_seconds
+                        deadline = clock.time() + wait_seconds
                         first_poll = True
                         min_trade_amount = float(self.config.get("trading", {}).get("min_trade_amount", 5500))
 
                         # 지정가 상태를 짧은 간격으로 확인(단, wait_seconds=0이어도 최소 1회 조회)
-                        while first_poll or time.time() < deadline:
+                        while first_poll or clock.time() < deadline:
                             first_poll = False
                             order_info = self._safe_get_order(order_uuid)
                             if order_info is None:
@@ -1437,7 +1749,7 @@ class TradingEngine:
                                     )
                                     return None
                                 self.logger.info(f"Cancel confirmation: {cancel_ok}")
-                                time.sleep(0.3)
+                                clock.sleep(0.3)
 
                                 if remaining_value >= min_trade_amount:
                                     self.logger.info(
@@ -1449,7 +1761,7 @@ class TradingEngine:
 
                                     market_result = self.upbit.buy_market_order(ticker, remaining_value)
                                     if market_result and 'uuid' in market_result:
-                                        time.sleep(0.5)
+                                        clock.sleep(0.5)
                                         market_order = self._safe_get_order(market_result['uuid'])
 
                                         if market_order:
@@ -1489,9 +1801,9 @@ class TradingEngine:
                                     'uuid': order_uuid
                                 }
 
-                            sleep_left = deadline - time.time()
+                            sleep_left = deadline - clock.time()
                             if sleep_left > 0:
-                                time.sleep(min(poll_interval, sleep_left))
+                                clock.sleep(min(poll_interval, sleep_left))
 
                         # 타임아웃: 취소 성공 확인 후에만 시장가 폴백
                         cancel_ok = self._try_cancel_limit(order_uuid, side="BUY", ticker=ticker, retries=3)
@@ -1526,7 +1838,7 @@ class TradingEngine:
                 self.logger.warning(f"⚠️  {ticker} 매수 주문 실패")
                 return None
             
-            time.sleep(0.5)
+            clock.sleep(0.5)
             
             # UUID로 정확한 체결 정보 확인
             if 'uuid' in result:
@@ -1652,7 +1964,7 @@ class TradingEngine:
                         )
                         self.logger.info("Limit order placed, waiting fill...")
                         # 체결 대기
-                        time.sleep(self.limit_wait_seconds)
+                        clock.sleep(self.limit_wait_seconds)
                         
                         # 체결 확인
                         order_info = self.upbit.get_order(order_uuid)
@@ -1710,7 +2022,7 @@ class TradingEngine:
                                     f"uuid={order_uuid} cancelled={bool(cancel_result)}"
                                 )
                                 self.logger.info(f"Cancel confirmation: {bool(cancel_result)}")
-                                time.sleep(0.3)
+                                clock.sleep(0.3)
                                 
                                 remaining_balance = self.get_tradable_balance(ticker)
                                 remaining_price = self.get_current_price(ticker) or current_price
@@ -1735,7 +2047,7 @@ class TradingEngine:
                                 self.logger.info(f"  ↪️  남은 {remaining_balance:.8f} 시장가 처리")
                                 market_result = self.upbit.sell_market_order(ticker, round(remaining_balance, 8))
                                 if market_result and 'uuid' in market_result:
-                                    time.sleep(0.5)
+                                    clock.sleep(0.5)
                                     market_info = self.upbit.get_order(market_result['uuid'])
                                     
                                     if market_info:
@@ -1800,7 +2112,7 @@ class TradingEngine:
                                 f"uuid={order_uuid} cancelled={bool(cancel_result)}"
                             )
                             self.logger.info(f"Cancel confirmation: {bool(cancel_result)}")
-                            time.sleep(0.3)
+                            clock.sleep(0.3)
                 else:
                     self.logger.warning(f"LIMIT_ORDERBOOK_PARSE_FAIL | side=SELL ticker={ticker}")
                     self.logger.warning(f"{ticker} orderbook parse 실패, 시장가 폴백")
@@ -1817,7 +2129,7 @@ class TradingEngine:
                 self.logger.warning(f"⚠️  {ticker} 매도 주문 실패")
                 return None
             
-            time.sleep(0.5)
+            clock.sleep(0.5)
 
             # UUID로 체결 정보 조회 (정확한 체결가/수수료 반영)
             if 'uuid' in result:
@@ -1942,7 +2254,7 @@ class TradingEngine:
                 if amount > 0:
                     self.logger.info(f"  매도 중: {ticker} ({amount})")
                     self.upbit.sell_market_order(ticker, amount)
-                    time.sleep(0.3)
+                    clock.sleep(0.3)
             
             self.logger.info("✅ 긴급 매도 완료")
             return True
@@ -2,25 +2,32 @@
 거래 통계 및 상태 관리 모듈
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from collections import defaultdict
 import json
 import os
 import threading
 import pyupbit
 
+import clock
+from trade_store import TradeStore
+from pnl_rollup import PnLRollupStore
+from equity_series import EquitySeries
+from position import Position
+
 
 class TradingStats:
-    def __init__(self):
+    def __init__(self, config=None):
         # 스레드 안전성
         self.lock = threading.Lock()
         
+        stats_cfg = (config or {}).get('stats', {}) or {}
+        
         self.initial_balance = 0
         self.current_balance = 0
-        
-        # 거래 기록
-        self.trades = []
-        self.positions = {}  # {coin: {buy_price, amount, original_amount, timestamp, highest_price, uuid}}
+        self.positions = {}  # {coin: Position}
+        # 포지션 변경 버전 (저장할 때마다 증가, 리포트 캐시 무효화용)
+        self.positions_version = 0
         
         # 통계
         self.total_trades = 0
@@ -47,11 +54,28 @@ class TradingStats:
         self.last_update = None
         
         # 히스토리 디렉토리
-        self.history_dir = "trade_history"
+        self.history_dir = stats_cfg.get('history_dir', "trade_history")
         os.makedirs(self.history_dir, exist_ok=True)
         
+        # 거래 기록 (최근 N건 링 버퍼 + 일자별 인덱스, 과거 기록은 파일에서 조회)
+        self.trades = TradeStore(
+            self.history_dir,
+            max_recent=int(stats_cfg.get('recent_trades_limit', 500) or 500),
+            max_cached_days=int(stats_cfg.get('cached_days', 8) or 8),
+        )
+        
+        # 일자별 손익 롤업 (리포트는 롤업 행만 합산)
+        try:
+            fee_rate = float(((config or {}).get('trading', {}) or {}).get('fee_pct', 0.05)) / 100
+        except Exception:
+            fee_rate = 0.0005
+        self.rollups = PnLRollupStore(self.history_dir, fee_rate=fee_rate, trade_loader=self.trades.get_day)
+        
+        # 자산 곡선 시계열 (현금/총자산 샘플, 1m/1h/1d 다운샘플)
+        self.equity = EquitySeries(os.path.join(self.history_dir, "equity"))
+        
         # 포지션 스냅샷 파일
-        self.position_file = "positions_snapshot.json"
+        self.position_file = stats_cfg.get('position_file', "positions_snapshot.json")
         
         # 일일 통계
         self.daily_start_balance = 0
@@ -97,32 +121,32 @@ class TradingStats:
             # MDD는 총자산 기준으로 추적
             self.peak_balance = total
             self.daily_start_balance = total
-            self.start_time = datetime.now()
-            self.last_update = datetime.now()
+            self.start_time = clock.now()
+            self.last_update = clock.now()
     
     def add_position(self, coin, buy_price, amount, uuid=None, buy_fee_krw=0, buy_signals=None, buy_score=0, buy_meta=None):
         """포지션 추가 (매수 메타/수수료 포함)"""
         with self.lock:
-            self.positions[coin] = {
-                'buy_price': buy_price,
-                'amount': amount,
-                'original_amount': amount,  # 원래 매수 수량 저장
-                'timestamp': datetime.now(),
-                'highest_price': buy_price,
-                'uuid': uuid,  # 주문 UUID 저장
-                'buy_fee_krw': float(buy_fee_krw or 0),
-                'buy_signals': list(buy_signals) if buy_signals else [],
-                'buy_score': int(buy_score or 0),
-                'buy_meta': buy_meta if isinstance(buy_meta, dict) else {},
-            }
+            self.positions[coin] = Position(
+                coin,
+                buy_price,
+                amount,
+                timestamp=clock.now(),
+                uuid=uuid,  # 주문 UUID 저장
+                buy_fee_krw=buy_fee_krw,
+                buy_signals=buy_signals,
+                buy_score=buy_score,
+                buy_meta=buy_meta,
+            )
             self.save_positions()  # 포지션 저장
     
     def update_position_highest(self, coin, current_price):
         """포지션 최고가 업데이트"""
         with self.lock:
-            if coin in self.positions:
-                if current_price > self.positions[coin]['highest_price']:
-                    self.positions[coin]['highest_price'] = current_price
+            position = self.positions.get(coin)
+            if position is not None:
+                if current_price > position.highest_price:
+                    position.highest_price = float(current_price)
                     self.save_positions()  # 변경 사항 저장
     
     def remove_position(self, coin, sell_price, profit_krw, reason, sell_fee_krw=0, sell_meta=None):
@@ -132,25 +156,25 @@ class TradingStats:
                 return
             
             position = self.positions[coin]
-            buy_price = position['buy_price']
+            buy_price = position.buy_price
             profit_rate = ((sell_price - buy_price) / buy_price) * 100
-            buy_fee_krw = float(position.get('buy_fee_krw', 0) or 0)
+            buy_fee_krw = position.buy_fee_krw
             sell_fee_krw = float(sell_fee_krw or 0)
             profit_after_fees_krw = float(profit_krw) - buy_fee_krw
-            buy_meta = position.get('buy_meta', {}) if isinstance(position.get('buy_meta'), dict) else {}
+            buy_meta = position.buy_meta
             sell_meta_dict = sell_meta if isinstance(sell_meta, dict) else {}
 
-            stop_price = float(buy_meta.get('stop_price', 0) or 0)
+            stop_price = position.stop_price
             risk_unit = (buy_price - stop_price) if stop_price > 0 else 0.0
             r_multiple = sell_meta_dict.get('r_multiple', None)
             if r_multiple is None and risk_unit > 0:
                 r_multiple = (sell_price - buy_price) / risk_unit
 
-            strategy = str(buy_meta.get('strategy', '') or '')
-            entry_time_iso = position['timestamp'].isoformat() if position.get('timestamp') else None
+            strategy = str(position.strategy or '')
+            entry_time_iso = position.timestamp.isoformat() if position.timestamp else None
             
             # 거래 기록 저장
-            now = datetime.now()
+            now = clock.now()
             trade_record = {
                 'timestamp': now.isoformat(),
                 'entry_time': entry_time_iso,
@@ -183,11 +207,9 @@ class TradingStats:
                 'uuid': position.get('uuid'),
             }
             
-            # 메모리에 저장
-            self.trades.append({**trade_record, 'timestamp': now})
-            
-            # 파일에 영속화
-            self._save_trade_to_file(trade_record)
+            # 메모리(링/일자 인덱스)에 저장 + 파일에 영속화
+            trade = self.trades.append(trade_record)
+            self.rollups.add_trade(trade)
             
             # 통계 업데이트
             self.total_trades += 1
@@ -231,17 +253,24 @@ class TradingStats:
                 if drawdown < self.max_drawdown:
                     self.max_drawdown = drawdown
             
-            self.last_update = datetime.now()
+            self.last_update = clock.now()
+            self.equity.append(cash, total, ts=self.last_update)
     
-    def get_current_status(self):
-        """현재 상태 조회"""
+    def get_current_status(self, mark_prices=None):
+        """현재 상태 조회
+
+        mark_prices({coin: 가격})를 전달하면 현재가 API 대신 해당 가격으로 평가합니다.
+        """
         with self.lock:
             total_value = self.current_balance
             
             # 보유 포지션 평가액 계산 (현재가 기준)
             position_details = []
             for coin, pos in self.positions.items():
-                current_price = pyupbit.get_current_price(coin)
+                if mark_prices is not None:
+                    current_price = mark_prices.get(coin)
+                else:
+                    current_price = pyupbit.get_current_price(coin)
                 if not current_price:
                     current_price = pos['buy_price']
                 
@@ -270,7 +299,7 @@ class TradingStats:
             
             # 거래 시간
             if self.start_time:
-                trading_duration = datetime.now() - self.start_time
+                trading_duration = clock.now() - self.start_time
                 hours = trading_duration.total_seconds() / 3600
             else:
                 hours = 0
@@ -295,13 +324,26 @@ class TradingStats:
                 'start_time': self.start_time.strftime('%Y-%m-%d %H:%M:%S') if self.start_time else None
             }
     
+    def get_equity_metrics(self, hours=24, resolution='1m'):
+        """최근 N시간 자산 곡선 지표 (최대 낙폭/샤프/투자 비중)"""
+        end = clock.now()
+        return self.equity.window_metrics(end - timedelta(hours=hours), end, resolution)
+    
     def get_coin_stats(self):
         """코인별 통계 조회"""
         return dict(self.coin_stats)
     
     def get_recent_trades(self, limit=10):
         """최근 거래 내역"""
-        return self.trades[-limit:] if len(self.trades) > limit else self.trades
+        return self.trades.recent(limit)
+
+    def get_trades_for_date(self, date=None):
+        """특정 날짜의 거래 기록 (일자별 인덱스, 미캐시 시 파일 1회 로드)"""
+        return self.trades.get_day(date)
+
+    def get_trades_between(self, start_date, end_date):
+        """기간(start_date~end_date, 포함) 거래 기록"""
+        return self.trades.get_range(start_date, end_date)
     
     def export_stats(self):
         """통계 내보내기 (JSON)"""
@@ -322,29 +364,20 @@ class TradingStats:
         return status
     
     def save_positions(self):
-        """포지션 스냅샷 저장"""
+        """포지션 스냅샷 저장 (포지션별 cold 메타는 캐시된 JSON을 이어 붙임)"""
+        self.positions_version += 1
         try:
-            snapshot = {
-                'timestamp': datetime.now().isoformat(),
-                'positions': {}
-            }
-            
-            for coin, pos in self.positions.items():
-                snapshot['positions'][coin] = {
-                    'buy_price': pos['buy_price'],
-                    'amount': pos['amount'],
-                    'original_amount': pos['original_amount'],
-                    'timestamp': pos['timestamp'].isoformat(),
-                    'highest_price': pos['highest_price'],
-                    'uuid': pos.get('uuid'),
-                    'buy_fee_krw': pos.get('buy_fee_krw', 0),
-                    'buy_signals': pos.get('buy_signals', []),
-                    'buy_score': pos.get('buy_score', 0),
-                    'buy_meta': pos.get('buy_meta', {}),
-                }
+            parts = [
+                f"{json.dumps(coin)}: {pos.to_snapshot_json()}"
+                for coin, pos in self.positions.items()
+            ]
+            snapshot_json = (
+                f'{{"timestamp": {json.dumps(clock.now().isoformat())}, '
+                f'"positions": {{{", ".join(parts)}}}}}'
+            )
             
-            with open(self.position_file, 'w') as f:
-                json.dump(snapshot, f, indent=2)
+            with open(self.position_file, 'w', encoding='utf-8') as f:
+                f.write(snapshot_json)
         except Exception as e:
             print(f"포지션 저장 실패: {e}")
     
@@ -354,95 +387,29 @@ class TradingStats:
             if not os.path.exists(self.position_file):
                 return {}
             
-            with open(self.position_file, 'r') as f:
+            with open(self.position_file, 'r', encoding='utf-8') as f:
                 snapshot = json.load(f)
             
             positions = {}
             for coin, pos in snapshot.get('positions', {}).items():
-                positions[coin] = {
-                    'buy_price': pos['buy_price'],
-                    'amount': pos['amount'],
-                    'original_amount': pos['original_amount'],
-                    'timestamp': datetime.fromisoformat(pos['timestamp']),
-                    'highest_price': pos['highest_price'],
-                    'uuid': pos.get('uuid'),
-                    'buy_fee_krw': float(pos.get('buy_fee_krw', 0) or 0),
-                    'buy_signals': pos.get('buy_signals', []),
-                    'buy_score': int(pos.get('buy_score', 0) or 0),
-                    'buy_meta': pos.get('buy_meta', {}) if isinstance(pos.get('buy_meta'), dict) else {},
-                }
+                positions[coin] = Position.from_snapshot(coin, pos)
             
             return positions
         except Exception as e:
             print(f"포지션 로드 실패: {e}")
             return {}
     
-    def _save_trade_to_file(self, trade_record):
-        """거래 기록을 일자별 파일에 저장"""
-        try:
-            today = datetime.now().strftime('%Y%m%d')
-            filepath = os.path.join(self.history_dir, f"{today}.json")
-            
-            # 기존 파일 읽기
-            trades = []
-            if os.path.exists(filepath):
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    trades = json.load(f)
-            
-            # 새 거래 추가
-            trades.append(trade_record)
-            
-            # 파일 저장
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(trades, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"거래 히스토리 저장 실패: {e}")
-    
     def load_daily_trades(self, date=None):
         """특정 날짜의 거래 히스토리 로드"""
-        try:
-            if date is None:
-                date = datetime.now().strftime('%Y%m%d')
-            elif isinstance(date, datetime):
-                date = date.strftime('%Y%m%d')
-            
-            filepath = os.path.join(self.history_dir, f"{date}.json")
-            
-            if not os.path.exists(filepath):
-                return []
-            
-            with open(filepath, 'r', encoding='utf-8') as f:
-                trades = json.load(f)
-            
-            # timestamp를 datetime 객체로 변환
-            for trade in trades:
-                trade['timestamp'] = datetime.fromisoformat(trade['timestamp'])
-            
-            return trades
-        except Exception as e:
-            print(f"거래 히스토리 로드 실패: {e}")
-            return []
+        if isinstance(date, datetime):
+            date = date.strftime('%Y%m%d')
+        return self.trades.get_day(date)
     
     def get_daily_profit(self):
-        """일일 손익 계산 (메모리 + 파일 기록 통합)"""
-        with self.lock:
-            today = datetime.now().date()
-            
-            # 오늘의 파일 거래 기록
-            file_trades = self.load_daily_trades()
-            
-            # 메모리의 오늘 거래 기록
-            memory_trades = [t for t in self.trades if t['timestamp'].date() == today]
-            
-            # 중복 제거 (timestamp 기준)
-            all_trades = {t['timestamp'].isoformat(): t for t in file_trades}
-            for t in memory_trades:
-                all_trades[t['timestamp'].isoformat()] = t
-            
-            # 총 손익 계산
-            total_profit = sum(
-                float(t.get('profit_after_fees_krw', t.get('profit_krw', 0)) or 0)
-                for t in all_trades.values()
-            )
-            
-            return total_profit, len(all_trades)
+        """일일 손익 계산 (오늘 롤업 기준)"""
+        row = self.rollups.get_day(clock.now())
+        return float(row['profit_after_fees_krw']), int(row['trades'])
+    
+    def get_period_summary(self, start_date, end_date):
+        """기간 손익 요약 (일자별 롤업 합산)"""
+        return self.rollups.summarize(start_date, end_date)
@@ -0,0 +1,210 @@
+"""
+Upbit REST 호출 훅 모듈 - pyupbit의 모든 REST 호출을 한 지점에서 관찰
+
+pyupbit의 quotation/exchange API는 모두 `request_api._call_get/_call_post/_call_delete`를
+거치므로 이 세 함수를 감싸면 시세 조회/주문/잔고 조회 호출을 빠짐없이 관찰할 수 있습니다.
+관찰자(observer)는 호출 1건마다 dict 1개를 받습니다.
+
+같은 지점에서 요청별 타임아웃(기본 connect 3초/read 10초)을 강제하고, 설정 시 인증 없는
+시세 조회 GET에 한해 헤징(p95 지연까지 응답이 없으면 동일 요청 1회 추가, 먼저 온 응답 사용)을 적용합니다.
+주문/잔고 등 인증 호출은 헤징하지 않습니다.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+import threading
+import time
+
+import pyupbit.request_api as request_api
+
+
+_observers = []
+_observers_lock = threading.Lock()
+_install_lock = threading.Lock()
+
+# 헤징 대상: 인증 없는 시세 조회 GET (주문/잔고 등 인증 호출은 절대 중복 요청하지 않음)
+QUOTATION_PREFIXES = ("/v1/candles", "/v1/ticker", "/v1/orderbook", "/v1/trades/ticks", "/v1/market/all")
+ORDER_PREFIXES = ("/v1/order", "/v1/orders", "/v1/withdraws", "/v1/deposits")
+
+_settings = {
+    "connect_timeout": 3.0,
+    "read_timeout": 10.0,
+    # 주문 요청은 read 타임아웃을 두지 않음: 전송 후 응답만 늦은 경우 '실패'로 오인하면
+    # 체결된 주문을 놓칠 수 있으므로 connect 타임아웃(미전송 보장)만 적용
+    "order_read_timeout": None,
+    "hedge_enabled": False,
+    "hedge_min_delay_ms": 80.0,
+    "hedge_default_delay_ms": 400.0,
+    "hedge_max_per_minute": 60,
+    "hedge_delay_fn": None,  # fn("GET /v1/ticker") -> 지연 기준(ms) 또는 None
+}
+_hedge_times = deque()
+_hedge_lock = threading.Lock()
+_hedge_executor = None
+
+
+def add_observer(observer):
+    """호출 관찰자 등록. observer(call: dict) 형태이며 예외는 무시됩니다."""
+    with _observers_lock:
+        if observer not in _observers:
+            _observers.append(observer)
+
+
+def remove_observer(observer):
+    with _observers_lock:
+        if observer in _observers:
+            _observers.remove(observer)
+
+
+def _notify(call):
+    for observer in tuple(_observers):
+        try:
+            observer(call)
+        except Exception:
+            pass
+
+
+def configure(**settings):
+    """타임아웃/헤징 설정 (알 수 없는 키는 무시)."""
+    for key, value in settings.items():
+        if key in _settings:
+            _settings[key] = value
+
+
+def is_hedgeable(method, endpoint, kwargs):
+    """시세 조회 GET만 헤징 (인증 헤더가 있으면 JWT nonce 중복이므로 제외)."""
+    if method != "GET" or not endpoint.startswith(QUOTATION_PREFIXES):
+        return False
+    headers = kwargs.get("headers")
+    return not (isinstance(headers, dict) and "Authorization" in headers)
+
+
+def _request_timeout(method, endpoint):
+    read_timeout = _settings["read_timeout"]
+    if method != "GET" and endpoint.startswith(ORDER_PREFIXES):
+        read_timeout = _settings["order_read_timeout"]
+    return (float(_settings["connect_timeout"]), float(read_timeout) if read_timeout else None)
+
+
+def _executor():
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _install_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api-hedge")
+    return _hedge_executor
+
+
+def _hedge_delay_seconds(key):
+    """헤지 요청 발사 시점(초): 엔드포인트 p95 (샘플 부족 시 기본값), 하한/타임아웃 상한 적용."""
+    delay_ms = None
+    fn = _settings["hedge_delay_fn"]
+    if fn is not None:
+        try:
+            delay_ms = fn(key)
+        except Exception:
+            delay_ms = None
+    if delay_ms is None:
+        delay_ms = _settings["hedge_default_delay_ms"]
+    delay_ms = max(float(_settings["hedge_min_delay_ms"]), float(delay_ms))
+    return min(delay_ms / 1000.0, float(_settings["read_timeout"]))
+
+
+def _take_hedge_token():
+    """분당 헤지 요청 수 제한 (요청 한도 소모 방지)."""
+    now = time.monotonic()
+    with _hedge_lock:
+        while _hedge_times and now - _hedge_times[0] > 60.0:
+            _hedge_times.popleft()
+        if len(_hedge_times) >= int(_settings["hedge_max_per_minute"]):
+            return False
+        _hedge_times.append(now)
+        return True
+
+
+def _hedged_call(original, url, kwargs, key):
+    """1차 요청이 p95 안에 응답하지 않으면 2차 요청을 보내고 먼저 성공한 응답 사용.
+
+    Returns:
+        (response, attempts, hedge_won)
+    """
+    executor = _executor()
+    primary = executor.submit(original, url, **kwargs)
+    done, _ = wait([primary], timeout=_hedge_delay_seconds(key))
+    if done or not _take_hedge_token():
+        return primary.result(), 1, False
+
+    secondary = executor.submit(original, url, **kwargs)
+    pending = {primary, secondary}
+    first_error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), 2, future is secondary
+            if first_error is None:
+                first_error = future.exception()
+    raise first_error
+
+
+def _make_wrapper(method, original):
+    def wrapper(url, **kwargs):
+        started_at = time.time()
+        t0 = time.perf_counter()
+        endpoint = urlparse(url).path
+        resp = None
+        error = None
+        attempts = 1
+        hedge_won = False
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = _request_timeout(method, endpoint)
+        try:
+            if _settings["hedge_enabled"] and is_hedgeable(method, endpoint, kwargs):
+                resp, attempts, hedge_won = _hedged_call(original, url, kwargs, f"{method} {endpoint}")
+            else:
+                resp = original(url, **kwargs)
+            return resp
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            if _observers:
+                status = getattr(resp, "status_code", None)
+                if status is None and error is not None:
+                    status = getattr(error, "code", None)
+                headers = getattr(resp, "headers", None) or {}
+                _notify(
+                    {
+                        "method": method,
+                        "endpoint": endpoint,
+                        "url": url,
+                        "params": kwargs.get("params") if isinstance(kwargs.get("params"), dict) else None,
+                        "started_at": started_at,
+                        "perf_start": t0,
+                        "elapsed_ms": elapsed_ms,
+                        "status": status,
+                        "remaining_req": headers.get("Remaining-Req"),
+                        "error": f"{type(error).__name__}: {error}" if error is not None else None,
+                        "response": resp,
+                        "attempts": attempts,
+                        "hedge_won": hedge_won,
+                    }
+                )
+
+    wrapper.__wrapped__ = original
+    wrapper._upbit_api_hook = True
+    return wrapper
+
+
+def install():
+    """request_api의 REST 호출 함수를 훅으로 교체 (여러 번 호출해도 1회만 적용)."""
+    with _install_lock:
+        if getattr(request_api, "_upbit_api_hook_installed", False):
+            return False
+        for method, name in (("GET", "_call_get"), ("POST", "_call_post"), ("DELETE", "_call_delete")):
+            original = getattr(request_api, name)
+            setattr(request_api, name, _make_wrapper(method, original))
+        request_api._upbit_api_hook_installed = True
+        return True
@@ -0,0 +1,342 @@
+"""
+워크포워드 모듈 - 학습 구간 N에서 최적 조합 선택 -> 검증 구간 N+1에서 평가 -> 한 칸씩 이동
+
+조합별 지표/진입 조건(Backtester.prepare)은 전체 기간에 대해 워커당 1회만 계산하고,
+겹치는 학습/검증 구간은 같은 계산 결과를 구간만 바꿔 시뮬레이션합니다(지표는 인과적이라 구간 자르기와 무관).
+창(window) 평가는 sweep과 같은 프로세스 풀 + 공유 메모리로 병렬 실행합니다.
+
+결과:
+    - 창별 학습 구간 선택 조합 + 검증(out-of-sample) 요약
+    - 전체 검증 구간 복리 수익률 등 집계
+    - 최근 학습 구간 최적 조합을 반영한 설정 제안 ({"strategy": {...}} - config.example.json과 같은 구조)
+
+사용 예:
+    python main.py walkforward --spec sweep.json --train-days 60 --test-days 14 --out proposal.json
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import pandas as pd
+
+from backtest import Backtester, load_history
+from sweep import apply_overrides, expand_spec, init_worker, rank_results, share_history, worker_state
+
+
+# 워커당 보관할 조합별 prepare 결과 수 (전체 기간 지표 배열이라 메모리를 고려해 작게 유지)
+PREPARED_CACHE_SIZE = 4
+
+
+def make_windows(start, end, train_days, test_days, step_days=None, warmup_days=0):
+    """[start, end) 구간을 학습/검증 창 목록으로 분할.
+
+    step_days 기본값은 test_days (검증 구간이 겹치지 않고 이어짐).
+    warmup_days는 첫 학습 구간 앞에 지표 워밍업용으로 비워둘 기간입니다.
+    """
+    start = pd.Timestamp(start) + pd.Timedelta(days=warmup_days)
+    end = pd.Timestamp(end)
+    train = pd.Timedelta(days=train_days)
+    test = pd.Timedelta(days=test_days)
+    step = pd.Timedelta(days=step_days or test_days)
+    if train <= pd.Timedelta(0) or test <= pd.Timedelta(0) or step <= pd.Timedelta(0):
+        raise ValueError("train_days/test_days/step_days는 0보다 커야 합니다")
+
+    windows = []
+    cursor = start
+    while cursor + train + test <= end:
+        windows.append({
+            "window": len(windows),
+            "train_start": cursor,
+            "train_end": cursor + train,
+            "test_start": cursor + train,
+            "test_end": cursor + train + test,
+        })
+        cursor += step
+    return windows
+
+
+def history_bounds(history):
+    """{ticker: DataFrame} 전체 시작/끝(끝은 마지막 봉 다음 시각)."""
+    starts = [df.index[0] for df in history.values() if len(df)]
+    ends = [df.index[-1] for df in history.values() if len(df)]
+    if not starts:
+        raise ValueError("캔들 데이터 없음")
+    return min(starts), max(ends) + pd.Timedelta(minutes=5)
+
+
+# ---- 워커 ----
+def _prepared(overrides):
+    """조합별 prepare 결과 (워커 프로세스 안에서 LRU 캐시)."""
+    state = worker_state()
+    cache = state.setdefault("prepared", OrderedDict())
+    key = json.dumps(overrides, sort_keys=True, default=str)
+    if key in cache:
+        cache.move_to_end(key)
+        state["cache_hits"] = state.get("cache_hits", 0) + 1
+        return cache[key]
+
+    bt = Backtester(apply_overrides(state["config"], overrides), initial_krw=state["initial_krw"])
+    cache[key] = (bt, bt.prepare(state["history"]))
+    state["cache_misses"] = state.get("cache_misses", 0) + 1
+    while len(cache) > PREPARED_CACHE_SIZE:
+        cache.popitem(last=False)
+    return cache[key]
+
+
+def _evaluate(task):
+    """task = (combo, overrides, [(window, phase, start, end), ...]) -> 구간별 요약 목록"""
+    combo, overrides, spans = task
+    rows = []
+    try:
+        bt, prepared = _prepared(overrides)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return [
+            {"combo": combo, "params": overrides, "window": w, "phase": phase, "summary": {}, "error": error}
+            for w, phase, _, _ in spans
+        ]
+
+    for w, phase, start, end in spans:
+        try:
+            summary = bt.simulate(prepared, start=start, end=end)["summary"]
+            error = None
+        except Exception as e:
+            summary = {}
+            error = f"{type(e).__name__}: {e}"
+        rows.append({"combo": combo, "params": overrides, "window": w, "phase": phase, "summary": summary, "error": error})
+    return rows
+
+
+def _chunks(items, n):
+    n = max(1, min(n, len(items)))
+    size = int(math.ceil(len(items) / float(n)))
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def build_tasks(combos, spans, workers):
+    """조합 수가 워커 수 이상이면 조합당 1개 작업(prepare 1회), 적으면 창 묶음으로 나눠 워커를 채움."""
+    per_combo = max(1, int(math.ceil(workers / float(max(1, len(combos))))))
+    tasks = []
+    for combo, overrides in enumerate(combos):
+        for chunk in _chunks(spans, per_combo):
+            tasks.append((combo, overrides, chunk))
+    return tasks
+
+
+def _run_tasks(pool, tasks):
+    rows = []
+    for chunk in pool.map(_evaluate, tasks):
+        rows.extend(chunk)
+    return rows
+
+
+def _select(rows, rank_by, min_trades):
+    ok = [r for r in rows if r["error"] is None]
+    ranked = rank_results(ok, rank_by, min_trades)
+    return ranked[0] if ranked else None
+
+
+def aggregate_oos(windows):
+    """검증 구간 요약 -> 복리 수익률/거래 수/최대 낙폭 등 집계."""
+    tests = [w["test"] for w in windows if w.get("test")]
+    growth = 1.0
+    for s in tests:
+        growth *= 1.0 + s.get("total_return_pct", 0.0) / 100.0
+    trades = sum(s.get("trades", 0) for s in tests)
+    wins = sum(s.get("wins", 0) for s in tests)
+    chosen = {}
+    for w in windows:
+        if w.get("params") is not None:
+            key = json.dumps(w["params"], sort_keys=True, ensure_ascii=False)
+            chosen[key] = chosen.get(key, 0) + 1
+    return {
+        "windows": len(tests),
+        "compounded_return_pct": (growth - 1.0) * 100.0,
+        "positive_windows": sum(1 for s in tests if s.get("total_return_pct", 0.0) > 0),
+        "trades": trades,
+        "win_rate": wins / float(trades) * 100.0 if trades else 0.0,
+        "worst_drawdown_pct": min((s.get("max_drawdown_pct", 0.0) for s in tests), default=0.0),
+        "distinct_params": len(chosen),
+    }
+
+
+def build_proposal(config, overrides):
+    """선택 조합을 반영한 설정 제안 (strategy 블록 + 덮어쓴 경우 risk_management 블록)."""
+    cfg = apply_overrides(config, overrides or {})
+    proposal = {"strategy": cfg.get("strategy", {}) or {}}
+    if any(key.startswith("risk_management.") for key in (overrides or {})):
+        proposal["risk_management"] = cfg.get("risk_management", {}) or {}
+    return proposal
+
+
+def run_walk_forward(
+    config,
+    history,
+    combos,
+    train_days,
+    test_days,
+    step_days=None,
+    warmup_days=0,
+    workers=None,
+    initial_krw=1000000.0,
+    rank_by=("total_return_pct",),
+    min_trades=0,
+):
+    """워크포워드 실행 -> {"windows", "oos", "proposal", "proposal_params", ...}"""
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    start, end = history_bounds(history)
+    windows = make_windows(start, end, train_days, test_days, step_days, warmup_days)
+    if not windows:
+        raise ValueError(f"기간 부족: {start} ~ {end} (학습 {train_days}일 + 검증 {test_days}일 필요)")
+
+    # 마지막 학습 구간(데이터 끝까지) = 제안 설정 선택용, 검증 없음
+    live_start = max(start, end - pd.Timedelta(days=train_days))
+    train_spans = [(w["window"], "train", w["train_start"], w["train_end"]) for w in windows]
+    train_spans.append((len(windows), "train", live_start, end))
+
+    t0 = time.perf_counter()
+    shm, layout = share_history(history)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(shm.name, layout, config, initial_krw),
+        ) as pool:
+            train_rows = _run_tasks(pool, build_tasks(combos, train_spans, workers))
+
+            best = {}
+            for w, _, _, _ in train_spans:
+                best[w] = _select([r for r in train_rows if r["window"] == w], rank_by, min_trades)
+
+            # 창별 선택 조합을 검증 구간에서 평가 (같은 조합의 창은 한 작업으로 묶어 prepare 재사용)
+            test_by_combo = {}
+            for w in windows:
+                chosen = best.get(w["window"])
+                if chosen is not None:
+                    test_by_combo.setdefault(chosen["combo"], []).append(
+                        (w["window"], "test", w["test_start"], w["test_end"])
+                    )
+            test_tasks = []
+            per_combo = max(1, workers // max(1, len(test_by_combo)))
+            for combo, spans in test_by_combo.items():
+                for chunk in _chunks(spans, per_combo):
+                    test_tasks.append((combo, combos[combo], chunk))
+            test_rows = {r["window"]: r for r in _run_tasks(pool, test_tasks)}
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results = []
+    for w in windows:
+        chosen = best.get(w["window"])
+        test = test_rows.get(w["window"])
+        if chosen is None:
+            error = "학습 구간 유효 조합 없음"
+        else:
+            error = test["error"] if test else "검증 결과 없음"
+        results.append({
+            "window": w["window"],
+            "train_start": w["train_start"].isoformat(),
+            "train_end": w["train_end"].isoformat(),
+            "test_start": w["test_start"].isoformat(),
+            "test_end": w["test_end"].isoformat(),
+            "params": chosen["params"] if chosen else None,
+            "train": chosen["summary"] if chosen else None,
+            "test": test["summary"] if test and test["error"] is None else None,
+            "error": error,
+        })
+
+    live = best.get(len(windows))
+    return {
+        "windows": results,
+        "oos": aggregate_oos(results),
+        "proposal_params": live["params"] if live else None,
+        "proposal_train": {
+            "start": live_start.isoformat(),
+            "end": end.isoformat(),
+            "summary": live["summary"] if live else None,
+        },
+        "proposal": build_proposal(config, live["params"] if live else {}),
+        "combos": len(combos),
+        "elapsed_seconds": time.perf_counter() - t0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="워크포워드 평가 (학습 구간 최적화 -> 다음 구간 검증)")
+    parser.add_argument("--config", default="config.json", help="기준 설정 파일 (기본: config.json)")
+    parser.add_argument("--spec", required=True, help="스윕 스펙 JSON 파일 (sweep과 같은 형식)")
+    parser.add_argument("--data", default="cache/backtest_5m.npz", help="5분봉 캔들 파일(npz)")
+    parser.add_argument("--start", help="시작일 'YYYY-MM-DD'")
+    parser.add_argument("--end", help="종료일(미포함) 'YYYY-MM-DD'")
+    parser.add_argument("--train-days", type=float, default=60, help="학습 구간 일수 (기본: 60)")
+    parser.add_argument("--test-days", type=float, default=14, help="검증 구간 일수 (기본: 14)")
+    parser.add_argument("--step-days", type=float, default=0, help="이동 간격 일수 (기본: 검증 구간 일수)")
+    parser.add_argument("--warmup-days", type=float, default=7, help="첫 학습 구간 앞 지표 워밍업 일수 (기본: 7)")
+    parser.add_argument("--workers", type=int, default=0, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--initial-krw", type=float, default=1000000, help="초기 자금 (기본: 1,000,000)")
+    parser.add_argument("--out", help="설정 제안 JSON 저장 경로")
+    parser.add_argument("--report", help="창별 결과 전체 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    with open(args.spec, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+
+    history = load_history(args.data, start=args.start, end=args.end)
+    if not history:
+        sys.stderr.write(f"캔들 데이터 없음: {args.data} (python main.py backtest --fetch-days로 먼저 조회)\n")
+        return 1
+
+    combos = expand_spec(spec)
+    result = run_walk_forward(
+        config,
+        history,
+        combos,
+        train_days=args.train_days,
+        test_days=args.test_days,
+        step_days=args.step_days or None,
+        warmup_days=args.warmup_days,
+        workers=args.workers or None,
+        initial_krw=args.initial_krw,
+        rank_by=spec.get("rank_by") or ["total_return_pct"],
+        min_trades=int(spec.get("min_trades", 0) or 0),
+    )
+
+    for w in result["windows"]:
+        test = w["test"]
+        if test is None:
+            sys.stdout.write(f"#{w['window']:>2} {w['test_start'][:10]}~{w['test_end'][:10]} | 검증 실패 {w['error']}\n")
+            continue
+        sys.stdout.write(
+            f"#{w['window']:>2} {w['test_start'][:10]}~{w['test_end'][:10]} | "
+            f"학습 {w['train']['total_return_pct']:+.2f}% -> 검증 {test['total_return_pct']:+.2f}% | "
+            f"MDD {test['max_drawdown_pct']:.2f}% | 거래 {test['trades']} | "
+            f"{json.dumps(w['params'], ensure_ascii=False)}\n"
+        )
+    oos = result["oos"]
+    sys.stdout.write(
+        f"검증 누적 {oos['compounded_return_pct']:+.2f}% | 수익 창 {oos['positive_windows']}/{oos['windows']} | "
+        f"거래 {oos['trades']} | 최악 MDD {oos['worst_drawdown_pct']:.2f}%\n"
+    )
+    sys.stdout.write(f"제안 조합: {json.dumps(result['proposal_params'], ensure_ascii=False)}\n")
+    sys.stderr.write(f"{result['combos']}개 조합 x {len(result['windows'])}개 창 | {result['elapsed_seconds']:.1f}초\n")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result["proposal"], f, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in result.items() if k != "proposal"}, f, ensure_ascii=False, indent=2, default=str)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())